@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.core import checks
+from core.config import check_config
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self) -> None:
+        # Connect the receivers of the api signals.
+        from api import receivers
+
+        checks.register(check_config, deploy=True)
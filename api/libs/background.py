@@ -0,0 +1,102 @@
+import threading
+from typing import Any, Callable, Optional
+from django.db import connections
+
+# The tasks of the process, joined by join_background_tasks.
+_tasks: list['BackgroundTask'] = []
+
+
+class BackgroundTask:
+    '''
+    A task run in a background thread of the process, off the request
+    path (e.g. the rebuild of a table derived from the catalog
+    once a sync stored the new releases).
+    The task runs once at a time: scheduled while running,
+    it runs once more when done, the schedules meanwhile
+    being merged into that single run.
+
+    Attributes:
+        name (str): The name of the thread.
+        func (Callable[[], Any]): The task.
+    '''
+
+    def __init__(self, name: str, func: Callable[[], Any]):
+        '''
+        The constructor.
+
+        Args:
+            name (str): The name of the thread.
+            func (Callable[[], Any]): The task.
+        '''
+
+        self.name: str = name
+        self.func: Callable[[], Any] = func
+        self._lock: threading.Lock = threading.Lock()
+        self._pending: bool = False
+        self._thread: Optional[threading.Thread] = None
+        _tasks.append(self)
+
+    def schedule(self) -> None:
+        '''
+        Run the task in the background, unless it is already running
+        (it runs once more when done instead).
+        '''
+
+        with self._lock:
+            self._pending = True
+
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        '''
+        Run the task until no run is pending.
+        '''
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._thread = None
+                        return
+
+                    self._pending = False
+
+                try:
+                    self.func()
+                except BaseException:
+                    with self._lock:
+                        self._thread = None
+
+                    raise
+        finally:
+            connections.close_all()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        '''
+        Wait for the running task, if any.
+
+        Args:
+            timeout (Optional[float]): The maximum time to wait,
+                in seconds. Default to None (no limit).
+        '''
+
+        thread: Optional[threading.Thread] = self._thread
+
+        if thread is not None:
+            thread.join(timeout)
+
+
+def join_background_tasks() -> None:
+    '''
+    Wait for the background tasks of the process (e.g. before
+    a management command exits, killing the daemon threads).
+    '''
+
+    for task in _tasks:
+        task.join()
@@ -0,0 +1,247 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from django.db import connection, router, transaction
+from django.db.models import Q
+from api.models import Change, SyncGeneration
+
+# The PostgreSQL advisory lock serializing the generations allocation.
+GENERATION_LOCK: int = 0x67656E
+
+# The action resulting from two successive actions on the same object,
+# None meaning the object is back to its former state.
+_MERGED_ACTIONS: dict[tuple[str, str], Optional[str]] = {
+    (Change.INSERT, Change.UPDATE): Change.INSERT,
+    (Change.INSERT, Change.DELETE): None,
+    (Change.UPDATE, Change.DELETE): Change.DELETE,
+    (Change.DELETE, Change.INSERT): Change.UPDATE,
+}
+
+
+class ChangeRecorder:
+    '''
+    Collect the changes of a generation, in memory,
+    merging the successive changes of an object.
+
+    Attributes:
+        changes (dict[tuple[str, str], str]): The actions
+            by kind and object ID.
+        generation (Optional[SyncGeneration]): The generation,
+            once stored.
+    '''
+
+    def __init__(self):
+        '''
+        The constructor.
+        '''
+
+        self.changes: dict[tuple[str, str], str] = {}
+        self.generation: Optional[SyncGeneration] = None
+
+    def record(self, kind: str, object_id: str, action: str) -> None:
+        '''
+        Record a change.
+
+        Args:
+            kind (str): The kind of the changed object.
+            object_id (str): The primary key of the changed object.
+            action (str): The change action.
+        '''
+
+        key: tuple[str, str] = (kind, object_id)
+        previous: Optional[str] = self.changes.get(key)
+
+        if previous is not None:
+            action = _MERGED_ACTIONS.get((previous, action), action)
+
+        if action is None:
+            del self.changes[key]
+        else:
+            self.changes[key] = action
+
+
+_recorder: ContextVar[Optional[ChangeRecorder]] = ContextVar(
+    'change_recorder', default=None
+)
+
+
+def _lock_generations() -> None:
+    '''
+    Lock the generations allocation until the end of the transaction,
+    so the generations are committed in their number order
+    (and a client never reads a generation before a lower one
+    still in flight). SQLite serializes the write transactions already.
+    '''
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s)', [GENERATION_LOCK]
+            )
+
+
+@contextmanager
+def new_generation() -> Iterator[ChangeRecorder]:
+    '''
+    Collect the changes of the context and store them as a new
+    generation when it exits.
+    The generation number is allocated with its changes, in a single
+    transaction, so a reader never sees a generation without its
+    changes, and in the commit order of the generations.
+    Allocated in a larger transaction (e.g. a batch of a sync),
+    the generation holds the allocation until that transaction
+    commits: the changes of the context should be stored last.
+    '''
+
+    recorder: ChangeRecorder = ChangeRecorder()
+    token: Any = _recorder.set(recorder)
+
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        # The changes already written are stored even if the context
+        # failed midway.
+        with transaction.atomic():
+            _lock_generations()
+            recorder.generation = SyncGeneration.objects.create(
+                change_count=len(recorder.changes)
+            )
+            Change.objects.bulk_create(
+                [
+                    Change(
+                        generation=recorder.generation,
+                        kind=kind,
+                        object_id=object_id,
+                        action=action,
+                    )
+                    for (kind, object_id), action in recorder.changes.items()
+                ],
+                batch_size=1000,
+            )
+
+
+def record_change(kind: str, object_id: str, action: str) -> None:
+    '''
+    Record a change in the generation of the context,
+    or in a generation of its own outside of any.
+
+    Args:
+        kind (str): The kind of the changed object.
+        object_id (str): The primary key of the changed object.
+        action (str): The change action.
+    '''
+
+    recorder: Optional[ChangeRecorder] = _recorder.get()
+
+    if recorder is not None:
+        recorder.record(kind, object_id, action)
+        return
+
+    with new_generation() as recorder:
+        recorder.record(kind, object_id, action)
+
+
+def get_changes(
+    since: int, limit: int, after: Optional[int] = None
+) -> tuple[int, list[Change]]:
+    '''
+    Get a page of the changes of the generations following a generation.
+    The generations are committed in their number order (see
+    new_generation), so the ones following the last generation
+    are never committed before it.
+
+    Args:
+        since (int): The last generation known by the client
+            (0 for all of them), or the generation of the last change
+            read if after is given.
+        limit (int): The maximum number of changes.
+        after (Optional[int]): The ID of the last change read
+            of the since generation, to read its next changes.
+            Default to None (the since generation is fully known).
+
+    Returns:
+        tuple[int, list[Change]]: The last generation
+            and the changes, by generation.
+    '''
+
+    # Both reads go to the same database (e.g. the same replica).
+    using: str = router.db_for_read(Change)
+    # The last generation is read first: the generations created
+    # meanwhile are returned by the next call.
+    last: int = (
+        SyncGeneration.objects.using(using)
+        .order_by('-generation_id')
+        .values_list('generation_id', flat=True)
+        .first()
+    ) or 0
+    changes = Change.objects.using(using).filter(generation_id__lte=last)
+
+    if after is None:
+        changes = changes.filter(generation_id__gt=since)
+    else:
+        changes = changes.filter(
+            Q(generation_id__gt=since)
+            | Q(generation_id=since, change_id__gt=after)
+        )
+
+    # Keyset pagination: each page is a bounded index range scan.
+    return max(last, since), list(
+        changes.order_by('generation_id', 'change_id')[:limit]
+    )
+
+
+def compact_changes(keep: int) -> int:
+    '''
+    Merge the generations preceding the last kept ones into
+    the most recent of them, keeping the last change of each object.
+    The clients which knew one of the merged generations get
+    some of their changes again: the inserts and updates
+    must be applied as upserts.
+
+    Args:
+        keep (int): The number of most recent generations
+            left as they are.
+
+    Returns:
+        int: The number of removed changes.
+    '''
+
+    generation_ids: list[int] = list(
+        SyncGeneration.objects.order_by('-generation_id').values_list(
+            'generation_id', flat=True
+        )[keep : keep + 1]
+    )
+
+    if not generation_ids:
+        return 0
+
+    horizon: int = generation_ids[0]
+
+    with transaction.atomic():
+        merged = Change.objects.filter(generation_id__lte=horizon)
+        last_changes: dict[tuple[str, str], Change] = {}
+
+        for change in merged.order_by('generation_id', 'change_id').iterator():
+            last_changes[(change.kind, change.object_id)] = change
+
+        count: int = merged.count()
+        merged.delete()
+        SyncGeneration.objects.filter(generation_id__lt=horizon).delete()
+        Change.objects.bulk_create(
+            [
+                Change(
+                    generation_id=horizon,
+                    kind=change.kind,
+                    object_id=change.object_id,
+                    action=change.action,
+                )
+                for change in last_changes.values()
+            ],
+            batch_size=1000,
+        )
+        SyncGeneration.objects.filter(generation_id=horizon).update(
+            change_count=len(last_changes)
+        )
+
+    return count - len(last_changes)
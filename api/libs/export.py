@@ -0,0 +1,457 @@
+import csv
+import io
+import time
+from collections import defaultdict
+from typing import Any, Callable, Iterator, Optional, TextIO
+from core.codec import dumps
+from api.models import (
+    Album,
+    AlbumExternalURL,
+    AlbumImageURL,
+    Artist,
+    ArtistExternalURL,
+    ArtistImageURL,
+)
+
+NDJSON: str = 'ndjson'
+CSV: str = 'csv'
+PARQUET: str = 'parquet'
+FORMATS: tuple[str, ...] = (NDJSON, CSV, PARQUET)
+# The number of rows read, joined and written at once
+# (a Parquet row group per chunk).
+CHUNK_SIZE: int = 2000
+
+Row = dict[str, Any]
+
+
+def _group(rows: Iterator[tuple], value: Callable[[tuple], Any]) -> dict:
+    '''
+    Group rows by their first column.
+
+    Args:
+        rows (Iterator[tuple]): The rows.
+        value (Callable[[tuple], Any]): The grouped value of a row.
+
+    Returns:
+        dict: The values lists by first column.
+    '''
+
+    groups: dict[Any, list] = defaultdict(list)
+
+    for row in rows:
+        groups[row[0]].append(value(row))
+
+    return groups
+
+
+def _artist_rows(artist_ids: list[str]) -> list[Row]:
+    '''
+    Get the export rows of a chunk of artists,
+    with a query per relation for the whole chunk.
+
+    Args:
+        artist_ids (list[str]): The artists IDs.
+
+    Returns:
+        list[Row]: The rows.
+    '''
+
+    genres: dict[str, list] = _group(
+        Artist.genres.through.objects.filter(artist_id__in=artist_ids)
+        .order_by('artist_id', 'genre__name')
+        .values_list('artist_id', 'genre__name'),
+        lambda row: row[1],
+    )
+    external_urls: dict[str, list] = _group(
+        ArtistExternalURL.objects.filter(artist_id__in=artist_ids)
+        .order_by('pk')
+        .values_list('artist_id', 'source', 'url'),
+        lambda row: {'source': row[1], 'url': row[2]},
+    )
+    image_urls: dict[str, list] = _group(
+        ArtistImageURL.objects.filter(artist_id__in=artist_ids)
+        .order_by('pk')
+        .values_list('artist_id', 'width', 'height', 'url'),
+        lambda row: {'width': row[1], 'height': row[2], 'url': row[3]},
+    )
+
+    return [
+        {
+            **artist,
+            'genres': genres.get(artist['artist_id'], []),
+            'external_urls': external_urls.get(artist['artist_id'], []),
+            'image_urls': image_urls.get(artist['artist_id'], []),
+        }
+        for artist in Artist.objects.filter(artist_id__in=artist_ids)
+        .order_by('artist_id')
+        .values(
+            'artist_id',
+            'name',
+            'followers',
+            'popularity',
+            'href',
+            'artist_type',
+            'uri',
+        )
+    ]
+
+
+def _album_rows(album_ids: list[str]) -> list[Row]:
+    '''
+    Get the export rows of a chunk of albums,
+    with a query per relation for the whole chunk.
+
+    Args:
+        album_ids (list[str]): The albums IDs.
+
+    Returns:
+        list[Row]: The rows.
+    '''
+
+    artists: dict[str, list] = _group(
+        Album.artists.through.objects.filter(album_id__in=album_ids)
+        .order_by('album_id', 'artist_id')
+        .values_list('album_id', 'artist_id'),
+        lambda row: row[1],
+    )
+    markets: dict[str, list] = _group(
+        Album.available_markets.through.objects.filter(album_id__in=album_ids)
+        .order_by('album_id', 'market__country_code')
+        .values_list('album_id', 'market__country_code'),
+        lambda row: row[1],
+    )
+    external_urls: dict[str, list] = _group(
+        AlbumExternalURL.objects.filter(album_id__in=album_ids)
+        .order_by('pk')
+        .values_list('album_id', 'source', 'url'),
+        lambda row: {'source': row[1], 'url': row[2]},
+    )
+    image_urls: dict[str, list] = _group(
+        AlbumImageURL.objects.filter(album_id__in=album_ids)
+        .order_by('pk')
+        .values_list('album_id', 'width', 'height', 'url'),
+        lambda row: {'width': row[1], 'height': row[2], 'url': row[3]},
+    )
+
+    return [
+        {
+            **album,
+            'release_date': album['release_date'].isoformat(),
+            'last_checked_date': album['last_checked_date'].isoformat(),
+            'artist_ids': artists.get(album['album_id'], []),
+            'markets': markets.get(album['album_id'], []),
+            'external_urls': external_urls.get(album['album_id'], []),
+            'image_urls': image_urls.get(album['album_id'], []),
+        }
+        for album in Album.objects.filter(album_id__in=album_ids)
+        .order_by('album_id')
+        .values(
+            'album_id',
+            'name',
+            'album_type',
+            'release_date',
+            'release_date_precision',
+            'last_checked_date',
+            'object_type',
+            'href',
+            'uri',
+        )
+    ]
+
+
+# The model, the rows getter and the columns of the exported entities.
+ENTITIES: dict[str, tuple[Any, Callable[[list], list[Row]], list[str]]] = {
+    'artists': (
+        Artist,
+        _artist_rows,
+        [
+            'artist_id',
+            'name',
+            'followers',
+            'popularity',
+            'href',
+            'artist_type',
+            'uri',
+            'genres',
+            'external_urls',
+            'image_urls',
+        ],
+    ),
+    'albums': (
+        Album,
+        _album_rows,
+        [
+            'album_id',
+            'name',
+            'album_type',
+            'release_date',
+            'release_date_precision',
+            'last_checked_date',
+            'object_type',
+            'href',
+            'uri',
+            'artist_ids',
+            'markets',
+            'external_urls',
+            'image_urls',
+        ],
+    ),
+}
+
+
+def iter_chunks(
+    entity: str,
+    after: Optional[str] = None,
+    until: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[list[Row]]:
+    '''
+    Iterate over the rows of an entity by chunks, in primary key order.
+    Each chunk is an index range scan starting after the last key
+    of the previous one, so the memory stays constant and an
+    interrupted export resumes from its last key.
+
+    Args:
+        entity (str): The entity (artists or albums).
+        after (Optional[str]): The key after which to start.
+            Default to None (from the first key).
+        until (Optional[str]): The last key to export.
+            Default to None (up to the last key).
+        chunk_size (int): The number of rows per chunk.
+            Default to CHUNK_SIZE.
+
+    Yields:
+        list[Row]: The chunks of rows.
+    '''
+
+    model, get_rows, _ = ENTITIES[entity]
+    keys = model.objects.order_by('pk').values_list('pk', flat=True)
+
+    if until is not None:
+        keys = keys.filter(pk__lte=until)
+
+    while True:
+        chunk_keys: list[str] = list(
+            (keys.filter(pk__gt=after) if after is not None else keys)[
+                :chunk_size
+            ]
+        )
+
+        if not chunk_keys:
+            return
+
+        yield get_rows(chunk_keys)
+        after = chunk_keys[-1]
+
+
+def _to_csv_value(value: Any) -> Any:
+    '''
+    Flatten a value for a CSV cell (the lists as JSON).
+
+    Args:
+        value (Any): The value.
+
+    Returns:
+        Any: The cell value.
+    '''
+
+    return dumps(value).decode() if isinstance(value, list) else value
+
+
+def encode_chunks(
+    entity: str,
+    chunks: Iterator[list[Row]],
+    format: str,
+    header: bool = True,
+) -> Iterator[str]:
+    '''
+    Encode the chunks of rows as NDJSON lines or CSV rows.
+
+    Args:
+        entity (str): The entity (artists or albums).
+        chunks (Iterator[list[Row]]): The chunks of rows.
+        format (str): The format (ndjson or csv).
+        header (bool): Whether to start with the CSV header.
+            Default to True.
+
+    Yields:
+        str: The encoded chunks.
+    '''
+
+    columns: list[str] = ENTITIES[entity][2]
+
+    if format == NDJSON:
+        for rows in chunks:
+            yield ''.join(dumps(row).decode() + '\n' for row in rows)
+
+        return
+
+    buffer: io.StringIO = io.StringIO()
+    writer: csv.DictWriter = csv.DictWriter(buffer, fieldnames=columns)
+
+    if header:
+        writer.writeheader()
+
+    for rows in chunks:
+        writer.writerows(
+            {column: _to_csv_value(row[column]) for column in columns}
+            for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # The header of an empty export.
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_parquet(
+    entity: str, chunks: Iterator[list[Row]], path: str
+) -> Iterator[list[Row]]:
+    '''
+    Write the chunks of rows to a Parquet file, a row group per chunk.
+    Requires pyarrow (imported by the first Parquet export only,
+    as it is slow to import).
+
+    Args:
+        entity (str): The entity (artists or albums).
+        chunks (Iterator[list[Row]]): The chunks of rows.
+        path (str): The file path.
+
+    Raises:
+        RuntimeError: If pyarrow isn't installed.
+
+    Yields:
+        list[Row]: The written chunks.
+    '''
+
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError('The Parquet export requires pyarrow.')
+
+    columns: list[str] = ENTITIES[entity][2]
+    writer: Optional[Any] = None
+
+    try:
+        for rows in chunks:
+            # Table.from_pylist requires pyarrow 7.
+            table: Any = pyarrow.Table.from_pydict(
+                {column: [row[column] for row in rows] for column in columns},
+                schema=writer.schema if writer else None,
+            )
+
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(path, table.schema)
+
+            writer.write_table(table)
+            yield rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+class ExportProgress:
+    '''
+    The progress of an export: the exported rows, the throughput,
+    and the last exported key (to resume from).
+
+    Attributes:
+        entity (str): The entity (artists or albums).
+        rows (int): The number of exported rows.
+        last_key (Optional[str]): The last exported key.
+        started (float): The start time.
+    '''
+
+    def __init__(self, entity: str):
+        '''
+        The constructor.
+
+        Args:
+            entity (str): The entity (artists or albums).
+        '''
+
+        self.entity: str = entity
+        self.rows: int = 0
+        self.last_key: Optional[str] = None
+        self.started: float = time.perf_counter()
+
+    def track(self, chunks: Iterator[list[Row]]) -> Iterator[list[Row]]:
+        '''
+        Count the rows of the chunks going through.
+
+        Args:
+            chunks (Iterator[list[Row]]): The chunks of rows.
+
+        Yields:
+            list[Row]: The same chunks.
+        '''
+
+        key: str = ENTITIES[self.entity][2][0]
+
+        for rows in chunks:
+            yield rows
+            self.rows += len(rows)
+            self.last_key = rows[-1][key] if rows else self.last_key
+
+    @property
+    def throughput(self) -> float:
+        '''
+        The number of exported rows per second.
+
+        Returns:
+            float: The throughput.
+        '''
+
+        return self.rows / max(time.perf_counter() - self.started, 1e-9)
+
+
+def export(
+    entity: str,
+    output: TextIO,
+    format: str = NDJSON,
+    after: Optional[str] = None,
+    until: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[ExportProgress] = None,
+) -> ExportProgress:
+    '''
+    Export an entity to a text output (NDJSON or CSV)
+    or to a Parquet file (output being its path).
+
+    Args:
+        entity (str): The entity (artists or albums).
+        output (TextIO): The text output, or the Parquet file path.
+        format (str): The format (ndjson, csv or parquet).
+            Default to ndjson.
+        after (Optional[str]): The key after which to start.
+            Default to None (from the first key).
+        until (Optional[str]): The last key to export.
+            Default to None (up to the last key).
+        chunk_size (int): The number of rows per chunk.
+            Default to CHUNK_SIZE.
+        progress (Optional[ExportProgress]): The progress to update.
+            Default to None (a new one).
+
+    Returns:
+        ExportProgress: The progress of the finished export.
+    '''
+
+    progress = progress or ExportProgress(entity)
+    chunks: Iterator[list[Row]] = progress.track(
+        iter_chunks(entity, after, until, chunk_size)
+    )
+
+    if format == PARQUET:
+        for _ in write_parquet(entity, chunks, output):
+            pass
+    else:
+        # A resumed export continues the output of the previous one.
+        for data in encode_chunks(
+            entity, chunks, format, header=after is None
+        ):
+            output.write(data)
+
+    return progress
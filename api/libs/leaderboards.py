@@ -0,0 +1,142 @@
+import datetime
+import heapq
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+from django.db import transaction
+from django.utils import timezone
+from api.models import Album, Artist, Leaderboard, ReleaseAppearance
+
+# The number of artists per leaderboard.
+DEFAULT_K: int = 20
+# The number of days an artist is new after the appearance
+# of one of their albums in the new releases.
+WINDOW_DAYS: int = 7
+
+# An artist entry: the artist ID, name and popularity.
+Entry = tuple[str, str, int]
+
+
+def compute_leaderboards(
+    artists: Iterable[Entry],
+    artist_genres: dict[str, set[str]],
+    artist_markets: dict[str, set[str]],
+    k: int = DEFAULT_K,
+) -> dict[tuple[str, str], list[Entry]]:
+    '''
+    Compute the k most popular artists of each (genre, market)
+    in a single pass, with a bounded min-heap per leaderboard.
+    The ties are broken by artist ID.
+
+    Args:
+        artists (Iterable[Entry]): The artists.
+        artist_genres (dict[str, set[str]]): The genres by artist ID.
+        artist_markets (dict[str, set[str]]): The markets (country codes)
+            by artist ID.
+        k (int): The number of artists per leaderboard.
+            Default to DEFAULT_K.
+
+    Returns:
+        dict[tuple[str, str], list[Entry]]: The artists, most popular
+            first, by genre and market.
+    '''
+
+    artists = sorted(artists)
+    heaps: dict[tuple[str, str], list[tuple[int, int]]] = defaultdict(list)
+
+    for index, (artist_id, _, popularity) in enumerate(artists):
+        # The first artist IDs win the ties.
+        item: tuple[int, int] = (popularity, -index)
+
+        for genre in artist_genres.get(artist_id, ()):
+            for market in artist_markets.get(artist_id, ()):
+                heap: list[tuple[int, int]] = heaps[(genre, market)]
+
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+    return {
+        key: [artists[-rank] for _, rank in sorted(heap, reverse=True)]
+        for key, heap in heaps.items()
+    }
+
+
+def update_leaderboards(
+    k: int = DEFAULT_K, today: Optional[datetime.date] = None
+) -> int:
+    '''
+    Rebuild the leaderboards of the artists whose albums appeared
+    in the new releases of the last WINDOW_DAYS days.
+
+    Args:
+        k (int): The number of artists per leaderboard.
+            Default to DEFAULT_K.
+        today (Optional[datetime.date]): The last day of the window.
+            Default to None (today).
+
+    Returns:
+        int: The number of leaderboards.
+    '''
+
+    today = today or timezone.now().date()
+    album_ids: Any = ReleaseAppearance.objects.filter(
+        date__gt=today - datetime.timedelta(days=WINDOW_DAYS),
+        date__lte=today,
+    ).values('album_id')
+    album_artists: Any = Album.artists.through.objects.filter(
+        album_id__in=album_ids
+    )
+    album_markets: Any = Album.available_markets.through.objects.filter(
+        album_id__in=album_ids
+    )
+    markets: dict[str, set[str]] = defaultdict(set)
+    artist_markets: dict[str, set[str]] = defaultdict(set)
+    artist_genres: dict[str, set[str]] = defaultdict(set)
+
+    for album_id, country_code in album_markets.values_list(
+        'album_id', 'market__country_code'
+    ):
+        markets[album_id].add(country_code)
+
+    for artist_id, album_id in album_artists.values_list(
+        'artist_id', 'album_id'
+    ):
+        artist_markets[artist_id] |= markets[album_id]
+
+    for artist_id, genre in Artist.genres.through.objects.filter(
+        artist_id__in=album_artists.values('artist_id')
+    ).values_list('artist_id', 'genre__name'):
+        artist_genres[artist_id].add(genre)
+
+    leaderboards: dict[tuple[str, str], list[Entry]] = compute_leaderboards(
+        Artist.objects.filter(
+            artist_id__in=album_artists.values('artist_id')
+        ).values_list('artist_id', 'name', 'popularity'),
+        artist_genres,
+        artist_markets,
+        k=k,
+    )
+
+    with transaction.atomic():
+        Leaderboard.objects.all().delete()
+        Leaderboard.objects.bulk_create(
+            (
+                Leaderboard(
+                    genre=genre,
+                    country_code=country_code,
+                    artists=[
+                        {
+                            'artist_id': artist_id,
+                            'name': name,
+                            'popularity': popularity,
+                        }
+                        for artist_id, name, popularity in entries
+                    ],
+                )
+                for (genre, country_code), entries in leaderboards.items()
+            ),
+            batch_size=500,
+        )
+
+    return len(leaderboards)
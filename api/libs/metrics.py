@@ -0,0 +1,376 @@
+import datetime
+from collections import defaultdict
+from typing import Iterable, Optional
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from api.models import Artist, ArtistMetricSeries
+
+# A sample: the day, the followers and the popularity.
+Sample = tuple[datetime.date, int, int]
+
+
+def encode_deltas(values: Iterable[int]) -> bytes:
+    '''
+    Encode integers as the zigzag varints of their successive deltas.
+    The slowly changing series (days, followers, popularity)
+    take one or two bytes per value.
+
+    Args:
+        values (Iterable[int]): The integers.
+
+    Returns:
+        bytes: The encoded integers.
+    '''
+
+    data: bytearray = bytearray()
+    previous: int = 0
+
+    for value in values:
+        delta: int = value - previous
+        previous = value
+        # Zigzag: 0, -1, 1, -2... -> 0, 1, 2, 3...
+        unsigned: int = delta * 2 if delta >= 0 else -delta * 2 - 1
+
+        while unsigned >= 0x80:
+            data.append(unsigned & 0x7F | 0x80)
+            unsigned >>= 7
+
+        data.append(unsigned)
+
+    return bytes(data)
+
+
+def decode_deltas(data: bytes) -> list[int]:
+    '''
+    Decode the integers encoded by encode_deltas.
+
+    Args:
+        data (bytes): The encoded integers.
+
+    Returns:
+        list[int]: The integers.
+    '''
+
+    values: list[int] = []
+    previous: int = 0
+    unsigned: int = 0
+    shift: int = 0
+
+    for byte in bytes(data):
+        unsigned |= (byte & 0x7F) << shift
+        shift += 7
+
+        if byte & 0x80:
+            continue
+
+        previous += (
+            unsigned // 2 if unsigned % 2 == 0 else -(unsigned + 1) // 2
+        )
+        values.append(previous)
+        unsigned = 0
+        shift = 0
+
+    return values
+
+
+def get_period_start(date: datetime.date, resolution: str) -> datetime.date:
+    '''
+    Get the first day of the chunk holding a sample.
+
+    Args:
+        date (datetime.date): The sample day.
+        resolution (str): The series resolution.
+
+    Returns:
+        datetime.date: The first day of the month (daily resolution)
+            or of the year (weekly resolution).
+    '''
+
+    if resolution == ArtistMetricSeries.DAY:
+        return date.replace(day=1)
+
+    return date.replace(month=1, day=1)
+
+
+def get_samples(series: ArtistMetricSeries) -> list[Sample]:
+    '''
+    Decode the samples of a chunk.
+
+    Args:
+        series (ArtistMetricSeries): The chunk.
+
+    Returns:
+        list[Sample]: The samples, by day.
+    '''
+
+    return [
+        (series.period_start + datetime.timedelta(days=offset), *metrics)
+        for offset, *metrics in zip(
+            decode_deltas(series.days),
+            decode_deltas(series.followers),
+            decode_deltas(series.popularity),
+        )
+    ]
+
+
+def set_samples(series: ArtistMetricSeries, samples: list[Sample]) -> None:
+    '''
+    Encode the samples of a chunk.
+
+    Args:
+        series (ArtistMetricSeries): The chunk.
+        samples (list[Sample]): The samples, by day.
+    '''
+
+    series.sample_count = len(samples)
+    series.days = encode_deltas(
+        (date - series.period_start).days for date, _, _ in samples
+    )
+    series.followers = encode_deltas(followers for _, followers, _ in samples)
+    series.popularity = encode_deltas(
+        popularity for _, _, popularity in samples
+    )
+
+
+def downsample_weekly(
+    samples: Iterable[Sample],
+) -> dict[datetime.date, Sample]:
+    '''
+    Downsample daily samples to weekly ones: the last sample
+    of each week, dated by its monday.
+
+    Args:
+        samples (Iterable[Sample]): The daily samples, by day.
+
+    Returns:
+        dict[datetime.date, Sample]: The weekly samples by monday.
+    '''
+
+    weekly: dict[datetime.date, Sample] = {}
+
+    for date, followers, popularity in samples:
+        monday: datetime.date = date - datetime.timedelta(
+            days=date.weekday()
+        )
+        weekly[monday] = (monday, followers, popularity)
+
+    return weekly
+
+
+def _merge_samples(
+    artist_samples: dict[str, dict[datetime.date, Sample]], resolution: str
+) -> None:
+    '''
+    Merge samples into the chunks of their artists and periods,
+    a new sample replacing the stored one of the same day.
+
+    Args:
+        artist_samples (dict[str, dict[datetime.date, Sample]]):
+            The samples by artist ID and day.
+        resolution (str): The series resolution.
+    '''
+
+    chunk_samples: dict[tuple[str, datetime.date], dict] = defaultdict(dict)
+
+    for artist_id, samples in artist_samples.items():
+        for date, sample in samples.items():
+            chunk: tuple[str, datetime.date] = (
+                artist_id,
+                get_period_start(date, resolution),
+            )
+            chunk_samples[chunk][date] = sample
+
+    if not chunk_samples:
+        return
+
+    stored: dict[tuple[str, datetime.date], ArtistMetricSeries] = {
+        (series.artist_id, series.period_start): series
+        for series in ArtistMetricSeries.objects.filter(
+            artist_id__in=artist_samples,
+            resolution=resolution,
+            period_start__in={period for _, period in chunk_samples},
+        )
+    }
+    to_create: list[ArtistMetricSeries] = []
+    to_update: list[ArtistMetricSeries] = []
+
+    for (artist_id, period_start), samples in chunk_samples.items():
+        series: Optional[ArtistMetricSeries] = stored.get(
+            (artist_id, period_start)
+        )
+
+        if series is None:
+            series = ArtistMetricSeries(
+                artist_id=artist_id,
+                resolution=resolution,
+                period_start=period_start,
+            )
+            to_create.append(series)
+        else:
+            samples = {
+                sample[0]: sample for sample in get_samples(series)
+            } | samples
+            to_update.append(series)
+
+        set_samples(series, sorted(samples.values()))
+
+    ArtistMetricSeries.objects.bulk_create(to_create, batch_size=500)
+    ArtistMetricSeries.objects.bulk_update(
+        to_update,
+        ['sample_count', 'days', 'followers', 'popularity'],
+        batch_size=500,
+    )
+
+
+def record_metrics(
+    artists: Iterable[Artist], date: Optional[datetime.date] = None
+) -> None:
+    '''
+    Append the current followers and popularity of the artists
+    to their daily series.
+
+    Args:
+        artists (Iterable[Artist]): The artists.
+        date (Optional[datetime.date]): The sample day.
+            Default to None (today).
+    '''
+
+    date = date or timezone.now().date()
+
+    with transaction.atomic():
+        _merge_samples(
+            {
+                artist.artist_id: {
+                    date: (date, artist.followers, artist.popularity)
+                }
+                for artist in artists
+            },
+            ArtistMetricSeries.DAY,
+        )
+
+
+def rollup_metrics(before: datetime.date, batch_size: int = 500) -> int:
+    '''
+    Downsample the daily chunks of the months ended before a day
+    to weekly samples (the last sample of each week, dated by its
+    monday), then delete them.
+
+    Args:
+        before (datetime.date): The day before which the months
+            are rolled up.
+        batch_size (int): The number of artists rolled up
+            per transaction.
+            Default to 500.
+
+    Returns:
+        int: The number of rolled up daily chunks.
+    '''
+
+    old_series = ArtistMetricSeries.objects.filter(
+        resolution=ArtistMetricSeries.DAY,
+        period_start__lt=get_period_start(before, ArtistMetricSeries.DAY),
+    )
+    artist_ids: list[str] = list(
+        old_series.order_by('artist_id')
+        .values_list('artist_id', flat=True)
+        .distinct()
+    )
+    rolled_up: int = 0
+
+    for start in range(0, len(artist_ids), batch_size):
+        with transaction.atomic():
+            batch = old_series.filter(
+                artist_id__in=artist_ids[start : start + batch_size]
+            )
+            weekly: dict[str, dict[datetime.date, Sample]] = defaultdict(dict)
+
+            for series in batch.order_by('period_start'):
+                weekly[series.artist_id].update(
+                    downsample_weekly(get_samples(series))
+                )
+                rolled_up += 1
+
+            _merge_samples(weekly, ArtistMetricSeries.WEEK)
+            batch.delete()
+
+    return rolled_up
+
+
+def get_series(
+    artist_ids: list[str],
+    from_date: datetime.date,
+    to_date: datetime.date,
+    resolution: str = ArtistMetricSeries.DAY,
+) -> dict[str, list[Sample]]:
+    '''
+    Get the series of many artists between two days (included),
+    in a single query.
+    The rolled up days are served by the weekly samples, whatever
+    the resolution, the following ones by the daily samples
+    (downsampled like the rollup does at the weekly resolution).
+
+    Args:
+        artist_ids (list[str]): The artists IDs.
+        from_date (datetime.date): The first day.
+        to_date (datetime.date): The last day.
+        resolution (str): The series resolution.
+            Default to daily.
+
+    Returns:
+        dict[str, list[Sample]]: The samples by artist ID, by day.
+    '''
+
+    weekly: dict[str, dict[datetime.date, Sample]] = defaultdict(dict)
+    daily: dict[str, list[Sample]] = defaultdict(list)
+    # The first daily chunk of each artist: the days before it
+    # are rolled up.
+    boundaries: dict[str, datetime.date] = {}
+
+    for chunk in ArtistMetricSeries.objects.filter(
+        Q(
+            resolution=ArtistMetricSeries.DAY,
+            period_start__gte=get_period_start(
+                from_date, ArtistMetricSeries.DAY
+            ),
+        )
+        | Q(
+            resolution=ArtistMetricSeries.WEEK,
+            period_start__gte=get_period_start(
+                from_date, ArtistMetricSeries.WEEK
+            ),
+        ),
+        artist_id__in=artist_ids,
+        period_start__lte=to_date,
+    ).order_by('artist_id', 'period_start'):
+        if chunk.resolution == ArtistMetricSeries.WEEK:
+            weekly[chunk.artist_id].update(
+                (sample[0], sample) for sample in get_samples(chunk)
+            )
+        else:
+            boundaries.setdefault(chunk.artist_id, chunk.period_start)
+            daily[chunk.artist_id].extend(get_samples(chunk))
+
+    series: dict[str, list[Sample]] = {}
+
+    for artist_id in artist_ids:
+        boundary: Optional[datetime.date] = boundaries.get(artist_id)
+        samples: dict[datetime.date, Sample] = {
+            date: sample
+            for date, sample in weekly[artist_id].items()
+            if boundary is None or date < boundary
+        }
+
+        if resolution == ArtistMetricSeries.WEEK:
+            # The week straddling the boundary ends with a daily sample.
+            samples |= downsample_weekly(daily[artist_id])
+        else:
+            samples |= {sample[0]: sample for sample in daily[artist_id]}
+
+        series[artist_id] = [
+            samples[date]
+            for date in sorted(samples)
+            if from_date <= date <= to_date
+        ]
+
+    return series
@@ -0,0 +1,274 @@
+import datetime
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+from django.db import models, transaction
+from django.db.models import Count, QuerySet
+from django.utils import timezone
+from api.libs.changes import new_generation, record_change
+from api.models import (
+    Album,
+    Artist,
+    Change,
+    Genre,
+    Market,
+    SearchDocument,
+)
+
+# The number of days after which an album no longer listed
+# in the new releases is pruned.
+DEFAULT_MAX_AGE_DAYS: int = 180
+# The number of rows deleted per transaction, counting the rows
+# deleted with them (e.g. the markets of the albums).
+BATCH_SIZE: int = 500
+# The pause in seconds between two batches, letting the other
+# transactions and the replication catch up.
+THROTTLE: float = 0.1
+
+# The search documents kinds of the pruned models.
+_DOCUMENT_KINDS: dict[Any, str] = {
+    Album: SearchDocument.ALBUM,
+    Artist: SearchDocument.ARTIST,
+    Genre: SearchDocument.GENRE,
+}
+# The change feed kinds of the pruned models.
+_CHANGE_KINDS: dict[Any, str] = {
+    Album: Change.ALBUM,
+    Artist: Change.ARTIST,
+}
+
+
+def get_prunable(
+    max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+    keep_popularity: Optional[int] = None,
+    keep_released_days: Optional[int] = None,
+    today: Optional[datetime.date] = None,
+) -> dict[str, QuerySet]:
+    '''
+    Get the rows to prune, according to the retention policy:
+    the albums not listed in the new releases since max_age_days,
+    except the ones kept by the keep rules, then the artists, genres
+    and markets left without album or artist.
+    The querysets describe the catalog once pruned, so they count
+    the same rows before and during the pruning.
+
+    Args:
+        max_age_days (int): The number of days after which an album
+            no longer listed is pruned. Default to DEFAULT_MAX_AGE_DAYS.
+        keep_popularity (Optional[int]): Keep the albums of the artists
+            at least this popular. Default to None (no popularity kept).
+        keep_released_days (Optional[int]): Keep the albums released
+            in the last days. Default to None (no release date kept).
+        today (Optional[datetime.date]): The current day.
+            Default to None (today).
+
+    Returns:
+        dict[str, QuerySet]: The rows to prune, by table,
+            in the pruning order.
+    '''
+
+    today = today or timezone.now().date()
+    albums: QuerySet = Album.objects.filter(
+        last_checked_date__lt=today - datetime.timedelta(days=max_age_days)
+    )
+
+    if keep_popularity is not None:
+        albums = albums.exclude(artists__popularity__gte=keep_popularity)
+
+    if keep_released_days is not None:
+        albums = albums.exclude(
+            release_date__gte=today
+            - datetime.timedelta(days=keep_released_days)
+        )
+
+    kept_albums: QuerySet = Album.objects.exclude(pk__in=albums.values('pk'))
+    artists: QuerySet = Artist.objects.exclude(album__in=kept_albums)
+    kept_artists: QuerySet = Artist.objects.exclude(
+        pk__in=artists.values('pk')
+    )
+
+    return {
+        'albums': albums,
+        'artists': artists,
+        'genres': Genre.objects.exclude(artist__in=kept_artists),
+        'markets': Market.objects.exclude(album__in=kept_albums),
+    }
+
+
+def count_cascaded(
+    model: type[models.Model], pks: list[Any]
+) -> dict[Any, int]:
+    '''
+    Count the rows deleted with each row of a model (by cascade,
+    and the rows of its many-to-many relations).
+
+    Args:
+        model (type[models.Model]): The model.
+        pks (list[Any]): The primary keys of the rows.
+
+    Returns:
+        dict[Any, int]: The number of related rows by primary key.
+    '''
+
+    relations: list[tuple[type[models.Model], str]] = []
+
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            relations.append(
+                (
+                    relation.through,
+                    relation.field.m2m_reverse_field_name(),
+                )
+            )
+        elif relation.on_delete is models.CASCADE:
+            relations.append((relation.related_model, relation.field.name))
+
+    for field in model._meta.many_to_many:
+        relations.append(
+            (field.remote_field.through, field.m2m_field_name())
+        )
+
+    counts: dict[Any, int] = dict.fromkeys(pks, 0)
+
+    for related_model, field_name in relations:
+        for pk, count in (
+            related_model.objects.filter(**{f'{field_name}__in': pks})
+            .values_list(field_name)
+            .annotate(count=Count('pk'))
+            .order_by()
+        ):
+            counts[pk] += count
+
+    return counts
+
+
+def delete_in_batches(
+    queryset: QuerySet,
+    batch_size: int = BATCH_SIZE,
+    throttle: float = THROTTLE,
+) -> int:
+    '''
+    Delete the rows of a queryset by small primary key ranges,
+    a transaction per range, so no lock is held for long and
+    the write-ahead log grows slowly. Each range starts after
+    the previous one, scanning the primary key index once.
+    The related rows (images, URLs, markets, search documents...)
+    are deleted with their rows, and counted in the batch size:
+    a range of albums available in many markets is shorter.
+    The history (the appearances in the new releases, the metrics
+    series and the sync runs journal) is kept.
+    The deletions of artists and albums are stored in the change feed,
+    a generation per range committed with it, so an interrupted
+    deletion loses none of them.
+
+    Args:
+        queryset (QuerySet): The rows to delete.
+        batch_size (int): The number of rows per transaction,
+            counting the related rows. Default to BATCH_SIZE.
+        throttle (float): The pause in seconds between two batches.
+            Default to THROTTLE.
+
+    Returns:
+        int: The number of deleted rows.
+    '''
+
+    kind: Optional[str] = _DOCUMENT_KINDS.get(queryset.model)
+    change_kind: Optional[str] = _CHANGE_KINDS.get(queryset.model)
+    last_pk: Optional[Any] = None
+    deleted: int = 0
+
+    while True:
+        batch: QuerySet = queryset.order_by('pk')
+
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+
+        pks: list[Any] = list(batch.values_list('pk', flat=True)[:batch_size])
+
+        if not pks:
+            return deleted
+
+        cascaded: dict[Any, int] = count_cascaded(queryset.model, pks)
+        rows: int = 0
+
+        # At least a row per range, whatever its related rows.
+        for end, pk in enumerate(pks):
+            rows += 1 + cascaded[pk]
+
+            if rows > batch_size and end:
+                pks = pks[:end]
+                break
+
+        with transaction.atomic(), (
+            new_generation() if change_kind is not None else nullcontext()
+        ):
+            if kind is not None:
+                SearchDocument.objects.filter(
+                    kind=kind, object_id__in=[str(pk) for pk in pks]
+                ).delete()
+
+            # Recorded here rather than by a post_delete receiver,
+            # which would load and signal every deleted row.
+            if change_kind is not None:
+                for pk in pks:
+                    record_change(change_kind, str(pk), Change.DELETE)
+
+            queryset.model.objects.filter(pk__in=pks).delete()
+
+        deleted += len(pks)
+        last_pk = pks[-1]
+        time.sleep(throttle)
+
+
+def prune_catalog(
+    max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+    keep_popularity: Optional[int] = None,
+    keep_released_days: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    throttle: float = THROTTLE,
+    dry_run: bool = False,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> dict[str, int]:
+    '''
+    Prune the catalog according to the retention policy
+    (see get_prunable), by batches (see delete_in_batches).
+
+    Args:
+        max_age_days (int): The number of days after which an album
+            no longer listed is pruned. Default to DEFAULT_MAX_AGE_DAYS.
+        keep_popularity (Optional[int]): Keep the albums of the artists
+            at least this popular. Default to None (no popularity kept).
+        keep_released_days (Optional[int]): Keep the albums released
+            in the last days. Default to None (no release date kept).
+        batch_size (int): The number of rows per transaction.
+            Default to BATCH_SIZE.
+        throttle (float): The pause in seconds between two batches.
+            Default to THROTTLE.
+        dry_run (bool): Only count the rows to prune.
+            Default to False.
+        on_progress (Optional[Callable[[str, int], None]]): Called
+            with the table and its number of pruned rows once pruned.
+            Default to None.
+
+    Returns:
+        dict[str, int]: The number of pruned (or prunable) rows by table.
+    '''
+
+    prunable: dict[str, QuerySet] = get_prunable(
+        max_age_days, keep_popularity, keep_released_days
+    )
+
+    if dry_run:
+        return {
+            table: queryset.count() for table, queryset in prunable.items()
+        }
+
+    pruned: dict[str, int] = {}
+
+    for table, queryset in prunable.items():
+        pruned[table] = delete_in_batches(queryset, batch_size, throttle)
+
+        if on_progress is not None:
+            on_progress(table, pruned[table])
+
+    return pruned
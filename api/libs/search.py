@@ -0,0 +1,359 @@
+import re
+import time
+import unicodedata
+from collections import Counter
+from operator import itemgetter
+from typing import Iterable, Optional
+from django.db import connections, transaction
+from django.db.models import Max
+from api.models import Album, Artist, Genre, SearchDocument, SearchTrigram
+
+# The minimum Jaccard similarity between the query trigrams
+# and the name trigrams of a typo tolerant match.
+SIMILARITY_THRESHOLD: float = 0.3
+# The maximum length of the short prefixes, whose matches
+# are read from their bucket (see SearchDocument).
+SHORT_PREFIX_LENGTH: int = 2
+# The minimum query length of the typo tolerant matching
+# (the shorter queries are only matched by prefix).
+MIN_TYPO_LENGTH: int = 4
+# The maximum number of typo tolerant candidates scored per query.
+MAX_CANDIDATES: int = 200
+# The maximum number of postings read per typo tolerant query:
+# the posting lists are read from the shortest (the rarest trigrams,
+# telling the names apart), until the next one exceeds the budget.
+MAX_POSTINGS: int = 13000
+# The posting lists lengths are cached for this time in seconds
+# (they only order the lists, so may lag behind the index).
+POSTINGS_COUNT_TIMEOUT: int = 3600
+# The cached posting lists lengths and their expiry, by trigram
+# (as many as distinct trigrams, kept by the process rather than
+# evicting the shared cache entries).
+_postings_counts: dict[str, tuple[int, float]] = {}
+# The highest code point, closing the prefix range scans (SQLite).
+_MAX_CHAR: str = '\U0010ffff'
+_NON_ALNUM: re.Pattern = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text: str) -> str:
+    '''
+    Normalize a text for the search: lowercased, without accents,
+    and with the punctuation collapsed to single spaces.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The normalized text.
+    '''
+
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def get_trigrams(normalized: str) -> set[str]:
+    '''
+    Get the trigrams of a normalized text.
+    Each word is padded with a space before and after, so the words
+    boundaries weigh more. Unlike pg_trgm, there is no "  x" trigram
+    for the first letter: its posting list would be huge and carry
+    almost no information.
+
+    Args:
+        normalized (str): The normalized text.
+
+    Returns:
+        set[str]: The trigrams.
+    '''
+
+    trigrams: set[str] = set()
+
+    for word in normalized.split():
+        padded: str = f' {word} '
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+
+    return trigrams
+
+
+def get_postings_counts(trigrams: Iterable[str]) -> dict[str, int]:
+    '''
+    Get the posting lists lengths of trigrams, up to MAX_POSTINGS + 1
+    (the longer lists are never read), cached by the process.
+
+    Args:
+        trigrams (Iterable[str]): The trigrams.
+
+    Returns:
+        dict[str, int]: The posting list length by trigram.
+    '''
+
+    now: float = time.monotonic()
+    counts: dict[str, int] = {}
+
+    for trigram in trigrams:
+        cached: Optional[tuple[int, float]] = _postings_counts.get(trigram)
+
+        if cached is None or cached[1] <= now:
+            cached = (
+                SearchTrigram.objects.filter(trigram=trigram)[
+                    : MAX_POSTINGS + 1
+                ].count(),
+                now + POSTINGS_COUNT_TIMEOUT,
+            )
+            _postings_counts[trigram] = cached
+
+        counts[trigram] = cached[0]
+
+    return counts
+
+
+def index_documents(kind: str, documents: dict[str, tuple[str, int]]) -> None:
+    '''
+    Create or update the search documents of a kind,
+    and their trigrams when the name changed.
+
+    Args:
+        kind (str): The documents kind.
+        documents (dict[str, tuple[str, int]]): The name and popularity
+            of the documents by object ID.
+    '''
+
+    if not documents:
+        return
+
+    with transaction.atomic():
+        existing: dict[str, SearchDocument] = {
+            document.object_id: document
+            for document in SearchDocument.objects.filter(
+                kind=kind, object_id__in=documents
+            )
+        }
+        to_create: list[SearchDocument] = []
+        to_update: list[SearchDocument] = []
+        renamed: list[SearchDocument] = []
+
+        for object_id, (name, popularity) in documents.items():
+            normalized: str = normalize(name)
+            document: Optional[SearchDocument] = existing.get(object_id)
+
+            if document is None:
+                to_create.append(
+                    SearchDocument(
+                        kind=kind,
+                        object_id=object_id,
+                        name=name,
+                        normalized_name=normalized,
+                        prefix1=normalized[:1],
+                        prefix2=normalized[:2],
+                        trigram_count=len(get_trigrams(normalized)),
+                        popularity=popularity,
+                    )
+                )
+            elif document.name != name or document.popularity != popularity:
+                if document.normalized_name != normalized:
+                    document.normalized_name = normalized
+                    document.prefix1 = normalized[:1]
+                    document.prefix2 = normalized[:2]
+                    document.trigram_count = len(get_trigrams(normalized))
+                    renamed.append(document)
+
+                document.name = name
+                document.popularity = popularity
+                to_update.append(document)
+
+        SearchDocument.objects.bulk_create(to_create)
+        SearchDocument.objects.bulk_update(
+            to_update,
+            [
+                'name',
+                'normalized_name',
+                'prefix1',
+                'prefix2',
+                'trigram_count',
+                'popularity',
+            ],
+        )
+        SearchTrigram.objects.filter(document__in=renamed).delete()
+        # The primary keys of the created documents aren't returned
+        # by every backend.
+        created: Iterable[SearchDocument] = SearchDocument.objects.filter(
+            kind=kind,
+            object_id__in=[document.object_id for document in to_create],
+        )
+        SearchTrigram.objects.bulk_create(
+            [
+                SearchTrigram(trigram=trigram, document=document)
+                for document in [*created, *renamed]
+                for trigram in get_trigrams(document.normalized_name)
+            ],
+            batch_size=1000,
+        )
+
+
+def index_albums(albums: list[Album]) -> None:
+    '''
+    Index the albums, their artists and the genres of their artists.
+    The albums and genres are as popular as their most popular artist.
+
+    Args:
+        albums (list[Album]): The albums to index.
+    '''
+
+    album_ids: list[str] = [album.album_id for album in albums]
+    artists: list[Artist] = list(
+        Artist.objects.filter(album__in=album_ids).distinct()
+    )
+    index_documents(
+        SearchDocument.ARTIST,
+        {
+            artist.artist_id: (artist.name, artist.popularity)
+            for artist in artists
+        },
+    )
+    index_documents(
+        SearchDocument.ALBUM,
+        {
+            album.album_id: (album.name, album.popularity or 0)
+            for album in Album.objects.filter(album_id__in=album_ids).annotate(
+                popularity=Max('artists__popularity')
+            )
+        },
+    )
+    index_documents(
+        SearchDocument.GENRE,
+        {
+            str(genre.genre_id): (genre.name, genre.popularity or 0)
+            for genre in Genre.objects.filter(artist__in=artists)
+            .annotate(popularity=Max('artist__popularity'))
+            .distinct()
+        },
+    )
+
+
+def search(
+    query: str, limit: int = 10, kinds: Optional[list[str]] = None
+) -> list[SearchDocument]:
+    '''
+    Search the documents matching a query.
+    The names starting with the query come first, then the names
+    similar enough to the query (typo tolerance), each group
+    being ranked by popularity.
+    Both lookups are bounded index scans: an index only scan
+    of the names starting with the query, and the posting lists
+    of the rarest query trigrams, up to MAX_POSTINGS postings,
+    for the similar names. The names starting with a short query
+    (too many to rank) are read from its bucket, already ranked.
+
+    Args:
+        query (str): The query.
+        limit (int): The maximum number of results.
+            Default to 10.
+        kinds (Optional[list[str]]): The kinds of documents to search.
+            Default to None (all kinds).
+
+    Returns:
+        list[SearchDocument]: The matching documents.
+    '''
+
+    normalized: str = normalize(query)
+
+    if not normalized:
+        return []
+
+    documents = SearchDocument.objects.all()
+
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+
+    if len(normalized) <= SHORT_PREFIX_LENGTH:
+        # The first entries of the bucket index are the best matches.
+        return list(
+            documents.filter(
+                **{f'prefix{len(normalized)}': normalized}
+            ).order_by('-popularity', 'document_id')[:limit]
+        )
+
+    if connections[documents.db].vendor == 'postgresql':
+        # PostgreSQL compares the names with the database collation,
+        # under which a range scan has wrong bounds and skips the
+        # pattern ops index: LIKE 'prefix%' is served by the index.
+        prefixed = documents.filter(normalized_name__startswith=normalized)
+    else:
+        # SQLite compares the bytes, but its case insensitive LIKE
+        # never uses the index: the prefix is range scanned.
+        prefixed = documents.filter(
+            normalized_name__gte=normalized,
+            normalized_name__lt=normalized + _MAX_CHAR,
+        )
+
+    # The prefix index covers the ranking: the best matches are picked
+    # from the index alone, and only they are read from the table.
+    results: list[SearchDocument] = list(
+        SearchDocument.objects.filter(
+            document_id__in=prefixed.order_by(
+                '-popularity', 'document_id'
+            ).values('document_id')[:limit]
+        ).order_by('-popularity', 'document_id')
+    )
+
+    if len(results) >= limit:
+        return results
+
+    trigrams: set[str] = get_trigrams(normalized)
+
+    if len(normalized) < MIN_TYPO_LENGTH or not trigrams:
+        return results
+
+    # The candidates share the most trigrams with the query among
+    # the rarest ones, their similarity being computed on their names.
+    counts: dict[str, int] = get_postings_counts(trigrams)
+    budget: int = MAX_POSTINGS
+    read: list[str] = []
+
+    for trigram in sorted(trigrams, key=lambda trigram: counts[trigram]):
+        if counts[trigram] > budget:
+            break
+
+        budget -= counts[trigram]
+        read.append(trigram)
+
+    if not read:
+        return results
+
+    postings = SearchTrigram.objects.filter(trigram__in=read).values_list(
+        'document_id'
+    )
+    sql, params = postings.query.sql_with_params()
+
+    # The postings are plain IDs: they skip the querysets iteration.
+    with connections[postings.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        hits: Counter = Counter(map(itemgetter(0), cursor.fetchall()))
+
+    candidates: list[int] = [
+        document_id for document_id, _ in hits.most_common(MAX_CANDIDATES)
+    ]
+    found: set[int] = {document.document_id for document in results}
+    similar_ids: list[int] = []
+
+    for document_id, normalized_name, trigram_count in documents.filter(
+        document_id__in=candidates
+    ).values_list('document_id', 'normalized_name', 'trigram_count'):
+        shared: int = len(trigrams & get_trigrams(normalized_name))
+
+        if (
+            document_id not in found
+            and shared / (len(trigrams) + trigram_count - shared)
+            >= SIMILARITY_THRESHOLD
+        ):
+            similar_ids.append(document_id)
+
+    similar: list[SearchDocument] = list(
+        SearchDocument.objects.filter(document_id__in=similar_ids).order_by(
+            '-popularity', 'document_id'
+        )[: limit - len(results)]
+    )
+
+    return results + similar
@@ -0,0 +1,265 @@
+import heapq
+from collections import Counter, defaultdict
+from importlib.util import find_spec
+from typing import Any
+from django.db import transaction
+from api.models import Artist, SimilarArtist
+
+# Whether NumPy and SciPy are installed. They are slow to import,
+# so they are only imported by the first vectorized computation.
+VECTORIZED: bool = all(
+    find_spec(module) is not None for module in ('numpy', 'scipy')
+)
+
+JACCARD: str = 'jaccard'
+COSINE: str = 'cosine'
+METRICS: tuple[str, ...] = (JACCARD, COSINE)
+# The default number of neighbours stored per artist.
+DEFAULT_K: int = 10
+# The number of artists rows multiplied at once by the vectorized
+# computation (bounds the memory of the intersections block).
+BLOCK_SIZE: int = 2048
+
+Neighbours = dict[str, list[tuple[str, float]]]
+
+
+def _score(
+    intersection: Any, degree_a: Any, degree_b: Any, metric: str
+) -> Any:
+    '''
+    Compute the similarity of two genre sets from their sizes
+    and the size of their intersection (works on scalars and arrays).
+
+    Args:
+        intersection (Any): The number of shared genres.
+        degree_a (Any): The number of genres of the first artist.
+        degree_b (Any): The number of genres of the second artist.
+        metric (str): The metric (jaccard or cosine).
+
+    Returns:
+        Any: The similarity.
+    '''
+
+    if metric == JACCARD:
+        return intersection / (degree_a + degree_b - intersection)
+
+    return intersection / (degree_a * degree_b) ** 0.5
+
+
+def compute_neighbours_vectorized(
+    artist_genres: dict[str, set[Any]], k: int, metric: str
+) -> Neighbours:
+    '''
+    Compute the top-k neighbours of each artist with sparse
+    matrix products: the intersections of the genre sets are
+    the entries of A.At, A being the binary artist x genre matrix.
+    Requires NumPy and SciPy.
+
+    Args:
+        artist_genres (dict[str, set[Any]]): The genres by artist ID.
+        k (int): The number of neighbours per artist.
+        metric (str): The metric (jaccard or cosine).
+
+    Returns:
+        Neighbours: The neighbours and their scores by artist ID,
+            most similar first.
+    '''
+
+    import numpy as np
+    from scipy import sparse
+
+    artist_ids: list[str] = sorted(artist_genres)
+    genre_index: dict[Any, int] = {}
+    rows: list[int] = []
+    cols: list[int] = []
+
+    for row, artist_id in enumerate(artist_ids):
+        for genre in artist_genres[artist_id]:
+            rows.append(row)
+            cols.append(genre_index.setdefault(genre, len(genre_index)))
+
+    matrix: Any = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)),
+        shape=(len(artist_ids), len(genre_index)),
+    )
+    degrees: Any = np.asarray(matrix.sum(axis=1)).ravel()
+    transposed: Any = matrix.T.tocsr()
+    neighbours: Neighbours = {}
+
+    for start in range(0, len(artist_ids), BLOCK_SIZE):
+        block: Any = matrix[start : start + BLOCK_SIZE] @ transposed
+        # The neighbours IDs ascending within each row, so the stable
+        # sort below breaks the score ties by neighbour ID.
+        block.sort_indices()
+        block = block.tocoo()
+        block_rows: Any = block.row + start
+        not_self: Any = block_rows != block.col
+        block_rows = block_rows[not_self]
+        block_cols: Any = block.col[not_self]
+        scores: Any = _score(
+            block.data[not_self],
+            degrees[block_rows],
+            degrees[block_cols],
+            metric,
+        )
+        # Sort by artist, then by decreasing score.
+        order: Any = np.lexsort((-scores, block_rows))
+        block_rows = block_rows[order]
+        block_cols = block_cols[order]
+        scores = scores[order]
+        # The rank of each entry within its artist row.
+        _, starts, counts = np.unique(
+            block_rows, return_index=True, return_counts=True
+        )
+        ranks: Any = np.arange(len(block_rows)) - np.repeat(starts, counts)
+        top: Any = ranks < k
+
+        for row, col, score in zip(
+            block_rows[top].tolist(),
+            block_cols[top].tolist(),
+            scores[top].tolist(),
+        ):
+            neighbours.setdefault(artist_ids[row], []).append(
+                (artist_ids[col], score)
+            )
+
+    return neighbours
+
+
+def compute_neighbours_postings(
+    artist_genres: dict[str, set[Any]], k: int, metric: str
+) -> Neighbours:
+    '''
+    Compute the top-k neighbours of each artist from the genre
+    posting lists (the same sparse product, without NumPy).
+    Only the artists sharing a genre are ever compared.
+
+    Args:
+        artist_genres (dict[str, set[Any]]): The genres by artist ID.
+        k (int): The number of neighbours per artist.
+        metric (str): The metric (jaccard or cosine).
+
+    Returns:
+        Neighbours: The neighbours and their scores by artist ID,
+            most similar first.
+    '''
+
+    genre_artists: dict[Any, list[str]] = defaultdict(list)
+
+    for artist_id, genres in artist_genres.items():
+        for genre in genres:
+            genre_artists[genre].append(artist_id)
+
+    neighbours: Neighbours = {}
+
+    for artist_id, genres in artist_genres.items():
+        intersections: Counter = Counter(
+            other_id
+            for genre in genres
+            for other_id in genre_artists[genre]
+            if other_id != artist_id
+        )
+        top: list[tuple[float, str]] = heapq.nsmallest(
+            k,
+            (
+                (
+                    -_score(
+                        intersection,
+                        len(genres),
+                        len(artist_genres[other_id]),
+                        metric,
+                    ),
+                    other_id,
+                )
+                for other_id, intersection in intersections.items()
+            ),
+        )
+
+        if top:
+            neighbours[artist_id] = [
+                (other_id, -score) for score, other_id in top
+            ]
+
+    return neighbours
+
+
+def compute_neighbours(
+    artist_genres: dict[str, set[Any]],
+    k: int = DEFAULT_K,
+    metric: str = JACCARD,
+) -> Neighbours:
+    '''
+    Compute the top-k neighbours of each artist by genres overlap,
+    vectorized when NumPy and SciPy are installed.
+
+    Args:
+        artist_genres (dict[str, set[Any]]): The genres by artist ID.
+        k (int): The number of neighbours per artist.
+            Default to DEFAULT_K.
+        metric (str): The metric (jaccard or cosine).
+            Default to jaccard.
+
+    Raises:
+        ValueError: If the metric is unknown.
+
+    Returns:
+        Neighbours: The neighbours and their scores by artist ID,
+            most similar first.
+    '''
+
+    if metric not in METRICS:
+        raise ValueError(f'Unknown metric {metric}.')
+
+    artist_genres = {
+        artist_id: genres
+        for artist_id, genres in artist_genres.items()
+        if genres
+    }
+
+    if VECTORIZED:
+        return compute_neighbours_vectorized(artist_genres, k, metric)
+
+    return compute_neighbours_postings(artist_genres, k, metric)
+
+
+def update_similar_artists(k: int = DEFAULT_K, metric: str = JACCARD) -> int:
+    '''
+    Recompute the neighbours of all the artists
+    and replace the precomputed table.
+
+    Args:
+        k (int): The number of neighbours per artist.
+            Default to DEFAULT_K.
+        metric (str): The metric (jaccard or cosine).
+            Default to jaccard.
+
+    Returns:
+        int: The number of stored neighbours.
+    '''
+
+    artist_genres: dict[str, set[int]] = defaultdict(set)
+
+    for artist_id, genre_id in Artist.genres.through.objects.values_list(
+        'artist_id', 'genre_id'
+    ).iterator():
+        artist_genres[artist_id].add(genre_id)
+
+    neighbours: Neighbours = compute_neighbours(artist_genres, k, metric)
+
+    with transaction.atomic():
+        SimilarArtist.objects.all().delete()
+        SimilarArtist.objects.bulk_create(
+            (
+                SimilarArtist(
+                    artist_id=artist_id,
+                    similar_id=similar_id,
+                    score=score,
+                    rank=rank,
+                )
+                for artist_id, similars in neighbours.items()
+                for rank, (similar_id, score) in enumerate(similars)
+            ),
+            batch_size=1000,
+        )
+
+    return sum(len(similars) for similars in neighbours.values())
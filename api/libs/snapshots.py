@@ -0,0 +1,77 @@
+import datetime
+from typing import Any, Optional
+from django.core.cache import cache
+from core.codec import dumps
+from core.compression import compress_variants
+
+# The artists snapshot of a day is rebuilt at least once a day,
+# and on each sync.
+SNAPSHOT_TIMEOUT: int = 24 * 3600
+_CACHE_KEY: str = 'api:snapshots:artists:{date}'
+
+
+def encode_artists(artists: list[dict[str, Any]]) -> bytes:
+    '''
+    Serialize the /api/artists/ response body.
+
+    Args:
+        artists (list[dict[str, Any]]): The JSON serializable artists.
+
+    Returns:
+        bytes: The JSON response body.
+    '''
+
+    return dumps({'artists': artists})
+
+
+def get_artists_snapshot(date: datetime.date) -> Optional[dict[str, bytes]]:
+    '''
+    Get the stored /api/artists/ response body of a day,
+    shared by the workers with the cache.
+
+    Args:
+        date (datetime.date): The day of the snapshot.
+
+    Returns:
+        Optional[dict[str, bytes]]: The body by content encoding
+            (see compress_variants), or None if not built yet.
+    '''
+
+    return cache.get(_CACHE_KEY.format(date=date.isoformat()))
+
+
+def set_artists_snapshot(
+    date: datetime.date, artists: list[dict[str, Any]]
+) -> dict[str, bytes]:
+    '''
+    Build the /api/artists/ response body of a day once,
+    compressed with all the available encodings, and store it.
+
+    Args:
+        date (datetime.date): The day of the snapshot.
+        artists (list[dict[str, Any]]): The JSON serializable artists.
+
+    Returns:
+        dict[str, bytes]: The body by content encoding.
+    '''
+
+    variants: dict[str, bytes] = compress_variants(encode_artists(artists))
+    cache.set(
+        _CACHE_KEY.format(date=date.isoformat()),
+        variants,
+        timeout=SNAPSHOT_TIMEOUT,
+    )
+
+    return variants
+
+
+def delete_artists_snapshot(date: datetime.date) -> None:
+    '''
+    Delete the stored /api/artists/ response body of a day,
+    rebuilt by the next request.
+
+    Args:
+        date (datetime.date): The day of the snapshot.
+    '''
+
+    cache.delete(_CACHE_KEY.format(date=date.isoformat()))
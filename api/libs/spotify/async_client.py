@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from .auth import Token
+from .spotify_manager import SpotifyManager
+
+T = TypeVar('T')
+
+
+class AsyncSpotifyClient:
+    '''
+    The awaitable Spotify client, used by the async views.
+    The HTTP calls are run in a thread pool, out of the event loop,
+    so a slow Spotify response only holds a pool thread
+    (and never the whole ASGI worker).
+    The Spotify calls interleaved with database writes (e.g. the new
+    releases sync) are run in the pool too (see run), on a database
+    connection of their own: never on the single thread serializing
+    the ORM calls of sync_to_async.
+
+    Attributes:
+        MAX_WORKERS (int): The maximum number of concurrent Spotify calls
+            per process (WORKER_THREADS).
+        _executor (ThreadPoolExecutor): The thread pool
+            shared by all the clients of the process.
+        sp_man (SpotifyManager): The wrapped Spotify manager.
+    '''
+
+    MAX_WORKERS: int = settings.APP_CONFIG.WORKER_THREADS
+    _executor: ThreadPoolExecutor = ThreadPoolExecutor(
+        max_workers=MAX_WORKERS, thread_name_prefix='spotify'
+    )
+
+    def __init__(self, sp_man: SpotifyManager) -> None:
+        '''
+        The constructor.
+
+        Args:
+            sp_man (SpotifyManager): The Spotify manager to wrap.
+        '''
+
+        self.sp_man: SpotifyManager = sp_man
+
+    @classmethod
+    async def run(cls, func: Callable[..., T], *args: Any) -> T:
+        '''
+        Run a synchronous function calling Spotify and touching
+        the database in the thread pool. The database connection
+        of the thread is closed once done, so the pool threads
+        never hold idle connections.
+
+        Args:
+            func (Callable[..., T]): The function.
+            *args (Any): The function arguments.
+
+        Returns:
+            T: The function result.
+        '''
+
+        def call() -> T:
+            try:
+                return func(*args)
+            finally:
+                connections.close_all()
+
+        return await sync_to_async(
+            call, thread_sensitive=False, executor=cls._executor
+        )()
+
+    async def get_token(self, code: str) -> Token:
+        '''
+        Get the token from the Spotify Auth Server.
+
+        Args:
+            code (str): The authorization code.
+
+        Raises:
+            TokenRequestError: If an HTTPError occurs.
+
+        Returns:
+            Token: The token.
+        '''
+
+        return await sync_to_async(
+            self.sp_man.auth.get_token,
+            thread_sensitive=False,
+            executor=self._executor,
+        )(code)
+
+    async def update_token(self, refresh_token: str) -> Token:
+        '''
+        Refresh the token.
+
+        Args:
+            refresh_token (str): The refresh token.
+
+        Raises:
+            TokenRequestError: If the token does not exists
+                or if an HTTPError occurs.
+
+        Returns:
+            Token: The refreshed token.
+        '''
+
+        return await sync_to_async(
+            self.sp_man.auth.update_token,
+            thread_sensitive=False,
+            executor=self._executor,
+        )(refresh_token)
+
+    async def get_me(self) -> dict[str, Any]:
+        '''
+        Get the current user's information.
+
+        Raises:
+            SpotifyAPIError: If the request fails.
+
+        Returns:
+            dict[str, Any]: The user's information.
+        '''
+
+        return await sync_to_async(
+            self.sp_man.api.get_me,
+            thread_sensitive=False,
+            executor=self._executor,
+        )()
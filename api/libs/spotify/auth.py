@@ -1,8 +1,9 @@
 import base64
 import requests
-from typing import Union
+from typing import Optional, Union
 from django.utils.encoding import filepath_to_uri
 from user.models import User
+from .transport import Transport
 
 
 class Credentials:
@@ -125,13 +126,18 @@ class Auth:
         creds (Credentials): The credentials.
         _scope (list[str]): The scope.
         _redirect_uri (str): The redirect uri.
+        transport (Transport): The HTTP transport.
     '''
 
     _AUTHORIZE_URL: str = 'https://accounts.spotify.com/authorize/'
     _TOKEN_URL: str = 'https://accounts.spotify.com/api/token/'
 
     def __init__(
-        self, creds: Credentials, scope: list[str], redirect_uri: str
+        self,
+        creds: Credentials,
+        scope: list[str],
+        redirect_uri: str,
+        transport: Optional[Transport] = None,
     ) -> None:
         '''
         The constructor.
@@ -140,12 +146,16 @@ class Auth:
             creds (Credentials): The credentials.
             scope (list[str]): The scope.
             redirect_uri (str): The redirect uri.
+            transport (Optional[Transport]): The HTTP transport
+                (e.g. recording or replaying a cassette).
+                Default to None (the network).
         '''
 
         self.creds: Credentials = creds
         self._scope: list[str] = scope
         self._redirect_uri: str = redirect_uri
         self.token: Token = None
+        self.transport: Transport = transport or Transport()
 
     def _url_encode(self, obj: Union[list[str], str]) -> str:
         '''
@@ -215,7 +225,7 @@ class Auth:
             'redirect_uri': self._redirect_uri,
             'refresh_token': self.token.refresh_token,
         }
-        response: requests.Response = requests.post(
+        response: requests.Response = self.transport.post(
             self._TOKEN_URL,
             headers=headers,
             data=body,
@@ -257,7 +267,7 @@ class Auth:
             'code': code,
             'redirect_uri': self._redirect_uri,
         }
-        response: requests.Response = requests.post(
+        response: requests.Response = self.transport.post(
             self._TOKEN_URL,
             headers=headers,
             data=body,
@@ -0,0 +1,182 @@
+import gzip
+import threading
+from itertools import islice
+from typing import Any, Iterator, Optional
+from core.codec import loads
+
+
+def _open(path: str) -> Any:
+    '''
+    Open an NDJSON file, gzipped or not, in binary mode.
+
+    Args:
+        path (str): The file path (gzipped if ending with .gz).
+
+    Returns:
+        Any: The file object.
+    '''
+
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def read_ndjson(path: str) -> Iterator[dict[str, Any]]:
+    '''
+    Read the JSON objects of an NDJSON file, gzipped or not,
+    a line at a time.
+
+    Args:
+        path (str): The file path (gzipped if ending with .gz).
+
+    Yields:
+        dict[str, Any]: The JSON objects.
+    '''
+
+    with _open(path) as file:
+        for line in file:
+            if line.strip():
+                yield loads(line)
+
+
+class OfflineSpotifyAPI:
+    '''
+    The Spotify API replaying recorded payloads instead of requesting
+    the Spotify Web API, without token nor network access.
+    It serves the sync of the SpotifyManager the same way as SpotifyAPI.
+
+    The files are NDJSON, gzipped or not, of the recorded responses:
+    the new releases files contain the browse/new-releases pages
+    ({"albums": {"items": [...]}}) or the albums themselves,
+    and the artists files the artists pages ({"artists": [...]})
+    or the artists themselves.
+    The artists are indexed by their offset in the files and read
+    for each batch, so a large dump is not held in memory.
+
+    Attributes:
+        new_releases_paths (list[str]): The new releases files.
+        artists_paths (list[str]): The artists files.
+    '''
+
+    def __init__(
+        self, new_releases_paths: list[str], artists_paths: list[str]
+    ):
+        '''
+        The constructor.
+
+        Args:
+            new_releases_paths (list[str]): The new releases files.
+            artists_paths (list[str]): The artists files.
+        '''
+
+        self.new_releases_paths: list[str] = new_releases_paths
+        self.artists_paths: list[str] = artists_paths
+        self._offsets: Optional[dict[str, tuple[int, int]]] = None
+        # The artists files, opened once, read by the concurrent
+        # lookups of a batch one at a time.
+        self._files: dict[int, Any] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def offsets(self) -> dict[str, tuple[int, int]]:
+        '''
+        The record of each artist: the index of its file and
+        the offset of its line (decompressed), indexed once.
+        Only the offsets are kept in memory, not the artists.
+
+        Returns:
+            dict[str, tuple[int, int]]: The records by artist ID.
+        '''
+
+        if self._offsets is None:
+            self._offsets = {}
+
+            for index, path in enumerate(self.artists_paths):
+                with _open(path) as file:
+                    offset: int = 0
+
+                    for line in file:
+                        if line.strip():
+                            payload: dict[str, Any] = loads(line)
+
+                            for artist in payload.get('artists', [payload]):
+                                if artist is not None:
+                                    self._offsets[artist['id']] = (
+                                        index,
+                                        offset,
+                                    )
+
+                        offset += len(line)
+
+        return self._offsets
+
+    def get_several_artists(self, ids: list[str]) -> list[dict[str, Any]]:
+        '''
+        Get several recorded artists, read from their records
+        in the files order (forward reads for the gzipped files).
+        The artists missing from the records are skipped.
+
+        Args:
+            ids (list[str]): The Spotify IDs of the artists.
+
+        Returns:
+            list[dict[str, Any]]: The artists information.
+        '''
+
+        records: set[tuple[int, int]] = {
+            self.offsets[id_] for id_ in ids if id_ in self.offsets
+        }
+        artists: dict[str, dict[str, Any]] = {}
+
+        with self._lock:
+            for index, offset in sorted(records):
+                if index not in self._files:
+                    self._files[index] = _open(self.artists_paths[index])
+
+                file: Any = self._files[index]
+                file.seek(offset)
+                payload: dict[str, Any] = loads(file.readline())
+
+                for artist in payload.get('artists', [payload]):
+                    if artist is not None:
+                        artists[artist['id']] = artist
+
+        return [artists[id_] for id_ in ids if id_ in artists]
+
+    def close(self) -> None:
+        '''
+        Close the artists files.
+        '''
+
+        with self._lock:
+            for file in self._files.values():
+                file.close()
+
+            self._files.clear()
+
+    def get_new_releases(self, offset: int = 0) -> Iterator[dict[str, Any]]:
+        '''
+        Get the recorded new releases, in the order of the files.
+
+        Args:
+            offset (int): The number of new releases skipped
+                (e.g. already imported). Default to 0.
+
+        Returns:
+            Iterator[dict[str, Any]]: The new releases generator.
+        '''
+
+        return islice(self._read_new_releases(), offset, None)
+
+    def _read_new_releases(self) -> Iterator[dict[str, Any]]:
+        '''
+        Read the new releases of the files.
+
+        Yields:
+            dict[str, Any]: The new releases.
+        '''
+
+        for path in self.new_releases_paths:
+            for payload in read_ndjson(path):
+                if 'albums' in payload:
+                    yield from payload['albums']['items']
+                else:
+                    yield payload
@@ -1,20 +1,279 @@
-from typing import Any, Iterator
+from collections import deque
+from typing import Any, Iterator, Optional
+import random
+import threading
 import time
 import requests
+from core.codec import loads
 from .auth import Auth
+from .streaming import JSONItemStream
+from .transport import Transport
+
+
+class RateLimiter:
+    '''
+    A requests rate limit shared by the threads of the process.
+    Each request reserves the next free slot and waits for it,
+    up to burst requests being allowed at once after an idle period.
+    A 429 response pauses all the threads at once.
+
+    Attributes:
+        rate (float): The number of requests per second.
+        burst (int): The number of requests allowed at once.
+    '''
+
+    def __init__(self, rate: float, burst: int) -> None:
+        '''
+        The constructor.
+
+        Args:
+            rate (float): The number of requests per second.
+            burst (int): The number of requests allowed at once.
+        '''
+
+        self.rate: float = rate
+        self.burst: int = burst
+        self._next: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        '''
+        Wait for the next free slot.
+        '''
+
+        with self._lock:
+            now: float = time.monotonic()
+            self._next = max(self._next, now - (self.burst - 1) / self.rate)
+            wait: float = self._next - now
+            self._next += 1 / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def block(self, seconds: float) -> None:
+        '''
+        Delay all the slots for some time.
+
+        Args:
+            seconds (float): The pause in seconds.
+        '''
+
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    '''
+    A circuit breaker shared by the threads of the process.
+    It opens when the failure rate of the last calls is too high,
+    failing the calls fast for a while, then lets a single probe call
+    through (half-open): its success closes the circuit,
+    its failure opens it again.
+
+    Attributes:
+        CLOSED (str): The state letting all the calls through.
+        OPEN (str): The state failing all the calls.
+        HALF_OPEN (str): The state letting a probe call through.
+        failure_rate (float): The failure rate opening the circuit.
+        window (int): The number of last calls whose failure rate
+            is tracked.
+        min_calls (int): The minimum number of tracked calls
+            to open the circuit.
+        open_seconds (float): The time in seconds the circuit
+            stays open.
+    '''
+
+    CLOSED: str = 'closed'
+    OPEN: str = 'open'
+    HALF_OPEN: str = 'half-open'
+
+    def __init__(
+        self,
+        failure_rate: float,
+        window: int,
+        min_calls: int,
+        open_seconds: float,
+    ) -> None:
+        '''
+        The constructor.
+
+        Args:
+            failure_rate (float): The failure rate opening the circuit.
+            window (int): The number of last calls whose failure rate
+                is tracked.
+            min_calls (int): The minimum number of tracked calls
+                to open the circuit.
+            open_seconds (float): The time in seconds the circuit
+                stays open.
+        '''
+
+        self.failure_rate: float = failure_rate
+        self.window: int = window
+        self.min_calls: int = min_calls
+        self.open_seconds: float = open_seconds
+        self._lock: threading.Lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        '''
+        Close the circuit and forget the tracked calls.
+        '''
+
+        self._failures: deque = deque(maxlen=self.window)
+        self._opened_at: Optional[float] = None
+        self._probing: bool = False
+
+    @property
+    def state(self) -> str:
+        '''
+        The current state.
+
+        Returns:
+            str: The state.
+        '''
+
+        if self._opened_at is None:
+            return self.CLOSED
+
+        if time.monotonic() < self._opened_at + self.open_seconds:
+            return self.OPEN
+
+        return self.HALF_OPEN
+
+    @property
+    def retry_after(self) -> float:
+        '''
+        The time in seconds before the next probe call.
+
+        Returns:
+            float: The time in seconds (0 if closed).
+        '''
+
+        if self._opened_at is None:
+            return 0.0
+
+        return max(
+            self._opened_at + self.open_seconds - time.monotonic(), 0.0
+        )
+
+    def before_call(self) -> bool:
+        '''
+        Check that a call can go through.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open
+                with a probe call in flight.
+
+        Returns:
+            bool: Whether the call is the probe call, to release
+                with release_probe once done.
+        '''
+
+        with self._lock:
+            state: str = self.state
+
+            if state == self.CLOSED:
+                return False
+
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+        raise CircuitOpenError(
+            'The Spotify API is unavailable.', self.retry_after
+        )
+
+    def record_success(self) -> None:
+        '''
+        Track a successful call, closing the circuit after a probe.
+        '''
+
+        with self._lock:
+            if self._opened_at is not None:
+                self.reset()
+            else:
+                self._failures.append(False)
+
+    def record_failure(self) -> None:
+        '''
+        Track a failed call, opening the circuit if the failure rate
+        is too high or after a probe.
+        '''
+
+        with self._lock:
+            self._failures.append(True)
+
+            if self._opened_at is not None or (
+                len(self._failures) >= self.min_calls
+                and sum(self._failures) / len(self._failures)
+                >= self.failure_rate
+            ):
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self) -> None:
+        '''
+        Let another probe call through, the probe call in flight being
+        done, tracked or not (e.g. failed with an unexpected error).
+        '''
+
+        with self._lock:
+            self._probing = False
 
 
 class SpotifyAPI:
     '''
     This class is used to interact with the Spotify Web API.
+    The requests of all the instances share the rate limit
+    and the circuit breaker of the process.
+    The failed requests (server errors, timeouts and rate limits)
+    are retried a few times, with jittered exponential backoff.
     '''
 
     _SPOTIFY_API_VERSION: str = 'v1'
     _SPOTIFY_API_URL: str = f'https://api.spotify.com/{_SPOTIFY_API_VERSION}/'
     PAGE_SIZE: int = 20
+    RATE_LIMIT: float = 10.0
+    RATE_BURST: int = 20
+    _rate_limiter: RateLimiter = RateLimiter(RATE_LIMIT, RATE_BURST)
+    _circuit_breaker: CircuitBreaker = CircuitBreaker(
+        failure_rate=0.5, window=20, min_calls=5, open_seconds=30
+    )
+    # The timeout in seconds of a request.
+    TIMEOUT: float = 10
+    MAX_RETRIES: int = 3
+    # The backoff in seconds before the first retry, doubled
+    # for each next one, up to BACKOFF_MAX.
+    BACKOFF_BASE: float = 0.5
+    BACKOFF_MAX: float = 8
+    # The longest Retry-After waited for, the longer ones failing fast.
+    MAX_RETRY_AFTER: int = 10
+    # The size in bytes of the chunks of the streamed responses.
+    STREAM_CHUNK_SIZE: int = 16 * 1024
+    # The fields of the streamed albums dropped as not stored.
+    STREAM_SKIPPED_FIELDS: tuple[str, ...] = ('total_tracks', 'restrictions')
+
+    def __init__(
+        self,
+        auth: Auth,
+        transport: Optional[Transport] = None,
+        stream: bool = False,
+    ) -> None:
+        '''
+        The constructor.
+
+        Args:
+            auth (Auth): The Spotify Auth.
+            transport (Optional[Transport]): The HTTP transport.
+                Default to None (the transport of the auth).
+            stream (bool): Parse the new releases pages as they are
+                received, yielding each album as soon as it is complete.
+                Default to False.
+        '''
 
-    def __init__(self, auth: Auth) -> None:
         self._auth: Auth = auth
+        self.transport: Transport = transport or auth.transport
+        self.stream: bool = stream
 
     def _get(
         self, resource: str, params: dict[str, Any] = {}
@@ -28,40 +287,170 @@ class SpotifyAPI:
                 Default to {}.
 
         Raises:
+            CircuitOpenError: If the circuit breaker is open.
             SpotifyAPIError: If the request fails.
 
         Returns:
             dict[str, Any]: The response.
         '''
 
+        return loads(self._request(resource, params).content)
+
+    def _stream(
+        self,
+        resource: str,
+        params: dict[str, Any],
+        path: tuple[str, ...],
+    ) -> JSONItemStream:
+        '''
+        Get the items of an array of a Spotify Web API response,
+        parsed as the body is received (see JSONItemStream).
+
+        Args:
+            resource (str): The Spotify Web API URL.
+            params (dict[str, Any]): The query parameters.
+            path (tuple[str, ...]): The keys leading to the array.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            SpotifyAPIError: If the request fails.
+
+        Returns:
+            JSONItemStream: The items stream.
+        '''
+
+        response: requests.Response = self._request(
+            resource, params, stream=True
+        )
+
+        return JSONItemStream(
+            self._iter_content(response), path, self.STREAM_SKIPPED_FIELDS
+        )
+
+    def _iter_content(self, response: requests.Response) -> Iterator[bytes]:
+        '''
+        Read the body of a streamed response, then release
+        its connection.
+
+        Args:
+            response (requests.Response): The streamed response.
+
+        Raises:
+            SpotifyAPIError: If the connection fails.
+
+        Yields:
+            bytes: The body chunks.
+        '''
+
+        try:
+            yield from response.iter_content(self.STREAM_CHUNK_SIZE)
+        except requests.RequestException as e:
+            # The response succeeded, but not the call.
+            self._circuit_breaker.record_failure()
+            raise SpotifyAPIError(e)
+        finally:
+            response.close()
+
+    def _request(
+        self,
+        resource: str,
+        params: dict[str, Any],
+        stream: bool = False,
+    ) -> requests.Response:
+        '''
+        Send a GET request to the Spotify Web API, retrying
+        the failed ones.
+
+        Args:
+            resource (str): The Spotify Web API URL.
+            params (dict[str, Any]): The query parameters.
+            stream (bool): Return as soon as the headers are received,
+                the body being read from the response. Default to False.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            SpotifyAPIError: If the request fails.
+
+        Returns:
+            requests.Response: The successful response.
+        '''
+
         self._raise_for_empty_token()
         headers: dict[str, str] = {
             'Authorization': self._auth.token.bearer,
             'Accept': 'application/json',
         }
 
-        while True:
-            response: requests.Response = requests.get(
-                self._SPOTIFY_API_URL + resource,
-                headers=headers,
-                params=params,
-            )
+        for attempt in range(self.MAX_RETRIES + 1):
+            probe: bool = self._circuit_breaker.before_call()
 
             try:
-                response.raise_for_status()
-                break
-            except requests.HTTPError as e:
-                # Figure out the 429 error which is usually due to the
-                # requests rate limit.
-                # We wait for a few seconds (given by the "Retry-After"
-                # header) and try again.
-                # We had +1 second to ensure that the waiting time is filled.
-                if response.status_code == 429:
-                    time.sleep(int(response.headers['Retry-After']) + 1)
+                self._rate_limiter.acquire()
+                response: requests.Response = self.transport.get(
+                    self._SPOTIFY_API_URL + resource,
+                    headers=headers,
+                    params=params,
+                    timeout=self.TIMEOUT,
+                    stream=stream,
+                )
+            except requests.RequestException as e:
+                self._circuit_breaker.record_failure()
+                error: SpotifyAPIError = SpotifyAPIError(e)
+            else:
+                if response.status_code >= 500:
+                    self._circuit_breaker.record_failure()
                 else:
-                    raise SpotifyAPIError(e)
+                    self._circuit_breaker.record_success()
+
+                try:
+                    response.raise_for_status()
+                    return response
+                except requests.HTTPError as e:
+                    error = SpotifyAPIError(e)
+
+                    # Figure out the 429 error which is usually due to the
+                    # requests rate limit.
+                    # We wait for a few seconds (given by the "Retry-After"
+                    # header) and try again, as the other threads.
+                    # We had +1 second to ensure that the waiting time
+                    # is filled.
+                    if response.status_code == 429:
+                        retry_after: int = (
+                            int(response.headers.get('Retry-After', 0)) + 1
+                        )
+                        self._rate_limiter.block(retry_after)
+
+                        if retry_after > self.MAX_RETRY_AFTER:
+                            raise error
+
+                        continue
+
+                    if response.status_code < 500:
+                        raise error
+            finally:
+                if probe:
+                    self._circuit_breaker.release_probe()
+
+            if attempt < self.MAX_RETRIES:
+                time.sleep(self._get_backoff(attempt))
+
+        raise error
+
+    def _get_backoff(self, attempt: int) -> float:
+        '''
+        Get the jittered backoff before a retry ("full jitter"),
+        spreading the retries of the concurrent requests.
+
+        Args:
+            attempt (int): The number of the failed attempt (from 0).
 
-        return response.json()
+        Returns:
+            float: The backoff in seconds.
+        '''
+
+        return random.uniform(
+            0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2**attempt)
+        )
 
     def get_artist(self, id_: str) -> dict[str, Any]:
         '''
@@ -106,10 +495,18 @@ class SpotifyAPI:
 
         return response['artists']
 
-    def get_new_releases(self) -> Iterator[dict[str, Any]]:
+    def get_new_releases(
+        self, country: Optional[str] = None, offset: int = 0
+    ) -> Iterator[dict[str, Any]]:
         '''
         Get new releases from the Spotify Web API.
 
+        Args:
+            country (Optional[str]): The market (ISO country code).
+                Default to None (Spotify's default selection).
+            offset (int): The number of new releases skipped
+                (e.g. already synced). Default to 0.
+
         Raises:
             SpotifyAPIError: If the request fails.
 
@@ -119,24 +516,57 @@ class SpotifyAPI:
 
         resource: str = 'browse/new-releases'
         params: dict[str, Any] = {
-            'offset': 0,
+            'offset': offset,
             'limit': self.PAGE_SIZE,
         }
 
+        if country is not None:
+            params['country'] = country
+
         while True:
-            response: dict[str, Any] = self._get(resource, params)
-            response = response['albums']
+            response: dict[str, Any]
+
+            if self.stream:
+                # The page metadata follows the items.
+                page: JSONItemStream = self._stream(
+                    resource, params, ('albums', 'items')
+                )
+                yield from page
+                response = page.document['albums']
+            else:
+                response = self._get(resource, params)['albums']
+                yield from response.get('items')
+
             total: int = response['total']
             offset: int = response['offset']
             limit: int = response['limit']
             params['offset'] = offset + limit
 
-            for item in response.get('items'):
-                yield item
-
             if offset + limit >= total:
                 break
 
+    def get_new_releases_total(self, country: Optional[str] = None) -> int:
+        '''
+        Get the number of new releases, from a first page of one album.
+
+        Args:
+            country (Optional[str]): The market (ISO country code).
+                Default to None (Spotify's default selection).
+
+        Raises:
+            SpotifyAPIError: If the request fails.
+
+        Returns:
+            int: The number of new releases.
+        '''
+
+        params: dict[str, Any] = {'offset': 0, 'limit': 1}
+
+        if country is not None:
+            params['country'] = country
+
+        return self._get('browse/new-releases', params)['albums']['total']
+
     def get_me(self) -> dict[str, Any]:
         '''
         Get the current user's information.
@@ -164,3 +594,26 @@ class SpotifyAPI:
 
 class SpotifyAPIError(Exception):
     ...
+
+
+class CircuitOpenError(SpotifyAPIError):
+    '''
+    The Spotify API calls fail fast while the circuit breaker is open.
+
+    Attributes:
+        retry_after (float): The time in seconds before the next
+            probe call.
+    '''
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        '''
+        The constructor.
+
+        Args:
+            message (str): The error message.
+            retry_after (float): The time in seconds before the next
+                probe call.
+        '''
+
+        super().__init__(message)
+        self.retry_after: float = retry_after
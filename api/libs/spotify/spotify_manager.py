@@ -1,8 +1,26 @@
-from typing import Any, Iterator
+import copy
+import datetime
+import hashlib
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, Optional
+import django
+from django.db import connections, models, transaction
+from django.db.models import F, Max, Min, Q, QuerySet
 from django.utils import timezone
+from core.routers import mark_primary_written, use_primary
+from api.libs.changes import new_generation, record_change
+from api.signals import new_releases_synced
 from user.models import User
 from .auth import Auth, Credentials, Token
-from .spotify_api import SpotifyAPI
+from .spotify_api import RateLimiter, SpotifyAPI, SpotifyAPIError
+from .transport import Transport
 from api.models import (
     Album,
     AlbumImageURL,
@@ -10,8 +28,14 @@ from api.models import (
     Artist,
     ArtistImageURL,
     ArtistExternalURL,
+    Change,
     Genre,
     Market,
+    ReleaseAppearance,
+    SyncGeneration,
+    SyncRun,
+    SyncRunAlbum,
+    SyncShard,
 )
 
 
@@ -22,14 +46,45 @@ class SpotifyManager:
     Attributes:
         auth (Auth): The Spotify Auth object.
         api (SpotifyAPI): The Spotify API object.
+        snapshot_date (Optional[datetime.date]): The date of the stale
+            new releases served while the Spotify API is unavailable,
+            None when they are today's.
     '''
 
+    # The number of albums stored per transaction.
+    BATCH_SIZE: int = 100
+    # The maximum number of concurrent Spotify calls of a sync
+    # (all of them sharing the rate limit of the process).
+    MAX_WORKERS: int = 8
+    # The maximum number of artists per Spotify call.
+    ARTISTS_PER_CALL: int = 50
+    # The number of attempts of the background refresh, and the delay
+    # in seconds before the first one (about the circuit breaker's
+    # open time), doubled for each next one.
+    REFRESH_ATTEMPTS: int = 5
+    REFRESH_DELAY: float = 30
+    # The number of albums per shard of a sharded sync (rounded up
+    # to whole Spotify pages), the time in seconds a worker holds
+    # a shard, and the interval in seconds at which the coordinator
+    # polls the shards leased by the other workers.
+    SHARD_SIZE: int = 40
+    LEASE_SECONDS: float = 300
+    SHARD_POLL_INTERVAL: float = 1
+    # The markets of a sync of all the known markets (see SYNC_MARKETS),
+    # keyed as such: they are resolved once, by the first run of the day,
+    # so the markets stored by the sync don't start another one.
+    ALL_MARKETS: str = 'ALL'
+    # A single background refresh per process.
+    _refresh_lock: threading.Lock = threading.Lock()
+
     def __init__(
         self,
         client_id: str,
         client_secret: str,
         scope: list[str],
         redirect_uri: str,
+        transport: Optional[Transport] = None,
+        stream: bool = False,
     ):
         '''
         The constructor.
@@ -39,14 +94,29 @@ class SpotifyManager:
             client_secret (str): The client secret.
             scope (list[str]): The scope.
             redirect_uri (str): The redirect uri.
+            transport (Optional[Transport]): The HTTP transport
+                of the Spotify clients (e.g. recording or replaying
+                a cassette). Default to None (the network).
+            stream (bool): Parse the new releases pages as they are
+                received (see SpotifyAPI). Default to False.
         '''
 
         self.auth: Auth = Auth(
             Credentials(client_id, client_secret),
             scope=scope,
             redirect_uri=redirect_uri,
+            transport=transport,
         )
-        self.api: SpotifyAPI = SpotifyAPI(self.auth)
+        self.api: SpotifyAPI = SpotifyAPI(self.auth, stream=stream)
+        # The genres and markets of the running sync, by name,
+        # and its fetched and stored artists, by ID.
+        self._genres: dict[str, Genre] = {}
+        self._markets: dict[str, Market] = {}
+        self._artist_infos: dict[str, dict[str, Any]] = {}
+        self._artists: dict[str, Artist] = {}
+        # The number of artist batches fetched by the running sync.
+        self._artist_batches: int = 0
+        self.snapshot_date: Optional[datetime.date] = None
 
     def recover_token(self, user: User) -> None:
         '''
@@ -64,156 +134,1292 @@ class SpotifyManager:
             scope=user.scope,
         )
 
-    def get_today_new_releases(self) -> list[Album]:
+    def get_today_new_releases(
+        self, countries: Optional[list[str]] = None
+    ) -> list[Album]:
         '''
         Get the new releases from the database.
-        Filter the query by the current date.
-        If no data is found, update DB from Spotify API
+        If today's sync of the markets did not complete (e.g. it failed
+        halfway), run it (resuming the failed one)
         and return the new releases.
+        If the Spotify API is unavailable, return the new releases
+        of the last successful sync (setting snapshot_date)
+        and retry the sync in the background.
+
+        Args:
+            countries (Optional[list[str]]): The markets to sync
+                (or [ALL_MARKETS]). Default to None (Spotify's default
+                selection).
+
+        Raises:
+            SpotifyAPIError: If the Spotify API is unavailable
+                and no sync ever succeeded.
 
         Returns:
-            list[Album]: The list of new releases.
+            list[Album]: The list of new releases, by position.
         '''
 
-        today_releases: list[Album] = Album.objects.filter(
-            last_checked_date=timezone.now()
-        )
+        self.snapshot_date = None
+        today: datetime.date = timezone.now().date()
+        # The albums of a failed sync are stored, but not its appearances.
+        runs: QuerySet = SyncRun.objects.filter(
+            source=SyncRun.SPOTIFY,
+            markets_key=self._get_markets(countries)[1],
+            status=SyncRun.COMPLETED,
+        ).order_by('-run_id')
+        run: Optional[SyncRun] = runs.filter(date=today).first()
+
+        if run is not None:
+            today_releases: list[Album] = self._get_releases(
+                today, self._get_run_countries(run, countries)
+            )
+        else:
+            try:
+                today_releases = self.update_new_releases_in_db(
+                    countries=countries
+                )
+            except SpotifyAPIError:
+                # The appearances are recorded once a sync succeeded,
+                # for its markets.
+                run = runs.first()
+                markets: Optional[list[str]] = (
+                    self._resolve_countries(countries)
+                    if run is None
+                    else self._get_run_countries(run, countries)
+                )
+                snapshot_date: Optional[datetime.date] = (
+                    ReleaseAppearance.objects.filter(
+                        country_code__in=markets or ['']
+                    ).aggregate(Max('date'))['date__max']
+                )
+
+                if snapshot_date is None:
+                    raise
 
-        if not today_releases:
-            today_releases = self.update_new_releases_in_db()
+                self.snapshot_date = snapshot_date
+                self._refresh_in_background(countries)
+                today_releases = self._get_releases(snapshot_date, markets)
 
         return today_releases
 
-    def _update_artists_in_db(self, artist_ids: list[str]) -> set[Artist]:
+    @staticmethod
+    def _get_releases(
+        date: datetime.date, countries: Optional[list[str]]
+    ) -> list[Album]:
+        '''
+        Get the new releases of a day, by their best position
+        in the markets.
+
+        Args:
+            date (datetime.date): The day.
+            countries (Optional[list[str]]): The markets.
+
+        Returns:
+            list[Album]: The new releases.
+        '''
+
+        return list(
+            Album.objects.filter(
+                appearances__date=date,
+                appearances__country_code__in=countries or [''],
+            )
+            .annotate(best_position=Min('appearances__position'))
+            .order_by('best_position', 'album_id')
+        )
+
+    def _refresh_in_background(self, countries: Optional[list[str]]) -> None:
+        '''
+        Retry the sync in a background thread, unless already retried.
+
+        Args:
+            countries (Optional[list[str]]): The markets to sync.
+        '''
+
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        threading.Thread(
+            target=self._refresh,
+            args=(countries, copy.copy(self.auth.token)),
+            name='spotify-refresh',
+            daemon=True,
+        ).start()
+
+    @classmethod
+    def _refresh(cls, countries: Optional[list[str]], token: Token) -> None:
+        '''
+        Retry the sync a few times, with jittered exponential delays,
+        by a manager of its own (the manager of the request being
+        neither thread-safe nor meant to outlive it).
+
+        Args:
+            countries (Optional[list[str]]): The markets to sync.
+            token (Token): The Spotify token.
+        '''
+
+        from django.conf import settings
+
+        sp_man: SpotifyManager = cls(
+            client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
+            client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
+            scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
+            redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
+            stream=settings.APP_CONFIG.SPOTIFY_STREAM_PAGES,
+        )
+        sp_man.auth.token = token
+
+        try:
+            for attempt in range(cls.REFRESH_ATTEMPTS):
+                time.sleep(
+                    cls.REFRESH_DELAY * 2**attempt * random.uniform(0.5, 1)
+                )
+
+                try:
+                    sp_man.update_new_releases_in_db(countries=countries)
+                    return
+                except SpotifyAPIError:
+                    pass
+        finally:
+            connections.close_all()
+            cls._refresh_lock.release()
+
+    def _fetch_artists(self, artist_ids: Iterable[str]) -> None:
+        '''
+        Fetch the artists not fetched yet by the running sync,
+        by calls of ARTISTS_PER_CALL artists, run concurrently.
+
+        Args:
+            artist_ids (Iterable[str]): The artist ids.
+        '''
+
+        missing: list[str] = list(
+            dict.fromkeys(
+                artist_id
+                for artist_id in artist_ids
+                if artist_id not in self._artist_infos
+            )
+        )
+        chunks: list[list[str]] = [
+            missing[i : i + self.ARTISTS_PER_CALL]
+            for i in range(0, len(missing), self.ARTISTS_PER_CALL)
+        ]
+
+        if not chunks:
+            return
+
+        self._artist_batches += len(chunks)
+
+        if len(chunks) == 1:
+            responses: Iterable[list[dict[str, Any]]] = [
+                self.api.get_several_artists(ids=chunks[0])
+            ]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.MAX_WORKERS, len(chunks))
+            ) as executor:
+                responses = list(
+                    executor.map(
+                        lambda ids: self.api.get_several_artists(ids=ids),
+                        chunks,
+                    )
+                )
+
+        for artists_info in responses:
+            for artist_info in artists_info:
+                if artist_info is not None:
+                    self._artist_infos[artist_info['id']] = artist_info
+
+    def _fetch_new_releases(
+        self, countries: list[str]
+    ) -> tuple[list[dict[str, Any]], dict[str, list[str]]]:
         '''
-        Update the artists in the database.
+        Fetch the new releases of several markets concurrently.
+        The albums listed in several markets are merged.
 
         Args:
-            artist_ids (list[str]): The list of artist ids.
+            countries (list[str]): The markets (ISO country codes).
 
         Returns:
-            set[Artist]: The set of artists.
+            tuple[list[dict[str, Any]], dict[str, list[str]]]: The albums
+                info, in their first appearance order, and the album IDs
+                of each market, in their order.
+        '''
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.MAX_WORKERS, len(countries))
+        ) as executor:
+            releases: list[list[dict[str, Any]]] = list(
+                executor.map(
+                    lambda country: list(
+                        self.api.get_new_releases(country=country)
+                    ),
+                    countries,
+                )
+            )
+
+        albums_info: dict[str, dict[str, Any]] = {}
+        album_ids: dict[str, list[str]] = {}
+
+        for country, items in zip(countries, releases):
+            album_ids[country] = [item['id'] for item in items]
+
+            for item in items:
+                albums_info.setdefault(item['id'], item)
+
+        return list(albums_info.values()), album_ids
+
+    def _record_appearances(
+        self, albums: list[Album], country_code: str = ''
+    ) -> None:
+        '''
+        Append the appearances of the albums in today's new releases,
+        in a single statement.
+        A sync running again the same day keeps the first appearances.
+
+        Args:
+            albums (list[Album]): The new releases, in their order.
+            country_code (str): The market of the new releases.
+                Default to '' (synced without market).
         '''
 
-        artists_info: dict[str, Any] = self.api.get_several_artists(
-            ids=artist_ids
+        today: Any = timezone.now().date()
+        ReleaseAppearance.objects.bulk_create(
+            [
+                ReleaseAppearance(
+                    date=today,
+                    country_code=country_code,
+                    position=position,
+                    album=album,
+                )
+                for position, album in enumerate(albums, start=1)
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
         )
-        artist_set: set[Artist] = set()
 
-        for artist_info in artists_info:
-            genre_set: set[Genre] = set()
+    @staticmethod
+    def _get_markets(countries: Optional[list[str]]) -> tuple[str, str]:
+        '''
+        Get the markets of a run, and their key.
+
+        Args:
+            countries (Optional[list[str]]): The synced markets.
+
+        Returns:
+            tuple[str, str]: The markets, sorted and comma separated,
+                and their SHA-256 (a fixed length key whatever
+                the number of markets).
+        '''
+
+        markets: str = ','.join(sorted(countries or []))
+
+        return markets, hashlib.sha256(markets.encode()).hexdigest()
+
+    @classmethod
+    def _resolve_countries(
+        cls, countries: Optional[list[str]]
+    ) -> Optional[list[str]]:
+        '''
+        Resolve [ALL_MARKETS] to the markets stored so far.
+
+        Args:
+            countries (Optional[list[str]]): The markets to sync.
+
+        Returns:
+            Optional[list[str]]: The ISO country codes,
+                or None for Spotify's default selection.
+        '''
+
+        if countries == [cls.ALL_MARKETS]:
+            countries = list(
+                Market.objects.order_by('country_code').values_list(
+                    'country_code', flat=True
+                )
+            )
+
+        return countries or None
+
+    @classmethod
+    def _get_run_countries(
+        cls, run: SyncRun, countries: Optional[list[str]]
+    ) -> Optional[list[str]]:
+        '''
+        Get the markets synced by a run: [ALL_MARKETS] stands
+        for the ones resolved when the run started.
+
+        Args:
+            run (SyncRun): The run.
+            countries (Optional[list[str]]): The markets to sync.
+
+        Returns:
+            Optional[list[str]]: The ISO country codes,
+                or None for Spotify's default selection.
+        '''
+
+        if countries == [cls.ALL_MARKETS]:
+            return run.markets.split(',') if run.markets else None
+
+        return countries
+
+    def _start_run(
+        self,
+        countries: Optional[list[str]],
+        resume: bool,
+        sharded: bool = False,
+        source: str = SyncRun.SPOTIFY,
+    ) -> SyncRun:
+        '''
+        Resume the last run of today's sync of the source and markets
+        if it did not complete (and was run the same way),
+        or start a new one.
+
+        Args:
+            countries (Optional[list[str]]): The synced markets
+                (or [ALL_MARKETS], resolved by a new run).
+            resume (bool): Resume the last run if it did not complete.
+            sharded (bool): Resume a sharded run. Default to False.
+            source (str): The source of the new releases.
+                Default to SyncRun.SPOTIFY.
+
+        Returns:
+            SyncRun: The run.
+        '''
+
+        run: Optional[SyncRun] = None
+        today: datetime.date = timezone.now().date()
+        markets_key: str = self._get_markets(countries)[1]
+
+        if resume:
+            run = (
+                SyncRun.objects.filter(
+                    date=today, source=source, markets_key=markets_key
+                )
+                .order_by('-run_id')
+                .first()
+            )
+
+        if (
+            run is None
+            or run.status == SyncRun.COMPLETED
+            or run.shards.exists() != sharded
+        ):
+            return SyncRun.objects.create(
+                date=today,
+                source=source,
+                markets=self._get_markets(
+                    self._resolve_countries(countries)
+                )[0],
+                markets_key=markets_key,
+            )
+
+        run.status = SyncRun.RUNNING
+        run.attempts += 1
+        run.save(update_fields=['status', 'attempts'])
+
+        return run
+
+    def _journal_albums(
+        self,
+        run: SyncRun,
+        albums: list[Album],
+        start: int,
+        country_code: str = '',
+    ) -> None:
+        '''
+        Journal the albums committed by a run, from a position.
+
+        Args:
+            run (SyncRun): The run.
+            albums (list[Album]): The stored albums, in their order.
+            start (int): The position of the first album.
+            country_code (str): The market of the albums of a sharded
+                run. Default to ''.
+        '''
+
+        SyncRunAlbum.objects.bulk_create(
+            [
+                SyncRunAlbum(
+                    run=run,
+                    country_code=country_code,
+                    position=position,
+                    album=album,
+                )
+                for position, album in enumerate(albums, start=start)
+            ],
+            batch_size=1000,
+        )
+
+    def _get_run_album_ids(
+        self, run: SyncRun, country_code: str = ''
+    ) -> list[str]:
+        '''
+        Get the IDs of the albums committed by a run.
+
+        Args:
+            run (SyncRun): The run.
+            country_code (str): The market of the albums of a sharded
+                run. Default to ''.
+
+        Returns:
+            list[str]: The album IDs, in their order.
+        '''
+
+        return list(
+            run.albums.filter(country_code=country_code)
+            .order_by('position')
+            .values_list('album_id', flat=True)
+        )
+
+    def _restart_if_changed(self, run: SyncRun, album_ids: list[str]) -> None:
+        '''
+        Restart the run from the first album if the albums it committed
+        are not the first ones of the new releases anymore (i.e. Spotify
+        changed its list since the failed attempt).
+
+        Args:
+            run (SyncRun): The run.
+            album_ids (list[str]): The IDs of the new releases, in their
+                order.
+        '''
+
+        if self._get_run_album_ids(run) == album_ids[: run.offset]:
+            return
+
+        run.albums.all().delete()
+        run.offset = 0
+        run.save(update_fields=['offset'])
+
+    def _checkpoint(
+        self, run: SyncRun, albums: list[Album], elapsed: float
+    ) -> None:
+        '''
+        Journal the albums of a batch, in the batch transaction,
+        so the run resumes after them.
+
+        Args:
+            run (SyncRun): The run.
+            albums (list[Album]): The stored albums.
+            elapsed (float): The time in seconds spent by the run.
+        '''
+
+        self._journal_albums(run, albums, run.offset)
+        run.offset += len(albums)
+        run.artist_batches = self._artist_batches
+        run.elapsed = elapsed
+        run.checkpointed_at = timezone.now()
+        run.save(
+            update_fields=[
+                'offset',
+                'artist_batches',
+                'elapsed',
+                'checkpointed_at',
+            ]
+        )
+
+    def update_new_releases_in_db(
+        self,
+        batch_size: int = BATCH_SIZE,
+        countries: Optional[list[str]] = None,
+        resume: bool = True,
+        source: str = SyncRun.SPOTIFY,
+    ) -> list[Album]:
+        '''
+        Update the new releases in the database.
+        The new releases of several markets are fetched concurrently,
+        and the albums and artists listed in several markets
+        are stored once.
+        The whole sync reads from and writes to the primary database,
+        then keeps the reads on the primary until the replicas catch up.
+        The albums are stored by batches, a transaction per batch,
+        journaled in a sync run: a failed (or killed) sync is resumed
+        by the next one of the day after its last stored batch,
+        fetching only the artists of the remaining new releases.
+        It restarts from the first album instead if the new releases
+        listed before that batch changed since.
+        The inserted and updated artists and albums are stored
+        in the change feed, a generation per batch committed with it.
+        The appearances of today's new releases are recorded and
+        the new_releases_synced signal is sent once the albums are stored,
+        except for an offline import (whose releases are not today's).
+
+        Args:
+            batch_size (int): The number of albums per transaction.
+                Default to BATCH_SIZE.
+            countries (Optional[list[str]]): The markets to sync.
+                Default to None (Spotify's default selection).
+            resume (bool): Resume the last run of the day if it did not
+                complete. Default to True.
+            source (str): The source of the new releases (e.g. an offline
+                import). Default to SyncRun.SPOTIFY.
+
+        Returns:
+            list[Album]: The synced albums, including the ones stored
+                by the resumed run.
+        '''
+
+        self._genres.clear()
+        self._markets.clear()
+        self._artist_infos.clear()
+        self._artists.clear()
+        album_ids: Optional[dict[str, list[str]]] = None
+
+        with use_primary():
+            run: SyncRun = self._start_run(countries, resume, source=source)
+            countries = self._get_run_countries(run, countries)
+            self._artist_batches = run.artist_batches
+            elapsed: float = run.elapsed
+            started: float = time.perf_counter()
+            generations: list[SyncGeneration] = []
 
             try:
-                artist_model: Artist = Artist.objects.get(
-                    artist_id=artist_info['id']
+                if countries:
+                    albums_info, album_ids = self._fetch_new_releases(
+                        countries
+                    )
+                    self._restart_if_changed(
+                        run, [album_info['id'] for album_info in albums_info]
+                    )
+                    self._fetch_artists(
+                        artist['id']
+                        for album_info in albums_info[run.offset :]
+                        for artist in album_info['artists']
+                    )
+                    new_releases: Iterator[dict[str, Any]] = iter(
+                        albums_info[run.offset :]
+                    )
+                else:
+                    # The committed albums are listed again, to check
+                    # Spotify did not change its list since then.
+                    new_releases = iter(self.api.get_new_releases())
+                    committed: list[dict[str, Any]] = list(
+                        islice(new_releases, run.offset)
+                    )
+                    self._restart_if_changed(
+                        run, [album_info['id'] for album_info in committed]
+                    )
+
+                    if not run.offset:
+                        new_releases = chain(committed, new_releases)
+
+                while batch := list(islice(new_releases, batch_size)):
+                    self._fetch_artists(
+                        artist['id']
+                        for album_info in batch
+                        for artist in album_info['artists']
+                    )
+
+                    # The changes of the batch are committed with it,
+                    # so a killed run loses none of them.
+                    with transaction.atomic():
+                        with new_generation() as changes:
+                            stored: list[Album] = self._store_releases(batch)
+
+                        self._checkpoint(
+                            run,
+                            stored,
+                            elapsed + time.perf_counter() - started,
+                        )
+
+                    generations.append(changes.generation)
+
+                run_album_ids: list[str] = self._get_run_album_ids(run)
+                albums_by_id: dict[str, Album] = Album.objects.in_bulk(
+                    set(run_album_ids).union(*(album_ids or {}).values())
+                )
+                albums: list[Album] = [
+                    albums_by_id[album_id] for album_id in run_album_ids
+                ]
+
+                if source == SyncRun.IMPORT:
+                    # Replayed releases are not today's new releases.
+                    pass
+                elif album_ids is None:
+                    self._record_appearances(albums)
+                else:
+                    for country, ids in album_ids.items():
+                        self._record_appearances(
+                            [albums_by_id[album_id] for album_id in ids],
+                            country,
+                        )
+            except Exception as e:
+                run.status = SyncRun.FAILED
+                run.error = repr(e)[:255]
+                run.elapsed = elapsed + time.perf_counter() - started
+                run.save(update_fields=['status', 'error', 'elapsed'])
+                raise
+
+            run.status = SyncRun.COMPLETED
+            run.error = ''
+            run.elapsed = elapsed + time.perf_counter() - started
+            run.finished_at = timezone.now()
+            run.save(
+                update_fields=['status', 'error', 'elapsed', 'finished_at']
+            )
+
+            if source == SyncRun.SPOTIFY:
+                new_releases_synced.send(
+                    sender=self.__class__,
+                    albums=albums,
+                    generation=self._merge_generations(generations),
                 )
-            except Artist.DoesNotExist:
-                artist_model: Artist = Artist.objects.create(
-                    artist_id=artist_info['id'],
+
+        mark_primary_written()
+
+        return albums
+
+    def _merge_generations(
+        self, generations: list[SyncGeneration]
+    ) -> SyncGeneration:
+        '''
+        Merge the generations of the batches (or shards) of a run
+        into a single one, sent with the new_releases_synced signal.
+        The changes of each batch are stored in its own generation,
+        committed with the batch.
+
+        Args:
+            generations (list[SyncGeneration]): The generations.
+
+        Returns:
+            SyncGeneration: The last generation, counting the changes
+                of all of them, or a new empty one if none.
+        '''
+
+        if not generations:
+            with new_generation() as changes:
+                pass
+
+            return changes.generation
+
+        return SyncGeneration(
+            generation_id=max(
+                generation.generation_id for generation in generations
+            ),
+            change_count=sum(
+                generation.change_count for generation in generations
+            ),
+        )
+
+    def _create_missing(
+        self, model: type[models.Model], rows: list[dict[str, Any]]
+    ) -> None:
+        '''
+        Create the rows (e.g. the URLs of the artists) not stored yet,
+        matched on all their fields, with bulk writes.
+
+        Args:
+            model (type[models.Model]): The model.
+            rows (list[dict[str, Any]]): The rows fields, the first one
+                being the owner ID.
+        '''
+
+        if not rows:
+            return
+
+        fields: list[str] = list(rows[0])
+        missing: dict[tuple, dict[str, Any]] = {
+            tuple(row.values()): row for row in rows
+        }
+
+        for key in model.objects.filter(
+            **{f'{fields[0]}__in': {row[fields[0]] for row in rows}}
+        ).values_list(*fields):
+            missing.pop(key, None)
+
+        model.objects.bulk_create(
+            [model(**row) for row in missing.values()], batch_size=1000
+        )
+
+    def _store_artists(self, artist_ids: Iterable[str]) -> None:
+        '''
+        Create the fetched artists in the database, or update
+        the followers and popularity of the existing ones,
+        with bulk writes.
+
+        Args:
+            artist_ids (Iterable[str]): The artist ids.
+        '''
+
+        artist_infos: dict[str, dict[str, Any]] = {
+            artist_id: self._artist_infos[artist_id]
+            for artist_id in artist_ids
+            if artist_id in self._artist_infos
+            and artist_id not in self._artists
+        }
+        existing: dict[str, Artist] = Artist.objects.in_bulk(
+            list(artist_infos)
+        )
+        created: list[Artist] = []
+        updated: list[Artist] = []
+
+        for artist_id, artist_info in artist_infos.items():
+            artist: Optional[Artist] = existing.get(artist_id)
+            followers: int = artist_info['followers']['total']
+            popularity: int = artist_info['popularity']
+
+            if artist is None:
+                artist = Artist(
+                    artist_id=artist_id,
                     name=artist_info['name'],
-                    followers=artist_info['followers']['total'],
-                    popularity=artist_info['popularity'],
+                    followers=followers,
+                    popularity=popularity,
                     artist_type=artist_info['type'],
                     uri=artist_info['uri'],
                     href=artist_info['href'],
                 )
+                created.append(artist)
+                record_change(Change.ARTIST, artist_id, Change.INSERT)
+            elif (
+                artist.followers != followers
+                or artist.popularity != popularity
+            ):
+                artist.followers = followers
+                artist.popularity = popularity
+                updated.append(artist)
+                record_change(Change.ARTIST, artist_id, Change.UPDATE)
 
             for genre in artist_info['genres']:
-                genre_model, _ = Genre.objects.get_or_create(name=genre)
-                genre_set.add(genre_model)
+                if genre not in self._genres:
+                    self._genres[genre], _ = Genre.objects.get_or_create(
+                        name=genre
+                    )
 
-            for source, url in artist_info['external_urls'].items():
-                ArtistExternalURL.objects.update_or_create(
-                    source=source,
-                    url=url,
-                    artist_id=artist_model.artist_id,
-                )
+            self._artists[artist_id] = artist
 
-            for image_url in artist_info['images']:
-                ArtistImageURL.objects.update_or_create(
-                    width=image_url['width'],
-                    height=image_url['height'],
-                    url=image_url['url'],
-                    artist_id=artist_model.artist_id,
+        # Another worker may have created the same artists meanwhile.
+        Artist.objects.bulk_create(
+            created, batch_size=1000, ignore_conflicts=True
+        )
+        Artist.objects.bulk_update(
+            updated, ['followers', 'popularity'], batch_size=1000
+        )
+        Artist.genres.through.objects.bulk_create(
+            [
+                Artist.genres.through(
+                    artist_id=artist_id,
+                    genre_id=self._genres[genre].pk,
                 )
+                for artist_id, artist_info in artist_infos.items()
+                for genre in artist_info['genres']
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        self._create_missing(
+            ArtistExternalURL,
+            [
+                {'artist_id': artist_id, 'source': source, 'url': url}
+                for artist_id, artist_info in artist_infos.items()
+                for source, url in artist_info['external_urls'].items()
+            ],
+        )
+        self._create_missing(
+            ArtistImageURL,
+            [
+                {
+                    'artist_id': artist_id,
+                    'width': image_url['width'],
+                    'height': image_url['height'],
+                    'url': image_url['url'],
+                }
+                for artist_id, artist_info in artist_infos.items()
+                for image_url in artist_info['images']
+            ],
+        )
 
-            artist_model.genres.add(*genre_set)
-            artist_set.add(artist_model)
-
-        return artist_set
-
-    def _update_album_in_db(self, album_info: dict[str, Any]) -> Album:
+    def _store_releases(
+        self, albums_info: list[dict[str, Any]]
+    ) -> list[Album]:
         '''
-        Create or update the album in the database.
-        If the album already exists, update the last_checked_date field.
+        Create or update new release albums and their (fetched)
+        artists in the database, with bulk writes:
+        a few statements per table instead of a few per album.
 
         Args:
-            album_info (dict[str, Any]): The album info.
+            albums_info (list[dict[str, Any]]): The albums info.
 
         Returns:
-            Album: The album created/updated.
+            list[Album]: The albums created/updated, in their order.
         '''
 
-        market_set: set[Market] = set()
+        self._store_artists(
+            artist['id']
+            for album_info in albums_info
+            for artist in album_info['artists']
+        )
+        unique_infos: dict[str, dict[str, Any]] = {
+            album_info['id']: album_info for album_info in albums_info
+        }
+        now: datetime.datetime = timezone.now()
+        albums: dict[str, Album] = Album.objects.in_bulk(list(unique_infos))
+        Album.objects.filter(album_id__in=list(albums)).update(
+            last_checked_date=now
+        )
+        created: list[Album] = []
 
-        try:
-            album_model: Album = Album.objects.get(album_id=album_info['id'])
-            album_model.last_checked_date = timezone.now()
-            album_model.save()
-        except Album.DoesNotExist:
-            album_model: Album = Album.objects.create(
-                album_id=album_info['id'],
+        for album_id, album_info in unique_infos.items():
+            for country_code in album_info['available_markets']:
+                if country_code not in self._markets:
+                    (
+                        self._markets[country_code],
+                        _,
+                    ) = Market.objects.get_or_create(
+                        country_code=country_code
+                    )
+
+            if album_id in albums:
+                albums[album_id].last_checked_date = now
+                continue
+
+            albums[album_id] = Album(
+                album_id=album_id,
                 album_type=album_info['album_type'],
                 name=album_info['name'],
                 release_date=album_info['release_date'],
                 release_date_precision=album_info['release_date_precision'],
-                last_checked_date=timezone.now(),
+                last_checked_date=now,
                 object_type=album_info['type'],
                 uri=album_info['uri'],
                 href=album_info['href'],
             )
+            created.append(albums[album_id])
+            record_change(Change.ALBUM, album_id, Change.INSERT)
+
+        Album.objects.bulk_create(
+            created, batch_size=1000, ignore_conflicts=True
+        )
+        Album.available_markets.through.objects.bulk_create(
+            [
+                Album.available_markets.through(
+                    album_id=album_id,
+                    market_id=self._markets[country_code].pk,
+                )
+                for album_id, album_info in unique_infos.items()
+                for country_code in album_info['available_markets']
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        Album.artists.through.objects.bulk_create(
+            [
+                Album.artists.through(
+                    album_id=album_id, artist_id=artist['id']
+                )
+                for album_id, album_info in unique_infos.items()
+                for artist in album_info['artists']
+                if artist['id'] in self._artists
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        self._create_missing(
+            AlbumExternalURL,
+            [
+                {'album_id': album_id, 'source': source, 'url': url}
+                for album_id, album_info in unique_infos.items()
+                for source, url in album_info['external_urls'].items()
+            ],
+        )
+        self._create_missing(
+            AlbumImageURL,
+            [
+                {
+                    'album_id': album_id,
+                    'width': image_url['width'],
+                    'height': image_url['height'],
+                    'url': image_url['url'],
+                }
+                for album_id, album_info in unique_infos.items()
+                for image_url in album_info['images']
+            ],
+        )
 
-        for country_code in album_info['available_markets']:
-            (
-                market_model,
-                _,
-            ) = Market.objects.get_or_create(country_code=country_code)
-            market_set.add(market_model)
+        return [albums[album_info['id']] for album_info in albums_info]
 
-        for source, url in album_info['external_urls'].items():
-            AlbumExternalURL.objects.update_or_create(
-                source=source,
-                url=url,
-                album_id=album_model.album_id,
+    def plan_shards(
+        self,
+        shard_size: int = SHARD_SIZE,
+        countries: Optional[list[str]] = None,
+        resume: bool = True,
+    ) -> SyncRun:
+        '''
+        Start a sharded sync run: split the offsets of the new releases
+        of each market (their total being read from a first page)
+        into shards. Resume the last run of the day if it did not
+        complete instead, its failed shards being synced again.
+
+        Args:
+            shard_size (int): The number of albums per shard.
+                Default to SHARD_SIZE.
+            countries (Optional[list[str]]): The markets to sync.
+                Default to None (Spotify's default selection).
+            resume (bool): Resume the last run of the day if it did not
+                complete. Default to True.
+
+        Returns:
+            SyncRun: The run.
+        '''
+
+        # Whole pages per shard, so no page is fetched by two workers.
+        page_size: int = SpotifyAPI.PAGE_SIZE
+        shard_size = max(-(-shard_size // page_size), 1) * page_size
+
+        with use_primary():
+            run: SyncRun = self._start_run(countries, resume, sharded=True)
+            countries = self._get_run_countries(run, countries)
+
+            if run.shards.exists():
+                run.shards.filter(status=SyncShard.FAILED).update(
+                    status=SyncShard.PENDING
+                )
+                return run
+
+            totals: dict[str, int] = {
+                country: self.api.get_new_releases_total(country or None)
+                for country in countries or ['']
+            }
+            SyncShard.objects.bulk_create(
+                [
+                    SyncShard(
+                        run=run,
+                        country_code=country,
+                        start=start,
+                        end=min(start + shard_size, total),
+                    )
+                    for country, total in totals.items()
+                    for start in range(0, total, shard_size)
+                ]
             )
 
-        for image_url in album_info['images']:
-            AlbumImageURL.objects.update_or_create(
-                width=image_url['width'],
-                height=image_url['height'],
-                url=image_url['url'],
-                album_id=album_model.album_id,
+        return run
+
+    def _lease_shard(self, run: SyncRun, worker: str) -> Optional[SyncShard]:
+        '''
+        Lease the next shard of a run, pending or whose lease expired.
+        The lease is taken by a conditional update, so two workers
+        never lease the same shard (on any database backend).
+
+        Args:
+            run (SyncRun): The run.
+            worker (str): The worker name.
+
+        Returns:
+            Optional[SyncShard]: The leased shard, None if none is left.
+        '''
+
+        while True:
+            now: datetime.datetime = timezone.now()
+            shard: Optional[SyncShard] = (
+                run.shards.filter(
+                    Q(status=SyncShard.PENDING)
+                    | Q(status=SyncShard.LEASED, leased_until__lt=now)
+                )
+                .order_by('shard_id')
+                .first()
             )
 
-        album_model.available_markets.add(*market_set)
+            if shard is None:
+                return None
 
-        return album_model
+            if SyncShard.objects.filter(
+                pk=shard.pk,
+                status=shard.status,
+                leased_until=shard.leased_until,
+            ).update(
+                status=SyncShard.LEASED,
+                worker=worker,
+                leased_until=now
+                + datetime.timedelta(seconds=self.LEASE_SECONDS),
+                attempts=F('attempts') + 1,
+            ):
+                shard.refresh_from_db()
+                return shard
 
-    def update_new_releases_in_db(self) -> list[Album]:
+    def _leased(self, shard: SyncShard, worker: str) -> QuerySet:
         '''
-        Update the new releases in the database.
+        Get the shard if the worker still holds its lease,
+        to finish it with a conditional update.
+
+        Args:
+            shard (SyncShard): The shard.
+            worker (str): The worker name.
+
+        Returns:
+            QuerySet: The shard, empty if its lease was lost.
+        '''
+
+        return SyncShard.objects.filter(
+            pk=shard.pk, worker=worker, status=SyncShard.LEASED
+        )
+
+    def _forget_stored(self) -> None:
+        '''
+        Forget the genres, markets and artists stored by the sync,
+        once a transaction storing some of them was rolled back
+        (their rows may be gone). The fetched artists are kept.
+        '''
+
+        self._genres.clear()
+        self._markets.clear()
+        self._artists.clear()
+
+    def sync_shards(self, run: SyncRun, worker: str) -> int:
+        '''
+        Lease and sync the shards of a run until none is left,
+        each one in a transaction, with bulk writes.
+        The failed shards are marked as such, the worker going on
+        with the next ones. A shard whose lease was lost
+        (i.e. leased again by another worker) is rolled back.
+        The genres, markets and artists known by the worker are
+        forgotten after a rolled back shard, so the next ones store
+        them again.
+
+        Args:
+            run (SyncRun): The run.
+            worker (str): The worker name.
+
+        Returns:
+            int: The number of shards synced by the worker.
+        '''
+
+        self._genres.clear()
+        self._markets.clear()
+        self._artist_infos.clear()
+        self._artists.clear()
+        synced: int = 0
+
+        with use_primary():
+            while (shard := self._lease_shard(run, worker)) is not None:
+                started: float = time.perf_counter()
+                self._artist_batches = 0
+
+                try:
+                    albums_info: list[dict[str, Any]] = list(
+                        islice(
+                            self.api.get_new_releases(
+                                country=shard.country_code or None,
+                                offset=shard.start,
+                            ),
+                            shard.end - shard.start,
+                        )
+                    )
+                    self._fetch_artists(
+                        artist['id']
+                        for album_info in albums_info
+                        for artist in album_info['artists']
+                    )
+
+                    with transaction.atomic():
+                        with new_generation() as changes:
+                            albums: list[Album] = self._store_releases(
+                                albums_info
+                            )
+
+                        self._journal_albums(
+                            run, albums, shard.start, shard.country_code
+                        )
+
+                        # The lease expired and another worker leased
+                        # the shard: its sync is the one kept.
+                        if not self._leased(shard, worker).update(
+                            status=SyncShard.DONE,
+                            artist_batches=self._artist_batches,
+                            generation=changes.generation,
+                            error='',
+                            elapsed=time.perf_counter() - started,
+                        ):
+                            transaction.set_rollback(True)
+                            self._forget_stored()
+                            continue
+                except Exception as e:
+                    self._forget_stored()
+                    self._leased(shard, worker).update(
+                        status=SyncShard.FAILED,
+                        error=repr(e)[:255],
+                        elapsed=time.perf_counter() - started,
+                    )
+                    continue
+
+                synced += 1
+
+        return synced
+
+    def finish_sharded_run(self, run: SyncRun) -> list[Album]:
         '''
+        Complete a sharded sync run once its shards are synced:
+        merge the albums and stats of the shards into the run, record
+        the appearances of the albums, then send the new_releases_synced
+        signal, with the merged generations of the shards.
+
+        Args:
+            run (SyncRun): The run.
 
-        new_releases: Iterator[dict[str, Any]] = self.api.get_new_releases()
-        albums: list[Album] = []
+        Raises:
+            SpotifyAPIError: If some shards failed.
 
-        for album_info in new_releases:
-            artist_ids: list[str] = [
-                artist['id'] for artist in album_info['artists']
+        Returns:
+            list[Album]: The synced albums, in their first appearance
+                order.
+        '''
+
+        with use_primary():
+            shards: list[SyncShard] = list(
+                run.shards.select_related('generation').order_by(
+                    'country_code', 'start'
+                )
+            )
+            failed: int = sum(
+                shard.status != SyncShard.DONE for shard in shards
+            )
+
+            if failed:
+                run.status = SyncRun.FAILED
+                run.error = f'{failed} shards not synced.'
+                run.save(update_fields=['status', 'error'])
+                raise SpotifyAPIError(
+                    f'{failed} shards of the sync run {run.run_id} '
+                    f'not synced.'
+                )
+
+            album_ids: dict[str, list[str]] = {
+                country: self._get_run_album_ids(run, country)
+                for country in run.markets.split(',')
+            }
+            run_album_ids: list[str] = list(
+                dict.fromkeys(sum(album_ids.values(), []))
+            )
+            albums_by_id: dict[str, Album] = Album.objects.in_bulk(
+                run_album_ids
+            )
+
+            for country, ids in album_ids.items():
+                self._record_appearances(
+                    [albums_by_id[album_id] for album_id in ids], country
+                )
+
+            generation: SyncGeneration = self._merge_generations(
+                [shard.generation for shard in shards if shard.generation]
+            )
+            run.offset = len(run_album_ids)
+            run.artist_batches = sum(shard.artist_batches for shard in shards)
+            run.status = SyncRun.COMPLETED
+            run.error = ''
+            run.finished_at = timezone.now()
+            run.save()
+            albums: list[Album] = [
+                albums_by_id[album_id] for album_id in run_album_ids
             ]
-            artist_set: set[Artist] = self._update_artists_in_db(artist_ids)
-            album_model: Album = self._update_album_in_db(album_info)
-            album_model.artists.add(*artist_set)
-            albums.append(album_model)
+            new_releases_synced.send(
+                sender=self.__class__, albums=albums, generation=generation
+            )
+
+        mark_primary_written()
 
         return albums
+
+    def update_new_releases_sharded(
+        self,
+        shard_size: int = SHARD_SIZE,
+        countries: Optional[list[str]] = None,
+        processes: int = 1,
+        resume: bool = True,
+    ) -> list[Album]:
+        '''
+        Update the new releases in the database with a sharded sync:
+        the coordinator splits the new releases into shards (see
+        plan_shards), synced by a pool of worker processes and by the
+        sync_releases --worker processes joining the run, then merges
+        them (see finish_sharded_run).
+
+        Args:
+            shard_size (int): The number of albums per shard.
+                Default to SHARD_SIZE.
+            countries (Optional[list[str]]): The markets to sync.
+                Default to None (Spotify's default selection).
+            processes (int): The number of worker processes,
+                1 to sync the shards in the current process.
+                Default to 1.
+            resume (bool): Resume the last run of the day if it did not
+                complete. Default to True.
+
+        Raises:
+            SpotifyAPIError: If some shards failed.
+
+        Returns:
+            list[Album]: The synced albums.
+        '''
+
+        run: SyncRun = self.plan_shards(shard_size, countries, resume)
+        started: float = time.perf_counter()
+        worker: str = f'{socket.gethostname()}:{os.getpid()}'
+
+        if processes > 1:
+            # The workers connect to the database on their own.
+            connections.close_all()
+
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            ) as executor:
+                list(
+                    executor.map(
+                        sync_shards_in_process,
+                        [run.run_id] * processes,
+                        [self.auth.token] * processes,
+                        [f'{worker}/{i}' for i in range(processes)],
+                        # The workers share the rate limit of the process.
+                        [SpotifyAPI.RATE_LIMIT / processes] * processes,
+                    )
+                )
+
+        # Sync the shards left, and wait for the other workers.
+        while True:
+            self.sync_shards(run, worker)
+
+            if not run.shards.filter(
+                status=SyncShard.LEASED, leased_until__gte=timezone.now()
+            ).exists():
+                break
+
+            time.sleep(self.SHARD_POLL_INTERVAL)
+
+        run.refresh_from_db()
+        run.elapsed += time.perf_counter() - started
+
+        return self.finish_sharded_run(run)
+
+
+def sync_shards_in_process(
+    run_id: int, token: Token, worker: str, rate: float
+) -> int:
+    '''
+    Sync the shards of a run in a worker process of a sharded sync
+    (see SpotifyManager.update_new_releases_sharded).
+
+    Args:
+        run_id (int): The run ID.
+        token (Token): The Spotify token.
+        worker (str): The worker name.
+        rate (float): The number of Spotify requests per second
+            of the worker.
+
+    Returns:
+        int: The number of shards synced by the worker.
+    '''
+
+    from django.conf import settings
+
+    sp_man: SpotifyManager = SpotifyManager(
+        client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
+        client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
+        scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
+        redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
+        stream=settings.APP_CONFIG.SPOTIFY_STREAM_PAGES,
+    )
+    sp_man.auth.token = token
+    sp_man.api._rate_limiter = RateLimiter(rate, SpotifyAPI.RATE_BURST)
+
+    try:
+        return sp_man.sync_shards(SyncRun.objects.get(pk=run_id), worker)
+    finally:
+        connections.close_all()
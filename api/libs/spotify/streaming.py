@@ -0,0 +1,234 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Sequence
+
+_WHITESPACE: str = ' \t\n\r'
+
+
+class JSONItemStream:
+    '''
+    An incremental parser of the items of an array nested in a JSON
+    document (e.g. the albums.items of a new releases page), reading
+    the document by chunks: each item is yielded as soon as it is
+    complete, and only the current item is held in memory.
+    The rest of the document (e.g. the page total, offset and limit)
+    is available once the items are consumed.
+
+    Attributes:
+        path (tuple[str, ...]): The keys of the objects leading
+            to the array.
+        skip (frozenset[str]): The fields dropped from the items.
+        document (dict[str, Any]): The document parsed so far,
+            its array being empty.
+    '''
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        path: Sequence[str],
+        skip: Iterable[str] = (),
+    ):
+        '''
+        The constructor.
+
+        Args:
+            chunks (Iterable[bytes]): The chunks of the UTF-8 encoded
+                document.
+            path (Sequence[str]): The keys of the objects leading
+                to the array.
+            skip (Iterable[str]): The fields dropped from the items
+                (e.g. the ones not stored). Default to ().
+        '''
+
+        self.path: tuple[str, ...] = tuple(path)
+        self.skip: frozenset[str] = frozenset(skip)
+        self.document: dict[str, Any] = {}
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._utf8: codecs.IncrementalDecoder = codecs.getincrementaldecoder(
+            'utf-8'
+        )()
+        self._decoder: json.JSONDecoder = json.JSONDecoder()
+        self._buffer: str = ''
+        self._pos: int = 0
+        self._eof: bool = False
+
+    def __iter__(self) -> Iterator[Any]:
+        '''
+        Parse the document.
+
+        Raises:
+            ValueError: If the document is invalid, or has no array
+                at the path.
+
+        Yields:
+            Any: The items of the array.
+        '''
+
+        yield from self._parse_object(self.document, 0)
+
+        if self._peek():
+            raise ValueError('Extra data after the JSON document.')
+
+    def _read(self) -> bool:
+        '''
+        Append the next chunk to the buffer, dropping the parsed text.
+
+        Returns:
+            bool: False at the end of the document.
+        '''
+
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+
+        for chunk in self._chunks:
+            text: str = self._utf8.decode(chunk)
+
+            if text:
+                self._buffer += text
+                return True
+
+        self._buffer += self._utf8.decode(b'', final=True)
+        self._eof = True
+
+        return False
+
+    def _peek(self) -> str:
+        '''
+        Skip the whitespaces and get the next character.
+
+        Returns:
+            str: The next character, empty at the end of the document.
+        '''
+
+        while True:
+            while (
+                self._pos < len(self._buffer)
+                and self._buffer[self._pos] in _WHITESPACE
+            ):
+                self._pos += 1
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            if not self._read():
+                return ''
+
+    def _expect(self, chars: str) -> str:
+        '''
+        Consume the next character.
+
+        Args:
+            chars (str): The expected characters.
+
+        Raises:
+            ValueError: If the next character is not expected.
+
+        Returns:
+            str: The character.
+        '''
+
+        char: str = self._peek()
+
+        if not char or char not in chars:
+            raise ValueError(
+                f'Expecting one of {chars!r}, {char or "end"!r} found.'
+            )
+
+        self._pos += 1
+
+        return char
+
+    def _parse_value(self) -> Any:
+        '''
+        Parse the next complete value, reading as many chunks
+        as needed.
+
+        Raises:
+            json.JSONDecodeError: If the value is invalid.
+
+        Returns:
+            Any: The value.
+        '''
+
+        self._peek()
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+
+                continue
+
+            # A number ending the buffer may go on in the next chunk.
+            if end == len(self._buffer) and not self._eof:
+                self._read()
+                continue
+
+            self._pos = end
+
+            return value
+
+    def _parse_object(
+        self, target: dict[str, Any], depth: int
+    ) -> Iterator[Any]:
+        '''
+        Parse an object into target, descending into the path.
+
+        Args:
+            target (dict[str, Any]): The parsed object.
+            depth (int): The depth of the object in the path.
+
+        Yields:
+            Any: The items of the array.
+        '''
+
+        self._expect('{')
+
+        if self._peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key: Any = self._parse_value()
+            self._expect(':')
+
+            if depth < len(self.path) and key == self.path[depth]:
+                if depth == len(self.path) - 1:
+                    target[key] = []
+                    yield from self._parse_array()
+                else:
+                    target[key] = {}
+                    yield from self._parse_object(target[key], depth + 1)
+            else:
+                target[key] = self._parse_value()
+
+            if self._expect(',}') == '}':
+                return
+
+    def _parse_array(self) -> Iterator[Any]:
+        '''
+        Parse the array at the path, an item at a time.
+
+        Yields:
+            Any: The items.
+        '''
+
+        self._expect('[')
+
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            item: Any = self._parse_value()
+
+            if self.skip and isinstance(item, dict):
+                for field in self.skip:
+                    item.pop(field, None)
+
+            yield item
+
+            if self._expect(',]') == ']':
+                return
@@ -0,0 +1,394 @@
+import gzip
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Iterator, Optional
+import requests
+from core.codec import dumps, loads
+
+# The response headers kept by the cassettes.
+RECORDED_HEADERS: tuple[str, ...] = ('Content-Type', 'Retry-After')
+# The secrets replaced in the recorded response bodies.
+REDACTED_KEYS: tuple[str, ...] = ('access_token', 'refresh_token')
+REDACTED: str = 'REDACTED'
+
+Key = tuple[str, str, tuple[tuple[str, str], ...]]
+
+
+class Transport:
+    '''
+    The HTTP transport of the Spotify clients (SpotifyAPI and Auth),
+    sending the requests with requests.
+    '''
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        '''
+        Send a GET request.
+
+        Args:
+            url (str): The URL.
+            **kwargs (Any): The requests.get arguments.
+
+        Returns:
+            requests.Response: The response.
+        '''
+
+        return requests.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        '''
+        Send a POST request.
+
+        Args:
+            url (str): The URL.
+            **kwargs (Any): The requests.post arguments.
+
+        Returns:
+            requests.Response: The response.
+        '''
+
+        return requests.post(url, **kwargs)
+
+
+def get_key(method: str, url: str, kwargs: dict[str, Any]) -> Key:
+    '''
+    Get the key matching a request with its recorded exchanges:
+    its method, URL, and query parameters (or grant type, the other
+    fields of a token request being secrets).
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The URL.
+        kwargs (dict[str, Any]): The requests arguments.
+
+    Returns:
+        Key: The request key.
+    '''
+
+    if method == 'POST':
+        params: dict[str, Any] = {
+            'grant_type': (kwargs.get('data') or {}).get('grant_type', '')
+        }
+    else:
+        params = kwargs.get('params') or {}
+
+    return (
+        method,
+        url,
+        tuple(sorted((str(k), str(v)) for k, v in params.items())),
+    )
+
+
+def redact(body: bytes) -> bytes:
+    '''
+    Replace the tokens of a token response body.
+
+    Args:
+        body (bytes): The response body.
+
+    Returns:
+        bytes: The redacted body.
+    '''
+
+    try:
+        payload: Any = loads(body)
+    except ValueError:
+        return body
+
+    if not isinstance(payload, dict) or not any(
+        key in payload for key in REDACTED_KEYS
+    ):
+        return body
+
+    return dumps(
+        {
+            key: REDACTED if key in REDACTED_KEYS else value
+            for key, value in payload.items()
+        }
+    )
+
+
+class RecordingTransport(Transport):
+    '''
+    A transport recording the exchanges of another one (the network
+    by default) to a cassette: a gzipped NDJSON file of the requests
+    keys, the responses (or errors) and their latency.
+    The request headers are not recorded, nor the tokens.
+
+    Attributes:
+        path (str): The cassette path.
+        transport (Transport): The recorded transport.
+        exchanges (list[dict[str, Any]]): The recorded exchanges.
+    '''
+
+    def __init__(self, path: str, transport: Optional[Transport] = None):
+        '''
+        The constructor.
+
+        Args:
+            path (str): The cassette path.
+            transport (Optional[Transport]): The recorded transport.
+                Default to None (the network).
+        '''
+
+        self.path: str = path
+        self.transport: Transport = transport or Transport()
+        self.exchanges: list[dict[str, Any]] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def _record(self, method: str, url: str, kwargs: dict[str, Any]) -> Any:
+        '''
+        Send a request through the recorded transport
+        and record the exchange.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL.
+            kwargs (dict[str, Any]): The requests arguments.
+
+        Raises:
+            requests.RequestException: If the request fails.
+
+        Returns:
+            Any: The response.
+        '''
+
+        _, _, params = get_key(method, url, kwargs)
+        exchange: dict[str, Any] = {
+            'method': method,
+            'url': url,
+            'params': dict(params),
+        }
+        started: float = time.perf_counter()
+
+        try:
+            response: Any = getattr(self.transport, method.lower())(
+                url, **kwargs
+            )
+        except requests.RequestException as e:
+            exchange['error'] = type(e).__name__
+            exchange['message'] = str(e)
+            raise
+        else:
+            exchange['status'] = response.status_code
+            exchange['headers'] = {
+                header: response.headers[header]
+                for header in RECORDED_HEADERS
+                if header in response.headers
+            }
+            exchange['body'] = redact(response.content).decode()
+
+            return response
+        finally:
+            exchange['elapsed'] = round(time.perf_counter() - started, 4)
+
+            with self._lock:
+                self.exchanges.append(exchange)
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self._record('GET', url, kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        return self._record('POST', url, kwargs)
+
+    def save(self) -> int:
+        '''
+        Write the recorded exchanges to the cassette, in their order.
+
+        Returns:
+            int: The number of recorded exchanges.
+        '''
+
+        with gzip.open(self.path, 'wb') as file:
+            for exchange in self.exchanges:
+                file.write(dumps(exchange) + b'\n')
+
+        return len(self.exchanges)
+
+
+class ReplayResponse:
+    '''
+    A response replayed from a cassette, with the attributes
+    of requests.Response used by the Spotify clients.
+
+    Attributes:
+        status_code (int): The HTTP status code.
+        headers (dict[str, str]): The recorded headers.
+        content (bytes): The body.
+    '''
+
+    def __init__(
+        self, status_code: int, headers: dict[str, str], content: bytes
+    ):
+        '''
+        The constructor.
+
+        Args:
+            status_code (int): The HTTP status code.
+            headers (dict[str, str]): The recorded headers.
+            content (bytes): The body.
+        '''
+
+        self.status_code: int = status_code
+        self.headers: dict[str, str] = headers
+        self.content: bytes = content
+
+    def json(self) -> Any:
+        '''
+        Deserialize the JSON body.
+
+        Returns:
+            Any: The body value.
+        '''
+
+        return loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        '''
+        Iterate over the body, as a streamed response.
+
+        Args:
+            chunk_size (int): The size in bytes of the chunks.
+                Default to 1.
+
+        Yields:
+            bytes: The body chunks.
+        '''
+
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self) -> None:
+        '''
+        Release the connection (none replayed).
+        '''
+
+        ...
+
+    def raise_for_status(self) -> None:
+        '''
+        Raise the error of the 4xx and 5xx responses.
+
+        Raises:
+            requests.HTTPError: If the status is an error.
+        '''
+
+        if self.status_code >= 400:
+            raise requests.HTTPError(
+                f'{self.status_code} Error (replayed)', response=self
+            )
+
+
+class CassetteError(Exception):
+    '''
+    The request has no recorded exchange left to replay.
+    '''
+
+    ...
+
+
+class ReplayTransport(Transport):
+    '''
+    A transport replaying the exchanges of a cassette without network
+    access: each request gets the next exchange recorded for the same
+    key (see get_key), after the recorded latency divided by speed,
+    or a fixed latency.
+
+    Attributes:
+        latency (Optional[float]): The fixed latency in seconds
+            of the responses, None for the recorded ones.
+        speed (float): The replay speed, dividing the latencies
+            (inf for no latency).
+    '''
+
+    def __init__(
+        self,
+        path: str,
+        latency: Optional[float] = None,
+        speed: float = 1.0,
+    ):
+        '''
+        The constructor.
+
+        Args:
+            path (str): The cassette path.
+            latency (Optional[float]): The fixed latency in seconds
+                of the responses. Default to None (the recorded ones).
+            speed (float): The replay speed, dividing the latencies.
+                Default to 1.0 (real time).
+        '''
+
+        self.latency: Optional[float] = latency
+        self.speed: float = speed
+        self._exchanges: dict[Key, deque] = defaultdict(deque)
+        self._lock: threading.Lock = threading.Lock()
+
+        with gzip.open(path, 'rb') as file:
+            for line in file:
+                exchange: dict[str, Any] = loads(line)
+                key: Key = (
+                    exchange['method'],
+                    exchange['url'],
+                    tuple(sorted(exchange['params'].items())),
+                )
+                self._exchanges[key].append(exchange)
+
+    def _replay(self, method: str, url: str, kwargs: dict[str, Any]) -> Any:
+        '''
+        Replay the next exchange recorded for a request.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL.
+            kwargs (dict[str, Any]): The requests arguments.
+
+        Raises:
+            CassetteError: If no exchange is left for the request.
+            requests.RequestException: If the recorded request failed.
+
+        Returns:
+            Any: The response.
+        '''
+
+        key: Key = get_key(method, url, kwargs)
+
+        with self._lock:
+            if not self._exchanges[key]:
+                raise CassetteError(f'No exchange recorded for {key}.')
+
+            exchange: dict[str, Any] = self._exchanges[key].popleft()
+
+        delay: float = (
+            self.latency if self.latency is not None else exchange['elapsed']
+        ) / self.speed
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if 'error' in exchange:
+            raise getattr(
+                requests, exchange['error'], requests.RequestException
+            )(exchange['message'])
+
+        return ReplayResponse(
+            exchange['status'],
+            exchange['headers'],
+            exchange['body'].encode(),
+        )
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self._replay('GET', url, kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        return self._replay('POST', url, kwargs)
+
+    @property
+    def remaining(self) -> int:
+        '''
+        Returns the number of exchanges not replayed yet.
+
+        Returns:
+            int: The number of exchanges.
+        '''
+
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
@@ -0,0 +1,25 @@
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+from api.libs.changes import compact_changes
+
+
+class Command(BaseCommand):
+    '''
+    The compact_changes command.
+    Merge the old generations of the change feed, keeping
+    the last change of each artist and album.
+    '''
+
+    help: str = 'Merge the old generations of the change feed.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=30,
+            help='The number of most recent generations left as they are.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        removed: int = compact_changes(options['keep'])
+        self.stdout.write(f'{removed} changes removed.')
@@ -0,0 +1,34 @@
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+from api.libs.similarity import DEFAULT_K, JACCARD, METRICS
+from api.libs.similarity import update_similar_artists
+
+
+class Command(BaseCommand):
+    '''
+    The compute_similar_artists command.
+    Recompute the precomputed similar artists table
+    (the sync recomputes it with the default settings).
+    '''
+
+    help: str = 'Compute the similar artists by genres overlap.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=DEFAULT_K,
+            help='The number of similar artists stored per artist.',
+        )
+        parser.add_argument(
+            '--metric',
+            choices=METRICS,
+            default=JACCARD,
+            help='The similarity metric.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stored: int = update_similar_artists(
+            k=options['k'], metric=options['metric']
+        )
+        self.stdout.write(f'{stored} similar artists stored.')
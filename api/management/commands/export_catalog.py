@@ -0,0 +1,95 @@
+import os
+from typing import Any
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from api.libs.export import (
+    CHUNK_SIZE,
+    ENTITIES,
+    FORMATS,
+    NDJSON,
+    PARQUET,
+    ExportProgress,
+    export,
+)
+
+
+class Command(BaseCommand):
+    '''
+    The export_catalog command.
+    Export the artists or albums catalog in constant memory.
+    An interrupted export resumes with --after set to the last
+    exported key, reported on stderr.
+    '''
+
+    help: str = 'Export the artists or albums catalog.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('entity', choices=list(ENTITIES))
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=NDJSON,
+            help='The export format.',
+        )
+        parser.add_argument(
+            '--output',
+            help='The output file (stdout by default, required for parquet).',
+        )
+        parser.add_argument(
+            '--after', help='The key after which to start the export.'
+        )
+        parser.add_argument('--until', help='The last key to export.')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='The number of rows read and written at once.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['format'] == PARQUET and not options['output']:
+            raise CommandError('The parquet format requires --output.')
+
+        # A Parquet file is not appended to: a resumed export
+        # is written to a new part file.
+        if (
+            options['format'] == PARQUET
+            and options['after']
+            and os.path.exists(options['output'])
+        ):
+            raise CommandError(
+                f'{options["output"]} exists, a resumed parquet export '
+                'requires a new --output.'
+            )
+
+        progress: ExportProgress = ExportProgress(options['entity'])
+        kwargs: dict[str, Any] = {
+            'format': options['format'],
+            'after': options['after'],
+            'until': options['until'],
+            'chunk_size': options['chunk_size'],
+            'progress': progress,
+        }
+
+        try:
+            if options['format'] == PARQUET:
+                export(options['entity'], options['output'], **kwargs)
+            elif options['output']:
+                # Appending, so a resumed export completes the file.
+                with open(
+                    options['output'], 'a', newline='', encoding='utf-8'
+                ) as output:
+                    export(options['entity'], output, **kwargs)
+            else:
+                export(options['entity'], self.stdout, **kwargs)
+        except RuntimeError as error:
+            raise CommandError(str(error))
+        finally:
+            self.stderr.write(
+                f'{progress.rows} {options["entity"]} exported '
+                f'({progress.throughput:.0f} rows/s), '
+                f'last key: {progress.last_key}.'
+            )
@@ -0,0 +1,75 @@
+import time
+from typing import Any
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from api.libs.spotify.offline_api import OfflineSpotifyAPI
+from api.libs.spotify.spotify_manager import SpotifyManager
+from api.models import Album, SyncRun
+
+
+class Command(BaseCommand):
+    '''
+    The import_releases command.
+    Replay recorded new releases and artists payloads through the sync,
+    without token nor network access, e.g. to seed a new environment
+    or to benchmark the sync.
+    The imported albums are not recorded as today's new releases
+    and the data derived from the catalog is left as it is:
+    rebuild it with rebuild_search_index, compute_similar_artists
+    and update_leaderboards.
+    '''
+
+    help: str = 'Import recorded new releases and artists payloads.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--new-releases',
+            nargs='+',
+            required=True,
+            help='The NDJSON files (gzipped or not) of the new releases.',
+        )
+        parser.add_argument(
+            '--artists',
+            nargs='+',
+            default=[],
+            help='The NDJSON files (gzipped or not) of the artists.',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Start over instead of resuming the failed run of the day.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of albums stored per transaction.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
+            client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
+            scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
+            redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
+        )
+        api: OfflineSpotifyAPI = OfflineSpotifyAPI(
+            options['new_releases'], options['artists']
+        )
+        sp_man.api = api
+        started: float = time.perf_counter()
+
+        try:
+            albums: list[Album] = sp_man.update_new_releases_in_db(
+                batch_size=options['batch_size'],
+                resume=not options['restart'],
+                source=SyncRun.IMPORT,
+            )
+        finally:
+            api.close()
+
+        elapsed: float = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(
+            f'{len(albums)} albums imported in {elapsed:.1f}s '
+            f'({len(albums) / elapsed:.0f} albums/s).'
+        )
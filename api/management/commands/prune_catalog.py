@@ -0,0 +1,74 @@
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+from api.libs.retention import (
+    BATCH_SIZE,
+    DEFAULT_MAX_AGE_DAYS,
+    THROTTLE,
+    prune_catalog,
+)
+
+
+class Command(BaseCommand):
+    '''
+    The prune_catalog command.
+    Delete the albums no longer listed in the new releases,
+    then the artists, genres and markets left orphaned,
+    by small throttled batches.
+    '''
+
+    help: str = 'Prune the old albums and the orphaned catalog rows.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--max-age-days',
+            type=int,
+            default=DEFAULT_MAX_AGE_DAYS,
+            help='The number of days after which an album no longer '
+            'listed in the new releases is pruned.',
+        )
+        parser.add_argument(
+            '--keep-popularity',
+            type=int,
+            help='Keep the albums of the artists at least this popular.',
+        )
+        parser.add_argument(
+            '--keep-released-days',
+            type=int,
+            help='Keep the albums released in the last days.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='The number of rows deleted per transaction '
+            '(counting the related rows deleted with them).',
+        )
+        parser.add_argument(
+            '--throttle',
+            type=float,
+            default=THROTTLE,
+            help='The pause in seconds between two batches.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the number of rows to prune.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        verb: str = 'to prune' if options['dry_run'] else 'pruned'
+        pruned: dict[str, int] = prune_catalog(
+            max_age_days=options['max_age_days'],
+            keep_popularity=options['keep_popularity'],
+            keep_released_days=options['keep_released_days'],
+            batch_size=options['batch_size'],
+            throttle=options['throttle'],
+            dry_run=options['dry_run'],
+            on_progress=lambda table, count: self.stdout.write(
+                f'{count} {table} {verb}.'
+            ),
+        )
+
+        if options['dry_run']:
+            for table, count in pruned.items():
+                self.stdout.write(f'{count} {table} {verb}.')
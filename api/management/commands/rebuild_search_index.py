@@ -0,0 +1,38 @@
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+from api.libs.search import index_albums
+from api.models import Album
+
+
+class Command(BaseCommand):
+    '''
+    The rebuild_search_index command.
+    Index the whole catalog by batches of albums
+    (the sync only indexes the albums it stores).
+    '''
+
+    help: str = 'Index all the artists, albums and genres for the search.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='The number of albums indexed per batch.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batch: list[Album] = []
+        indexed: int = 0
+
+        for album in Album.objects.order_by('album_id').iterator():
+            batch.append(album)
+
+            if len(batch) >= options['batch_size']:
+                index_albums(batch)
+                indexed += len(batch)
+                batch = []
+
+        index_albums(batch)
+        indexed += len(batch)
+        self.stdout.write(f'{indexed} albums indexed.')
@@ -0,0 +1,38 @@
+import datetime
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+from api.libs.metrics import rollup_metrics
+
+
+class Command(BaseCommand):
+    '''
+    The rollup_artist_metrics command.
+    Downsample the old daily artist metrics to weekly samples,
+    so a year of history takes a row per artist.
+    '''
+
+    help: str = 'Roll up the old daily artist metrics to weekly samples.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=90,
+            help='The number of days kept at the daily resolution.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='The number of artists rolled up per transaction.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        before: datetime.date = timezone.now().date() - datetime.timedelta(
+            days=options['keep_days']
+        )
+        rolled_up: int = rollup_metrics(
+            before, batch_size=options['batch_size']
+        )
+        self.stdout.write(f'{rolled_up} daily series rolled up.')
@@ -0,0 +1,197 @@
+import os
+import socket
+import time
+from typing import Any, Optional
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from api.libs.background import join_background_tasks
+from api.libs.spotify.auth import Token
+from api.libs.spotify.spotify_api import RateLimiter, SpotifyAPI
+from api.libs.spotify.spotify_manager import SpotifyManager
+from api.libs.spotify.transport import (
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+)
+from api.models import Album, SyncRun
+from user.models import User
+
+
+class Command(BaseCommand):
+    '''
+    The sync_releases command.
+    Sync the new releases with the token of a user, optionally
+    recording the Spotify exchanges to a cassette, or replay
+    a cassette without network access (e.g. to benchmark the sync
+    or to reproduce a sync against large real-world payloads).
+    '''
+
+    help: str = 'Sync the new releases, recording or replaying a cassette.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--email',
+            help='The user whose Spotify token is used (not replaying).',
+        )
+        parser.add_argument(
+            '--markets',
+            nargs='+',
+            help='The markets (ISO country codes) to sync.',
+        )
+        parser.add_argument(
+            '--record',
+            metavar='CASSETTE',
+            help='Record the Spotify exchanges to a cassette file.',
+        )
+        parser.add_argument(
+            '--replay',
+            metavar='CASSETTE',
+            help='Replay the Spotify exchanges of a cassette file.',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            help='The fixed latency in seconds of the replayed responses '
+            '(the recorded ones by default).',
+        )
+        parser.add_argument(
+            '--speed',
+            type=float,
+            default=1.0,
+            help='The replay speed, dividing the latencies and scaling '
+            'the rate limit (inf for no latency nor rate limit).',
+        )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Parse the new releases pages as they are received '
+            '(SPOTIFY_STREAM_PAGES by default).',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Start over instead of resuming the failed run of the day.',
+        )
+        parser.add_argument(
+            '--shard-size',
+            type=int,
+            help='Shard the sync by offset ranges of this number of albums, '
+            'leased by the worker processes.',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='The number of worker processes of a sharded sync.',
+        )
+        parser.add_argument(
+            '--worker',
+            type=int,
+            metavar='RUN_ID',
+            help='Join the sharded sync run as a worker, syncing '
+            'its shards left.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of albums stored per transaction.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        transport: Optional[Transport] = None
+
+        if options['processes'] > 1 and (
+            options['record'] or options['replay']
+        ):
+            raise CommandError('--processes excludes --record and --replay.')
+
+        if options['replay']:
+            if options['email'] or options['record']:
+                raise CommandError('--replay excludes --email and --record.')
+
+            transport = ReplayTransport(
+                options['replay'],
+                latency=options['latency'],
+                speed=options['speed'],
+            )
+        elif not options['email']:
+            raise CommandError('--email is required unless replaying.')
+        elif options['record']:
+            transport = RecordingTransport(options['record'])
+
+        sp_man: SpotifyManager = SpotifyManager(
+            client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
+            client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
+            scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
+            redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
+            transport=transport,
+            stream=options['stream']
+            or settings.APP_CONFIG.SPOTIFY_STREAM_PAGES,
+        )
+
+        if options['replay']:
+            # The recorded requests were sent with a valid token,
+            # and under the rate limit of the recording.
+            sp_man.auth.token = Token('REPLAY', 'Bearer', 3600, '', '')
+            sp_man.api._rate_limiter = RateLimiter(
+                SpotifyAPI.RATE_LIMIT * options['speed'],
+                SpotifyAPI.RATE_BURST,
+            )
+        else:
+            try:
+                user: User = User.objects.get(email=options['email'])
+            except User.DoesNotExist:
+                raise CommandError(f'Unknown user {options["email"]}.')
+
+            sp_man.recover_token(user)
+
+            if user.token_expired:
+                sp_man.auth.update_token(user.refresh_token)
+
+        if options['worker']:
+            try:
+                run: SyncRun = SyncRun.objects.get(pk=options['worker'])
+            except SyncRun.DoesNotExist:
+                raise CommandError(f'Unknown sync run {options["worker"]}.')
+
+            shards: int = sp_man.sync_shards(
+                run, f'{socket.gethostname()}:{os.getpid()}'
+            )
+            self.stdout.write(f'{shards} shards synced.')
+            return
+
+        started: float = time.perf_counter()
+
+        try:
+            if options['shard_size']:
+                albums: list[Album] = sp_man.update_new_releases_sharded(
+                    shard_size=options['shard_size'],
+                    countries=options['markets'],
+                    processes=options['processes'],
+                    resume=not options['restart'],
+                )
+            else:
+                albums = sp_man.update_new_releases_in_db(
+                    batch_size=options['batch_size'],
+                    countries=options['markets'],
+                    resume=not options['restart'],
+                )
+        finally:
+            if isinstance(transport, RecordingTransport):
+                self.stdout.write(
+                    f'{transport.save()} exchanges recorded '
+                    f'to {transport.path}.'
+                )
+
+        elapsed: float = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(
+            f'{len(albums)} albums synced in {elapsed:.1f}s '
+            f'({len(albums) / elapsed:.0f} albums/s).'
+        )
+        # The derived tables are rebuilt in the background.
+        join_background_tasks()
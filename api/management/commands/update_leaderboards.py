@@ -0,0 +1,25 @@
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+from api.libs.leaderboards import DEFAULT_K, update_leaderboards
+
+
+class Command(BaseCommand):
+    '''
+    The update_leaderboards command.
+    Rebuild the leaderboards (the sync rebuilds them in the background
+    with the default size).
+    '''
+
+    help: str = 'Rebuild the genre and market leaderboards.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=DEFAULT_K,
+            help='The number of artists per leaderboard.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        count: int = update_leaderboards(k=options['k'])
+        self.stdout.write(f'{count} leaderboards built.')
@@ -0,0 +1,56 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_rename_coutry_code_market_country_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('document_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('artist', 'artist'), ('album', 'album'), ('genre', 'genre')], max_length=10)),
+                ('object_id', models.CharField(max_length=22)),
+                ('name', models.CharField(max_length=255)),
+                ('normalized_name', models.CharField(max_length=255)),
+                ('trigram_count', models.IntegerField()),
+                ('popularity', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'search document',
+                'verbose_name_plural': 'search documents',
+                'db_table': 'search_document',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('trigram_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('trigram', models.CharField(max_length=3)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='api.searchdocument')),
+            ],
+            options={
+                'verbose_name': 'search trigram',
+                'verbose_name_plural': 'search trigrams',
+                'db_table': 'search_trigram',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['normalized_name'], name='search_document_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchdocument',
+            unique_together={('kind', 'object_id')},
+        ),
+        migrations.AddIndex(
+            model_name='searchtrigram',
+            index=models.Index(fields=['trigram', 'document'], name='search_trigram_posting_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarArtist',
+            fields=[
+                ('similar_artist_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('artist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_artists', to='api.artist')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.artist')),
+            ],
+            options={
+                'verbose_name': 'similar artist',
+                'verbose_name_plural': 'similar artists',
+                'db_table': 'similar_artist',
+                'unique_together': {('artist', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_similar_artist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReleaseAppearance',
+            fields=[
+                ('appearance_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('position', models.PositiveSmallIntegerField()),
+                ('album', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appearances', to='api.album')),
+            ],
+            options={
+                'verbose_name': 'release appearance',
+                'verbose_name_plural': 'release appearances',
+                'db_table': 'release_appearance',
+                'unique_together': {('date', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_release_appearance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistMetricSeries',
+            fields=[
+                ('series_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('resolution', models.CharField(choices=[('day', 'day'), ('week', 'week')], max_length=4)),
+                ('period_start', models.DateField()),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('days', models.BinaryField(default=b'')),
+                ('followers', models.BinaryField(default=b'')),
+                ('popularity', models.BinaryField(default=b'')),
+                ('artist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_series', to='api.artist')),
+            ],
+            options={
+                'verbose_name': 'artist metric series',
+                'verbose_name_plural': 'artist metric series',
+                'db_table': 'artist_metric_series',
+                'unique_together': {('artist', 'resolution', 'period_start')},
+            },
+        ),
+    ]
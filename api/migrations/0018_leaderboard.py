@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_artist_metric_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('leaderboard_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('genre', models.CharField(max_length=150)),
+                ('country_code', models.CharField(max_length=2)),
+                ('artists', models.JSONField(default=list)),
+            ],
+            options={
+                'verbose_name': 'leaderboard',
+                'verbose_name_plural': 'leaderboards',
+                'db_table': 'leaderboard',
+                'unique_together': {('genre', 'country_code')},
+            },
+        ),
+    ]
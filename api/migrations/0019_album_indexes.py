@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='market',
+            name='country_code',
+            field=models.CharField(db_index=True, max_length=2),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['release_date', 'album_id'], name='album_release_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['album_type', 'release_date', 'album_id'], name='album_type_release_date_idx'),
+        ),
+    ]
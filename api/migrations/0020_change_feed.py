@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_album_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncGeneration',
+            fields=[
+                ('generation_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('change_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'sync generation',
+                'verbose_name_plural': 'sync generations',
+                'db_table': 'sync_generation',
+            },
+        ),
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('change_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('artist', 'artist'), ('album', 'album')], max_length=6)),
+                ('object_id', models.CharField(max_length=22)),
+                ('action', models.CharField(choices=[('insert', 'insert'), ('update', 'update'), ('delete', 'delete')], max_length=6)),
+                ('generation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='api.syncgeneration')),
+            ],
+            options={
+                'verbose_name': 'change',
+                'verbose_name_plural': 'changes',
+                'db_table': 'change',
+                'unique_together': {('generation', 'kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='releaseappearance',
+            name='country_code',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.AlterUniqueTogether(
+            name='releaseappearance',
+            unique_together={('date', 'country_code', 'position')},
+        ),
+    ]
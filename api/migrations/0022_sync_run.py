@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_release_appearance_market'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('run_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('markets', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(choices=[('running', 'running'), ('failed', 'failed'), ('completed', 'completed')], default='running', max_length=9)),
+                ('offset', models.PositiveIntegerField(default=0)),
+                ('album_ids', models.JSONField(default=list)),
+                ('artist_batches', models.PositiveIntegerField(default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=1)),
+                ('elapsed', models.FloatField(default=0)),
+                ('error', models.CharField(blank=True, default='', max_length=255)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('checkpointed_at', models.DateTimeField(null=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'verbose_name': 'sync run',
+                'verbose_name_plural': 'sync runs',
+                'db_table': 'sync_run',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='syncrun',
+            index=models.Index(fields=['date', 'markets'], name='sync_run_date_idx'),
+        ),
+    ]
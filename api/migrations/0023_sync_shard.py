@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_sync_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncShard',
+            fields=[
+                ('shard_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('country_code', models.CharField(blank=True, default='', max_length=2)),
+                ('start', models.PositiveIntegerField()),
+                ('end', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('leased', 'leased'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=7)),
+                ('worker', models.CharField(blank=True, default='', max_length=255)),
+                ('leased_until', models.DateTimeField(null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('album_ids', models.JSONField(default=list)),
+                ('artist_batches', models.PositiveIntegerField(default=0)),
+                ('elapsed', models.FloatField(default=0)),
+                ('error', models.CharField(blank=True, default='', max_length=255)),
+                ('generation', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.syncgeneration')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='api.syncrun')),
+            ],
+            options={
+                'verbose_name': 'sync shard',
+                'verbose_name_plural': 'sync shards',
+                'db_table': 'sync_shard',
+                'unique_together': {('run', 'country_code', 'start')},
+            },
+        ),
+    ]
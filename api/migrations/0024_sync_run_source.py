@@ -0,0 +1,62 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_sync_shard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRunAlbum',
+            fields=[
+                ('run_album_id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('country_code', models.CharField(blank=True, default='', max_length=2)),
+                ('position', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'sync run album',
+                'verbose_name_plural': 'sync run albums',
+                'db_table': 'sync_run_album',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='syncrun',
+            name='sync_run_date_idx',
+        ),
+        migrations.RemoveField(
+            model_name='syncrun',
+            name='album_ids',
+        ),
+        migrations.RemoveField(
+            model_name='syncshard',
+            name='album_ids',
+        ),
+        migrations.AddField(
+            model_name='syncrun',
+            name='source',
+            field=models.CharField(choices=[('spotify', 'spotify'), ('import', 'import')], default='spotify', max_length=7),
+        ),
+        migrations.AddIndex(
+            model_name='syncrun',
+            index=models.Index(fields=['date', 'source', 'markets'], name='sync_run_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='syncrunalbum',
+            name='album',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.album'),
+        ),
+        migrations.AddField(
+            model_name='syncrunalbum',
+            name='run',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='albums', to='api.syncrun'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='syncrunalbum',
+            unique_together={('run', 'country_code', 'position')},
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:02
+
+import hashlib
+from django.db import migrations, models
+
+
+def set_markets_key(apps, schema_editor):
+    SyncRun = apps.get_model('api', 'SyncRun')
+
+    for run in SyncRun.objects.all():
+        run.markets = ','.join(sorted(filter(None, run.markets.split(','))))
+        run.markets_key = hashlib.sha256(run.markets.encode()).hexdigest()
+        run.save(update_fields=['markets', 'markets_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_sync_run_source'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='syncrun',
+            name='sync_run_date_idx',
+        ),
+        migrations.AlterField(
+            model_name='syncrun',
+            name='markets',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='syncrun',
+            name='markets_key',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_markets_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='syncrun',
+            index=models.Index(fields=['date', 'source', 'markets_key'], name='sync_run_date_idx'),
+        ),
+    ]
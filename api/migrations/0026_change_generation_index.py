@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_sync_run_markets_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['generation', 'change_id'], name='change_generation_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_change_generation_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='artistmetricseries',
+            name='artist',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='metric_series', to='api.artist'),
+        ),
+        migrations.AlterField(
+            model_name='releaseappearance',
+            name='album',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='appearances', to='api.album'),
+        ),
+        migrations.AlterField(
+            model_name='syncrunalbum',
+            name='album',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.album'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_keep_history_on_prune'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='searchdocument',
+            name='search_document_prefix_idx',
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['normalized_name', 'popularity', 'kind', 'document_id'], name='search_document_prefix_idx', opclasses=['varchar_pattern_ops', 'int4_ops', 'text_ops', 'int8_ops']),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-19 19:32
+
+from django.db import migrations, models
+from django.db.models.functions import Substr
+
+
+def set_prefixes(apps, schema_editor):
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+    SearchDocument.objects.update(
+        prefix1=Substr('normalized_name', 1, 1),
+        prefix2=Substr('normalized_name', 1, 2),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_search_prefix_covering_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchdocument',
+            name='prefix1',
+            field=models.CharField(default='', max_length=1),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='prefix2',
+            field=models.CharField(default='', max_length=2),
+        ),
+        migrations.RunPython(set_prefixes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['prefix1', '-popularity', 'document_id', 'kind'], name='search_document_prefix1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['prefix2', '-popularity', 'document_id', 'kind'], name='search_document_prefix2_idx'),
+        ),
+    ]
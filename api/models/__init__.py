@@ -6,3 +6,14 @@ from .artist_external_url import ArtistExternalURL
 from .album_external_url import AlbumExternalURL
 from .artist_image_url import ArtistImageURL
 from .album_image_url import AlbumImageURL
+from .search_document import SearchDocument
+from .search_trigram import SearchTrigram
+from .similar_artist import SimilarArtist
+from .release_appearance import ReleaseAppearance
+from .artist_metric_series import ArtistMetricSeries
+from .leaderboard import Leaderboard
+from .sync_generation import SyncGeneration
+from .change import Change
+from .sync_run import SyncRun
+from .sync_shard import SyncShard
+from .sync_run_album import SyncRunAlbum
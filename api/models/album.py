@@ -1,3 +1,4 @@
+from typing import Any
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from . import Market, Artist
@@ -41,6 +42,33 @@ class Album(models.Model):
         Artist, related_name='album', blank=True, db_table='artists_albums'
     )
 
+    @property
+    def as_dict(self) -> dict[str, Any]:
+        '''
+        A dictionary representation of the model.
+        Prefetch the artists and image urls to serialize many albums.
+
+        Returns:
+            dict[str, Any]: The dict representation.
+        '''
+
+        return {
+            'album_id': self.album_id,
+            'name': self.name,
+            'album_type': self.album_type,
+            'release_date': self.release_date.isoformat(),
+            'release_date_precision': self.release_date_precision,
+            'href': self.href,
+            'uri': self.uri,
+            'artists': [
+                {'artist_id': artist.artist_id, 'name': artist.name}
+                for artist in self.artists.all()
+            ],
+            'image_urls': [
+                image_url.as_dict for image_url in self.albumimageurl_set.all()
+            ],
+        }
+
     def __str__(self) -> str:
         return self.name
 
@@ -49,3 +77,15 @@ class Album(models.Model):
         db_table: str = 'album'
         verbose_name: str = _('album')
         verbose_name_plural: str = _('albums')
+        # Serve the /api/albums/ date ranges and pages (by descending
+        # release date), with or without the album type filter.
+        indexes: list[models.Index] = [
+            models.Index(
+                fields=['release_date', 'album_id'],
+                name='album_release_date_idx',
+            ),
+            models.Index(
+                fields=['album_type', 'release_date', 'album_id'],
+                name='album_type_release_date_idx',
+            ),
+        ]
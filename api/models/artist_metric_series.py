@@ -0,0 +1,65 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from . import Artist
+
+
+class ArtistMetricSeries(models.Model):
+    '''
+    A chunk of the followers and popularity time series of an artist.
+    The samples of a period are packed in a single row, as delta
+    encoded varints (see api.libs.metrics), instead of one row
+    per sample.
+
+    Attributes:
+        DAY (str): The daily resolution (a chunk per month).
+        WEEK (str): The weekly resolution (a chunk per year),
+            produced by the rollup of the old daily chunks.
+        series_id (models.BigAutoField): The primary key.
+        artist (models.ForeignKey): The artist (the series being kept
+            when the retention prunes the artist).
+        resolution (models.CharField): The samples resolution.
+        period_start (models.DateField): The first day of the chunk.
+        sample_count (models.PositiveIntegerField): The number
+            of samples.
+        days (models.BinaryField): The encoded day offsets of the
+            samples from the period start.
+        followers (models.BinaryField): The encoded followers.
+        popularity (models.BinaryField): The encoded popularity.
+    '''
+
+    DAY: str = 'day'
+    WEEK: str = 'week'
+
+    series_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    artist: models.ForeignKey = models.ForeignKey(
+        Artist,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='metric_series',
+    )
+    resolution: models.CharField = models.CharField(
+        max_length=4,
+        choices=[(DAY, _('day')), (WEEK, _('week'))],
+    )
+    period_start: models.DateField = models.DateField()
+    sample_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0
+    )
+    days: models.BinaryField = models.BinaryField(default=b'')
+    followers: models.BinaryField = models.BinaryField(default=b'')
+    popularity: models.BinaryField = models.BinaryField(default=b'')
+
+    def __str__(self) -> str:
+        return f'{self.artist_id} {self.resolution} {self.period_start}'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'artist_metric_series'
+        verbose_name: str = _('artist metric series')
+        verbose_name_plural: str = _('artist metric series')
+        # Also serves the lookups of the series of many artists.
+        unique_together: list[list[str]] = [
+            ['artist', 'resolution', 'period_start']
+        ]
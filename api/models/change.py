@@ -0,0 +1,84 @@
+from typing import Any
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from . import SyncGeneration
+
+
+class Change(models.Model):
+    '''
+    A change of an artist or an album in a generation of the catalog.
+
+    Attributes:
+        ARTIST (str): The artist kind.
+        ALBUM (str): The album kind.
+        INSERT (str): The insertion action.
+        UPDATE (str): The update action.
+        DELETE (str): The deletion action.
+        change_id (models.BigAutoField): The primary key.
+        generation (models.ForeignKey): The generation.
+        kind (models.CharField): The kind of the changed object.
+        object_id (models.CharField): The primary key of the changed
+            object.
+        action (models.CharField): The change action.
+    '''
+
+    ARTIST: str = 'artist'
+    ALBUM: str = 'album'
+    INSERT: str = 'insert'
+    UPDATE: str = 'update'
+    DELETE: str = 'delete'
+
+    change_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    generation: models.ForeignKey = models.ForeignKey(
+        SyncGeneration, on_delete=models.CASCADE, related_name='changes'
+    )
+    kind: models.CharField = models.CharField(
+        max_length=6, choices=[(ARTIST, _('artist')), (ALBUM, _('album'))]
+    )
+    object_id: models.CharField = models.CharField(max_length=22)
+    action: models.CharField = models.CharField(
+        max_length=6,
+        choices=[
+            (INSERT, _('insert')),
+            (UPDATE, _('update')),
+            (DELETE, _('delete')),
+        ],
+    )
+
+    @property
+    def as_dict(self) -> dict[str, Any]:
+        '''
+        A dictionary representation of the model.
+
+        Returns:
+            dict[str, Any]: The dict representation.
+        '''
+
+        return {
+            'generation': self.generation_id,
+            'kind': self.kind,
+            'id': self.object_id,
+            'action': self.action,
+        }
+
+    def __str__(self) -> str:
+        return f'{self.action} {self.kind} {self.object_id}'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'change'
+        verbose_name: str = _('change')
+        verbose_name_plural: str = _('changes')
+        # A change per object and generation.
+        unique_together: list[list[str]] = [
+            ['generation', 'kind', 'object_id']
+        ]
+        # The changes are read by pages, in generation and ID order.
+        indexes: list[models.Index] = [
+            models.Index(
+                fields=['generation', 'change_id'],
+                name='change_generation_idx',
+            )
+        ]
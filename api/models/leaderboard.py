@@ -0,0 +1,51 @@
+from typing import Any
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Leaderboard(models.Model):
+    '''
+    The precomputed most popular new artists of a genre in a market,
+    rebuilt after each sync (see api.libs.leaderboards).
+    The genre name and country code are copied, so serving
+    a leaderboard reads a single row.
+
+    Attributes:
+        leaderboard_id (models.BigAutoField): The primary key.
+        genre (models.CharField): The genre name.
+        country_code (models.CharField): The market country code.
+        artists (models.JSONField): The artists (ID, name and
+            popularity), most popular first.
+    '''
+
+    leaderboard_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    genre: models.CharField = models.CharField(max_length=150)
+    country_code: models.CharField = models.CharField(max_length=2)
+    artists: models.JSONField = models.JSONField(default=list)
+
+    @property
+    def as_dict(self) -> dict[str, Any]:
+        '''
+        A dictionary representation of the model.
+
+        Returns:
+            dict[str, Any]: The dict representation.
+        '''
+
+        return {
+            'genre': self.genre,
+            'market': self.country_code,
+            'artists': self.artists,
+        }
+
+    def __str__(self) -> str:
+        return f'{self.genre} ({self.country_code})'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'leaderboard'
+        verbose_name: str = _('leaderboard')
+        verbose_name_plural: str = _('leaderboards')
+        unique_together: list[list[str]] = [['genre', 'country_code']]
@@ -14,7 +14,9 @@ class Market(models.Model):
     market_id: models.BigAutoField = models.BigAutoField(
         auto_created=True, primary_key=True, serialize=False
     )
-    country_code: models.CharField = models.CharField(max_length=2)
+    country_code: models.CharField = models.CharField(
+        max_length=2, db_index=True
+    )
 
     def __str__(self) -> str:
         return self.country_code
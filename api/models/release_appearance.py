@@ -0,0 +1,78 @@
+from typing import Any
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from . import Album
+
+
+class ReleaseAppearance(models.Model):
+    '''
+    An appearance of an album in the Spotify new releases of a day,
+    in a market.
+    The table is append-only: the sync only adds the appearances
+    of the day and never updates the former ones, and the retention
+    keeps them when it prunes their album.
+
+    Attributes:
+        appearance_id (models.BigAutoField): The primary key.
+        date (models.DateField): The day of the appearance.
+        country_code (models.CharField): The market, empty for
+            the new releases synced without market.
+        position (models.PositiveSmallIntegerField): The position
+            of the album in the new releases of the day (from 1).
+        album (models.ForeignKey): The album, None once pruned
+            (its ID being kept).
+    '''
+
+    appearance_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    date: models.DateField = models.DateField()
+    country_code: models.CharField = models.CharField(
+        max_length=2, blank=True, default=''
+    )
+    position: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField()
+    )
+    # Nullable so the appearances of the pruned albums are still
+    # joined (outer join) to the albums.
+    album: models.ForeignKey = models.ForeignKey(
+        Album,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='appearances',
+    )
+
+    @property
+    def as_dict(self) -> dict[str, Any]:
+        '''
+        A dictionary representation of the model.
+
+        Returns:
+            dict[str, Any]: The dict representation.
+        '''
+
+        return {
+            'date': self.date.isoformat(),
+            'market': self.country_code,
+            'position': self.position,
+            'album_id': self.album_id,
+            'name': self.album.name if self.album else None,
+        }
+
+    def __str__(self) -> str:
+        if self.country_code:
+            return f'{self.date} {self.country_code} #{self.position}'
+
+        return f'{self.date} #{self.position}'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'release_appearance'
+        verbose_name: str = _('release appearance')
+        verbose_name_plural: str = _('release appearances')
+        # The date leading index serves the date range scans
+        # already sorted by market and position.
+        unique_together: list[list[str]] = [
+            ['date', 'country_code', 'position']
+        ]
@@ -0,0 +1,109 @@
+from typing import Any
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchDocument(models.Model):
+    '''
+    A searchable name (artist, album or genre), maintained by the sync.
+
+    Attributes:
+        ARTIST (str): The artist kind.
+        ALBUM (str): The album kind.
+        GENRE (str): The genre kind.
+        document_id (models.BigAutoField): The primary key.
+        kind (models.CharField): The kind of the indexed object.
+        object_id (models.CharField): The primary key of the indexed object.
+        name (models.CharField): The indexed name.
+        normalized_name (models.CharField): The lowercased name,
+            without accents nor punctuation (used for prefix matching).
+        prefix1 (models.CharField): The first character
+            of the normalized name.
+        prefix2 (models.CharField): The first two characters
+            of the normalized name.
+        trigram_count (models.IntegerField): The number of distinct
+            trigrams of the normalized name.
+        popularity (models.IntegerField): The ranking popularity.
+    '''
+
+    ARTIST: str = 'artist'
+    ALBUM: str = 'album'
+    GENRE: str = 'genre'
+
+    document_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    kind: models.CharField = models.CharField(
+        max_length=10,
+        choices=[
+            (ARTIST, _('artist')),
+            (ALBUM, _('album')),
+            (GENRE, _('genre')),
+        ],
+    )
+    object_id: models.CharField = models.CharField(max_length=22)
+    name: models.CharField = models.CharField(max_length=255)
+    normalized_name: models.CharField = models.CharField(max_length=255)
+    # The short prefixes match too many names to rank them on the fly:
+    # their buckets are indexed by popularity.
+    prefix1: models.CharField = models.CharField(max_length=1, default='')
+    prefix2: models.CharField = models.CharField(max_length=2, default='')
+    trigram_count: models.IntegerField = models.IntegerField()
+    popularity: models.IntegerField = models.IntegerField(default=0)
+
+    @property
+    def as_dict(self) -> dict[str, Any]:
+        '''
+        A dictionary representation of the model.
+
+        Returns:
+            dict[str, Any]: The dict representation.
+        '''
+
+        return {
+            'kind': self.kind,
+            'id': self.object_id,
+            'name': self.name,
+            'popularity': self.popularity,
+        }
+
+    def __str__(self) -> str:
+        return self.name
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'search_document'
+        verbose_name: str = _('search document')
+        verbose_name_plural: str = _('search documents')
+        unique_together: list[list[str]] = [['kind', 'object_id']]
+        indexes: list[models.Index] = [
+            # The pattern ops let PostgreSQL use the index for the
+            # prefix LIKE lookups whatever the collation. The other
+            # fields cover the ranking (and the kind filter),
+            # for an index only scan of the prefix matches.
+            models.Index(
+                fields=[
+                    'normalized_name',
+                    'popularity',
+                    'kind',
+                    'document_id',
+                ],
+                name='search_document_prefix_idx',
+                opclasses=[
+                    'varchar_pattern_ops',
+                    'int4_ops',
+                    'text_ops',
+                    'int8_ops',
+                ],
+            ),
+            # The most popular names of a short prefix are the first
+            # entries of its bucket: no match is ranked.
+            models.Index(
+                fields=['prefix1', '-popularity', 'document_id', 'kind'],
+                name='search_document_prefix1_idx',
+            ),
+            models.Index(
+                fields=['prefix2', '-popularity', 'document_id', 'kind'],
+                name='search_document_prefix2_idx',
+            ),
+        ]
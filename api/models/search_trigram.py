@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from . import SearchDocument
+
+
+class SearchTrigram(models.Model):
+    '''
+    An entry of the trigram inverted index: the documents whose
+    normalized name contains the trigram (used for typo tolerance).
+
+    Attributes:
+        trigram_id (models.BigAutoField): The primary key.
+        trigram (models.CharField): The trigram.
+        document (models.ForeignKey): The related search document.
+    '''
+
+    trigram_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    trigram: models.CharField = models.CharField(max_length=3)
+    document: models.ForeignKey = models.ForeignKey(
+        SearchDocument, on_delete=models.CASCADE, related_name='trigrams'
+    )
+
+    def __str__(self) -> str:
+        return self.trigram
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'search_trigram'
+        verbose_name: str = _('search trigram')
+        verbose_name_plural: str = _('search trigrams')
+        indexes: list[models.Index] = [
+            # Covers the posting lists lookup (trigram -> documents).
+            models.Index(
+                fields=['trigram', 'document'],
+                name='search_trigram_posting_idx',
+            ),
+        ]
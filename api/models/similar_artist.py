@@ -0,0 +1,56 @@
+from typing import Any
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from . import Artist
+
+
+class SimilarArtist(models.Model):
+    '''
+    A precomputed neighbour of an artist, by genres overlap.
+
+    Attributes:
+        similar_artist_id (models.BigAutoField): The primary key.
+        artist (models.ForeignKey): The artist.
+        similar (models.ForeignKey): The similar artist.
+        score (models.FloatField): The similarity score (0 to 1).
+        rank (models.PositiveSmallIntegerField): The rank of the neighbour
+            (0 is the most similar).
+    '''
+
+    similar_artist_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    artist: models.ForeignKey = models.ForeignKey(
+        Artist, on_delete=models.CASCADE, related_name='similar_artists'
+    )
+    similar: models.ForeignKey = models.ForeignKey(
+        Artist, on_delete=models.CASCADE, related_name='+'
+    )
+    score: models.FloatField = models.FloatField()
+    rank: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField()
+
+    @property
+    def as_dict(self) -> dict[str, Any]:
+        '''
+        A dictionary representation of the model.
+
+        Returns:
+            dict[str, Any]: The dict representation.
+        '''
+
+        return {
+            'artist_id': self.similar.artist_id,
+            'name': self.similar.name,
+            'popularity': self.similar.popularity,
+            'score': self.score,
+        }
+
+    def __str__(self) -> str:
+        return f'{self.artist_id} ~ {self.similar_id}'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'similar_artist'
+        verbose_name: str = _('similar artist')
+        verbose_name_plural: str = _('similar artists')
+        unique_together: list[list[str]] = [['artist', 'rank']]
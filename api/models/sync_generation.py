@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SyncGeneration(models.Model):
+    '''
+    A generation of the catalog: the changes stored by a sync
+    (or a deletion), numbered in increasing order.
+
+    Attributes:
+        generation_id (models.BigAutoField): The generation number.
+        created_at (models.DateTimeField): The creation datetime.
+        change_count (models.PositiveIntegerField): The number
+            of changes of the generation.
+    '''
+
+    generation_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    change_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0
+    )
+
+    def __str__(self) -> str:
+        return str(self.generation_id)
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'sync_generation'
+        verbose_name: str = _('sync generation')
+        verbose_name_plural: str = _('sync generations')
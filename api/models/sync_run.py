@@ -0,0 +1,100 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SyncRun(models.Model):
+    '''
+    The journal of a new releases sync: the number of albums
+    committed so far (see SyncRunAlbum), a checkpoint per batch,
+    so a failed (or killed) run is resumed where it stopped
+    instead of started over.
+
+    Attributes:
+        SPOTIFY (str): The source of the syncs from the Spotify API.
+        IMPORT (str): The source of the offline imports.
+        RUNNING (str): The status of a running (or killed) run.
+        FAILED (str): The status of a failed run.
+        COMPLETED (str): The status of a completed run.
+        run_id (models.BigAutoField): The run ID.
+        date (models.DateField): The day of the synced new releases.
+        source (models.CharField): The source of the new releases.
+        markets (models.TextField): The synced markets, sorted
+            and comma separated, empty for Spotify's default selection.
+        markets_key (models.CharField): The SHA-256 of the markets,
+            the fixed length key of the run lookups.
+        status (models.CharField): The run status.
+        offset (models.PositiveIntegerField): The number of albums
+            committed, where the run resumes.
+        artist_batches (models.PositiveIntegerField): The number
+            of artist batches fetched from Spotify.
+        attempts (models.PositiveSmallIntegerField): The number
+            of attempts (the first run and its resumes).
+        elapsed (models.FloatField): The time in seconds spent
+            by the attempts.
+        error (models.CharField): The error of the last failed attempt.
+        started_at (models.DateTimeField): The start datetime.
+        checkpointed_at (models.DateTimeField): The datetime
+            of the last checkpoint.
+        finished_at (models.DateTimeField): The completion datetime.
+    '''
+
+    SPOTIFY: str = 'spotify'
+    IMPORT: str = 'import'
+    RUNNING: str = 'running'
+    FAILED: str = 'failed'
+    COMPLETED: str = 'completed'
+
+    run_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    date: models.DateField = models.DateField()
+    source: models.CharField = models.CharField(
+        max_length=7,
+        choices=[(SPOTIFY, _('spotify')), (IMPORT, _('import'))],
+        default=SPOTIFY,
+    )
+    # All the markets are about 550 characters.
+    markets: models.TextField = models.TextField(blank=True, default='')
+    markets_key: models.CharField = models.CharField(max_length=64)
+    status: models.CharField = models.CharField(
+        max_length=9,
+        choices=[
+            (RUNNING, _('running')),
+            (FAILED, _('failed')),
+            (COMPLETED, _('completed')),
+        ],
+        default=RUNNING,
+    )
+    offset: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0
+    )
+    artist_batches: models.PositiveIntegerField = (
+        models.PositiveIntegerField(default=0)
+    )
+    attempts: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField(default=1)
+    )
+    elapsed: models.FloatField = models.FloatField(default=0)
+    error: models.CharField = models.CharField(
+        max_length=255, blank=True, default=''
+    )
+    started_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    checkpointed_at: models.DateTimeField = models.DateTimeField(null=True)
+    finished_at: models.DateTimeField = models.DateTimeField(null=True)
+
+    def __str__(self) -> str:
+        return f'{self.run_id} {self.status} at {self.offset}'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'sync_run'
+        verbose_name: str = _('sync run')
+        verbose_name_plural: str = _('sync runs')
+        # The last run of the day, source and markets is looked up
+        # to resume it.
+        indexes: list[models.Index] = [
+            models.Index(
+                fields=['date', 'source', 'markets_key'],
+                name='sync_run_date_idx',
+            )
+        ]
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from . import Album, SyncRun
+
+
+class SyncRunAlbum(models.Model):
+    '''
+    An album committed by a sync run, at its position in the synced
+    new releases: the rows of a batch are inserted with the batch,
+    so the journal grows by a batch per checkpoint.
+
+    Attributes:
+        run_album_id (models.BigAutoField): The primary key.
+        run (models.ForeignKey): The sync run.
+        country_code (models.CharField): The market of the shard
+            of a sharded run, empty otherwise.
+        position (models.PositiveIntegerField): The offset
+            of the album in the new releases (from 0).
+        album (models.ForeignKey): The album (the journal being kept
+            when the retention prunes the album).
+    '''
+
+    run_album_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    run: models.ForeignKey = models.ForeignKey(
+        SyncRun, on_delete=models.CASCADE, related_name='albums'
+    )
+    country_code: models.CharField = models.CharField(
+        max_length=2, blank=True, default=''
+    )
+    position: models.PositiveIntegerField = models.PositiveIntegerField()
+    album: models.ForeignKey = models.ForeignKey(
+        Album,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+    )
+
+    def __str__(self) -> str:
+        return f'{self.run_id} #{self.position}'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'sync_run_album'
+        verbose_name: str = _('sync run album')
+        verbose_name_plural: str = _('sync run albums')
+        unique_together: list[list[str]] = [
+            ['run', 'country_code', 'position']
+        ]
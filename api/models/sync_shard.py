@@ -0,0 +1,97 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from . import SyncGeneration, SyncRun
+
+
+class SyncShard(models.Model):
+    '''
+    An offset range of the new releases of a sharded sync run,
+    leased by a worker (a process of the pool, or another
+    sync_releases --worker process) until synced. A shard whose
+    lease expired (e.g. its worker was killed) is leased again.
+
+    Attributes:
+        PENDING (str): The status of a shard not leased yet.
+        LEASED (str): The status of a shard being synced.
+        DONE (str): The status of a synced shard.
+        FAILED (str): The status of a shard whose sync failed.
+        shard_id (models.BigAutoField): The primary key.
+        run (models.ForeignKey): The sync run.
+        country_code (models.CharField): The market, empty for
+            Spotify's default selection.
+        start (models.PositiveIntegerField): The offset of the first
+            album of the shard.
+        end (models.PositiveIntegerField): The offset following
+            the last album of the shard.
+        status (models.CharField): The shard status.
+        worker (models.CharField): The worker holding the lease.
+        leased_until (models.DateTimeField): The lease expiration.
+        attempts (models.PositiveSmallIntegerField): The number
+            of leases.
+        artist_batches (models.PositiveIntegerField): The number
+            of artist batches fetched from Spotify.
+        elapsed (models.FloatField): The time in seconds spent
+            by the last attempt.
+        error (models.CharField): The error of the last failed attempt.
+        generation (models.ForeignKey): The generation of the changes
+            stored by the shard.
+    '''
+
+    PENDING: str = 'pending'
+    LEASED: str = 'leased'
+    DONE: str = 'done'
+    FAILED: str = 'failed'
+
+    shard_id: models.BigAutoField = models.BigAutoField(
+        auto_created=True, primary_key=True, serialize=False
+    )
+    run: models.ForeignKey = models.ForeignKey(
+        SyncRun, on_delete=models.CASCADE, related_name='shards'
+    )
+    country_code: models.CharField = models.CharField(
+        max_length=2, blank=True, default=''
+    )
+    start: models.PositiveIntegerField = models.PositiveIntegerField()
+    end: models.PositiveIntegerField = models.PositiveIntegerField()
+    status: models.CharField = models.CharField(
+        max_length=7,
+        choices=[
+            (PENDING, _('pending')),
+            (LEASED, _('leased')),
+            (DONE, _('done')),
+            (FAILED, _('failed')),
+        ],
+        default=PENDING,
+    )
+    worker: models.CharField = models.CharField(
+        max_length=255, blank=True, default=''
+    )
+    leased_until: models.DateTimeField = models.DateTimeField(null=True)
+    attempts: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField(default=0)
+    )
+    artist_batches: models.PositiveIntegerField = (
+        models.PositiveIntegerField(default=0)
+    )
+    elapsed: models.FloatField = models.FloatField(default=0)
+    error: models.CharField = models.CharField(
+        max_length=255, blank=True, default=''
+    )
+    generation: models.ForeignKey = models.ForeignKey(
+        SyncGeneration, on_delete=models.SET_NULL, null=True
+    )
+
+    def __str__(self) -> str:
+        if self.country_code:
+            return f'{self.country_code} [{self.start}, {self.end})'
+
+        return f'[{self.start}, {self.end})'
+
+    class Meta:
+        app_label: str = 'api'
+        db_table: str = 'sync_shard'
+        verbose_name: str = _('sync shard')
+        verbose_name_plural: str = _('sync shards')
+        unique_together: list[list[str]] = [
+            ['run', 'country_code', 'start']
+        ]
@@ -0,0 +1,132 @@
+from typing import Any
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from core.events import publish
+from api.libs.background import BackgroundTask
+from api.libs.leaderboards import update_leaderboards
+from api.libs.metrics import record_metrics
+from api.libs.search import index_albums
+from api.libs.similarity import update_similar_artists
+from api.libs.snapshots import delete_artists_snapshot
+from api.models import Album, Artist, SyncGeneration
+from api.signals import new_releases_synced
+
+# The full recomputation takes seconds on a large catalog:
+# it runs in the background, not in the request which synced.
+similar_artists_task: BackgroundTask = BackgroundTask(
+    'similar-artists', update_similar_artists
+)
+leaderboards_task: BackgroundTask = BackgroundTask(
+    'leaderboards', update_leaderboards
+)
+
+
+@receiver(new_releases_synced)
+def update_search_index(
+    sender: Any, albums: list[Album], **kwargs: Any
+) -> None:
+    '''
+    Index the synced albums, their artists and genres.
+
+    Args:
+        sender (Any): The signal sender.
+        albums (list[Album]): The synced albums.
+    '''
+
+    index_albums(albums)
+
+
+@receiver(new_releases_synced)
+def update_similar_artists_table(
+    sender: Any, albums: list[Album], **kwargs: Any
+) -> None:
+    '''
+    Recompute the similar artists in the background
+    once the new artists are committed.
+
+    Args:
+        sender (Any): The signal sender.
+        albums (list[Album]): The synced albums.
+    '''
+
+    if albums:
+        transaction.on_commit(similar_artists_task.schedule)
+
+
+@receiver(new_releases_synced)
+def record_artist_metrics(
+    sender: Any, albums: list[Album], **kwargs: Any
+) -> None:
+    '''
+    Append the followers and popularity of the synced artists
+    to their series.
+
+    Args:
+        sender (Any): The signal sender.
+        albums (list[Album]): The synced albums.
+    '''
+
+    record_metrics(Artist.objects.filter(album__in=albums).distinct())
+
+
+@receiver(new_releases_synced)
+def update_leaderboards_table(
+    sender: Any, albums: list[Album], **kwargs: Any
+) -> None:
+    '''
+    Rebuild the leaderboards with the new releases of the day,
+    in the background once they are committed.
+
+    Args:
+        sender (Any): The signal sender.
+        albums (list[Album]): The synced albums.
+    '''
+
+    if albums:
+        transaction.on_commit(leaderboards_task.schedule)
+
+
+@receiver(new_releases_synced)
+def delete_artists_snapshot_of_today(
+    sender: Any, albums: list[Album], **kwargs: Any
+) -> None:
+    '''
+    Let the next /api/artists/ request rebuild the snapshot of the day
+    with the synced albums.
+
+    Args:
+        sender (Any): The signal sender.
+        albums (list[Album]): The synced albums.
+    '''
+
+    delete_artists_snapshot(timezone.now().date())
+
+
+@receiver(new_releases_synced)
+def publish_releases_event(
+    sender: Any,
+    albums: list[Album],
+    generation: SyncGeneration,
+    **kwargs: Any,
+) -> None:
+    '''
+    Notify the clients listening to /api/events/ that the new releases
+    are available, with a summary of the generation.
+
+    Args:
+        sender (Any): The signal sender.
+        albums (list[Album]): The synced albums.
+        generation (SyncGeneration): The generation of the sync.
+    '''
+
+    publish(
+        generation.generation_id,
+        'releases',
+        {
+            'generation': generation.generation_id,
+            'date': timezone.now().date().isoformat(),
+            'albums': len(albums),
+            'changes': generation.change_count,
+        },
+    )
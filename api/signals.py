@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent by SpotifyManager.update_new_releases_in_db once the new releases
+# are stored, with the synced albums (list[Album]) as "albums" argument
+# and the generation of their changes (SyncGeneration) as "generation".
+# The receivers maintain the data derived from the catalog.
+new_releases_synced: Signal = Signal()
@@ -1,4 +1,6 @@
 import pytest
+from django.core.cache import cache
+from api.libs import search
 from api.libs.spotify.auth import Auth, Credentials, Token
 from api.libs.spotify.spotify_api import SpotifyAPI
 
@@ -31,3 +33,21 @@ def spotify_auth() -> Auth:
 def spotify_api(spotify_auth: Auth, fake_token: Token) -> SpotifyAPI:
     spotify_auth.token = fake_token
     return SpotifyAPI(auth=spotify_auth)
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker() -> None:
+    # The circuit breaker is shared by the process.
+    SpotifyAPI._circuit_breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    # The artists snapshots are shared by the process.
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_postings_counts() -> None:
+    # The posting lists lengths are cached by the process.
+    search._postings_counts.clear()
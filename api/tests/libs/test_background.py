@@ -0,0 +1,51 @@
+import threading
+from unittest.mock import Mock
+import pytest
+from api.libs.background import BackgroundTask, join_background_tasks
+
+
+class TestBackgroundTask:
+    def test_schedule(self) -> None:
+        func: Mock = Mock()
+        task: BackgroundTask = BackgroundTask('task', func)
+        task.schedule()
+        task.join()
+
+        func.assert_called_once_with()
+
+    def test_schedule_running(self) -> None:
+        started: threading.Event = threading.Event()
+        release: threading.Event = threading.Event()
+        calls: list[int] = []
+
+        def func() -> None:
+            calls.append(1)
+            started.set()
+            release.wait(5)
+
+        task: BackgroundTask = BackgroundTask('task', func)
+        task.schedule()
+        started.wait(5)
+
+        # The schedules of a running task are merged into a single run.
+        task.schedule()
+        task.schedule()
+        release.set()
+        join_background_tasks()
+
+        assert len(calls) == 2
+
+    @pytest.mark.filterwarnings(
+        'ignore::pytest.PytestUnhandledThreadExceptionWarning'
+    )
+    def test_schedule_failing(self) -> None:
+        func: Mock = Mock(side_effect=[ValueError(), None])
+        task: BackgroundTask = BackgroundTask('task', func)
+        task.schedule()
+        task.join()
+
+        # A failed run does not prevent the next ones.
+        task.schedule()
+        task.join()
+
+        assert func.call_count == 2
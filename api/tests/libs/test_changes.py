@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from django.db import connection
+from api.libs import changes as changes_lib
+from api.libs.changes import (
+    ChangeRecorder,
+    compact_changes,
+    get_changes,
+    new_generation,
+    record_change,
+)
+from api.models import Change, SyncGeneration
+
+
+def get_actions(since: int) -> list[tuple[int, str, str]]:
+    return [
+        (change.generation_id, change.object_id, change.action)
+        for change in get_changes(since, 100)[1]
+    ]
+
+
+class TestChanges:
+    @pytest.mark.parametrize(
+        'actions, expected',
+        [
+            ([Change.INSERT, Change.UPDATE], Change.INSERT),
+            ([Change.UPDATE, Change.UPDATE], Change.UPDATE),
+            ([Change.UPDATE, Change.DELETE], Change.DELETE),
+            ([Change.DELETE, Change.INSERT], Change.UPDATE),
+            ([Change.INSERT, Change.DELETE], None),
+        ],
+    )
+    def test_change_recorder(self, actions: list[str], expected: str) -> None:
+        recorder: ChangeRecorder = ChangeRecorder()
+
+        for action in actions:
+            recorder.record(Change.ARTIST, 'id', action)
+
+        assert recorder.changes.get((Change.ARTIST, 'id')) == expected
+
+    @pytest.mark.django_db
+    def test_get_changes(self) -> None:
+        with new_generation():
+            record_change(Change.ARTIST, 'a', Change.INSERT)
+            record_change(Change.ALBUM, 'b', Change.INSERT)
+
+        first: int = SyncGeneration.objects.get().generation_id
+        # Outside of a generation.
+        record_change(Change.ARTIST, 'a', Change.UPDATE)
+
+        assert get_changes(first + 1, 100) == (first + 1, [])
+        assert get_actions(first) == [(first + 1, 'a', Change.UPDATE)]
+        assert get_actions(0) == [
+            (first, 'a', Change.INSERT),
+            (first, 'b', Change.INSERT),
+            (first + 1, 'a', Change.UPDATE),
+        ]
+
+    @pytest.mark.django_db
+    def test_get_changes_pages(self) -> None:
+        with new_generation():
+            for object_id in ['a', 'b', 'c']:
+                record_change(Change.ARTIST, object_id, Change.INSERT)
+
+        record_change(Change.ARTIST, 'd', Change.INSERT)
+        pages: list[list[str]] = []
+        since, after = 0, None
+
+        while True:
+            last, changes = get_changes(since, 2, after)
+
+            if not changes:
+                break
+
+            pages.append([change.object_id for change in changes])
+            since, after = changes[-1].generation_id, changes[-1].change_id
+
+        assert pages == [['a', 'b'], ['c', 'd']]
+        assert since == last
+
+    @pytest.mark.django_db
+    def test_new_generation_lock(self, monkeypatch: MonkeyPatch) -> None:
+        cursor: MagicMock = MagicMock()
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        monkeypatch.setattr(connection, 'cursor', MagicMock())
+        connection.cursor.return_value.__enter__.return_value = cursor
+
+        changes_lib._lock_generations()
+
+        # The allocation is locked until the transaction commits.
+        cursor.execute.assert_called_once_with(
+            'SELECT pg_advisory_xact_lock(%s)', [changes_lib.GENERATION_LOCK]
+        )
+
+    @pytest.mark.django_db
+    def test_compact_changes(self) -> None:
+        for object_id, action in [
+            ('a', Change.INSERT),
+            ('b', Change.INSERT),
+            ('a', Change.DELETE),
+            ('b', Change.UPDATE),
+        ]:
+            record_change(Change.ARTIST, object_id, action)
+
+        last: int = get_changes(0, 100)[0]
+
+        assert compact_changes(keep=1) == 1
+        assert SyncGeneration.objects.count() == 2
+        assert get_actions(0) == [
+            (last - 1, 'a', Change.DELETE),
+            (last - 1, 'b', Change.INSERT),
+            (last, 'b', Change.UPDATE),
+        ]
+        assert compact_changes(keep=5) == 0
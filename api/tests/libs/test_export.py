@@ -0,0 +1,197 @@
+import csv
+import datetime
+import io
+import json
+import sys
+import pytest
+from django.core.management import CommandError, call_command
+from api.libs.export import CSV, NDJSON, PARQUET, export, iter_chunks
+from api.models import (
+    Album,
+    AlbumExternalURL,
+    Artist,
+    ArtistImageURL,
+    Genre,
+    Market,
+)
+
+
+@pytest.fixture
+def catalog() -> None:
+    rock: Genre = Genre.objects.create(name='rock')
+    fr: Market = Market.objects.create(country_code='FR')
+
+    for index in range(5):
+        artist: Artist = Artist.objects.create(
+            artist_id=f'artist{index}',
+            name=f'Artist {index}',
+            followers=index,
+            popularity=index,
+            href='https://url.test',
+            artist_type='artist',
+            uri='uri',
+        )
+        artist.genres.add(rock)
+        ArtistImageURL.objects.create(
+            width=64, height=64, url='https://image.test', artist=artist
+        )
+        album: Album = Album.objects.create(
+            album_id=f'album{index}',
+            album_type='album',
+            name=f'Album {index}',
+            release_date=datetime.date(2021, 8, 1),
+            last_checked_date=datetime.date(2021, 8, 1),
+            release_date_precision='day',
+            object_type='album',
+            uri='uri',
+            href='https://url.test',
+        )
+        album.artists.add(artist)
+        album.available_markets.add(fr)
+        AlbumExternalURL.objects.create(
+            source='spotify', url='https://album.test', album=album
+        )
+
+
+@pytest.mark.django_db
+class TestExport:
+    def test_iter_chunks(self, catalog: None, django_assert_num_queries):
+        # A query for the keys, the rows and each relation, per chunk.
+        with django_assert_num_queries(3 * 6 + 1):
+            chunks: list[list[dict]] = list(
+                iter_chunks('albums', chunk_size=2)
+            )
+
+        assert [len(rows) for rows in chunks] == [2, 2, 1]
+        assert chunks[0][0] == {
+            'album_id': 'album0',
+            'name': 'Album 0',
+            'album_type': 'album',
+            'release_date': '2021-08-01',
+            'release_date_precision': 'day',
+            'last_checked_date': '2021-08-01',
+            'object_type': 'album',
+            'href': 'https://url.test',
+            'uri': 'uri',
+            'artist_ids': ['artist0'],
+            'markets': ['FR'],
+            'external_urls': [
+                {'source': 'spotify', 'url': 'https://album.test'}
+            ],
+            'image_urls': [],
+        }
+
+    def test_iter_chunks_range(self, catalog: None) -> None:
+        rows: list[dict] = [
+            row
+            for chunk in iter_chunks(
+                'artists', after='artist1', until='artist3', chunk_size=1
+            )
+            for row in chunk
+        ]
+
+        assert [row['artist_id'] for row in rows] == ['artist2', 'artist3']
+        assert rows[0]['genres'] == ['rock']
+        assert rows[0]['image_urls'] == [
+            {'width': 64, 'height': 64, 'url': 'https://image.test'}
+        ]
+
+    def test_export_ndjson(self, catalog: None) -> None:
+        output: io.StringIO = io.StringIO()
+        progress = export('artists', output, NDJSON, chunk_size=2)
+        lines: list[str] = output.getvalue().splitlines()
+
+        assert [json.loads(line)['artist_id'] for line in lines] == [
+            f'artist{index}' for index in range(5)
+        ]
+        assert progress.rows == 5
+        assert progress.last_key == 'artist4'
+
+    def test_export_csv_resumed(self, catalog: None) -> None:
+        output: io.StringIO = io.StringIO()
+        progress = export('albums', output, CSV, until='album1')
+        export('albums', output, CSV, after=progress.last_key)
+        rows: list[dict] = list(csv.DictReader(io.StringIO(output.getvalue())))
+
+        assert [row['album_id'] for row in rows] == [
+            f'album{index}' for index in range(5)
+        ]
+        assert json.loads(rows[0]['markets']) == ['FR']
+
+    def test_export_csv_empty(self) -> None:
+        output: io.StringIO = io.StringIO()
+        export('artists', output, CSV)
+
+        assert output.getvalue().startswith('artist_id,name,')
+
+    def test_export_parquet(self, catalog: None, tmp_path) -> None:
+        parquet = pytest.importorskip('pyarrow.parquet')
+        path: str = str(tmp_path / 'albums.parquet')
+        export('albums', path, PARQUET, chunk_size=2)
+        parquet_file = parquet.ParquetFile(path)
+
+        assert parquet_file.num_row_groups == 3
+        assert parquet_file.read().column('album_id').to_pylist() == [
+            f'album{index}' for index in range(5)
+        ]
+
+    def test_command(self, catalog: None, tmp_path) -> None:
+        path = tmp_path / 'artists.ndjson'
+        stderr: io.StringIO = io.StringIO()
+        call_command(
+            'export_catalog',
+            'artists',
+            '--output',
+            str(path),
+            '--until',
+            'artist2',
+            stderr=stderr,
+        )
+        call_command(
+            'export_catalog',
+            'artists',
+            '--output',
+            str(path),
+            '--after',
+            'artist2',
+            stderr=stderr,
+        )
+
+        assert len(path.read_text().splitlines()) == 5
+        assert '3 artists exported' in stderr.getvalue()
+        assert 'last key: artist4.' in stderr.getvalue()
+
+    def test_command_parquet(self, monkeypatch, tmp_path) -> None:
+        with pytest.raises(CommandError):
+            call_command('export_catalog', 'albums', '--format', 'parquet')
+
+        path = tmp_path / 'albums.parquet'
+        path.write_bytes(b'PAR1')
+
+        # A resumed export never truncates the previous file.
+        with pytest.raises(CommandError):
+            call_command(
+                'export_catalog',
+                'albums',
+                '--format',
+                'parquet',
+                '--output',
+                str(path),
+                '--after',
+                'album1',
+            )
+
+        assert path.read_bytes() == b'PAR1'
+
+        monkeypatch.setitem(sys.modules, 'pyarrow', None)
+
+        with pytest.raises(CommandError):
+            call_command(
+                'export_catalog',
+                'albums',
+                '--format',
+                'parquet',
+                '--output',
+                str(tmp_path / 'albums.1.parquet'),
+                stderr=io.StringIO(),
+            )
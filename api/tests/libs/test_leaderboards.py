@@ -0,0 +1,102 @@
+import datetime
+from unittest.mock import Mock
+import pytest
+from api import receivers
+from api.libs.leaderboards import compute_leaderboards, update_leaderboards
+from api.models import (
+    Album,
+    Artist,
+    Genre,
+    Leaderboard,
+    Market,
+    ReleaseAppearance,
+)
+
+
+def create_artist(artist_id: str, popularity: int, genre: Genre) -> Artist:
+    artist: Artist = Artist.objects.create(
+        artist_id=artist_id,
+        name=artist_id.upper(),
+        followers=0,
+        popularity=popularity,
+        href='https://url.test',
+        artist_type='artist',
+        uri='uri',
+    )
+    artist.genres.add(genre)
+
+    return artist
+
+
+def create_album(
+    album_id: str, artists: list[Artist], markets: list[Market]
+) -> Album:
+    album: Album = Album.objects.create(
+        album_id=album_id,
+        album_type='album',
+        name=album_id.upper(),
+        release_date=datetime.date(2021, 8, 1),
+        last_checked_date=datetime.date(2021, 8, 1),
+        release_date_precision='day',
+        object_type='album',
+        uri='uri',
+        href='https://url.test',
+    )
+    album.artists.set(artists)
+    album.available_markets.set(markets)
+
+    return album
+
+
+class TestLeaderboards:
+    def test_compute_leaderboards(self):
+        leaderboards = compute_leaderboards(
+            [('d', 'D', 50), ('a', 'A', 10), ('c', 'C', 50), ('b', 'B', 90)],
+            {'a': {'pop'}, 'b': {'pop'}, 'c': {'pop', 'rock'}, 'd': {'pop'}},
+            {'a': {'FR'}, 'b': {'FR'}, 'c': {'FR', 'US'}, 'd': {'FR'}},
+            k=3,
+        )
+
+        assert leaderboards == {
+            ('pop', 'FR'): [('b', 'B', 90), ('c', 'C', 50), ('d', 'D', 50)],
+            ('pop', 'US'): [('c', 'C', 50)],
+            ('rock', 'FR'): [('c', 'C', 50)],
+            ('rock', 'US'): [('c', 'C', 50)],
+        }
+
+    @pytest.mark.django_db
+    def test_update_leaderboards(self):
+        pop: Genre = Genre.objects.create(name='pop')
+        fr: Market = Market.objects.create(country_code='FR')
+        us: Market = Market.objects.create(country_code='US')
+        new: Album = create_album(
+            'new',
+            [create_artist('a', 10, pop), create_artist('b', 90, pop)],
+            [fr, us],
+        )
+        old: Album = create_album('old', [create_artist('c', 99, pop)], [fr])
+        ReleaseAppearance.objects.create(
+            date=datetime.date(2021, 8, 10), position=1, album=new
+        )
+        ReleaseAppearance.objects.create(
+            date=datetime.date(2021, 8, 1), position=1, album=old
+        )
+
+        assert update_leaderboards(k=1, today=datetime.date(2021, 8, 10)) == 2
+        assert Leaderboard.objects.get(
+            genre='pop', country_code='FR'
+        ).artists == [{'artist_id': 'b', 'name': 'B', 'popularity': 90}]
+
+    @pytest.mark.django_db
+    def test_update_leaderboards_table(
+        self, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        schedule: Mock = Mock()
+        monkeypatch.setattr(receivers.leaderboards_task, 'schedule', schedule)
+
+        # Rebuilt in the background, once the sync is committed.
+        with django_capture_on_commit_callbacks() as callbacks:
+            receivers.update_leaderboards_table(sender=None, albums=[Mock()])
+
+        schedule.assert_not_called()
+        assert callbacks == [schedule]
@@ -0,0 +1,106 @@
+import datetime
+import pytest
+from api.libs.metrics import (
+    decode_deltas,
+    encode_deltas,
+    get_series,
+    record_metrics,
+    rollup_metrics,
+)
+from api.models import Artist, ArtistMetricSeries
+
+
+def create_artist(artist_id: str) -> Artist:
+    return Artist.objects.create(
+        artist_id=artist_id,
+        name=artist_id.upper(),
+        followers=1000,
+        popularity=50,
+        href='https://url.test',
+        artist_type='artist',
+        uri='uri',
+    )
+
+
+def record_days(artist: Artist, first: datetime.date, days: int) -> None:
+    for day in range(days):
+        artist.followers += day
+        artist.popularity = 50 + day % 3
+        record_metrics([artist], first + datetime.timedelta(days=day))
+
+
+class TestMetrics:
+    @pytest.mark.parametrize(
+        'values', [[], [0], [5, 3, 3, 1000000, -7], [2**40, 2**40 + 1]]
+    )
+    def test_encode_deltas(self, values: list[int]):
+        assert decode_deltas(encode_deltas(values)) == values
+
+    def test_encode_deltas_size(self):
+        assert len(encode_deltas(range(1000000, 1000100))) == 102
+
+    @pytest.mark.django_db
+    def test_record_metrics(self):
+        artist: Artist = create_artist('a')
+        record_days(artist, datetime.date(2021, 8, 30), 4)
+        artist.followers = 1
+        record_metrics([artist], datetime.date(2021, 9, 2))
+
+        assert ArtistMetricSeries.objects.count() == 2
+        assert get_series(
+            ['a', 'b'], datetime.date(2021, 8, 31), datetime.date(2021, 9, 30)
+        ) == {
+            'a': [
+                (datetime.date(2021, 8, 31), 1001, 51),
+                (datetime.date(2021, 9, 1), 1003, 52),
+                (datetime.date(2021, 9, 2), 1, 50),
+            ],
+            'b': [],
+        }
+
+    @pytest.mark.django_db
+    def test_rollup_metrics(self):
+        artist: Artist = create_artist('a')
+        record_days(artist, datetime.date(2021, 7, 28), 14)
+
+        assert rollup_metrics(datetime.date(2021, 8, 15), batch_size=1) == 1
+        assert list(
+            ArtistMetricSeries.objects.values_list(
+                'resolution', 'period_start', 'sample_count'
+            ).order_by('resolution')
+        ) == [
+            (ArtistMetricSeries.DAY, datetime.date(2021, 8, 1), 10),
+            (ArtistMetricSeries.WEEK, datetime.date(2021, 1, 1), 1),
+        ]
+        assert get_series(
+            ['a'],
+            datetime.date(2021, 1, 1),
+            datetime.date(2021, 12, 31),
+            ArtistMetricSeries.WEEK,
+        ) == {
+            'a': [
+                (datetime.date(2021, 7, 26), 1010, 51),
+                (datetime.date(2021, 8, 2), 1066, 52),
+                (datetime.date(2021, 8, 9), 1091, 51),
+            ]
+        }
+
+    @pytest.mark.django_db
+    def test_get_series_rolled_up(self):
+        artist: Artist = create_artist('a')
+        record_days(artist, datetime.date(2021, 7, 28), 7)
+        rollup_metrics(datetime.date(2021, 8, 15))
+        series: list = get_series(
+            ['a'], datetime.date(2021, 7, 1), datetime.date(2021, 8, 31)
+        )['a']
+
+        # The rolled up days are served by the weekly samples.
+        assert series == [
+            (datetime.date(2021, 7, 26), 1006, 50),
+            (datetime.date(2021, 8, 1), 1010, 51),
+            (datetime.date(2021, 8, 2), 1015, 52),
+            (datetime.date(2021, 8, 3), 1021, 50),
+        ]
+        assert get_series(
+            ['a'], datetime.date(2021, 8, 2), datetime.date(2021, 8, 2)
+        ) == {'a': [(datetime.date(2021, 8, 2), 1015, 52)]}
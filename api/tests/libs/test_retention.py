@@ -0,0 +1,226 @@
+import datetime
+import io
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from django.core.management import call_command
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from api.libs import retention
+from api.libs.metrics import record_metrics
+from api.libs.retention import (
+    count_cascaded,
+    delete_in_batches,
+    prune_catalog,
+)
+from api.libs.search import index_albums
+from api.models import (
+    Album,
+    Artist,
+    ArtistImageURL,
+    ArtistMetricSeries,
+    Change,
+    Genre,
+    Market,
+    ReleaseAppearance,
+    SearchDocument,
+)
+
+
+def create_artist(artist_id: str, popularity: int, genre: Genre) -> Artist:
+    artist: Artist = Artist.objects.create(
+        artist_id=artist_id,
+        name=artist_id.upper(),
+        followers=0,
+        popularity=popularity,
+        href='https://url.test',
+        artist_type='artist',
+        uri='uri',
+    )
+    artist.genres.add(genre)
+    ArtistImageURL.objects.create(
+        width=64, height=64, url='https://image.test', artist=artist
+    )
+
+    return artist
+
+
+def create_album(
+    album_id: str, age_days: int, artist: Artist, market: Market
+) -> Album:
+    date: datetime.date = timezone.now().date() - datetime.timedelta(
+        days=age_days
+    )
+    album: Album = Album.objects.create(
+        album_id=album_id,
+        album_type='album',
+        name=album_id.upper(),
+        release_date=date,
+        last_checked_date=date,
+        release_date_precision='day',
+        object_type='album',
+        uri='uri',
+        href='https://url.test',
+    )
+    album.artists.add(artist)
+    album.available_markets.add(market)
+
+    return album
+
+
+@pytest.fixture
+def catalog() -> None:
+    rock: Genre = Genre.objects.create(name='rock')
+    jazz: Genre = Genre.objects.create(name='jazz')
+    fr: Market = Market.objects.create(country_code='FR')
+    us: Market = Market.objects.create(country_code='US')
+    recent: Artist = create_artist('recent', 10, rock)
+    old: Artist = create_artist('old', 10, jazz)
+    popular: Artist = create_artist('popular', 90, jazz)
+    create_album('recent', 10, recent, fr)
+    create_album('old1', 400, old, us)
+    create_album('old2', 300, old, us)
+    create_album('popular', 400, popular, us)
+    index_albums(list(Album.objects.all()))
+
+
+@pytest.mark.django_db
+class TestRetention:
+    def test_prune_catalog_dry_run(self, catalog: None) -> None:
+        assert prune_catalog(dry_run=True) == {
+            'albums': 3,
+            'artists': 2,
+            'genres': 1,
+            'markets': 1,
+        }
+        assert Album.objects.count() == 4
+
+    def test_prune_catalog(self, catalog: None) -> None:
+        pruned: dict[str, int] = prune_catalog(batch_size=1, throttle=0)
+
+        assert pruned == {'albums': 3, 'artists': 2, 'genres': 1, 'markets': 1}
+        assert list(Album.objects.values_list('pk', flat=True)) == ['recent']
+        assert list(Artist.objects.values_list('pk', flat=True)) == ['recent']
+        assert list(Genre.objects.values_list('name', flat=True)) == ['rock']
+        assert list(Market.objects.values_list('country_code', flat=True)) == [
+            'FR'
+        ]
+        assert ArtistImageURL.objects.count() == 1
+        assert SearchDocument.objects.count() == 3
+        # No deletion receiver keeps the rows from being fast deleted.
+        assert not post_delete.has_listeners(Album)
+        assert not post_delete.has_listeners(Artist)
+        # The deletions are stored in a generation per batch.
+        assert list(
+            Change.objects.order_by('change_id').values_list(
+                'kind', 'object_id', 'action'
+            )
+        ) == [
+            (Change.ALBUM, 'old1', Change.DELETE),
+            (Change.ALBUM, 'old2', Change.DELETE),
+            (Change.ALBUM, 'popular', Change.DELETE),
+            (Change.ARTIST, 'old', Change.DELETE),
+            (Change.ARTIST, 'popular', Change.DELETE),
+        ]
+        assert (
+            Change.objects.values('generation_id').distinct().count() == 5
+        )
+
+    def test_prune_catalog_killed(
+        self, catalog: None, monkeypatch: MonkeyPatch
+    ) -> None:
+        feed: list[list[tuple[str, str]]] = []
+
+        def kill(throttle: float) -> None:
+            feed.append(
+                list(Change.objects.values_list('object_id', 'action'))
+            )
+            raise KeyboardInterrupt()
+
+        monkeypatch.setattr(retention.time, 'sleep', kill)
+
+        with pytest.raises(KeyboardInterrupt):
+            prune_catalog(batch_size=1)
+
+        # The deletion of the first batch is in the change feed
+        # as soon as the batch is committed.
+        assert Album.objects.count() == 3
+        assert feed == [[('old1', Change.DELETE)]]
+
+    def test_prune_catalog_keeps_history(self, catalog: None) -> None:
+        date: datetime.date = datetime.date(2021, 8, 1)
+        ReleaseAppearance.objects.create(
+            date=date, position=1, album_id='old1'
+        )
+        record_metrics(Artist.objects.filter(pk='old'), date)
+        prune_catalog(throttle=0)
+
+        # The history of the pruned albums and artists survives.
+        appearance: ReleaseAppearance = ReleaseAppearance.objects.get()
+
+        assert not Album.objects.filter(pk='old1').exists()
+        assert appearance.album_id == 'old1'
+        assert ArtistMetricSeries.objects.get().artist_id == 'old'
+        assert (
+            ReleaseAppearance.objects.select_related('album')
+            .get()
+            .as_dict['name']
+            is None
+        )
+
+    def test_prune_catalog_keep_rules(self, catalog: None) -> None:
+        assert prune_catalog(
+            keep_popularity=50, keep_released_days=350, throttle=0
+        ) == {'albums': 1, 'artists': 0, 'genres': 0, 'markets': 0}
+        assert not Album.objects.filter(pk='old1').exists()
+
+    def test_delete_in_batches(self, catalog: None) -> None:
+        assert (
+            delete_in_batches(
+                Market.objects.filter(country_code='US'),
+                batch_size=1,
+                throttle=0,
+            )
+            == 1
+        )
+        assert (
+            delete_in_batches(Genre.objects.all(), batch_size=1, throttle=0)
+            == 2
+        )
+        assert not Genre.objects.exists()
+        assert not SearchDocument.objects.filter(
+            kind=SearchDocument.GENRE
+        ).exists()
+
+    def test_count_cascaded(self, catalog: None) -> None:
+        # The artist and market rows, then the genre and image rows.
+        assert count_cascaded(Album, ['old1', 'recent']) == {
+            'old1': 2,
+            'recent': 2,
+        }
+        assert count_cascaded(Artist, ['old']) == {'old': 4}
+
+    def test_delete_in_batches_cascaded(
+        self, catalog: None, monkeypatch: MonkeyPatch
+    ) -> None:
+        batches: list[float] = []
+        monkeypatch.setattr(retention.time, 'sleep', batches.append)
+
+        # Each album deletes 2 related rows: a range of 3 rows
+        # holds a single album.
+        assert (
+            delete_in_batches(Album.objects.all(), batch_size=3, throttle=0)
+            == 4
+        )
+        assert len(batches) == 4
+
+    def test_command(self, catalog: None) -> None:
+        stdout: io.StringIO = io.StringIO()
+        call_command('prune_catalog', '--dry-run', stdout=stdout)
+
+        assert '3 albums to prune.' in stdout.getvalue()
+        assert Album.objects.count() == 4
+
+        call_command('prune_catalog', '--throttle', '0', stdout=stdout)
+
+        assert '3 albums pruned.' in stdout.getvalue()
+        assert Album.objects.count() == 1
@@ -0,0 +1,213 @@
+import datetime
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.libs import search as search_lib
+from api.libs.search import (
+    get_postings_counts,
+    get_trigrams,
+    index_albums,
+    normalize,
+    search,
+)
+from api.models import Album, Artist, Genre, SearchDocument, SearchTrigram
+
+
+def create_artist(artist_id: str, name: str, popularity: int) -> Artist:
+    return Artist.objects.create(
+        artist_id=artist_id,
+        name=name,
+        followers=0,
+        popularity=popularity,
+        href='https://url.test',
+        artist_type='artist',
+        uri='uri',
+    )
+
+
+def create_album(album_id: str, name: str, artists: list[Artist]) -> Album:
+    album: Album = Album.objects.create(
+        album_id=album_id,
+        album_type='album',
+        name=name,
+        release_date=datetime.date(2021, 8, 1),
+        last_checked_date=datetime.date(2021, 8, 1),
+        release_date_precision='day',
+        object_type='album',
+        uri='uri',
+        href='https://url.test',
+    )
+    album.artists.set(artists)
+
+    return album
+
+
+@pytest.fixture
+def albums() -> list[Album]:
+    beyonce: Artist = create_artist('beyonce', 'Beyoncé', 90)
+    beyonce.genres.add(Genre.objects.create(name='R&B'))
+    bey: Artist = create_artist('bey', 'Bey Crew', 10)
+
+    return [
+        create_album('lemonade', 'Lemonade', [beyonce]),
+        create_album('crew', 'Beyond the Crew', [bey]),
+    ]
+
+
+class TestSearch:
+    @pytest.mark.parametrize(
+        'text, expected',
+        [
+            ('Beyoncé', 'beyonce'),
+            ('  AC/DC -- Live!', 'ac dc live'),
+            ('R&B', 'r b'),
+        ],
+    )
+    def test_normalize(self, text: str, expected: str) -> None:
+        assert normalize(text) == expected
+
+    def test_get_trigrams(self) -> None:
+        assert get_trigrams('abc') == {' ab', 'abc', 'bc '}
+        assert get_trigrams('ab cd') == {' ab', 'ab ', ' cd', 'cd '}
+        assert get_trigrams('') == set()
+
+    @pytest.mark.django_db
+    def test_index_albums(self, albums: list[Album]) -> None:
+        index_albums(albums)
+        index_albums(albums)
+
+        assert SearchDocument.objects.count() == 5
+        document: SearchDocument = SearchDocument.objects.get(
+            kind=SearchDocument.ALBUM, object_id='lemonade'
+        )
+        assert document.popularity == 90
+        assert set(
+            document.trigrams.values_list('trigram', flat=True)
+        ) == get_trigrams('lemonade')
+
+    @pytest.mark.django_db
+    def test_index_albums_renamed(self, albums: list[Album]) -> None:
+        index_albums(albums)
+        Album.objects.filter(album_id='lemonade').update(name='Renaissance')
+        index_albums(albums)
+
+        assert [document.object_id for document in search('renais')] == [
+            'lemonade'
+        ]
+        assert [document.object_id for document in search('re')] == [
+            'lemonade'
+        ]
+        assert not SearchTrigram.objects.filter(
+            document__object_id='lemonade', trigram='lem'
+        ).exists()
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        'query, kinds, expected',
+        [
+            # Prefix matches, ranked by popularity.
+            ('bey', None, ['beyonce', 'bey', 'crew']),
+            ('bey', [SearchDocument.ARTIST], ['beyonce', 'bey']),
+            # Short prefix matches, read from their bucket.
+            ('B', None, ['beyonce', 'bey', 'crew']),
+            ('be', [SearchDocument.ARTIST], ['beyonce', 'bey']),
+            ('le', None, ['lemonade']),
+            ('lz', None, []),
+            # Typo tolerant matches.
+            ('lemonda', None, ['lemonade']),
+            ('beyonse', None, ['beyonce']),
+            ('zzz', None, []),
+            ('', None, []),
+        ],
+    )
+    def test_search(
+        self,
+        albums: list[Album],
+        query: str,
+        kinds: list[str],
+        expected: list[str],
+    ) -> None:
+        index_albums(albums)
+        results: list[SearchDocument] = search(query, kinds=kinds)
+
+        assert [result.object_id for result in results] == expected
+
+    @pytest.mark.django_db
+    def test_search_limit(self, albums: list[Album]) -> None:
+        index_albums(albums)
+
+        assert len(search('bey', limit=1)) == 1
+
+    @pytest.mark.django_db
+    def test_search_short_prefix(
+        self, albums: list[Album], django_assert_num_queries
+    ) -> None:
+        index_albums(albums)
+
+        # The best matches are read from the bucket index at once.
+        with django_assert_num_queries(1):
+            results: list[SearchDocument] = search('b', limit=2)
+
+        assert [result.object_id for result in results] == ['beyonce', 'bey']
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        'query, max_postings, expected',
+        [
+            # The rarest trigrams ('eyo' and 'yon') tell Beyoncé apart.
+            ('beyonse', 4, ['beyonce']),
+            # The shortest posting lists exceed the budget.
+            ('beyonse', 1, []),
+            ('lemonade crew', 0, []),
+        ],
+    )
+    def test_search_max_postings(
+        self,
+        albums: list[Album],
+        monkeypatch: MonkeyPatch,
+        query: str,
+        max_postings: int,
+        expected: list[str],
+    ) -> None:
+        index_albums(albums)
+        monkeypatch.setattr(search_lib, 'MAX_POSTINGS', max_postings)
+        results: list[SearchDocument] = search(query)
+
+        assert [result.object_id for result in results] == expected
+
+    @pytest.mark.django_db
+    def test_get_postings_counts(self, albums: list[Album]) -> None:
+        index_albums(albums)
+
+        assert get_postings_counts([' be', 'eyo', 'zzz']) == {
+            ' be': 3,
+            'eyo': 2,
+            'zzz': 0,
+        }
+
+        # The counts are cached.
+        SearchTrigram.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            assert get_postings_counts(['eyo']) == {'eyo': 2}
+
+        assert not queries
+
+    @pytest.mark.django_db
+    def test_search_postgresql(
+        self, albums: list[Album], monkeypatch: MonkeyPatch
+    ) -> None:
+        index_albums(albums)
+        # The prefix is matched with LIKE, served by the pattern ops index.
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+
+        with CaptureQueriesContext(connection) as queries:
+            results: list[SearchDocument] = search('bey')
+
+        assert [result.object_id for result in results] == [
+            'beyonce',
+            'bey',
+            'crew',
+        ]
+        assert 'LIKE' in queries[0]['sql']
@@ -0,0 +1,111 @@
+from unittest.mock import Mock
+import pytest
+from api import receivers
+from api.libs import similarity
+from api.libs.similarity import (
+    COSINE,
+    JACCARD,
+    compute_neighbours,
+    compute_neighbours_postings,
+    compute_neighbours_vectorized,
+    update_similar_artists,
+)
+from api.models import Artist, Genre, SimilarArtist
+
+ARTIST_GENRES: dict[str, set[int]] = {
+    'a': {1, 2, 3},
+    'b': {1, 2},
+    'c': {3, 4},
+    'd': {1, 2, 3},
+    'e': {5},
+    'f': set(),
+}
+
+
+def create_artist(artist_id: str) -> Artist:
+    return Artist.objects.create(
+        artist_id=artist_id,
+        name=artist_id.upper(),
+        followers=0,
+        popularity=50,
+        href='https://url.test',
+        artist_type='artist',
+        uri='uri',
+    )
+
+
+class TestSimilarity:
+    @pytest.mark.parametrize(
+        'compute', [compute_neighbours_vectorized, compute_neighbours_postings]
+    )
+    def test_compute_neighbours(self, compute):
+        neighbours = compute(
+            {k: v for k, v in ARTIST_GENRES.items() if v}, 2, JACCARD
+        )
+
+        assert neighbours['a'] == [('d', 1.0), ('b', 2 / 3)]
+        assert neighbours['b'] == [('a', 2 / 3), ('d', 2 / 3)]
+        assert neighbours['c'] == [('a', 0.25), ('d', 0.25)]
+        assert 'e' not in neighbours
+
+    def test_compute_neighbours_same_results(self):
+        genres: dict[str, set[int]] = {
+            f'artist{i}': {i % 7, i % 11, i % 13 + 20} for i in range(200)
+        }
+
+        for metric in (JACCARD, COSINE):
+            assert compute_neighbours_vectorized(
+                genres, 5, metric
+            ) == compute_neighbours_postings(genres, 5, metric)
+
+    def test_compute_neighbours_cosine(self):
+        neighbours = compute_neighbours(ARTIST_GENRES, k=1, metric=COSINE)
+
+        assert neighbours['c'] == [('a', pytest.approx(1 / 6**0.5))]
+
+    def test_compute_neighbours_without_scipy(self, monkeypatch):
+        monkeypatch.setattr(similarity, 'VECTORIZED', False)
+
+        assert compute_neighbours(ARTIST_GENRES, k=1)['a'] == [('d', 1.0)]
+
+    def test_compute_neighbours_unknown_metric(self):
+        with pytest.raises(ValueError):
+            compute_neighbours(ARTIST_GENRES, metric='euclidean')
+
+    @pytest.mark.django_db
+    def test_update_similar_artists(self):
+        genres: dict[int, Genre] = {
+            genre_id: Genre.objects.create(name=f'genre{genre_id}')
+            for genre_id in range(1, 6)
+        }
+
+        for artist_id, genre_ids in ARTIST_GENRES.items():
+            create_artist(artist_id).genres.set(
+                [genres[genre_id] for genre_id in genre_ids]
+            )
+
+        assert update_similar_artists(k=1) == 4
+        assert update_similar_artists(k=2) == 8
+        assert list(
+            SimilarArtist.objects.filter(artist_id='a')
+            .order_by('rank')
+            .values_list('similar_id', 'rank')
+        ) == [('d', 0), ('b', 1)]
+
+    @pytest.mark.django_db
+    def test_update_similar_artists_table(
+        self, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        schedule: Mock = Mock()
+        monkeypatch.setattr(
+            receivers.similar_artists_task, 'schedule', schedule
+        )
+
+        # Recomputed in the background, once the sync is committed.
+        with django_capture_on_commit_callbacks() as callbacks:
+            receivers.update_similar_artists_table(
+                sender=None, albums=[Mock()]
+            )
+
+        schedule.assert_not_called()
+        assert callbacks == [schedule]
@@ -1,7 +1,37 @@
-from api.models import Album
+import datetime
+import pytest
+from api.models import Album, AlbumImageURL
 
 
 class TestAlbum:
     def test___str__(self):
         album: Album = Album(name='Test')
         assert str(album) == 'Test'
+
+    @pytest.mark.django_db
+    def test_as_dict(self):
+        album: Album = Album.objects.create(
+            album_id='id',
+            album_type='album',
+            name='name',
+            release_date=datetime.date(2021, 8, 1),
+            last_checked_date=datetime.date(2021, 8, 1),
+            release_date_precision='day',
+            object_type='album',
+            uri='uri',
+            href='https://url.test',
+        )
+        image_url: AlbumImageURL = AlbumImageURL.objects.create(
+            width=64, height=64, url='https://image.test', album=album
+        )
+        assert album.as_dict == {
+            'album_id': 'id',
+            'name': 'name',
+            'album_type': 'album',
+            'release_date': '2021-08-01',
+            'release_date_precision': 'day',
+            'href': 'https://url.test',
+            'uri': 'uri',
+            'artists': [],
+            'image_urls': [image_url.as_dict],
+        }
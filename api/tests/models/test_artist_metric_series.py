@@ -0,0 +1,12 @@
+import datetime
+from api.models import ArtistMetricSeries
+
+
+class TestArtistMetricSeries:
+    def test___str__(self):
+        series: ArtistMetricSeries = ArtistMetricSeries(
+            artist_id='id',
+            resolution=ArtistMetricSeries.DAY,
+            period_start=datetime.date(2021, 8, 1),
+        )
+        assert str(series) == 'id day 2021-08-01'
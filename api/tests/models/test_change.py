@@ -0,0 +1,9 @@
+from api.models import Change
+
+
+class TestChange:
+    def test___str__(self):
+        change: Change = Change(
+            kind=Change.ARTIST, object_id='id', action=Change.INSERT
+        )
+        assert str(change) == 'insert artist id'
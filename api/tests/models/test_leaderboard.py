@@ -0,0 +1,7 @@
+from api.models import Leaderboard
+
+
+class TestLeaderboard:
+    def test___str__(self):
+        leaderboard: Leaderboard = Leaderboard(genre='pop', country_code='FR')
+        assert str(leaderboard) == 'pop (FR)'
@@ -0,0 +1,16 @@
+import datetime
+from api.models import ReleaseAppearance
+
+
+class TestReleaseAppearance:
+    def test___str__(self):
+        appearance: ReleaseAppearance = ReleaseAppearance(
+            date=datetime.date(2021, 8, 1), position=3
+        )
+        assert str(appearance) == '2021-08-01 #3'
+
+    def test___str___market(self):
+        appearance: ReleaseAppearance = ReleaseAppearance(
+            date=datetime.date(2021, 8, 1), country_code='FR', position=3
+        )
+        assert str(appearance) == '2021-08-01 FR #3'
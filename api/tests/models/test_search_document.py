@@ -0,0 +1,21 @@
+from api.models import SearchDocument
+
+
+class TestSearchDocument:
+    def test___str__(self):
+        document: SearchDocument = SearchDocument(name='Test')
+        assert str(document) == 'Test'
+
+    def test_as_dict(self):
+        document: SearchDocument = SearchDocument(
+            kind=SearchDocument.ARTIST,
+            object_id='id',
+            name='Test',
+            popularity=10,
+        )
+        assert document.as_dict == {
+            'kind': 'artist',
+            'id': 'id',
+            'name': 'Test',
+            'popularity': 10,
+        }
@@ -0,0 +1,7 @@
+from api.models import SearchTrigram
+
+
+class TestSearchTrigram:
+    def test___str__(self):
+        trigram: SearchTrigram = SearchTrigram(trigram='tes')
+        assert str(trigram) == 'tes'
@@ -0,0 +1,9 @@
+from api.models import SimilarArtist
+
+
+class TestSimilarArtist:
+    def test___str__(self):
+        similar_artist: SimilarArtist = SimilarArtist(
+            artist_id='id1', similar_id='id2'
+        )
+        assert str(similar_artist) == 'id1 ~ id2'
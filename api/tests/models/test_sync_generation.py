@@ -0,0 +1,7 @@
+from api.models import SyncGeneration
+
+
+class TestSyncGeneration:
+    def test___str__(self):
+        generation: SyncGeneration = SyncGeneration(generation_id=3)
+        assert str(generation) == '3'
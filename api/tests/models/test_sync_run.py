@@ -0,0 +1,7 @@
+from api.models import SyncRun
+
+
+class TestSyncRun:
+    def test___str__(self):
+        run: SyncRun = SyncRun(run_id=3, status=SyncRun.FAILED, offset=40)
+        assert str(run) == '3 failed at 40'
@@ -0,0 +1,7 @@
+from api.models import SyncRunAlbum
+
+
+class TestSyncRunAlbum:
+    def test___str__(self):
+        run_album: SyncRunAlbum = SyncRunAlbum(run_id=3, position=40)
+        assert str(run_album) == '3 #40'
@@ -0,0 +1,9 @@
+from api.models import SyncShard
+
+
+class TestSyncShard:
+    def test___str__(self):
+        shard: SyncShard = SyncShard(country_code='FR', start=20, end=40)
+        assert str(shard) == 'FR [20, 40)'
+        shard.country_code = ''
+        assert str(shard) == '[20, 40)'
@@ -0,0 +1,160 @@
+import gzip
+import io
+import json
+from typing import Any
+import pytest
+from django.core.management import call_command
+from api.libs.spotify.offline_api import OfflineSpotifyAPI
+from api.models import Album, Artist, Genre, Market, ReleaseAppearance
+from api.signals import new_releases_synced
+
+
+def make_album(album_id: str, artist_ids: list[str]) -> dict[str, Any]:
+    return {
+        'id': album_id,
+        'album_type': 'album',
+        'name': album_id.upper(),
+        'release_date': '2021-08-01',
+        'release_date_precision': 'day',
+        'type': 'album',
+        'uri': 'uri',
+        'href': 'https://url.test',
+        'available_markets': ['FR', 'US'],
+        'external_urls': {'spotify': f'https://{album_id}.test'},
+        'images': [],
+        'artists': [{'id': artist_id} for artist_id in artist_ids],
+    }
+
+
+def make_artist(artist_id: str) -> dict[str, Any]:
+    return {
+        'id': artist_id,
+        'name': artist_id.upper(),
+        'followers': {'total': 10},
+        'popularity': 50,
+        'type': 'artist',
+        'uri': 'uri',
+        'href': 'https://url.test',
+        'genres': ['rock'],
+        'external_urls': {},
+        'images': [],
+    }
+
+
+def write_ndjson(path: Any, payloads: list[dict[str, Any]]) -> str:
+    opener: Any = gzip.open if str(path).endswith('.gz') else open
+
+    with opener(path, 'wt', encoding='utf-8') as file:
+        for payload in payloads:
+            file.write(json.dumps(payload) + '\n')
+
+    return str(path)
+
+
+@pytest.fixture
+def dumps(tmp_path: Any) -> tuple[str, str]:
+    new_releases: str = write_ndjson(
+        tmp_path / 'new_releases.ndjson.gz',
+        [
+            {'albums': {'items': [make_album('a', ['x', 'y'])]}},
+            make_album('b', ['y', 'z']),
+        ],
+    )
+    artists: str = write_ndjson(
+        tmp_path / 'artists.ndjson',
+        [{'artists': [make_artist('x'), make_artist('y')]}],
+    )
+
+    return new_releases, artists
+
+
+class TestOfflineSpotifyAPI:
+    def test_get_new_releases(self, dumps: tuple[str, str]) -> None:
+        api: OfflineSpotifyAPI = OfflineSpotifyAPI([dumps[0]], [dumps[1]])
+
+        assert [album['id'] for album in api.get_new_releases()] == [
+            'a',
+            'b',
+        ]
+
+    def test_get_several_artists(self, dumps: tuple[str, str]) -> None:
+        api: OfflineSpotifyAPI = OfflineSpotifyAPI([dumps[0]], [dumps[1]])
+
+        assert [
+            artist['id'] for artist in api.get_several_artists(['y', 'z'])
+        ] == ['y']
+
+    def test_get_several_artists_gzipped(self, tmp_path: Any) -> None:
+        artists: str = write_ndjson(
+            tmp_path / 'artists.ndjson.gz',
+            [
+                {'artists': [make_artist('x'), make_artist('y')]},
+                make_artist('z'),
+            ],
+        )
+        api: OfflineSpotifyAPI = OfflineSpotifyAPI([], [artists])
+
+        # The records are read backward then forward.
+        assert [
+            artist['id'] for artist in api.get_several_artists(['z', 'x'])
+        ] == ['z', 'x']
+        assert [
+            artist['id'] for artist in api.get_several_artists(['y'])
+        ] == ['y']
+        assert [
+            artist['id'] for artist in api.get_several_artists(['z'])
+        ] == ['z']
+        api.close()
+
+    @pytest.mark.django_db
+    def test_import_releases(self, dumps: tuple[str, str]) -> None:
+        stdout: io.StringIO = io.StringIO()
+        call_command(
+            'import_releases',
+            '--new-releases',
+            dumps[0],
+            '--artists',
+            dumps[1],
+            '--batch-size',
+            '1',
+            stdout=stdout,
+        )
+
+        assert '2 albums imported' in stdout.getvalue()
+        assert sorted(Album.objects.values_list('album_id', flat=True)) == [
+            'a',
+            'b',
+        ]
+        assert sorted(
+            Album.objects.get(album_id='b').artists.values_list(
+                'artist_id', flat=True
+            )
+        ) == ['y']
+        assert Artist.objects.count() == 2
+        assert Genre.objects.count() == 1
+        assert Market.objects.count() == 2
+        # The imported albums are not today's new releases.
+        assert not ReleaseAppearance.objects.exists()
+
+    @pytest.mark.django_db
+    def test_import_releases_signal(self, dumps: tuple[str, str]) -> None:
+        received: list[Any] = []
+
+        def receiver(**kwargs: Any) -> None:
+            received.append(kwargs)
+
+        new_releases_synced.connect(receiver)
+
+        try:
+            call_command(
+                'import_releases',
+                '--new-releases',
+                dumps[0],
+                '--artists',
+                dumps[1],
+                stdout=io.StringIO(),
+            )
+        finally:
+            new_releases_synced.disconnect(receiver)
+
+        assert not received
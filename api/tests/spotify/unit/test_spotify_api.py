@@ -1,4 +1,5 @@
 from typing import Any, Generator, Iterator, Union
+import json
 import time
 import requests
 import pytest
@@ -6,7 +7,13 @@ from unittest.mock import Mock
 from _pytest.monkeypatch import MonkeyPatch, monkeypatch
 from requests.exceptions import HTTPError
 from api.libs.spotify.auth import Auth, Token
-from api.libs.spotify.spotify_api import SpotifyAPI, SpotifyAPIError
+from api.libs.spotify.spotify_api import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimiter,
+    SpotifyAPI,
+    SpotifyAPIError,
+)
 
 
 class TestSpotifyAPI:
@@ -32,11 +39,9 @@ class TestSpotifyAPI:
                     self.status_code: int = 200
 
                 self.headers: dict[str, str] = {'Retry-After': '0'}
+                self.content: bytes = json.dumps(fake_resp).encode()
                 ResponseMock._REQUESTS_COUNT += 1
 
-            def json(self) -> dict[str, Any]:
-                return fake_resp
-
             def raise_for_status(self) -> None:
                 if self.status_code >= 400:
                     raise HTTPError()
@@ -49,13 +54,94 @@ class TestSpotifyAPI:
         monkeypatch.setattr(requests, 'Response', ResponseMock)
         response: dict[str, Any] = None
 
-        if status_code not in (200, 301, 429):
+        # The rate limits and server errors are retried.
+        if status_code not in (200, 301, 429, 500):
             with pytest.raises(SpotifyAPIError):
                 response = spotify_api._get('fake_resource')
         else:
             response = spotify_api._get('fake_resource')
             assert response == fake_resp
 
+    @pytest.mark.parametrize(
+        'error',
+        [
+            requests.ConnectionError('Connection refused.'),
+            requests.Timeout('Read timed out.'),
+        ],
+    )
+    def test__get_retries(
+        self,
+        error: Exception,
+        spotify_api: SpotifyAPI,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        get_patch: Mock = Mock(side_effect=error)
+        sleep: Mock = Mock()
+        monkeypatch.setattr(time, 'sleep', sleep)
+        monkeypatch.setattr(requests, 'get', get_patch)
+        monkeypatch.setattr(SpotifyAPI, '_rate_limiter', RateLimiter(10, 20))
+        monkeypatch.setattr(
+            SpotifyAPI,
+            '_circuit_breaker',
+            CircuitBreaker(
+                failure_rate=0.5, window=20, min_calls=4, open_seconds=30
+            ),
+        )
+
+        with pytest.raises(SpotifyAPIError):
+            spotify_api._get('fake_resource')
+
+        assert get_patch.call_count == SpotifyAPI.MAX_RETRIES + 1
+        # A jittered and growing backoff between the attempts.
+        assert [call[0][0] for call in sleep.call_args_list] == [
+            pytest.approx(0.5, abs=0.5),
+            pytest.approx(1, abs=1),
+            pytest.approx(2, abs=2),
+        ]
+
+        # The failures opened the circuit: the calls fail fast.
+        with pytest.raises(CircuitOpenError):
+            spotify_api._get('fake_resource')
+
+        assert get_patch.call_count == SpotifyAPI.MAX_RETRIES + 1
+
+    def test__get_long_retry_after(
+        self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
+    ) -> None:
+        response: Mock = Mock(status_code=429, headers={'Retry-After': '3600'})
+        response.raise_for_status.side_effect = HTTPError()
+        get_patch: Mock = Mock(return_value=response)
+        monkeypatch.setattr(requests, 'get', get_patch)
+        monkeypatch.setattr(SpotifyAPI, '_rate_limiter', RateLimiter(10, 20))
+
+        with pytest.raises(SpotifyAPIError):
+            spotify_api._get('fake_resource')
+
+        assert get_patch.call_count == 1
+
+    def test__get_probe_error(
+        self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
+    ) -> None:
+        now: list[float] = [100.0]
+        get_patch: Mock = Mock(side_effect=ValueError('Unexpected.'))
+        breaker: CircuitBreaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=1, open_seconds=30
+        )
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(requests, 'get', get_patch)
+        monkeypatch.setattr(SpotifyAPI, '_rate_limiter', RateLimiter(10, 20))
+        monkeypatch.setattr(SpotifyAPI, '_circuit_breaker', breaker)
+        breaker.record_failure()
+        now[0] += 30
+
+        # The probe failing with an unexpected error is released.
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                spotify_api._get('fake_resource')
+
+        assert get_patch.call_count == 2
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
     def test_get_artist(
         self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
     ) -> None:
@@ -105,6 +191,105 @@ class TestSpotifyAPI:
 
         assert isinstance(response, Generator)
 
+    def test_get_new_releases_country(
+        self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
+    ) -> None:
+        fake_resp: Mock = Mock(
+            return_value={
+                'albums': {
+                    'total': 1,
+                    'offset': 0,
+                    'limit': 20,
+                    'items': ['any'],
+                }
+            }
+        )
+        monkeypatch.setattr(spotify_api, '_get', fake_resp)
+
+        assert list(spotify_api.get_new_releases(country='FR')) == ['any']
+        assert fake_resp.call_args[0][1]['country'] == 'FR'
+
+    def test_get_new_releases_stream(
+        self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
+    ) -> None:
+        pages: list[bytes] = [
+            json.dumps(
+                {
+                    'albums': {
+                        'href': 'any',
+                        'items': [
+                            {'id': str(offset + i), 'total_tracks': 1}
+                            for i in range(2)
+                        ],
+                        'limit': 2,
+                        'offset': offset,
+                        'total': 3,
+                    }
+                },
+                indent=2,
+            ).encode()
+            for offset in (0, 2)
+        ]
+        responses: list[Mock] = []
+
+        def get_patch(url: str, **kwargs: Any) -> Mock:
+            body: bytes = pages[kwargs['params']['offset'] // 2]
+            response: Mock = Mock(status_code=200)
+            response.iter_content.side_effect = lambda size: (
+                body[i : i + 7] for i in range(0, len(body), 7)
+            )
+            responses.append(response)
+
+            return response
+
+        monkeypatch.setattr(requests, 'get', get_patch)
+        spotify_api.stream = True
+        releases: Iterator[dict[str, Any]] = spotify_api.get_new_releases()
+
+        # The first album is yielded before the page is read.
+        assert next(releases) == {'id': '0'}
+        assert not responses[0].close.called
+        assert list(releases) == [{'id': '1'}, {'id': '2'}, {'id': '3'}]
+        assert [response.close.called for response in responses] == [
+            True,
+            True,
+        ]
+
+    def test_get_new_releases_stream_error(
+        self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
+    ) -> None:
+        breaker: CircuitBreaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=2, open_seconds=30
+        )
+        response: Mock = Mock(status_code=200)
+        response.iter_content.side_effect = requests.ConnectionError(
+            'Connection reset.'
+        )
+        monkeypatch.setattr(requests, 'get', Mock(return_value=response))
+        monkeypatch.setattr(SpotifyAPI, '_circuit_breaker', breaker)
+        spotify_api.stream = True
+
+        with pytest.raises(SpotifyAPIError):
+            list(spotify_api.get_new_releases())
+
+        # The page failed after its headers succeeded.
+        assert list(breaker._failures) == [False, True]
+        assert breaker.state == CircuitBreaker.OPEN
+        assert response.close.called
+
+    def test_get_new_releases_total(
+        self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
+    ) -> None:
+        fake_resp: Mock = Mock(return_value={'albums': {'total': 100}})
+        monkeypatch.setattr(spotify_api, '_get', fake_resp)
+
+        assert spotify_api.get_new_releases_total(country='FR') == 100
+        assert fake_resp.call_args[0][1] == {
+            'offset': 0,
+            'limit': 1,
+            'country': 'FR',
+        }
+
     def test_get_me(
         self, spotify_api: SpotifyAPI, monkeypatch: MonkeyPatch
     ) -> None:
@@ -122,3 +307,100 @@ class TestSpotifyAPI:
 
         with pytest.raises(SpotifyAPIError):
             spotify_api._raise_for_empty_token()
+
+
+class TestRateLimiter:
+    def test_acquire(self, monkeypatch: MonkeyPatch) -> None:
+        now: list[float] = [100.0]
+        sleep: Mock = Mock(side_effect=lambda seconds: None)
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(time, 'sleep', sleep)
+        rate_limiter: RateLimiter = RateLimiter(rate=10, burst=2)
+
+        # The burst is available at once, then a slot every 0.1s.
+        for _ in range(3):
+            rate_limiter.acquire()
+
+        assert [call[0][0] for call in sleep.call_args_list] == [
+            pytest.approx(0.1)
+        ]
+
+    def test_block(self, monkeypatch: MonkeyPatch) -> None:
+        sleep: Mock = Mock()
+        monkeypatch.setattr(time, 'monotonic', lambda: 100.0)
+        monkeypatch.setattr(time, 'sleep', sleep)
+        rate_limiter: RateLimiter = RateLimiter(rate=10, burst=2)
+        rate_limiter.block(5)
+        rate_limiter.acquire()
+
+        sleep.assert_called_once_with(5)
+
+
+class TestCircuitBreaker:
+    def test_open(self, monkeypatch: MonkeyPatch) -> None:
+        now: list[float] = [100.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        breaker: CircuitBreaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=4, open_seconds=30
+        )
+
+        for failed in [True, False, True]:
+            breaker.before_call()
+            (breaker.record_failure if failed else breaker.record_success)()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.before_call()
+
+        assert error.value.retry_after == 30
+
+    def test_half_open(self, monkeypatch: MonkeyPatch) -> None:
+        now: list[float] = [100.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        breaker: CircuitBreaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=1, open_seconds=30
+        )
+        breaker.record_failure()
+        now[0] += 30
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # A single probe call goes through.
+        breaker.before_call()
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+        now[0] += 30
+        breaker.before_call()
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert not breaker.before_call()
+
+    def test_release_probe(self, monkeypatch: MonkeyPatch) -> None:
+        now: list[float] = [100.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        breaker: CircuitBreaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=1, open_seconds=30
+        )
+        breaker.record_failure()
+        now[0] += 30
+
+        assert breaker.before_call()
+
+        # The probe ended untracked: another one goes through.
+        breaker.release_probe()
+
+        assert breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
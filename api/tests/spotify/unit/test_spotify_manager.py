@@ -0,0 +1,732 @@
+import datetime
+import time
+from typing import Any, Callable, Iterator
+from unittest.mock import Mock
+import django
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from django.db import connections
+from django.utils import timezone
+from api.libs.spotify import spotify_manager as manager_lib
+from api.libs.spotify.auth import Token
+from api.libs.spotify.spotify_api import (
+    CircuitOpenError,
+    SpotifyAPI,
+    SpotifyAPIError,
+)
+from api.libs.spotify.spotify_manager import SpotifyManager
+from api.models import (
+    Album,
+    AlbumImageURL,
+    Artist,
+    ArtistExternalURL,
+    Change,
+    Market,
+    ReleaseAppearance,
+    SyncRun,
+    SyncShard,
+)
+
+
+# The markets of the Spotify API.
+ALL_MARKETS: list[str] = '''
+AD AE AG AL AM AO AR AT AU AZ BA BB BD BE BF BG BH BI BJ BN BO BR BS BT
+BW BY BZ CA CD CG CH CI CL CM CO CR CV CW CY CZ DE DJ DK DM DO DZ EC EE EG
+ES ET FI FJ FM FR GA GB GD GE GH GM GN GQ GR GT GW GY HK HN HR HT HU ID IE
+IL IN IQ IS IT JM JO JP KE KG KH KI KM KN KR KW KZ LA LB LC LI LK LR LS LT
+LU LV LY MA MC MD ME MG MH MK ML MN MO MR MT MU MV MW MX MY MZ NA NE NG NI
+NL NO NP NR NZ OM PA PE PG PH PK PL PS PT PW PY QA RO RS RW SA SB SC SE SG
+SI SK SL SM SN SR ST SV SZ TD TG TH TJ TL TN TO TR TT TV TW TZ UA UG US UY
+UZ VC VE VN VU WS XK ZA ZM ZW
+'''.split()
+
+
+def create_album(album_id: str) -> Album:
+    return Album.objects.create(
+        album_id=album_id,
+        album_type='album',
+        name=album_id.upper(),
+        release_date=datetime.date(2021, 8, 1),
+        last_checked_date=datetime.date(2021, 8, 1),
+        release_date_precision='day',
+        object_type='album',
+        uri='uri',
+        href='https://url.test',
+    )
+
+
+def make_album_info(album_id: str, artist_ids: list[str]) -> dict[str, Any]:
+    return {
+        'id': album_id,
+        'album_type': 'album',
+        'name': album_id.upper(),
+        'release_date': '2021-08-01',
+        'release_date_precision': 'day',
+        'type': 'album',
+        'uri': 'uri',
+        'href': 'https://url.test',
+        'available_markets': ['FR', 'US'],
+        'external_urls': {},
+        'images': [],
+        'artists': [{'id': artist_id} for artist_id in artist_ids],
+    }
+
+
+def make_artist_info(artist_id: str) -> dict[str, Any]:
+    return {
+        'id': artist_id,
+        'name': artist_id.upper(),
+        'followers': {'total': 10},
+        'popularity': 50,
+        'type': 'artist',
+        'uri': 'uri',
+        'href': 'https://url.test',
+        'genres': ['rock'],
+        'external_urls': {},
+        'images': [],
+    }
+
+
+@pytest.mark.django_db
+class TestSpotifyManager:
+    def test__record_appearances(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        albums: list[Album] = [create_album('a'), create_album('b')]
+        sp_man._record_appearances(albums)
+        # A second sync the same day keeps the first appearances.
+        sp_man._record_appearances(albums[::-1])
+        today: datetime.date = timezone.now().date()
+
+        assert list(
+            ReleaseAppearance.objects.order_by('position').values_list(
+                'date', 'position', 'album_id'
+            )
+        ) == [(today, 1, 'a'), (today, 2, 'b')]
+
+    def test_update_new_releases_in_db_markets(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        releases: dict[str, list[str]] = {'FR': ['a', 'b'], 'US': ['b', 'c']}
+        artist_calls: list[list[str]] = []
+
+        class FakeAPI:
+            def get_new_releases(self, country: str) -> Iterator[dict]:
+                for album_id in releases[country]:
+                    yield make_album_info(album_id, ['x', album_id])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                artist_calls.append(ids)
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = FakeAPI()
+        albums: list[Album] = sp_man.update_new_releases_in_db(
+            countries=['FR', 'US']
+        )
+        today: datetime.date = timezone.now().date()
+
+        assert [album.album_id for album in albums] == ['a', 'b', 'c']
+        # The artists of all the markets are fetched once.
+        assert sorted(sum(artist_calls, [])) == ['a', 'b', 'c', 'x']
+        assert Artist.objects.count() == 4
+        assert list(
+            ReleaseAppearance.objects.order_by(
+                'country_code', 'position'
+            ).values_list('date', 'country_code', 'position', 'album_id')
+        ) == [
+            (today, 'FR', 1, 'a'),
+            (today, 'FR', 2, 'b'),
+            (today, 'US', 1, 'b'),
+            (today, 'US', 2, 'c'),
+        ]
+
+    def test_update_new_releases_in_db_markets_resume(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        releases: dict[str, list[str]] = {'FR': ['a', 'b'], 'US': ['c']}
+        attempts: list[int] = []
+
+        class FlakyAPI:
+            def get_new_releases(self, country: str) -> Iterator[dict]:
+                for album_id in releases[country]:
+                    yield make_album_info(album_id, [album_id])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = FlakyAPI()
+        checkpoint: Callable[..., None] = sp_man._checkpoint
+
+        def flaky_checkpoint(run: SyncRun, *args: Any) -> None:
+            # The first attempt fails in the second batch.
+            if run.offset == 1 and not attempts:
+                attempts.append(1)
+                raise SpotifyAPIError('Read timed out.')
+
+            checkpoint(run, *args)
+
+        sp_man._checkpoint = flaky_checkpoint
+
+        with pytest.raises(SpotifyAPIError):
+            sp_man.update_new_releases_in_db(
+                batch_size=1, countries=['FR', 'US']
+            )
+
+        # A new release is listed before the committed one.
+        releases['FR'] = ['d', 'a', 'b']
+        albums: list[Album] = sp_man.update_new_releases_in_db(
+            batch_size=1, countries=['FR', 'US']
+        )
+        run: SyncRun = SyncRun.objects.get()
+
+        assert [album.album_id for album in albums] == ['d', 'a', 'b', 'c']
+        assert (run.status, run.offset) == (SyncRun.COMPLETED, 4)
+        assert list(
+            ReleaseAppearance.objects.filter(country_code='FR')
+            .order_by('position')
+            .values_list('album_id', flat=True)
+        ) == ['d', 'a', 'b']
+
+    def test_update_new_releases_in_db_resume(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        album_ids: list[str] = ['a', 'b', 'c', 'd', 'e']
+        offsets: list[int] = []
+        artist_calls: list[list[str]] = []
+        committed_changes: list[str] = []
+
+        class FlakyAPI:
+            def get_new_releases(self, offset: int = 0) -> Iterator[dict]:
+                offsets.append(offset)
+
+                for album_id in album_ids[offset:]:
+                    # The first attempt fails in the second batch.
+                    if album_id == 'd' and len(offsets) == 1:
+                        # The changes of the first batch are committed
+                        # with it (e.g. before the worker is killed).
+                        committed_changes.extend(
+                            Change.objects.filter(kind=Change.ALBUM)
+                            .order_by('object_id')
+                            .values_list('object_id', flat=True)
+                        )
+                        raise SpotifyAPIError('Read timed out.')
+
+                    yield make_album_info(album_id, [album_id])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                artist_calls.append(ids)
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = FlakyAPI()
+
+        with pytest.raises(SpotifyAPIError):
+            sp_man.update_new_releases_in_db(batch_size=2)
+
+        run: SyncRun = SyncRun.objects.get()
+
+        assert (run.status, run.offset) == (SyncRun.FAILED, 2)
+        assert committed_changes == ['a', 'b']
+        assert list(
+            run.albums.order_by('position').values_list(
+                'position', 'album_id'
+            )
+        ) == [(0, 'a'), (1, 'b')]
+        assert not ReleaseAppearance.objects.exists()
+
+        # The run of another source is not resumed.
+        assert sp_man._start_run(None, True, source=SyncRun.IMPORT) != run
+
+        albums: list[Album] = sp_man.update_new_releases_in_db(batch_size=2)
+        run.refresh_from_db()
+
+        # The committed albums are listed again to check them, only
+        # the albums after the last committed batch are synced again.
+        assert offsets == [0, 0]
+        assert artist_calls == [['a', 'b'], ['c', 'd'], ['e']]
+        assert [album.album_id for album in albums] == album_ids
+        assert (run.status, run.offset, run.attempts) == (
+            SyncRun.COMPLETED,
+            5,
+            2,
+        )
+        assert run.artist_batches == 3
+        assert list(
+            ReleaseAppearance.objects.order_by('position').values_list(
+                'position', 'album_id'
+            )
+        ) == list(enumerate(album_ids, start=1))
+
+        # A completed run is not resumed.
+        sp_man.update_new_releases_in_db(batch_size=2)
+
+        assert offsets == [0, 0, 0]
+        assert SyncRun.objects.filter(source=SyncRun.SPOTIFY).count() == 2
+
+    def test_update_new_releases_in_db_resume_changed(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        album_ids: list[str] = ['a', 'b', 'c']
+        attempts: list[int] = []
+
+        class FlakyAPI:
+            def get_new_releases(self, offset: int = 0) -> Iterator[dict]:
+                for album_id in album_ids[offset:]:
+                    yield make_album_info(album_id, [album_id])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = FlakyAPI()
+        checkpoint: Callable[..., None] = sp_man._checkpoint
+
+        def flaky_checkpoint(run: SyncRun, *args: Any) -> None:
+            # The first attempt fails in the second batch.
+            if run.offset == 2 and not attempts:
+                attempts.append(1)
+                raise SpotifyAPIError('Read timed out.')
+
+            checkpoint(run, *args)
+
+        sp_man._checkpoint = flaky_checkpoint
+
+        with pytest.raises(SpotifyAPIError):
+            sp_man.update_new_releases_in_db(batch_size=2)
+
+        # A new release is listed before the committed ones.
+        album_ids.insert(0, 'd')
+        albums: list[Album] = sp_man.update_new_releases_in_db(batch_size=2)
+        run: SyncRun = SyncRun.objects.get()
+
+        # The run restarts from the first album: none is skipped.
+        assert [album.album_id for album in albums] == ['d', 'a', 'b', 'c']
+        assert (run.status, run.offset) == (SyncRun.COMPLETED, 4)
+        assert list(
+            ReleaseAppearance.objects.order_by('position').values_list(
+                'album_id', flat=True
+            )
+        ) == ['d', 'a', 'b', 'c']
+
+    def test__store_releases(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        album_infos: list[dict[str, Any]] = [
+            make_album_info('a', ['x', 'y']),
+            make_album_info('b', ['y']),
+        ]
+        album_infos[0]['images'] = [
+            {'width': 64, 'height': 64, 'url': 'https://a.test/64'}
+        ]
+
+        for artist_id in ('x', 'y'):
+            sp_man._artist_infos[artist_id] = make_artist_info(artist_id)
+            sp_man._artist_infos[artist_id]['external_urls'] = {
+                'spotify': f'https://{artist_id}.test'
+            }
+
+        create_album('b')
+        albums: list[Album] = sp_man._store_releases(album_infos)
+        # Storing the albums again creates nothing.
+        sp_man._artists.clear()
+        sp_man._store_releases(album_infos)
+
+        assert [album.album_id for album in albums] == ['a', 'b']
+        assert list(
+            Album.objects.get(album_id='a').artists.values_list(
+                'artist_id', flat=True
+            )
+        ) == ['x', 'y']
+        assert Album.objects.get(album_id='b').artists.count() == 1
+        assert Album.objects.get(album_id='b').available_markets.count() == 2
+        assert Artist.objects.get(artist_id='x').genres.count() == 1
+        assert ArtistExternalURL.objects.count() == 2
+        assert AlbumImageURL.objects.count() == 1
+
+    def test_update_new_releases_sharded(
+        self, monkeypatch: MonkeyPatch
+    ) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        releases: dict[str, list[str]] = {
+            'FR': ['a', 'b', 'c'],
+            'US': ['c', 'd'],
+        }
+        requests: list[tuple[str, int]] = []
+
+        class FlakyAPI:
+            def get_new_releases_total(self, country: str) -> int:
+                return len(releases[country])
+
+            def get_new_releases(
+                self, country: str, offset: int = 0
+            ) -> Iterator[dict]:
+                requests.append((country, offset))
+
+                # The first attempt of the last shard of FR fails.
+                if requests.count(('FR', 2)) == 1 and offset == 2:
+                    raise SpotifyAPIError('Read timed out.')
+
+                for album_id in releases[country][offset:]:
+                    yield make_album_info(album_id, ['x', album_id])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = FlakyAPI()
+        monkeypatch.setattr(SpotifyAPI, 'PAGE_SIZE', 1)
+
+        with pytest.raises(SpotifyAPIError):
+            sp_man.update_new_releases_sharded(
+                shard_size=2, countries=['FR', 'US']
+            )
+
+        run: SyncRun = SyncRun.objects.get()
+
+        assert run.status == SyncRun.FAILED
+        assert list(
+            run.shards.order_by('shard_id').values_list(
+                'country_code', 'start', 'end', 'status'
+            )
+        ) == [
+            ('FR', 0, 2, SyncShard.DONE),
+            ('FR', 2, 3, SyncShard.FAILED),
+            ('US', 0, 2, SyncShard.DONE),
+        ]
+        assert not ReleaseAppearance.objects.exists()
+
+        albums: list[Album] = sp_man.update_new_releases_sharded(
+            shard_size=2, countries=['FR', 'US']
+        )
+        run.refresh_from_db()
+
+        # Only the failed shard is synced again.
+        assert requests == [('FR', 0), ('FR', 2), ('US', 0), ('FR', 2)]
+        assert [album.album_id for album in albums] == ['a', 'b', 'c', 'd']
+        assert (run.status, run.offset, run.attempts) == (
+            SyncRun.COMPLETED,
+            4,
+            2,
+        )
+        assert Artist.objects.count() == 5
+        assert list(
+            ReleaseAppearance.objects.order_by(
+                'country_code', 'position'
+            ).values_list('country_code', 'position', 'album_id')
+        ) == [
+            ('FR', 1, 'a'),
+            ('FR', 2, 'b'),
+            ('FR', 3, 'c'),
+            ('US', 1, 'c'),
+            ('US', 2, 'd'),
+        ]
+
+    def test_sync_shards_lost_lease(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        run: SyncRun = SyncRun.objects.create(date=timezone.now().date())
+        shard: SyncShard = SyncShard.objects.create(run=run, start=0, end=1)
+
+        class SlowAPI:
+            def get_new_releases(
+                self, country: str, offset: int = 0
+            ) -> Iterator[dict]:
+                # The lease expires and another worker leases the shard.
+                SyncShard.objects.filter(pk=shard.pk).update(worker='other')
+                yield make_album_info('a', ['x'])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = SlowAPI()
+
+        assert sp_man.sync_shards(run, 'worker') == 0
+
+        shard.refresh_from_db()
+
+        assert (shard.status, shard.worker) == (SyncShard.LEASED, 'other')
+        assert not Album.objects.exists()
+        assert not run.albums.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sync_shards_after_rollback(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        run: SyncRun = SyncRun.objects.create(date=timezone.now().date())
+        shard: SyncShard = SyncShard.objects.create(run=run, start=0, end=1)
+        SyncShard.objects.create(run=run, start=1, end=2)
+
+        class SlowAPI:
+            def get_new_releases(
+                self, country: str, offset: int = 0
+            ) -> Iterator[dict]:
+                # The lease of the first shard is lost.
+                if offset == 0:
+                    SyncShard.objects.filter(pk=shard.pk).update(
+                        worker='other'
+                    )
+
+                yield make_album_info(f'album{offset}', ['x'])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = SlowAPI()
+
+        # The artist, genre and market of the rolled back shard
+        # are stored again by the next one.
+        assert sp_man.sync_shards(run, 'worker') == 1
+        assert list(Album.objects.values_list('album_id', flat=True)) == [
+            'album1'
+        ]
+        assert Artist.objects.get(artist_id='x').genres.count() == 1
+        assert Album.objects.get().available_markets.count() == 2
+
+    def test_update_new_releases_sharded_processes(
+        self, monkeypatch: MonkeyPatch
+    ) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        sp_man.auth.token = Token('ACCESS_TOKEN', 'Bearer', 3600, '', '')
+        run: SyncRun = SyncRun.objects.create(date=timezone.now().date())
+        SyncShard.objects.create(
+            run=run, start=0, end=1, status=SyncShard.DONE
+        )
+        executor: Mock = Mock()
+        executor.return_value.__enter__ = Mock(
+            return_value=executor.return_value
+        )
+        executor.return_value.__exit__ = Mock(return_value=False)
+        executor.return_value.map.return_value = iter([1, 0])
+        monkeypatch.setattr(manager_lib, 'ProcessPoolExecutor', executor)
+        monkeypatch.setattr(sp_man, 'plan_shards', Mock(return_value=run))
+        monkeypatch.setattr(
+            sp_man, 'finish_sharded_run', Mock(return_value=[])
+        )
+        sp_man.update_new_releases_sharded(processes=2)
+        kwargs: dict[str, Any] = executor.call_args.kwargs
+        args: tuple = executor.return_value.map.call_args.args
+
+        # The workers are spawned, each one setting Django up.
+        assert kwargs['max_workers'] == 2
+        assert kwargs['mp_context'].get_start_method() == 'spawn'
+        assert kwargs['initializer'] is django.setup
+        assert args[0] is manager_lib.sync_shards_in_process
+        assert args[1] == [run.run_id] * 2
+        assert args[2] == [sp_man.auth.token] * 2
+        assert [worker[-2:] for worker in args[3]] == ['/0', '/1']
+        assert args[4] == [SpotifyAPI.RATE_LIMIT / 2] * 2
+
+    def test__lease_shard(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        run: SyncRun = SyncRun.objects.create(date=timezone.now().date())
+        SyncShard.objects.create(run=run, start=0, end=20)
+        shard: SyncShard = sp_man._lease_shard(run, 'worker-1')
+
+        assert (shard.status, shard.worker, shard.attempts) == (
+            SyncShard.LEASED,
+            'worker-1',
+            1,
+        )
+        # The shard is leased by a single worker at once.
+        assert sp_man._lease_shard(run, 'worker-2') is None
+
+        # An expired lease (e.g. of a killed worker) is taken over.
+        SyncShard.objects.update(
+            leased_until=timezone.now() - datetime.timedelta(seconds=1)
+        )
+        shard = sp_man._lease_shard(run, 'worker-2')
+
+        assert (shard.worker, shard.attempts) == ('worker-2', 2)
+
+    def test__start_run_all_markets(self) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        run: SyncRun = sp_man._start_run(ALL_MARKETS, True)
+        run.refresh_from_db()
+
+        assert len(run.markets) > 255
+        assert run.markets.split(',') == sorted(ALL_MARKETS)
+        assert len(run.markets_key) == 64
+
+        # The same markets, in any order, resume the run.
+        assert sp_man._start_run(ALL_MARKETS[::-1], True) == run
+        assert sp_man._start_run(ALL_MARKETS[1:], True) != run
+
+    def test_get_today_new_releases(self, monkeypatch: MonkeyPatch) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        update: Mock = Mock(return_value=[])
+        monkeypatch.setattr(sp_man, 'update_new_releases_in_db', update)
+        # The albums stored by a failed sync are not served.
+        album: Album = create_album('a')
+        Album.objects.update(last_checked_date=timezone.now())
+        SyncRun.objects.create(
+            date=timezone.now().date(),
+            markets_key=sp_man._get_markets(None)[1],
+            status=SyncRun.FAILED,
+            offset=1,
+        )
+
+        assert sp_man.get_today_new_releases() == []
+        update.assert_called_once_with(countries=None)
+
+        SyncRun.objects.update(status=SyncRun.COMPLETED)
+        ReleaseAppearance.objects.create(
+            date=timezone.now().date(), position=1, album=album
+        )
+
+        assert sp_man.get_today_new_releases() == [album]
+        assert update.call_count == 1
+
+    def test_get_today_new_releases_all_markets(
+        self, monkeypatch: MonkeyPatch
+    ) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        syncs: list[int] = []
+
+        class FakeAPI:
+            def get_new_releases(self, offset: int = 0) -> Iterator[dict]:
+                syncs.append(offset)
+
+                for album_id in ['b', 'a']:
+                    yield make_album_info(album_id, [album_id])
+
+            def get_several_artists(self, ids: list[str]) -> list[dict]:
+                return [make_artist_info(artist_id) for artist_id in ids]
+
+        sp_man.api = FakeAPI()
+        # No market stored yet: Spotify's default selection is synced.
+        albums: list[Album] = sp_man.get_today_new_releases(
+            [SpotifyManager.ALL_MARKETS]
+        )
+
+        assert [album.album_id for album in albums] == ['b', 'a']
+        assert SyncRun.objects.get().markets == ''
+
+        # The markets stored by the sync don't start another one.
+        assert Market.objects.count() == 2
+        albums = sp_man.get_today_new_releases([SpotifyManager.ALL_MARKETS])
+
+        assert [album.album_id for album in albums] == ['b', 'a']
+        assert syncs == [0]
+
+        # Unavailable the next day: the last sync's markets are served.
+        SyncRun.objects.update(date=datetime.date(2021, 8, 1))
+        ReleaseAppearance.objects.update(date=datetime.date(2021, 8, 1))
+        monkeypatch.setattr(
+            sp_man,
+            'update_new_releases_in_db',
+            Mock(side_effect=SpotifyAPIError()),
+        )
+        monkeypatch.setattr(sp_man, '_refresh_in_background', Mock())
+        albums = sp_man.get_today_new_releases([SpotifyManager.ALL_MARKETS])
+
+        assert [album.album_id for album in albums] == ['b', 'a']
+        assert sp_man.snapshot_date == datetime.date(2021, 8, 1)
+
+    def test_get_today_new_releases_stale(
+        self, monkeypatch: MonkeyPatch
+    ) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        refreshes: Mock = Mock()
+
+        class FailingAPI:
+            def get_new_releases(self, offset: int = 0) -> Iterator[dict]:
+                raise CircuitOpenError('Unavailable.', retry_after=30)
+
+        sp_man.api = FailingAPI()
+        monkeypatch.setattr(sp_man, '_refresh_in_background', refreshes)
+
+        # Never synced: nothing to serve instead.
+        with pytest.raises(SpotifyAPIError):
+            sp_man.get_today_new_releases()
+
+        refreshes.assert_not_called()
+        album: Album = create_album('a')
+        ReleaseAppearance.objects.create(
+            date=datetime.date(2021, 8, 1), position=1, album=album
+        )
+
+        assert sp_man.get_today_new_releases() == [album]
+        assert sp_man.snapshot_date == datetime.date(2021, 8, 1)
+        refreshes.assert_called_once_with(None)
+
+        # The last sync of the other markets is not served.
+        ReleaseAppearance.objects.create(
+            date=datetime.date(2021, 8, 2),
+            country_code='FR',
+            position=1,
+            album=create_album('b'),
+        )
+
+        assert sp_man.get_today_new_releases() == [album]
+        assert sp_man.snapshot_date == datetime.date(2021, 8, 1)
+
+    def test__refresh(self, monkeypatch: MonkeyPatch) -> None:
+        token: Token = Token('access_token', 'Bearer', 3600, '', '')
+        managers: list[SpotifyManager] = []
+
+        def update(self: SpotifyManager, countries: list[str]) -> list:
+            managers.append(self)
+
+            if len(managers) == 1:
+                raise SpotifyAPIError()
+
+            return []
+
+        monkeypatch.setattr(time, 'sleep', Mock())
+        monkeypatch.setattr(
+            SpotifyManager, 'update_new_releases_in_db', update
+        )
+        # The connections of the background thread are closed.
+        monkeypatch.setattr(connections, 'close_all', Mock())
+        SpotifyManager._refresh_lock.acquire()
+        SpotifyManager._refresh(['FR'], token)
+
+        assert len(managers) == 2
+        # A manager of the thread's own, with the token of the request.
+        assert managers[0] is managers[1]
+        assert managers[0].auth.token is token
+        assert not SpotifyManager._refresh_lock.locked()
+
+    def test__refresh_in_background(self, monkeypatch: MonkeyPatch) -> None:
+        sp_man: SpotifyManager = SpotifyManager(
+            'client_id', 'client_secret', ['scope'], 'http://redirect.test'
+        )
+        sp_man.auth.token = Token('access_token', 'Bearer', 3600, '', '')
+        refresh: Mock = Mock()
+        monkeypatch.setattr(SpotifyManager, '_refresh', refresh)
+        threads: list[Mock] = []
+        monkeypatch.setattr(
+            manager_lib.threading,
+            'Thread',
+            lambda **kwargs: threads.append(Mock(**kwargs)) or threads[-1],
+        )
+        sp_man._refresh_in_background(['FR'])
+        # A single background refresh per process.
+        sp_man._refresh_in_background(['FR'])
+        SpotifyManager._refresh_lock.release()
+
+        assert len(threads) == 1
+        assert threads[0].start.called
+        countries, token = threads[0].args
+        assert countries == ['FR']
+        assert token is not sp_man.auth.token
+        assert token.access_token == 'access_token'
@@ -0,0 +1,86 @@
+import json
+from typing import Any
+import pytest
+from api.libs.spotify.streaming import JSONItemStream
+
+PAGE: dict[str, Any] = {
+    'albums': {
+        'href': 'https://api.spotify.com/v1/browse/new-releases',
+        'items': [
+            {
+                'id': 'a1',
+                'name': 'Été 1985 ♪',
+                'total_tracks': 12,
+                'artists': [{'id': 'x', 'name': 'X'}],
+            },
+            {'id': 'a2', 'name': '"Quoted" \\ name', 'total_tracks': 1},
+        ],
+        'limit': 20,
+        'next': None,
+        'offset': 0,
+        'total': 2,
+    }
+}
+
+
+def chunk(body: bytes, size: int) -> list[bytes]:
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class TestJSONItemStream:
+    @pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 4096])
+    @pytest.mark.parametrize('indent', [None, 2])
+    def test_iter(self, size: int, indent: Any) -> None:
+        body: bytes = json.dumps(
+            PAGE, indent=indent, ensure_ascii=False
+        ).encode()
+        stream: JSONItemStream = JSONItemStream(
+            chunk(body, size), ('albums', 'items')
+        )
+
+        assert list(stream) == PAGE['albums']['items']
+        # The metadata following the items is parsed.
+        assert stream.document == {'albums': {**PAGE['albums'], 'items': []}}
+
+    def test_iter_skip(self) -> None:
+        stream: JSONItemStream = JSONItemStream(
+            [json.dumps(PAGE).encode()],
+            ('albums', 'items'),
+            skip=('total_tracks', 'unknown'),
+        )
+
+        assert [sorted(item) for item in stream] == [
+            ['artists', 'id', 'name'],
+            ['id', 'name'],
+        ]
+
+    def test_iter_numbers(self) -> None:
+        # A number split between two chunks is not cut.
+        stream: JSONItemStream = JSONItemStream(
+            [b'{"items": [12', b'34, 5', b'6], "total": 1', b'0}'],
+            ('items',),
+        )
+
+        assert list(stream) == [1234, 56]
+        assert stream.document == {'items': [], 'total': 10}
+
+    def test_iter_empty(self) -> None:
+        stream: JSONItemStream = JSONItemStream(
+            [b'{"albums": {"items": [ ], "total": 0}}'], ('albums', 'items')
+        )
+
+        assert list(stream) == []
+        assert stream.document == {'albums': {'items': [], 'total': 0}}
+
+    @pytest.mark.parametrize(
+        'body',
+        [
+            b'{"albums": {"items": [{"id": "a1"}',
+            b'{"albums": {"items": [{"id": "a1"}]}} []',
+            b'{"albums": {"items": {"id": "a1"}}}',
+            b'[]',
+        ],
+    )
+    def test_iter_invalid(self, body: bytes) -> None:
+        with pytest.raises(ValueError):
+            list(JSONItemStream(chunk(body, 5), ('albums', 'items')))
@@ -0,0 +1,194 @@
+import gzip
+import io
+import json
+from typing import Any
+from unittest.mock import Mock
+import pytest
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from django.core.management import call_command
+from api.libs.spotify import transport as transport_lib
+from api.libs.spotify.auth import Auth, Token
+from api.libs.spotify.spotify_api import RateLimiter, SpotifyAPI
+from api.libs.spotify.spotify_manager import SpotifyManager
+from api.libs.spotify.transport import (
+    CassetteError,
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+)
+from api.models import Album
+from api.tests.spotify.unit.test_offline_api import make_album, make_artist
+
+ALBUMS: list[dict[str, Any]] = [
+    make_album('a', ['x', 'y']),
+    make_album('b', ['y']),
+    make_album('c', ['z']),
+]
+
+
+class FakeResponse:
+    def __init__(self, payload: Any, status_code: int = 200) -> None:
+        self.status_code: int = status_code
+        self.headers: dict[str, str] = {'Content-Type': 'application/json'}
+        self.content: bytes = json.dumps(payload).encode()
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+def fake_get(url: str, params: dict[str, Any], **kwargs: Any) -> Any:
+    if url.endswith('browse/new-releases'):
+        offset: int = params['offset']
+
+        return FakeResponse(
+            {
+                'albums': {
+                    'items': ALBUMS[offset : offset + 2],
+                    'total': len(ALBUMS),
+                    'offset': offset,
+                    'limit': 2,
+                }
+            }
+        )
+
+    return FakeResponse(
+        {'artists': [make_artist(id) for id in params['ids'].split(',')]}
+    )
+
+
+def sync(transport: Transport) -> list[Album]:
+    sp_man: SpotifyManager = SpotifyManager(
+        client_id='CLIENT_ID',
+        client_secret='CLIENT_SECRET',
+        scope=['user-read-private'],
+        redirect_uri='http://localhost:8000/auth/callback/',
+        transport=transport,
+    )
+    sp_man.auth.token = Token('ACCESS_TOKEN', 'Bearer', 3600, '', '')
+
+    return sp_man.update_new_releases_in_db()
+
+
+@pytest.fixture
+def cassette(tmp_path: Any, monkeypatch: MonkeyPatch) -> str:
+    path: str = str(tmp_path / 'sync.ndjson.gz')
+    recorder: RecordingTransport = RecordingTransport(path)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(requests, 'get', fake_get)
+        sync(recorder)
+
+    assert recorder.save() == 3
+    # No network access from now on.
+    monkeypatch.setattr(requests, 'get', Mock(side_effect=AssertionError))
+
+    return path
+
+
+@pytest.mark.django_db
+class TestTransport:
+    def test_record(self, cassette: str) -> None:
+        with gzip.open(cassette, 'rt') as file:
+            exchanges: list[dict[str, Any]] = [
+                json.loads(line) for line in file
+            ]
+
+        assert [exchange['params'] for exchange in exchanges] == [
+            {'limit': '20', 'offset': '0'},
+            {'limit': '20', 'offset': '2'},
+            {'ids': 'x,y,z'},
+        ]
+        assert exchanges[0]['status'] == 200
+        assert exchanges[0]['headers'] == {'Content-Type': 'application/json'}
+        assert json.loads(exchanges[2]['body'])['artists'][0]['id'] == 'x'
+
+    def test_replay(self, cassette: str) -> None:
+        Album.objects.all().delete()
+        replay: ReplayTransport = ReplayTransport(cassette, speed=float('inf'))
+        albums: list[Album] = sync(replay)
+
+        assert sorted(album.album_id for album in albums) == ['a', 'b', 'c']
+        assert replay.remaining == 0
+
+        with pytest.raises(CassetteError):
+            sync(replay)
+
+    def test_replay_latency(
+        self, cassette: str, monkeypatch: MonkeyPatch
+    ) -> None:
+        sleep: Mock = Mock()
+        monkeypatch.setattr(transport_lib.time, 'sleep', sleep)
+        monkeypatch.setattr(
+            SpotifyAPI, '_rate_limiter', RateLimiter(float('inf'), 20)
+        )
+        sync(ReplayTransport(cassette, latency=0.5, speed=10))
+
+        assert [call[0][0] for call in sleep.call_args_list] == [
+            pytest.approx(0.05)
+        ] * 3
+
+    def test_replay_error(self, tmp_path: Any) -> None:
+        path: str = str(tmp_path / 'error.ndjson.gz')
+        failing: Transport = Mock(
+            get=Mock(side_effect=requests.Timeout('Read timed out.'))
+        )
+        recorder: RecordingTransport = RecordingTransport(path, failing)
+
+        with pytest.raises(requests.Timeout):
+            recorder.get('https://url.test', params={'q': 1})
+
+        recorder.save()
+
+        with pytest.raises(requests.Timeout, match='Read timed out.'):
+            ReplayTransport(path, latency=0).get(
+                'https://url.test', params={'q': '1'}
+            )
+
+    def test_record_token(
+        self, tmp_path: Any, spotify_auth: Auth, monkeypatch: MonkeyPatch
+    ) -> None:
+        path: str = str(tmp_path / 'token.ndjson.gz')
+        post: Mock = Mock(
+            return_value=FakeResponse(
+                {
+                    'access_token': 'SECRET',
+                    'token_type': 'Bearer',
+                    'expires_in': 3600,
+                    'refresh_token': 'SECRET',
+                    'scope': 'user-read-private',
+                }
+            )
+        )
+        monkeypatch.setattr(requests, 'post', post)
+        spotify_auth.transport = RecordingTransport(path)
+        spotify_auth.get_token(code='CODE')
+        spotify_auth.transport.save()
+
+        with gzip.open(path, 'rt') as file:
+            assert 'SECRET' not in file.read()
+
+        spotify_auth.transport = ReplayTransport(path, latency=0)
+        token: Token = spotify_auth.get_token(code='OTHER_CODE')
+
+        assert token.access_token == transport_lib.REDACTED
+        assert token.expires_in == 3600
+
+    @pytest.mark.parametrize('options', [[], ['--stream']])
+    def test_command(self, options: list[str], cassette: str) -> None:
+        stdout: io.StringIO = io.StringIO()
+        call_command(
+            'sync_releases',
+            '--replay',
+            cassette,
+            '--speed',
+            'inf',
+            *options,
+            stdout=stdout,
+        )
+
+        assert '3 albums synced' in stdout.getvalue()
+        assert Album.objects.count() == 3
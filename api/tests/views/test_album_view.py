@@ -0,0 +1,118 @@
+import datetime
+import json
+import pytest
+from django.test import Client
+from api.models import Album, AlbumImageURL, Artist, Market
+
+
+def create_album(
+    album_id: str, release_date: datetime.date, album_type: str = 'album'
+) -> Album:
+    album: Album = Album.objects.create(
+        album_id=album_id,
+        album_type=album_type,
+        name=album_id.upper(),
+        release_date=release_date,
+        last_checked_date=release_date,
+        release_date_precision='day',
+        object_type='album',
+        uri='uri',
+        href='https://url.test',
+    )
+    AlbumImageURL.objects.create(
+        width=64, height=64, url=f'https://{album_id}.test', album=album
+    )
+
+    return album
+
+
+@pytest.fixture
+def albums() -> list[Album]:
+    artist: Artist = Artist.objects.create(
+        artist_id='artist',
+        name='Artist',
+        followers=0,
+        popularity=0,
+        href='https://url.test',
+        artist_type='artist',
+        uri='uri',
+    )
+    fr: Market = Market.objects.create(country_code='FR')
+    albums: list[Album] = [
+        create_album(f'album{day}', datetime.date(2021, 8, day))
+        for day in range(1, 6)
+    ]
+    albums.append(create_album('single', datetime.date(2021, 8, 3), 'single'))
+
+    for album in albums[:3]:
+        album.artists.add(artist)
+        album.available_markets.add(fr)
+
+    return albums
+
+
+@pytest.mark.django_db
+class TestAlbumView:
+    def test_get(
+        self, client: Client, albums: list[Album], django_assert_num_queries
+    ) -> None:
+        # The albums, their artists and their images.
+        with django_assert_num_queries(3):
+            response = client.get('/api/albums/', {'limit': 2})
+
+        content: dict = json.loads(response.content)
+
+        assert response.status_code == 200
+        assert [album['album_id'] for album in content['albums']] == [
+            'album5',
+            'album4',
+        ]
+        assert content['albums'][0]['image_urls'][0]['url'] == (
+            'https://album5.test'
+        )
+        assert content['next'] == '2021-08-04,album4'
+
+        response = client.get(
+            '/api/albums/', {'limit': 2, 'cursor': content['next']}
+        )
+        content = json.loads(response.content)
+
+        assert [album['album_id'] for album in content['albums']] == [
+            'single',
+            'album3',
+        ]
+
+    @pytest.mark.parametrize(
+        'params, expected',
+        [
+            ({'market': 'fr'}, ['album3', 'album2', 'album1']),
+            (
+                {'from': '2021-08-02', 'to': '2021-08-03'},
+                ['single', 'album3', 'album2'],
+            ),
+            ({'album_type': 'single'}, ['single']),
+            ({'artist': 'artist', 'to': '2021-08-02'}, ['album2', 'album1']),
+        ],
+    )
+    def test_get_filters(
+        self,
+        client: Client,
+        albums: list[Album],
+        params: dict[str, str],
+        expected: list[str],
+    ) -> None:
+        response = client.get('/api/albums/', params)
+        content: dict = json.loads(response.content)
+
+        assert [album['album_id'] for album in content['albums']] == expected
+        assert content['next'] is None
+
+    @pytest.mark.parametrize(
+        'params', [{'limit': '0'}, {'cursor': 'abc'}, {'from': 'abc'}]
+    )
+    def test_get_invalid_params(
+        self, client: Client, params: dict[str, str]
+    ) -> None:
+        response = client.get('/api/albums/', params)
+
+        assert response.status_code == 400
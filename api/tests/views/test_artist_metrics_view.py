@@ -0,0 +1,54 @@
+import datetime
+import json
+import pytest
+from django.test import Client
+from api.libs.metrics import record_metrics
+from api.models import Artist
+
+
+@pytest.mark.django_db
+class TestArtistMetricsView:
+    def test_get(self, client: Client) -> None:
+        artist: Artist = Artist.objects.create(
+            artist_id='a',
+            name='A',
+            followers=10,
+            popularity=50,
+            href='https://url.test',
+            artist_type='artist',
+            uri='uri',
+        )
+        record_metrics([artist], datetime.date(2021, 8, 1))
+        artist.followers = 12
+        record_metrics([artist], datetime.date(2021, 8, 2))
+        response = client.get(
+            '/api/artists/metrics/',
+            {'ids': 'a,b', 'from': '2021-08-01', 'to': '2021-08-31'},
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            'series': {
+                'a': {
+                    'dates': ['2021-08-01', '2021-08-02'],
+                    'followers': [10, 12],
+                    'popularity': [50, 50],
+                },
+                'b': {'dates': [], 'followers': [], 'popularity': []},
+            }
+        }
+
+    @pytest.mark.parametrize(
+        'params',
+        [
+            {},
+            {'ids': 'a', 'resolution': 'hour'},
+            {'ids': 'a', 'from': '2021-08-02', 'to': '2021-08-01'},
+        ],
+    )
+    def test_get_invalid_params(
+        self, client: Client, params: dict[str, str]
+    ) -> None:
+        response = client.get('/api/artists/metrics/', params)
+
+        assert response.status_code == 400
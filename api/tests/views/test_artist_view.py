@@ -0,0 +1,164 @@
+import asyncio
+import datetime
+import gzip
+import json
+import threading
+from typing import Any
+import pytest
+from asgiref.sync import async_to_sync
+from _pytest.monkeypatch import MonkeyPatch
+from django.contrib.auth import login
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from api import views
+from api.libs.spotify.spotify_api import CircuitOpenError
+from api.views import AsyncArtistView
+from user.models import User
+
+
+async def get(request: HttpRequest) -> HttpResponse:
+    return await AsyncArtistView.as_view()(request)
+
+
+@pytest.fixture
+def user() -> User:
+    return User.objects.create_or_update_user(
+        email='user@test.com',
+        access_token='ACCESS_TOKEN',
+        token_type='Bearer',
+        scope='user-read-private',
+        expires_in=3600,
+        refresh_token='REFRESH_TOKEN',
+    )
+
+
+@pytest.mark.django_db
+class TestAsyncArtistView:
+    def test_as_view(self) -> None:
+        assert asyncio.iscoroutinefunction(AsyncArtistView.as_view())
+
+    def test_get(self, user: User, monkeypatch: MonkeyPatch) -> None:
+        artists: list[dict[str, Any]] = [{'artist_id': 'id'}]
+        monkeypatch.setattr(
+            views, 'get_today_artists', lambda user: (artists, None)
+        )
+        request: HttpRequest = RequestFactory().get('/api/artists/')
+        request.session = SessionStore()
+        login(request, user)
+        response: HttpResponse = async_to_sync(get)(request)
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {'artists': artists}
+
+    def test_get_thread(self, user: User, monkeypatch: MonkeyPatch) -> None:
+        threads: list[str] = []
+
+        def get_today_artists(user: User) -> tuple[list, None]:
+            threads.append(threading.current_thread().name)
+
+            return [], None
+
+        monkeypatch.setattr(views, 'get_today_artists', get_today_artists)
+        request: HttpRequest = RequestFactory().get('/api/artists/')
+        request.session = SessionStore()
+        login(request, user)
+        response: HttpResponse = async_to_sync(get)(request)
+
+        assert response.status_code == 200
+        # The sync runs in the Spotify client pool, not on the thread
+        # serializing the ORM calls.
+        assert threads[0].startswith('spotify')
+
+    def test_get_stale(self, user: User, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setattr(
+            views,
+            'get_today_artists',
+            lambda user: ([], datetime.date(2021, 8, 1)),
+        )
+        request: HttpRequest = RequestFactory().get('/api/artists/')
+        request.session = SessionStore()
+        login(request, user)
+        response: HttpResponse = async_to_sync(get)(request)
+
+        assert response.status_code == 200
+        assert response['Warning'] == '110 - "Response is Stale"'
+        assert response['X-Snapshot-Date'] == '2021-08-01'
+
+    def test_get_unavailable(
+        self, user: User, monkeypatch: MonkeyPatch
+    ) -> None:
+        def get_today_artists(user: User) -> None:
+            raise CircuitOpenError('Unavailable.', retry_after=12.5)
+
+        monkeypatch.setattr(views, 'get_today_artists', get_today_artists)
+        request: HttpRequest = RequestFactory().get('/api/artists/')
+        request.session = SessionStore()
+        login(request, user)
+        response: HttpResponse = async_to_sync(get)(request)
+
+        assert response.status_code == 503
+        assert response['Retry-After'] == '13'
+
+    def test_get_snapshot(self, user: User, monkeypatch: MonkeyPatch) -> None:
+        calls: list[User] = []
+
+        def get_today_artists(user: User) -> tuple[list, None]:
+            calls.append(user)
+            return [{'artist_id': 'id'}], None
+
+        monkeypatch.setattr(views, 'get_today_artists', get_today_artists)
+        responses: list[HttpResponse] = []
+
+        for accept_encoding in ('gzip, deflate, br;q=0', ''):
+            request: HttpRequest = RequestFactory().get(
+                '/api/artists/', HTTP_ACCEPT_ENCODING=accept_encoding
+            )
+            request.session = SessionStore()
+            login(request, user)
+            responses.append(async_to_sync(get)(request))
+
+        # The artists are serialized and compressed once.
+        assert len(calls) == 1
+        assert responses[0]['Content-Encoding'] == 'gzip'
+        assert responses[0]['Vary'] == 'Accept-Encoding'
+        assert json.loads(gzip.decompress(responses[0].content)) == {
+            'artists': [{'artist_id': 'id'}]
+        }
+        assert not responses[1].has_header('Content-Encoding')
+        assert responses[1]['Vary'] == 'Accept-Encoding'
+        assert json.loads(responses[1].content) == {
+            'artists': [{'artist_id': 'id'}]
+        }
+
+    def test_get_stale_not_stored(
+        self, user: User, monkeypatch: MonkeyPatch
+    ) -> None:
+        calls: list[User] = []
+
+        def get_today_artists(user: User) -> tuple[list, datetime.date]:
+            calls.append(user)
+            return [], datetime.date(2021, 8, 1)
+
+        monkeypatch.setattr(views, 'get_today_artists', get_today_artists)
+
+        for _ in range(2):
+            request: HttpRequest = RequestFactory().get(
+                '/api/artists/', HTTP_ACCEPT_ENCODING='gzip'
+            )
+            request.session = SessionStore()
+            login(request, user)
+            response: HttpResponse = async_to_sync(get)(request)
+
+            assert response['Content-Encoding'] == 'gzip'
+            assert response['X-Snapshot-Date'] == '2021-08-01'
+
+        assert len(calls) == 2
+
+    def test_get_not_authenticated(self) -> None:
+        request: HttpRequest = RequestFactory().get('/api/artists/')
+        request.session = SessionStore()
+        response: HttpResponse = async_to_sync(get)(request)
+
+        assert response.status_code == 302
+        assert response.url == '/auth/'
@@ -0,0 +1,70 @@
+import json
+import pytest
+from django.test import Client
+from api.libs.changes import new_generation, record_change
+from api.models import Change
+
+
+@pytest.mark.django_db
+class TestChangeView:
+    def test_get(self, client: Client) -> None:
+        with new_generation():
+            record_change(Change.ALBUM, 'a', Change.INSERT)
+
+        response = client.get('/api/changes/')
+        content: dict = json.loads(response.content)
+
+        assert response.status_code == 200
+        assert content['changes'] == [
+            {
+                'generation': content['generation'],
+                'kind': 'album',
+                'id': 'a',
+                'action': 'insert',
+            }
+        ]
+
+        response = client.get(
+            '/api/changes/', {'since': content['generation']}
+        )
+
+        assert json.loads(response.content) == {
+            'generation': content['generation'],
+            'changes': [],
+            'next': None,
+        }
+
+    def test_get_pages(self, client: Client) -> None:
+        with new_generation():
+            for object_id in ['a', 'b', 'c']:
+                record_change(Change.ALBUM, object_id, Change.INSERT)
+
+        response = client.get('/api/changes/', {'limit': 2})
+        content: dict = json.loads(response.content)
+
+        assert [change['id'] for change in content['changes']] == ['a', 'b']
+        assert content['next'] is not None
+
+        response = client.get('/api/changes/', {'cursor': content['next']})
+        content = json.loads(response.content)
+
+        assert [change['id'] for change in content['changes']] == ['c']
+        assert content['next'] is None
+
+    @pytest.mark.parametrize(
+        'params',
+        [
+            {'since': 'abc'},
+            {'since': '-1'},
+            {'limit': '0'},
+            {'limit': 'abc'},
+            {'cursor': 'abc'},
+            {'cursor': '-1,2'},
+        ],
+    )
+    def test_get_invalid_params(
+        self, client: Client, params: dict[str, str]
+    ) -> None:
+        response = client.get('/api/changes/', params)
+
+        assert response.status_code == 400
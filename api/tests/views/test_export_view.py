@@ -0,0 +1,75 @@
+import json
+import pytest
+from django.test import Client
+from api.models import Artist
+from user.models import User
+
+
+@pytest.fixture
+def user() -> User:
+    return User.objects.create_or_update_user(
+        email='user@test.com',
+        access_token='ACCESS_TOKEN',
+        token_type='Bearer',
+        scope='user-read-private',
+        expires_in=3600,
+        refresh_token='REFRESH_TOKEN',
+    )
+
+
+@pytest.fixture
+def artists() -> None:
+    for index in range(3):
+        Artist.objects.create(
+            artist_id=f'artist{index}',
+            name=f'Artist {index}',
+            followers=0,
+            popularity=0,
+            href='https://url.test',
+            artist_type='artist',
+            uri='uri',
+        )
+
+
+@pytest.mark.django_db
+class TestExportView:
+    def test_get(self, client: Client, user: User, artists: None) -> None:
+        user.is_staff = True
+        user.save()
+        client.force_login(user)
+        response = client.get('/api/export/artists/', {'after': 'artist0'})
+        lines: list[str] = b''.join(response.streaming_content).splitlines()
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert [json.loads(line)['artist_id'] for line in lines] == [
+            'artist1',
+            'artist2',
+        ]
+
+        response = client.get('/api/export/artists/', {'format': 'csv'})
+        lines = b''.join(response.streaming_content).splitlines()
+
+        assert response['Content-Type'] == 'text/csv'
+        assert len(lines) == 4
+
+    def test_get_not_staff(self, client: Client, user: User) -> None:
+        response = client.get('/api/export/artists/')
+
+        assert response.status_code == 302
+
+        client.force_login(user)
+        response = client.get('/api/export/artists/')
+
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize(
+        'url', ['/api/export/users/', '/api/export/artists/?format=parquet']
+    )
+    def test_get_invalid(self, client: Client, user: User, url: str) -> None:
+        user.is_staff = True
+        user.save()
+        client.force_login(user)
+        response = client.get(url)
+
+        assert response.status_code == 400
@@ -0,0 +1,32 @@
+import json
+import pytest
+from django.test import Client
+from api.models import Leaderboard
+
+
+@pytest.mark.django_db
+class TestLeaderboardView:
+    def test_get(self, client: Client) -> None:
+        artists: list[dict] = [
+            {'artist_id': 'a', 'name': 'A', 'popularity': 1}
+        ]
+        Leaderboard.objects.create(
+            genre='pop', country_code='FR', artists=artists
+        )
+        response = client.get(
+            '/api/leaderboards/', {'genre': 'pop', 'market': 'fr'}
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            'genre': 'pop',
+            'market': 'FR',
+            'artists': artists,
+        }
+
+    def test_get_unknown_leaderboard(self, client: Client) -> None:
+        response = client.get(
+            '/api/leaderboards/', {'genre': 'pop', 'market': 'FR'}
+        )
+
+        assert response.status_code == 404
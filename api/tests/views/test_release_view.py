@@ -0,0 +1,154 @@
+import datetime
+import json
+import pytest
+from django.test import Client
+from api.models import Album, ReleaseAppearance
+
+
+def create_album(album_id: str) -> Album:
+    return Album.objects.create(
+        album_id=album_id,
+        album_type='album',
+        name=album_id.upper(),
+        release_date=datetime.date(2021, 8, 1),
+        last_checked_date=datetime.date(2021, 8, 1),
+        release_date_precision='day',
+        object_type='album',
+        uri='uri',
+        href='https://url.test',
+    )
+
+
+@pytest.mark.django_db
+class TestReleaseView:
+    def test_get(self, client: Client) -> None:
+        album1: Album = create_album('a')
+        album2: Album = create_album('b')
+
+        for day, albums in [(1, [album1, album2]), (2, [album2]), (3, [])]:
+            for position, album in enumerate(albums, start=1):
+                ReleaseAppearance.objects.create(
+                    date=datetime.date(2021, 8, day),
+                    position=position,
+                    album=album,
+                )
+
+        response = client.get(
+            '/api/releases/', {'from': '2021-08-01', 'to': '2021-08-02'}
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            'releases': [
+                {
+                    'date': '2021-08-01',
+                    'market': '',
+                    'position': 1,
+                    'album_id': 'a',
+                    'name': 'A',
+                },
+                {
+                    'date': '2021-08-01',
+                    'market': '',
+                    'position': 2,
+                    'album_id': 'b',
+                    'name': 'B',
+                },
+                {
+                    'date': '2021-08-02',
+                    'market': '',
+                    'position': 1,
+                    'album_id': 'b',
+                    'name': 'B',
+                },
+            ],
+            'next': None,
+        }
+
+    def test_get_pages(self, client: Client) -> None:
+        album: Album = create_album('a')
+
+        for day, country_code, position in [
+            (1, '', 1),
+            (1, 'FR', 1),
+            (1, 'FR', 2),
+            (2, '', 1),
+            (2, 'US', 1),
+        ]:
+            ReleaseAppearance.objects.create(
+                date=datetime.date(2021, 8, day),
+                country_code=country_code,
+                position=position,
+                album=album,
+            )
+
+        pages: list[list[tuple[str, str, int]]] = []
+        params: dict[str, str] = {
+            'from': '2021-08-01',
+            'to': '2021-08-02',
+            'limit': '2',
+        }
+
+        while True:
+            response = client.get('/api/releases/', params)
+            content: dict = json.loads(response.content)
+            pages.append(
+                [
+                    (
+                        release['date'][-2:],
+                        release['market'],
+                        release['position'],
+                    )
+                    for release in content['releases']
+                ]
+            )
+
+            if content['next'] is None:
+                break
+
+            params['cursor'] = content['next']
+
+        assert pages == [
+            [('01', '', 1), ('01', 'FR', 1)],
+            [('01', 'FR', 2), ('02', '', 1)],
+            [('02', 'US', 1)],
+        ]
+
+    def test_get_market(self, client: Client) -> None:
+        album: Album = create_album('a')
+
+        for position, country_code in enumerate(['', 'FR', 'US'], start=1):
+            ReleaseAppearance.objects.create(
+                date=datetime.date(2021, 8, 1),
+                country_code=country_code,
+                position=position,
+                album=album,
+            )
+
+        response = client.get(
+            '/api/releases/',
+            {'from': '2021-08-01', 'to': '2021-08-01', 'market': 'fr'},
+        )
+
+        assert [
+            (release['market'], release['position'])
+            for release in json.loads(response.content)['releases']
+        ] == [('FR', 2)]
+
+    @pytest.mark.parametrize(
+        'params',
+        [
+            {'from': 'yesterday'},
+            {'from': '2021-08-02', 'to': '2021-08-01'},
+            {'from': '2020-01-01', 'to': '2021-08-01'},
+            {'limit': '0'},
+            {'cursor': '2021-08-01,FR'},
+            {'cursor': 'abc,FR,1'},
+        ],
+    )
+    def test_get_invalid_params(
+        self, client: Client, params: dict[str, str]
+    ) -> None:
+        response = client.get('/api/releases/', params)
+
+        assert response.status_code == 400
@@ -0,0 +1,33 @@
+import json
+import pytest
+from django.test import Client
+from api.libs.search import index_documents
+from api.models import SearchDocument
+
+
+@pytest.mark.django_db
+class TestSearchView:
+    def test_get(self, client: Client) -> None:
+        index_documents(
+            SearchDocument.ARTIST,
+            {'id1': ('Daft Punk', 80), 'id2': ('Dafter', 90)},
+        )
+        response = client.get('/api/search/', {'q': 'daft', 'limit': 1})
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            'results': [
+                {
+                    'kind': 'artist',
+                    'id': 'id2',
+                    'name': 'Dafter',
+                    'popularity': 90,
+                }
+            ]
+        }
+
+    @pytest.mark.parametrize('limit', ['abc', '0'])
+    def test_get_invalid_limit(self, client: Client, limit: str) -> None:
+        response = client.get('/api/search/', {'q': 'daft', 'limit': limit})
+
+        assert response.status_code == 400
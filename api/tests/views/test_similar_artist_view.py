@@ -0,0 +1,48 @@
+import json
+import pytest
+from django.test import Client
+from api.models import Artist, SimilarArtist
+
+
+def create_artist(artist_id: str, popularity: int) -> Artist:
+    return Artist.objects.create(
+        artist_id=artist_id,
+        name=artist_id.upper(),
+        followers=0,
+        popularity=popularity,
+        href='https://url.test',
+        artist_type='artist',
+        uri='uri',
+    )
+
+
+@pytest.mark.django_db
+class TestSimilarArtistView:
+    def test_get(self, client: Client) -> None:
+        artist: Artist = create_artist('a', 10)
+        SimilarArtist.objects.create(
+            artist=artist, similar=create_artist('c', 30), score=0.5, rank=1
+        )
+        SimilarArtist.objects.create(
+            artist=artist, similar=create_artist('b', 20), score=1, rank=0
+        )
+        response = client.get('/api/artists/a/similar/')
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            'artist_id': 'a',
+            'similar_artists': [
+                {'artist_id': 'b', 'name': 'B', 'popularity': 20, 'score': 1},
+                {
+                    'artist_id': 'c',
+                    'name': 'C',
+                    'popularity': 30,
+                    'score': 0.5,
+                },
+            ],
+        }
+
+    def test_get_unknown_artist(self, client: Client) -> None:
+        response = client.get('/api/artists/unknown/similar/')
+
+        assert response.status_code == 404
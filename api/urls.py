@@ -1,7 +1,39 @@
+from django.conf import settings
 from django.urls import path
-from .views import ArtistView
+from .views import (
+    AlbumView,
+    ArtistMetricsView,
+    ArtistView,
+    AsyncArtistView,
+    ChangeView,
+    ExportView,
+    LeaderboardView,
+    ReleaseView,
+    SearchView,
+    SimilarArtistView,
+)
 
 app_name: str = 'api'
 urlpatterns = [
-    path('artists/', ArtistView.as_view(), name='artists'),
+    path('albums/', AlbumView.as_view(), name='albums'),
+    path(
+        'artists/',
+        (
+            AsyncArtistView if settings.APP_CONFIG.ASYNC_VIEWS else ArtistView
+        ).as_view(),
+        name='artists',
+    ),
+    path(
+        'artists/metrics/', ArtistMetricsView.as_view(), name='artist_metrics'
+    ),
+    path(
+        'artists/<str:artist_id>/similar/',
+        SimilarArtistView.as_view(),
+        name='similar_artists',
+    ),
+    path('changes/', ChangeView.as_view(), name='changes'),
+    path('export/<str:entity>/', ExportView.as_view(), name='export'),
+    path('leaderboards/', LeaderboardView.as_view(), name='leaderboards'),
+    path('releases/', ReleaseView.as_view(), name='releases'),
+    path('search/', SearchView.as_view(), name='search'),
 ]
@@ -1,14 +1,220 @@
 from api.models.artist_image_url import ArtistImageURL
 from api.models.artist_external_url import ArtistExternalURL
-from typing import Any
+import datetime
+import math
+from typing import Any, Optional
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http.response import JsonResponse
-from django.shortcuts import redirect
+from django.contrib.auth import get_user
+from django.http.response import (
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    StreamingHttpResponse,
+)
+from django.db.models import Q
+from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import View
+from core.codec import JsonResponse
+from core.compression import compress_variants, get_precompressed_response
+from core.compression import negotiate_encoding
+from core.views import AsyncView
 from django.http import HttpRequest, HttpResponse
-from api.libs.spotify.spotify_manager import SpotifyManager
-from api.models import Album
+from api.libs.changes import get_changes
+from api.libs.export import CSV, ENTITIES, NDJSON
+from api.libs.export import encode_chunks, iter_chunks
+from api.libs.metrics import get_series
+from api.libs.search import search
+from api.libs.snapshots import encode_artists, get_artists_snapshot
+from api.libs.snapshots import set_artists_snapshot
+from api.models import Album, Artist, ArtistMetricSeries, Leaderboard
+from api.models import Change, ReleaseAppearance, SearchDocument
+from api.models import SimilarArtist
+from user.models import User
+
+
+def get_sync_countries() -> Optional[list[str]]:
+    '''
+    Get the markets whose new releases are synced,
+    as configured by SYNC_MARKETS.
+
+    Returns:
+        Optional[list[str]]: The ISO country codes
+            (or [SpotifyManager.ALL_MARKETS], resolved by the sync),
+            or None for Spotify's default selection.
+    '''
+
+    return settings.APP_CONFIG.SYNC_MARKETS or None
+
+
+def get_today_artists(
+    user: User,
+) -> tuple[list[dict[str, Any]], Optional[datetime.date]]:
+    '''
+    Get the artists who released albums today,
+    syncing the new releases from Spotify if needed.
+    The artists of the last successful sync are returned
+    while the Spotify API is unavailable.
+
+    Args:
+        user (User): The authenticated user (owning the Spotify token).
+
+    Raises:
+        SpotifyAPIError: If the Spotify API is unavailable
+            and no sync ever succeeded.
+
+    Returns:
+        tuple[list[dict[str, Any]], Optional[datetime.date]]: The JSON
+            serializable artist list, and the date of its sync if stale.
+    '''
+
+    # The Spotify stack is imported by the first request using it,
+    # so loading the URLconf stays fast.
+    from api.libs.spotify.spotify_manager import SpotifyManager
+
+    sp_man: SpotifyManager = SpotifyManager(
+        client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
+        client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
+        scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
+        redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
+        stream=settings.APP_CONFIG.SPOTIFY_STREAM_PAGES,
+    )
+    sp_man.recover_token(user)
+    today_releases: list[Album] = sp_man.get_today_new_releases(
+        countries=get_sync_countries()
+    )
+    artists: list[dict[str, Any]] = []
+
+    for album in today_releases:
+        for artist in album.artists.all():
+            external_urls: list[ArtistExternalURL] = (
+                ArtistExternalURL.objects.filter(
+                    artist__artist_id=artist.artist_id
+                )
+            )
+            image_urls: list[ArtistImageURL] = ArtistImageURL.objects.filter(
+                artist__artist_id=artist.artist_id
+            )
+            as_dict_artist: dict[str, Any] = artist.as_dict
+            as_dict_artist['external_urls'] = []
+            as_dict_artist['image_urls'] = []
+
+            for external_url in external_urls:
+                as_dict_artist['external_urls'].append(external_url.as_dict)
+
+            for image_url in image_urls:
+                as_dict_artist['image_urls'].append(image_url.as_dict)
+
+            if not as_dict_artist in artists:
+                artists.append(as_dict_artist)
+
+    return artists, sp_man.snapshot_date
+
+
+def get_artists_response(
+    user: User, accept_encoding: str = ''
+) -> HttpResponse:
+    '''
+    Get the response of the artists views.
+    The artists of the day are serialized and compressed once, then
+    served from the snapshot in the encoding negotiated with the client.
+    The stale artists are flagged by the Warning and X-Snapshot-Date
+    headers, and the unavailability of the Spotify API (with no
+    artists to serve instead) is a 503 response.
+
+    Args:
+        user (User): The authenticated user (owning the Spotify token).
+        accept_encoding (str): The Accept-Encoding request header.
+            Default to '' (no compression).
+
+    Returns:
+        HttpResponse: A response containing the JSON serialized
+            artist list.
+    '''
+
+    from api.libs.spotify.spotify_api import SpotifyAPIError
+
+    today: datetime.date = timezone.now().date()
+    snapshot_date: Optional[datetime.date] = None
+    variants: Optional[dict[str, bytes]] = get_artists_snapshot(today)
+
+    if variants is None:
+        try:
+            artists, snapshot_date = get_today_artists(user)
+        except SpotifyAPIError as error:
+            response: HttpResponse = HttpResponse(
+                _('The Spotify API is unavailable.'), status=503
+            )
+            response['Retry-After'] = str(
+                math.ceil(getattr(error, 'retry_after', 0)) or 60
+            )
+
+            return response
+
+        if snapshot_date is None:
+            variants = set_artists_snapshot(today, artists)
+        else:
+            # The stale artists are not stored, the next requests
+            # retry the sync: only the negotiated encoding is built.
+            variants = compress_variants(
+                encode_artists(artists),
+                [negotiate_encoding(accept_encoding)],
+            )
+
+    response = get_precompressed_response(
+        variants, accept_encoding, content_type='application/json'
+    )
+
+    if snapshot_date is not None:
+        response['Warning'] = '110 - "Response is Stale"'
+        response['X-Snapshot-Date'] = snapshot_date.isoformat()
+
+    return response
+
+
+def get_date_range(
+    request: HttpRequest, max_days: int, default_days: int = 1
+) -> tuple[datetime.date, datetime.date]:
+    '''
+    Get the dates range (included) of the from and to query params,
+    in ISO format.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        max_days (int): The maximum number of days of the range.
+        default_days (int): The number of days of the range ending
+            at the to date (today by default) when from is missing.
+            Default to 1.
+
+    Raises:
+        ValueError: If a date or the range is invalid.
+
+    Returns:
+        tuple[datetime.date, datetime.date]: The first and last days.
+    '''
+
+    try:
+        to_date: datetime.date = (
+            datetime.date.fromisoformat(request.GET['to'])
+            if 'to' in request.GET
+            else timezone.now().date()
+        )
+        from_date: datetime.date = (
+            datetime.date.fromisoformat(request.GET['from'])
+            if 'from' in request.GET
+            else to_date - datetime.timedelta(days=default_days - 1)
+        )
+    except ValueError:
+        raise ValueError(_('Invalid date.'))
+
+    if from_date > to_date:
+        raise ValueError(_('Invalid date range.'))
+
+    if (to_date - from_date).days >= max_days:
+        raise ValueError(_('Date range too large.'))
+
+    return from_date, to_date
 
 
 class ArtistView(View):
@@ -34,45 +240,538 @@ class ArtistView(View):
         if request.user.token_expired:
             return redirect('user:auth_refresh_token')
 
-        sp_man: SpotifyManager = SpotifyManager(
-            client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
-            client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
-            scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
-            redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
-        )
-        sp_man.recover_token(request.user)
-        today_releases: list[Album] = sp_man.get_today_new_releases()
-        artists: list[dict[str, Any]] = []
-
-        for album in today_releases:
-            for artist in album.artists.all():
-                external_urls: list[
-                    ArtistExternalURL
-                ] = ArtistExternalURL.objects.filter(
-                    artist__artist_id=artist.artist_id
+        return get_artists_response(
+            request.user, request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+
+
+class AsyncArtistView(AsyncView):
+    '''
+    The /api/artists/ view class, served asynchronously under ASGI.
+    The database and Spotify work runs in the pool of the Spotify
+    client, each request on a database connection of its own,
+    so the event loop keeps serving the other requests meanwhile
+    and the concurrent syncs do not queue on a single thread.
+    '''
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                artist list.
+        '''
+
+        user: User = await sync_to_async(get_user)(request)
+
+        if not user.is_authenticated:
+            return redirect('user:auth')
+
+        if user.token_expired:
+            return redirect('user:auth_refresh_token')
+
+        from api.libs.spotify.async_client import AsyncSpotifyClient
+
+        return await AsyncSpotifyClient.run(
+            get_artists_response,
+            user,
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+        )
+
+
+class SearchView(View):
+    '''
+    The /api/search/ view class.
+    '''
+
+    MAX_LIMIT: int = 50
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Search the artists, albums and genres by name prefix,
+        tolerating typos, ranked by popularity.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                results.
+        '''
+
+        query: str = request.GET.get('q', '')
+        kinds: list[str] = request.GET.getlist('kind')
+
+        try:
+            limit: int = min(int(request.GET.get('limit', 10)), self.MAX_LIMIT)
+        except ValueError:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        if limit < 1:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        results: list[SearchDocument] = search(query, limit=limit, kinds=kinds)
+
+        return JsonResponse(
+            {
+                'results': [result.as_dict for result in results],
+            }
+        )
+
+
+class SimilarArtistView(View):
+    '''
+    The /api/artists/<artist_id>/similar/ view class.
+    '''
+
+    def get(self, request: HttpRequest, artist_id: str) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Serve the precomputed neighbours of the artist,
+        most similar first.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            artist_id (str): The artist ID.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                similar artist list.
+        '''
+
+        artist: Artist = get_object_or_404(Artist, artist_id=artist_id)
+        similars: list[SimilarArtist] = (
+            SimilarArtist.objects.filter(artist=artist)
+            .select_related('similar')
+            .order_by('rank')
+        )
+
+        return JsonResponse(
+            {
+                'artist_id': artist.artist_id,
+                'similar_artists': [similar.as_dict for similar in similars],
+            }
+        )
+
+
+class ReleaseView(View):
+    '''
+    The /api/releases/ view class.
+    '''
+
+    DEFAULT_LIMIT: int = 100
+    MAX_LIMIT: int = 1000
+    MAX_DAYS: int = 366
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Serve a page of the albums which appeared in the new releases
+        between two dates (included, today by default), by date, market
+        and position, in a market if the market param is given.
+        The next pages are requested with the returned cursor.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                appearance list and the next page cursor.
+        '''
+
+        try:
+            limit: int = min(
+                int(request.GET.get('limit', self.DEFAULT_LIMIT)),
+                self.MAX_LIMIT,
+            )
+        except ValueError:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        if limit < 1:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        try:
+            from_date, to_date = get_date_range(request, self.MAX_DAYS)
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+
+        appearances: Any = ReleaseAppearance.objects.filter(
+            date__gte=from_date, date__lte=to_date
+        )
+
+        if 'market' in request.GET:
+            appearances = appearances.filter(
+                country_code=request.GET['market'].upper()
+            )
+
+        if 'cursor' in request.GET:
+            try:
+                date, country_code, position = request.GET['cursor'].split(
+                    ',', 2
                 )
-                image_urls: list[
-                    ArtistImageURL
-                ] = ArtistImageURL.objects.filter(
-                    artist__artist_id=artist.artist_id
+                cursor_date: datetime.date = datetime.date.fromisoformat(date)
+                cursor_position: int = int(position)
+            except ValueError:
+                return HttpResponseBadRequest(_('Invalid cursor.'))
+
+            appearances = appearances.filter(
+                Q(date__gt=cursor_date)
+                | Q(date=cursor_date, country_code__gt=country_code)
+                | Q(
+                    date=cursor_date,
+                    country_code=country_code,
+                    position__gt=cursor_position,
                 )
-                as_dict_artist: dict[str, Any] = artist.as_dict
-                as_dict_artist['external_urls'] = []
-                as_dict_artist['image_urls'] = []
+            )
+
+        # Keyset pagination over the unique (date, market, position)
+        # index: each page is a bounded index range scan.
+        page: list[ReleaseAppearance] = list(
+            appearances.select_related('album').order_by(
+                'date', 'country_code', 'position'
+            )[: limit + 1]
+        )
+        next_cursor: Optional[str] = None
+
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = (
+                f'{page[-1].date.isoformat()},{page[-1].country_code},'
+                f'{page[-1].position}'
+            )
+
+        return JsonResponse(
+            {
+                'releases': [appearance.as_dict for appearance in page],
+                'next': next_cursor,
+            }
+        )
 
-                for external_url in external_urls:
-                    as_dict_artist['external_urls'].append(
-                        external_url.as_dict
-                    )
 
-                for image_url in image_urls:
-                    as_dict_artist['image_urls'].append(image_url.as_dict)
+class ArtistMetricsView(View):
+    '''
+    The /api/artists/metrics/ view class.
+    '''
 
-                if not as_dict_artist in artists:
-                    artists.append(as_dict_artist)
+    MAX_ARTISTS: int = 100
+    MAX_DAYS: int = 366 * 5
+    RESOLUTIONS: tuple[str, ...] = (
+        ArtistMetricSeries.DAY,
+        ArtistMetricSeries.WEEK,
+    )
 
+    def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Serve the followers and popularity series of many artists
+        between two dates (included, the last year by default),
+        the rolled up days by their weekly samples.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                series, by artist ID.
+        '''
+
+        artist_ids: list[str] = [
+            artist_id
+            for artist_id in request.GET.get('ids', '').split(',')
+            if artist_id
+        ]
+        resolution: str = request.GET.get('resolution', ArtistMetricSeries.DAY)
+
+        if not artist_ids or len(artist_ids) > self.MAX_ARTISTS:
+            return HttpResponseBadRequest(_('Invalid artist IDs.'))
+
+        if resolution not in self.RESOLUTIONS:
+            return HttpResponseBadRequest(_('Invalid resolution.'))
+
+        try:
+            from_date, to_date = get_date_range(
+                request, self.MAX_DAYS, default_days=365
+            )
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+
+        series: dict[str, list] = get_series(
+            artist_ids, from_date, to_date, resolution
+        )
+
+        # Columnar, like the storage: the charts read a column per metric.
         return JsonResponse(
             {
-                'artists': artists,
+                'series': {
+                    artist_id: {
+                        'dates': [date.isoformat() for date, _, _ in samples],
+                        'followers': [
+                            followers for _, followers, _ in samples
+                        ],
+                        'popularity': [
+                            popularity for _, _, popularity in samples
+                        ],
+                    }
+                    for artist_id, samples in series.items()
+                },
             }
         )
+
+
+class LeaderboardView(View):
+    '''
+    The /api/leaderboards/ view class.
+    '''
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Serve the precomputed most popular new artists
+        of a genre in a market.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                leaderboard.
+        '''
+
+        leaderboard: Leaderboard = get_object_or_404(
+            Leaderboard,
+            genre=request.GET.get('genre', ''),
+            country_code=request.GET.get('market', '').upper(),
+        )
+
+        return JsonResponse(leaderboard.as_dict)
+
+
+class AlbumView(View):
+    '''
+    The /api/albums/ view class.
+    '''
+
+    DEFAULT_LIMIT: int = 20
+    MAX_LIMIT: int = 100
+    MAX_DAYS: int = 366 * 100
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Serve a page of the albums, latest released first, filtered
+        by market, release dates range, album type and artist.
+        The next pages are requested with the returned cursor.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                album list and the next page cursor.
+        '''
+
+        try:
+            limit: int = min(
+                int(request.GET.get('limit', self.DEFAULT_LIMIT)),
+                self.MAX_LIMIT,
+            )
+        except ValueError:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        if limit < 1:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        albums = Album.objects.all()
+
+        if 'from' in request.GET or 'to' in request.GET:
+            try:
+                from_date, to_date = get_date_range(
+                    request, self.MAX_DAYS, default_days=self.MAX_DAYS
+                )
+            except ValueError as error:
+                return HttpResponseBadRequest(str(error))
+
+            albums = albums.filter(
+                release_date__gte=from_date, release_date__lte=to_date
+            )
+
+        if 'market' in request.GET:
+            albums = albums.filter(
+                available_markets__country_code=request.GET['market'].upper()
+            )
+
+        if 'album_type' in request.GET:
+            albums = albums.filter(album_type=request.GET['album_type'])
+
+        if 'artist' in request.GET:
+            albums = albums.filter(artists__artist_id=request.GET['artist'])
+
+        if 'cursor' in request.GET:
+            try:
+                release_date, album_id = request.GET['cursor'].split(',', 1)
+                cursor_date: datetime.date = datetime.date.fromisoformat(
+                    release_date
+                )
+            except ValueError:
+                return HttpResponseBadRequest(_('Invalid cursor.'))
+
+            albums = albums.filter(
+                Q(release_date__lt=cursor_date)
+                | Q(release_date=cursor_date, album_id__lt=album_id)
+            )
+
+        # Keyset pagination: each page is a bounded index range scan,
+        # whatever its depth.
+        page: list[Album] = list(
+            albums.order_by('-release_date', '-album_id').prefetch_related(
+                'artists', 'albumimageurl_set'
+            )[: limit + 1]
+        )
+        next_cursor: Optional[str] = None
+
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = (
+                f'{page[-1].release_date.isoformat()},{page[-1].album_id}'
+            )
+
+        return JsonResponse(
+            {
+                'albums': [album.as_dict for album in page],
+                'next': next_cursor,
+            }
+        )
+
+
+class ChangeView(View):
+    '''
+    The /api/changes/ view class.
+    '''
+
+    DEFAULT_LIMIT: int = 1000
+    MAX_LIMIT: int = 10000
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Serve a page of the artists and albums changed since a generation,
+        and the last generation (the since param of the next call,
+        once the pages are read).
+        The next pages are requested with the returned cursor.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A response containing the JSON serialized
+                change list and the next page cursor.
+        '''
+
+        try:
+            limit: int = min(
+                int(request.GET.get('limit', self.DEFAULT_LIMIT)),
+                self.MAX_LIMIT,
+            )
+        except ValueError:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        if limit < 1:
+            return HttpResponseBadRequest(_('Invalid limit.'))
+
+        after: Optional[int] = None
+
+        if 'cursor' in request.GET:
+            try:
+                since, after = map(int, request.GET['cursor'].split(',', 1))
+            except ValueError:
+                return HttpResponseBadRequest(_('Invalid cursor.'))
+        else:
+            try:
+                since = int(request.GET.get('since', 0))
+            except ValueError:
+                return HttpResponseBadRequest(_('Invalid generation.'))
+
+        if since < 0:
+            return HttpResponseBadRequest(_('Invalid generation.'))
+
+        generation, changes = get_changes(since, limit + 1, after)
+        next_cursor: Optional[str] = None
+
+        if len(changes) > limit:
+            changes = changes[:limit]
+            next_cursor = (
+                f'{changes[-1].generation_id},{changes[-1].change_id}'
+            )
+
+        return JsonResponse(
+            {
+                'generation': generation,
+                'changes': [change.as_dict for change in changes],
+                'next': next_cursor,
+            }
+        )
+
+
+class ExportView(View):
+    '''
+    The /api/export/<entity>/ view class, for the staff users.
+    '''
+
+    # The content types of the streamed formats.
+    CONTENT_TYPES: dict[str, str] = {
+        NDJSON: 'application/x-ndjson',
+        CSV: 'text/csv',
+    }
+
+    def get(self, request: HttpRequest, entity: str) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Stream the whole artists or albums catalog, chunk by chunk,
+        from the key following the after param, if any,
+        up to the until param, if any.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            entity (str): The entity (artists or albums).
+
+        Returns:
+            HttpResponse: A streaming response containing the NDJSON
+                or CSV serialized rows.
+        '''
+
+        if not request.user.is_authenticated:
+            return redirect('user:auth')
+
+        if not request.user.is_staff:
+            return HttpResponseForbidden()
+
+        if entity not in ENTITIES:
+            return HttpResponseBadRequest(_('Invalid entity.'))
+
+        format: str = request.GET.get('format', NDJSON)
+
+        if format not in self.CONTENT_TYPES:
+            return HttpResponseBadRequest(_('Invalid format.'))
+
+        response: StreamingHttpResponse = StreamingHttpResponse(
+            encode_chunks(
+                entity,
+                iter_chunks(
+                    entity,
+                    after=request.GET.get('after') or None,
+                    until=request.GET.get('until') or None,
+                ),
+                format,
+            ),
+            content_type=self.CONTENT_TYPES[format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{entity}.{format}"'
+        )
+
+        return response
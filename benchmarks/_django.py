@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR: Path = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    '''
+    Setup Django for a benchmark, on a fresh SQLite database
+    created in a temporary directory (never on the development one).
+    '''
+
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(Path(tempfile.mkdtemp()) / 'benchmark.sqlite3'),
+        }
+    }
+    django.setup()
+    call_command('migrate', verbosity=0)
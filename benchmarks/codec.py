@@ -0,0 +1,226 @@
+'''
+Measure the JSON codec time per request on realistic payloads,
+with orjson (orjson extra) and with the stdlib json module.
+
+The payloads mimic the Spotify responses decoded by the sync
+(a page of new releases, a batch of artists) and the /api/artists/
+response encoded by the views.
+
+Usage:
+    python -m benchmarks.codec [--repeat 200]
+'''
+
+import argparse
+import datetime
+import random
+import statistics
+import time
+from typing import Any, Callable
+from core import codec
+
+# The ISO codes of the markets listed by the albums.
+_MARKETS: list[str] = [
+    chr(first) + chr(second)
+    for first in range(ord('A'), ord('Z') + 1)
+    for second in range(ord('A'), ord('H'))
+][:180]
+
+
+def make_image(rand: random.Random, size: int) -> dict[str, Any]:
+    '''
+    Generate an image object.
+
+    Args:
+        rand (random.Random): The random generator.
+        size (int): The image width and height.
+
+    Returns:
+        dict[str, Any]: The image object.
+    '''
+
+    return {
+        'height': size,
+        'width': size,
+        'url': f'https://i.scdn.co/image/{rand.getrandbits(128):032x}',
+    }
+
+
+def make_artist(rand: random.Random) -> dict[str, Any]:
+    '''
+    Generate a Spotify artist object.
+
+    Args:
+        rand (random.Random): The random generator.
+
+    Returns:
+        dict[str, Any]: The artist object.
+    '''
+
+    artist_id: str = f'{rand.getrandbits(110):022x}'
+
+    return {
+        'id': artist_id,
+        'name': f'Artist {artist_id[:6]}',
+        'type': 'artist',
+        'uri': f'spotify:artist:{artist_id}',
+        'href': f'https://api.spotify.com/v1/artists/{artist_id}',
+        'external_urls': {
+            'spotify': f'https://open.spotify.com/artist/{artist_id}'
+        },
+        'followers': {'href': None, 'total': rand.randint(0, 10**7)},
+        'popularity': rand.randint(0, 100),
+        'genres': rand.sample(['pop', 'rock', 'rap', 'jazz', 'indie'], 3),
+        'images': [make_image(rand, size) for size in (640, 320, 160)],
+    }
+
+
+def make_album(rand: random.Random) -> dict[str, Any]:
+    '''
+    Generate a Spotify simplified album object.
+
+    Args:
+        rand (random.Random): The random generator.
+
+    Returns:
+        dict[str, Any]: The album object.
+    '''
+
+    album_id: str = f'{rand.getrandbits(110):022x}'
+    artists: list[dict[str, Any]] = [
+        {
+            key: value
+            for key, value in make_artist(rand).items()
+            if key in ('id', 'name', 'type', 'uri', 'href', 'external_urls')
+        }
+        for _ in range(rand.randint(1, 3))
+    ]
+
+    return {
+        'id': album_id,
+        'name': f'Album {album_id[:6]}',
+        'album_type': 'album',
+        'type': 'album',
+        'uri': f'spotify:album:{album_id}',
+        'href': f'https://api.spotify.com/v1/albums/{album_id}',
+        'external_urls': {
+            'spotify': f'https://open.spotify.com/album/{album_id}'
+        },
+        'release_date': '2021-08-01',
+        'release_date_precision': 'day',
+        'total_tracks': rand.randint(1, 20),
+        'available_markets': _MARKETS,
+        'images': [make_image(rand, size) for size in (640, 300, 64)],
+        'artists': artists,
+    }
+
+
+def make_artists_response(rand: random.Random) -> dict[str, Any]:
+    '''
+    Generate an /api/artists/ response of 100 artists.
+
+    Args:
+        rand (random.Random): The random generator.
+
+    Returns:
+        dict[str, Any]: The response data.
+    '''
+
+    artists: list[dict[str, Any]] = []
+
+    for _ in range(100):
+        artist: dict[str, Any] = make_artist(rand)
+        artists.append(
+            {
+                'artist_id': artist['id'],
+                'name': artist['name'],
+                'followers': artist['followers']['total'],
+                'popularity': artist['popularity'],
+                'href': artist['href'],
+                'artist_type': artist['type'],
+                'uri': artist['uri'],
+                'genres': artist['genres'],
+                'last_checked_date': datetime.date(2021, 8, 1),
+                'external_urls': [{'url': artist['external_urls']['spotify']}],
+                'image_urls': artist['images'],
+            }
+        )
+
+    return {'artists': artists}
+
+
+def measure(function: Callable[[], Any], repeat: int) -> float:
+    '''
+    Measure the median duration of a function call.
+
+    Args:
+        function (Callable[[], Any]): The function.
+        repeat (int): The number of calls.
+
+    Returns:
+        float: The median duration in seconds.
+    '''
+
+    durations: list[float] = []
+
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=200)
+    args: argparse.Namespace = parser.parse_args()
+    rand: random.Random = random.Random(42)
+    new_releases: bytes = codec.dumps(
+        {'albums': {'items': [make_album(rand) for _ in range(50)]}}
+    )
+    artists: bytes = codec.dumps(
+        {'artists': [make_artist(rand) for _ in range(50)]}
+    )
+    artists_response: dict[str, Any] = make_artists_response(rand)
+    cases: list[tuple[str, int, Callable[[], Any]]] = [
+        (
+            'loads new-releases',
+            len(new_releases),
+            lambda: codec.loads(new_releases),
+        ),
+        ('loads artists', len(artists), lambda: codec.loads(artists)),
+        (
+            'dumps /api/artists/',
+            len(codec.dumps(artists_response)),
+            lambda: codec.dumps(artists_response),
+        ),
+    ]
+    orjson: Any = codec.orjson
+
+    if orjson is None:
+        print('orjson is not installed: only the stdlib is measured.')
+
+    for label, size, function in cases:
+        codec.orjson = None
+        stdlib: float = measure(function, args.repeat)
+        line: str = (
+            f'{label:<20} {size / 1024:7.1f}KiB '
+            f'stdlib={stdlib * 1000:.3f}ms'
+        )
+
+        if orjson is not None:
+            codec.orjson = orjson
+            fast: float = measure(function, args.repeat)
+            line += (
+                f' orjson={fast * 1000:.3f}ms '
+                f'saved={(stdlib - fast) * 1000:.3f}ms '
+                f'(x{stdlib / fast:.1f})'
+            )
+
+        print(line)
+
+    codec.orjson = orjson
+
+
+if __name__ == '__main__':
+    main()
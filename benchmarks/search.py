@@ -0,0 +1,182 @@
+'''
+Measure the search latency on a large synthetic catalog.
+
+The documents are random pronounceable names with a random popularity,
+indexed exactly like the sync does. The queries are prefixes (of one,
+two, and three to six characters) and misspelled names of indexed
+documents, once the posting lists lengths are cached (as by a running
+server).
+
+On 1,000,000 names (about 12 million postings) with SQLite, the one
+and two characters prefixes p99 is about 1 ms (14.1 and 4.0 ms when
+ranking the matches on the fly, growing with the names sharing
+the prefix), the longer prefixes p99 is 12 to 19.5 ms and the typo
+queries p99 is 15 to 23 ms across runs: the typo tolerant matching
+stays about at the 20 ms target rather than below it, most of its
+time being the scan of up to MAX_POSTINGS postings.
+
+Usage:
+    python -m benchmarks.search [--documents 1000000] [--queries 1000]
+'''
+
+import argparse
+import random
+import statistics
+import time
+from benchmarks._django import setup_django
+
+setup_django()
+
+from api.libs.search import (
+    get_postings_counts,
+    get_trigrams,
+    normalize,
+    search,
+)
+from api.models import SearchDocument, SearchTrigram
+
+_SYLLABLES: list[str] = [
+    consonant + vowel for consonant in 'bcdfghjklmnprstvz' for vowel in 'aeiou'
+]
+
+
+def random_name(rand: random.Random) -> str:
+    '''
+    Generate a random name of one to three words.
+
+    Args:
+        rand (random.Random): The random generator.
+
+    Returns:
+        str: The name.
+    '''
+
+    return ' '.join(
+        ''.join(rand.choices(_SYLLABLES, k=rand.randint(2, 4))).capitalize()
+        for _ in range(rand.randint(1, 3))
+    )
+
+
+def populate(documents: int, rand: random.Random) -> list[str]:
+    '''
+    Index the synthetic documents.
+
+    Args:
+        documents (int): The number of documents.
+        rand (random.Random): The random generator.
+
+    Returns:
+        list[str]: The indexed names.
+    '''
+
+    names: list[str] = []
+    batch_size: int = 10000
+
+    for start in range(0, documents, batch_size):
+        batch: list[SearchDocument] = []
+
+        for object_id in range(start, min(start + batch_size, documents)):
+            name: str = random_name(rand)
+            normalized: str = normalize(name)
+            names.append(name)
+            batch.append(
+                SearchDocument(
+                    document_id=object_id + 1,
+                    kind=SearchDocument.ARTIST,
+                    object_id=str(object_id),
+                    name=name,
+                    normalized_name=normalized,
+                    prefix1=normalized[:1],
+                    prefix2=normalized[:2],
+                    trigram_count=len(get_trigrams(normalized)),
+                    popularity=rand.randint(0, 100),
+                )
+            )
+
+        SearchDocument.objects.bulk_create(batch)
+        SearchTrigram.objects.bulk_create(
+            [
+                SearchTrigram(trigram=trigram, document_id=document.pk)
+                for document in batch
+                for trigram in get_trigrams(document.normalized_name)
+            ],
+            batch_size=batch_size,
+        )
+
+    return names
+
+
+def misspell(name: str, rand: random.Random) -> str:
+    '''
+    Swap two adjacent letters of a name.
+
+    Args:
+        name (str): The name.
+        rand (random.Random): The random generator.
+
+    Returns:
+        str: The misspelled name.
+    '''
+
+    i: int = rand.randint(1, len(name) - 2)
+
+    return name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+
+
+def percentiles(latencies: list[float]) -> str:
+    '''
+    Format the latencies percentiles in milliseconds.
+
+    Args:
+        latencies (list[float]): The latencies in seconds.
+
+    Returns:
+        str: The formatted percentiles.
+    '''
+
+    quantiles: list[float] = statistics.quantiles(latencies, n=100)
+
+    return (
+        f'p50={quantiles[49] * 1000:.2f}ms '
+        f'p99={quantiles[98] * 1000:.2f}ms '
+        f'max={max(latencies) * 1000:.2f}ms'
+    )
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument('--documents', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=1000)
+    args: argparse.Namespace = parser.parse_args()
+    rand: random.Random = random.Random(42)
+
+    start: float = time.perf_counter()
+    names: list[str] = populate(args.documents, rand)
+    print(
+        f'{args.documents} documents indexed '
+        f'in {time.perf_counter() - start:.1f}s'
+    )
+
+    get_postings_counts(
+        SearchTrigram.objects.values_list('trigram', flat=True).distinct()
+    )
+
+    for label, make_query in (
+        ('prefix1', lambda name: name[:1]),
+        ('prefix2', lambda name: name[:2]),
+        ('prefix', lambda name: name[: rand.randint(3, 6)]),
+        ('typo', lambda name: misspell(name, rand)),
+    ):
+        latencies: list[float] = []
+
+        for name in rand.sample(names, args.queries):
+            query: str = make_query(name)
+            start = time.perf_counter()
+            search(query)
+            latencies.append(time.perf_counter() - start)
+
+        print(f'{label:<7} {args.queries} queries: {percentiles(latencies)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+'''
+Measure the import time of the processes started by the autoscaler:
+the WSGI and ASGI workers (up to their first request) and a management
+command, with python -X importtime.
+
+Each process is started several times and the best run is kept.
+The slowest modules (by self time) of the last process are listed.
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--top 15] [--budget-ms 500]
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+from benchmarks._django import BASE_DIR
+
+# The processes measured, as python arguments.
+PROCESSES: dict[str, list[str]] = {
+    'wsgi': ['-c', 'import core.wsgi, core.urls'],
+    'asgi': ['-c', 'import core.asgi, core.urls'],
+    'manage.py check': ['manage.py', 'check'],
+}
+
+
+def import_times(args: list[str]) -> list[tuple[str, int, int]]:
+    '''
+    Run a Python process with -X importtime.
+
+    Args:
+        args (list[str]): The python arguments.
+
+    Returns:
+        list[tuple[str, int, int]]: The imported modules with their self
+            and cumulative times in microseconds, indented by depth.
+    '''
+
+    env: dict[str, str] = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'core.settings',
+    }
+    stderr: str = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stderr
+    times: list[tuple[str, int, int]] = []
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_us, cumulative_us, module = line[12:].split('|')
+        times.append((module.rstrip(), int(self_us), int(cumulative_us)))
+
+    return times
+
+
+def total_time(times: list[tuple[str, int, int]]) -> int:
+    '''
+    Sum the cumulative times of the top-level imports.
+
+    Args:
+        times (list[tuple[str, int, int]]): The import times.
+
+    Returns:
+        int: The total import time in microseconds.
+    '''
+
+    return sum(
+        cumulative
+        for module, _, cumulative in times
+        if not module.startswith('  ')
+    )
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float)
+    args: argparse.Namespace = parser.parse_args()
+    over_budget: bool = False
+
+    for label, process in PROCESSES.items():
+        runs: list[list[tuple[str, int, int]]] = [
+            import_times(process) for _ in range(args.runs)
+        ]
+        best: float = min(total_time(times) for times in runs) / 1000
+        over: bool = args.budget_ms is not None and best > args.budget_ms
+        over_budget = over_budget or over
+        print(f'{label:<16} {best:7.1f}ms' + (' over budget' if over else ''))
+
+        for module, self_us, _ in sorted(
+            runs[-1], key=lambda time: time[1], reverse=True
+        )[: args.top]:
+            print(f'    {self_us / 1000:6.1f}ms {module.strip()}')
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
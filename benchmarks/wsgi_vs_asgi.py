@@ -0,0 +1,159 @@
+'''
+Compare the WSGI and ASGI deployments under slow Spotify responses.
+
+Every request goes through the /auth/callback view, whose Spotify calls
+(get_token and get_me) are replaced by a fixed latency.
+The WSGI deployment serves the requests with a fixed pool of workers,
+the ASGI deployment serves all of them from a single event loop.
+
+Usage:
+    python -m benchmarks.wsgi_vs_asgi [--requests 200] [--latency 0.2]
+        [--workers 4]
+'''
+
+import argparse
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from benchmarks._django import setup_django
+
+setup_django()
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import include, path
+from api.libs.spotify.auth import Auth, Token
+from api.libs.spotify.spotify_api import SpotifyAPI
+from user.views import AsyncAuthCallbackView, AuthCallbackView
+
+urlpatterns = [
+    path('wsgi/callback/', AuthCallbackView.as_view()),
+    path('asgi/callback/', AsyncAuthCallbackView.as_view()),
+    path('', include('core.urls')),
+]
+
+
+def patch_spotify(latency: float) -> None:
+    '''
+    Replace the Spotify calls of the callback by a fixed latency.
+
+    Args:
+        latency (float): The latency of each Spotify call in seconds.
+    '''
+
+    def get_token(self: Auth, code: str) -> Token:
+        time.sleep(latency)
+        self.token = Token('ACCESS_TOKEN', 'Bearer', 3600, 'REFRESH', 'scope')
+
+        return self.token
+
+    def get_me(self: SpotifyAPI) -> dict[str, Any]:
+        time.sleep(latency)
+
+        return {'email': 'benchmark@test.com'}
+
+    Auth.get_token = get_token
+    SpotifyAPI.get_me = get_me
+
+
+def run_wsgi(requests: int, workers: int) -> float:
+    '''
+    Serve the requests with a pool of WSGI workers.
+
+    Args:
+        requests (int): The number of requests.
+        workers (int): The number of workers.
+
+    Returns:
+        float: The elapsed time in seconds.
+    '''
+
+    handler: WSGIHandler = WSGIHandler()
+
+    def request(_: int) -> None:
+        environ: dict[str, Any] = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': '/wsgi/callback/',
+            'QUERY_STRING': 'code=CODE',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+        }
+        response: Any = handler(environ, lambda status, headers: None)
+        response.close()
+
+    start: float = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(request, range(requests)))
+
+    return time.perf_counter() - start
+
+
+def run_asgi(requests: int) -> float:
+    '''
+    Serve the requests concurrently from a single ASGI event loop.
+
+    Args:
+        requests (int): The number of requests.
+
+    Returns:
+        float: The elapsed time in seconds.
+    '''
+
+    handler: ASGIHandler = ASGIHandler()
+
+    async def request() -> None:
+        scope: dict[str, Any] = {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/asgi/callback/',
+            'query_string': b'code=CODE',
+            'headers': [(b'host', b'localhost')],
+        }
+
+        async def receive() -> dict[str, Any]:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message: dict[str, Any]) -> None:
+            pass
+
+        await handler(scope, receive, send)
+
+    async def main() -> None:
+        await asyncio.gather(*(request() for _ in range(requests)))
+
+    start: float = time.perf_counter()
+    asyncio.run(main())
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--workers', type=int, default=4)
+    args: argparse.Namespace = parser.parse_args()
+    settings.ROOT_URLCONF = __name__
+    patch_spotify(args.latency)
+
+    for name, elapsed in (
+        (
+            f'WSGI ({args.workers} workers)',
+            run_wsgi(args.requests, args.workers),
+        ),
+        ('ASGI (1 event loop)', run_asgi(args.requests)),
+    ):
+        print(
+            f'{name:<22} {args.requests} requests in {elapsed:.2f}s '
+            f'({args.requests / elapsed:.1f} req/s)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.events import EventStreamApp  # noqa: E402 (needs the settings)
+
+# The server-sent events are streamed outside of Django, which can't
+# stream a response asynchronously.
+application = EventStreamApp(
+    django_application,
+    path='/api/events/',
+    heartbeat=settings.APP_CONFIG.EVENTS_HEARTBEAT,
+)
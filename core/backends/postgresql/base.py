@@ -0,0 +1,241 @@
+import threading
+from typing import Any, Optional
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+_POOLS: dict[str, 'BlockingConnectionPool'] = {}
+_POOLS_LOCK: threading.Lock = threading.Lock()
+
+
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    '''
+    A thread safe connection pool keeping the connections given back
+    open, and waiting for a free connection when exhausted instead
+    of failing at once: a burst of concurrent queries beyond the pool
+    size is served as the connections are given back.
+
+    Attributes:
+        timeout (float): The maximum time to wait for a connection,
+            in seconds.
+    '''
+
+    def __init__(
+        self, minconn: int, maxconn: int, timeout: float, **kwargs: Any
+    ):
+        '''
+        The constructor.
+
+        Args:
+            minconn (int): The number of connections opened upfront.
+            maxconn (int): The maximum number of connections.
+            timeout (float): The maximum time to wait for a connection,
+                in seconds.
+            **kwargs (Any): The psycopg2 connection parameters.
+        '''
+
+        super().__init__(minconn, maxconn, **kwargs)
+        # psycopg2 only keeps minconn connections given back, closing
+        # the others: keep them all, still opened lazily.
+        self.minconn: int = maxconn
+        self.timeout: float = timeout
+        self._slots: threading.BoundedSemaphore = threading.BoundedSemaphore(
+            maxconn
+        )
+
+    def getconn(self, key: Optional[Any] = None) -> Any:
+        '''
+        Get a connection, waiting for one to be given back
+        if the pool is exhausted.
+
+        Args:
+            key (Optional[Any]): The connection key. Default to None.
+
+        Raises:
+            pool.PoolError: If no connection was given back in time.
+
+        Returns:
+            Any: The connection.
+        '''
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pool.PoolError(
+                f'connection pool exhausted for {self.timeout}s'
+            )
+
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(
+        self,
+        conn: Optional[Any] = None,
+        key: Optional[Any] = None,
+        close: bool = False,
+    ) -> None:
+        '''
+        Give a connection back to the pool, waking up a waiting thread.
+
+        Args:
+            conn (Optional[Any]): The connection. Default to None.
+            key (Optional[Any]): The connection key. Default to None.
+            close (bool): Close the connection. Default to False.
+        '''
+
+        super().putconn(conn, key, close)
+        self._slots.release()
+
+
+def _get_pool(
+    alias: str, max_size: int, timeout: float, conn_params: dict[str, Any]
+) -> BlockingConnectionPool:
+    '''
+    Get (or lazily create) the process-wide connection pool of an alias.
+
+    Args:
+        alias (str): The database alias.
+        max_size (int): The maximum number of connections in the pool.
+        timeout (float): The maximum time to wait for a connection
+            of the exhausted pool, in seconds.
+        conn_params (dict[str, Any]): The psycopg2 connection parameters.
+
+    Returns:
+        BlockingConnectionPool: The connection pool.
+    '''
+
+    with _POOLS_LOCK:
+        if alias not in _POOLS:
+            _POOLS[alias] = BlockingConnectionPool(
+                0, max_size, timeout, **conn_params
+            )
+
+        return _POOLS[alias]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    '''
+    The PostgreSQL backend with connection health checks
+    and an optional local connection pool.
+
+    The health checks are enabled by the CONN_HEALTH_CHECKS key
+    of the database settings: a persistent connection is pinged once
+    per request before being reused, so a connection dropped by the
+    server (or a proxy) is transparently replaced.
+
+    The pool is enabled by a strictly positive "pool_max_size" option.
+    Closing a connection gives it back to the pool instead of closing
+    the socket, so the connection setup is paid once per worker.
+    Once exhausted, the pool makes the queries wait for a connection
+    for up to the "pool_timeout" option (in seconds).
+
+    Attributes:
+        health_check_done (bool): True if the connection has already been
+            checked during the current request.
+    '''
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.health_check_done: bool = False
+
+    @property
+    def pool_max_size(self) -> int:
+        '''
+        Returns the maximum size of the pool (0 if the pool is disabled).
+
+        Returns:
+            int: The pool maximum size.
+        '''
+
+        return self.settings_dict['OPTIONS'].get('pool_max_size') or 0
+
+    @property
+    def pool_timeout(self) -> float:
+        '''
+        Returns the maximum time to wait for a connection
+        of the exhausted pool, in seconds.
+
+        Returns:
+            float: The pool timeout.
+        '''
+
+        return self.settings_dict['OPTIONS'].get('pool_timeout') or 10.0
+
+    def get_connection_params(self) -> dict[str, Any]:
+        conn_params: dict[str, Any] = super().get_connection_params()
+        conn_params.pop('pool_max_size', None)
+        conn_params.pop('pool_timeout', None)
+
+        return conn_params
+
+    def get_new_connection(self, conn_params: dict[str, Any]) -> Any:
+        if not self.pool_max_size:
+            return super().get_new_connection(conn_params)
+
+        connection_pool: BlockingConnectionPool = _get_pool(
+            self.alias, self.pool_max_size, self.pool_timeout, conn_params
+        )
+        connection: Any = connection_pool.getconn()
+
+        # A pooled connection may have been closed by the server
+        # while it was idle. Drop it and open a fresh one.
+        if connection.closed:
+            connection_pool.putconn(connection, close=True)
+            connection = connection_pool.getconn()
+
+        options: dict[str, Any] = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level
+        )
+
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+
+        base.psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+
+        return connection
+
+    def _close(self) -> None:
+        if self.connection is None or not self.pool_max_size:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            connection_pool: BlockingConnectionPool = _get_pool(
+                self.alias,
+                self.pool_max_size,
+                self.pool_timeout,
+                self.get_connection_params(),
+            )
+
+            # Never give back a connection with a pending transaction.
+            if not self.connection.closed and not self.autocommit:
+                self.connection.rollback()
+
+            connection_pool.putconn(
+                self.connection, close=bool(self.connection.closed)
+            )
+
+    def ensure_connection(self) -> None:
+        if (
+            self.connection is not None
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.close()
+
+            self.health_check_done = True
+
+        super().ensure_connection()
+
+    def connect(self) -> None:
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self) -> None:
+        super().close_if_unusable_or_obsolete()
+        # Called at the start and at the end of each request.
+        self.health_check_done = False
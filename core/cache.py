@@ -0,0 +1,36 @@
+from typing import Any
+from core.config import Config
+
+LOCMEM_BACKEND: str = 'django.core.cache.backends.locmem.LocMemCache'
+MEMCACHED_BACKEND: str = 'django.core.cache.backends.memcached.PyMemcacheCache'
+
+
+def get_caches(config: Config) -> dict[str, Any]:
+    '''
+    Build the CACHES setting from the configuration.
+    The sessions get their own alias, so the default cache
+    evictions never log users out.
+
+    Args:
+        config (Config): The application configuration.
+
+    Returns:
+        dict[str, Any]: The CACHES setting.
+    '''
+
+    caches: dict[str, Any] = {}
+
+    for alias in ('default', 'sessions'):
+        if config.CACHE_LOCATION:
+            caches[alias] = {
+                'BACKEND': MEMCACHED_BACKEND,
+                'LOCATION': config.CACHE_LOCATION,
+                'KEY_PREFIX': alias,
+            }
+        else:
+            caches[alias] = {
+                'BACKEND': LOCMEM_BACKEND,
+                'LOCATION': alias,
+            }
+
+    return caches
@@ -0,0 +1,146 @@
+import gzip
+from typing import Any, Callable, Iterable, Optional
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+IDENTITY: str = 'identity'
+GZIP: str = 'gzip'
+BROTLI: str = 'br'
+ZSTD: str = 'zstd'
+# The compressors of the available encodings, by order of preference
+# (the best ratio first). Brotli and Zstandard are optional
+# (compression extra).
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {}
+
+if brotli is not None:  # pragma: no cover
+    COMPRESSORS[BROTLI] = lambda body: brotli.compress(body, quality=11)
+
+if zstandard is not None:  # pragma: no cover
+    COMPRESSORS[ZSTD] = zstandard.ZstdCompressor(level=19).compress
+
+# The modification time is left out of the gzip header,
+# so a body is always compressed to the same bytes.
+COMPRESSORS[GZIP] = lambda body: gzip.compress(body, 9, mtime=0)
+
+
+def compress_variants(
+    body: bytes, encodings: Optional[Iterable[str]] = None
+) -> dict[str, bytes]:
+    '''
+    Compress a response body in advance, once per encoding,
+    at the highest compression levels since the variants are served
+    many times.
+
+    Args:
+        body (bytes): The response body.
+        encodings (Optional[Iterable[str]]): The encodings to compress.
+            Default to None (all the available encodings).
+
+    Returns:
+        dict[str, bytes]: The body by content encoding,
+            including the identity one.
+    '''
+
+    variants: dict[str, bytes] = {IDENTITY: body}
+
+    for encoding in COMPRESSORS if encodings is None else encodings:
+        if encoding in COMPRESSORS:
+            variants[encoding] = COMPRESSORS[encoding](body)
+
+    return variants
+
+
+def negotiate_encoding(
+    accept_encoding: str, encodings: Optional[Iterable[str]] = None
+) -> str:
+    '''
+    Select the content encoding of a response from the Accept-Encoding
+    request header: the preferred encoding of the client (its highest
+    quality value), the best compression ratio on ties.
+    The identity encoding is selected if no encoding is acceptable.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding request header.
+        encodings (Optional[Iterable[str]]): The encodings available.
+            Default to None (all the available encodings).
+
+    Returns:
+        str: The selected content encoding.
+    '''
+
+    qualities: dict[str, float] = {}
+
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.partition(';')
+        name = name.strip().lower()
+        quality: float = 1.0
+
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if name:
+            qualities[name] = quality
+
+    best: str = IDENTITY
+    best_quality: float = 0.0
+
+    for encoding in COMPRESSORS if encodings is None else encodings:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+
+        if encoding != IDENTITY and quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+def get_precompressed_response(
+    variants: dict[str, bytes],
+    accept_encoding: str,
+    content_type: str,
+    **kwargs: Any,
+) -> HttpResponse:
+    '''
+    Build a response serving the stored variant of its body
+    negotiated with the client, as is.
+    The response varies on Accept-Encoding, so the caches keep
+    a variant per encoding.
+
+    Args:
+        variants (dict[str, bytes]): The body by content encoding
+            (see compress_variants).
+        accept_encoding (str): The Accept-Encoding request header.
+        content_type (str): The content type of the body.
+        **kwargs (Any): The other HttpResponse arguments.
+
+    Returns:
+        HttpResponse: The response.
+    '''
+
+    encoding: str = negotiate_encoding(accept_encoding, variants)
+    response: HttpResponse = HttpResponse(
+        variants[encoding], content_type=content_type, **kwargs
+    )
+    response['Content-Length'] = str(len(variants[encoding]))
+
+    if encoding != IDENTITY:
+        response['Content-Encoding'] = encoding
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    return response
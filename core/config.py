@@ -1,30 +1,294 @@
 import os
-from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+
+def parse_bool(value: str) -> bool:
+    '''
+    Parse a boolean environment variable.
+
+    Args:
+        value (str): The variable value (1, true or yes for True).
+
+    Returns:
+        bool: The boolean.
+    '''
+
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def parse_list(value: str) -> list[str]:
+    '''
+    Parse a comma separated environment variable.
+
+    Args:
+        value (str): The variable value.
+
+    Returns:
+        list[str]: The non-empty items, stripped.
+    '''
+
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class Env:
+    '''
+    A configuration variable, read from the environment and validated
+    on its first access only, so the process starts without reading
+    (nor requiring) the variables it never uses.
+
+    Attributes:
+        parse (Callable[[str], Any]): The parser of the variable value.
+        default (Optional[str]): The value of the variable if not set,
+            None if the variable is required.
+        name (str): The variable name (the attribute name).
+    '''
+
+    def __init__(
+        self,
+        parse: Callable[[str], Any] = str,
+        default: Optional[str] = None,
+    ):
+        '''
+        The constructor.
+
+        Args:
+            parse (Callable[[str], Any]): The parser of the variable value,
+                raising a ValueError if invalid. Default to str.
+            default (Optional[str]): The value of the variable if not set.
+                Default to None (required).
+        '''
+
+        self.parse: Callable[[str], Any] = parse
+        self.default: Optional[str] = default
+        self.name: str = ''
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        '''
+        Read and parse the variable, then store it on the instance
+        (read once per configuration).
+
+        Args:
+            instance (Any): The configuration.
+            owner (Optional[type]): The configuration class.
+                Default to None.
+
+        Raises:
+            ImproperlyConfigured: If the variable is required and not set,
+                or invalid.
+
+        Returns:
+            Any: The variable value (the descriptor on the class).
+        '''
+
+        if instance is None:
+            return self
+
+        raw: Optional[str] = os.environ.get(self.name, self.default)
+
+        if raw is None:
+            raise ImproperlyConfigured(
+                f'The {self.name} environment variable is required.'
+            )
+
+        try:
+            value: Any = self.parse(raw)
+        except ValueError:
+            raise ImproperlyConfigured(
+                f'Invalid {self.name} environment variable: "{raw}".'
+            )
+
+        instance.__dict__[self.name] = value
+
+        return value
 
 
-@dataclass
 class Config:
     '''
     Configuration class for core.
+    The variables are read from the environment on their first access.
 
     Attributes:
         SPOTIFY_API_REDIRECT_URI (str): The Spotify API redirect URI.
         SPOTIFY_API_SCOPE (list[str]): The Spotify API scope.
         SPOTIFY_API_CLIENT_ID (str): The Spotify API client ID.
         SPOTIFY_API_CLIENT_SECRET (str): The Spotify API client secret.
+        SPOTIFY_STREAM_PAGES (bool): Parse the new releases pages
+            as they are received instead of once downloaded.
+        ASYNC_VIEWS (bool): Serve the Spotify bound views asynchronously
+            (to enable when deployed with an ASGI server).
+        WORKER_THREADS (int): The number of threads of a worker process
+            querying the database concurrently (the thread pool
+            of the async Spotify client).
+        SYNC_MARKETS (list[str]): The markets (ISO country codes)
+            whose new releases are synced, ALL for all the stored markets,
+            empty for Spotify's default selection.
+        CACHE_LOCATION (str): The shared (memcached) cache location,
+            empty to use a local memory cache per process.
+        USER_CACHE_TTL (int): The time in seconds during which
+            the authenticated user is served from the cache.
+        EVENTS_BROKER (str): The delivery of the server-sent events
+            (local to the publishing process, or cache to share them
+            between the workers through the cache).
+        EVENTS_POLL_INTERVAL (float): The interval in seconds at which
+            each worker polls the cache broker.
+        EVENTS_HEARTBEAT (float): The interval in seconds of the
+            comments keeping the idle events streams open.
+        DATABASE_ENGINE (str): The database backend to use
+            (sqlite or postgresql).
+        DATABASE_CONN_MAX_AGE (int): The lifetime of a persistent
+            database connection in seconds (0 closes it after each request).
+        DATABASE_CONN_HEALTH_CHECKS (bool): Check a persistent connection
+            before reusing it in a new request.
+        DATABASE_POOL_MAX_SIZE (int): The maximum size of the local
+            connection pool per worker process (0 disables the pool),
+            at least WORKER_THREADS.
+        DATABASE_POOL_TIMEOUT (float): The time in seconds a query waits
+            for a connection of the exhausted local pool before failing.
+        DATABASE_REPLICAS (list[str]): The read replicas (hosts for
+            PostgreSQL, file paths for SQLite).
+        DATABASE_REPLICA_LAG (int): The time in seconds during which
+            the reads stay on the primary after a sync.
         POSTGRES_HOST (str): The PostgreSQL host.
         POSTGRES_PORT (int): The PostgreSQL port.
         POSTGRES_USER (str): The PostgreSQL user.
         POSTGRES_PASS (str): The PostgreSQL password.
+        POSTGRES_DB (str): The PostgreSQL database name.
     '''
 
-    SPOTIFY_API_REDIRECT_URI: str = os.environ['SPOTIFY_API_REDIRECT_URI']
-    SPOTIFY_API_SCOPE: list[str] = field(
-        default_factory=os.environ['SPOTIFY_API_SCOPE'].split
+    SPOTIFY_API_REDIRECT_URI: str = Env()
+    SPOTIFY_API_SCOPE: list[str] = Env(str.split)
+    SPOTIFY_API_CLIENT_ID: str = Env()
+    SPOTIFY_API_CLIENT_SECRET: str = Env()
+    SPOTIFY_STREAM_PAGES: bool = Env(parse_bool, 'false')
+    ASYNC_VIEWS: bool = Env(parse_bool, 'false')
+    WORKER_THREADS: int = Env(int, '64')
+    SYNC_MARKETS: list[str] = Env(
+        lambda value: [market.upper() for market in parse_list(value)], ''
     )
-    SPOTIFY_API_CLIENT_ID: str = os.environ['SPOTIFY_API_CLIENT_ID']
-    SPOTIFY_API_CLIENT_SECRET: str = os.environ['SPOTIFY_API_CLIENT_SECRET']
-    POSTGRES_HOST: str = os.environ['POSTGRES_HOST']
-    POSTGRES_PORT: int = int(os.environ['POSTGRES_PORT'])
-    POSTGRES_USER: str = os.environ['POSTGRES_USER']
-    POSTGRES_PASS: str = os.environ['POSTGRES_PASS']
+    CACHE_LOCATION: str = Env(str, '')
+    USER_CACHE_TTL: int = Env(int, '60')
+    EVENTS_BROKER: str = Env(str, 'local')
+    EVENTS_POLL_INTERVAL: float = Env(float, '1')
+    EVENTS_HEARTBEAT: float = Env(float, '15')
+    DATABASE_ENGINE: str = Env(str, 'sqlite')
+    DATABASE_CONN_MAX_AGE: int = Env(int, '60')
+    DATABASE_CONN_HEALTH_CHECKS: bool = Env(parse_bool, 'true')
+    DATABASE_POOL_MAX_SIZE: int = Env(int, '0')
+    DATABASE_POOL_TIMEOUT: float = Env(float, '10')
+    DATABASE_REPLICAS: list[str] = Env(parse_list, '')
+    DATABASE_REPLICA_LAG: int = Env(int, '5')
+    POSTGRES_HOST: str = Env()
+    POSTGRES_PORT: int = Env(int)
+    POSTGRES_USER: str = Env()
+    POSTGRES_PASS: str = Env()
+    POSTGRES_DB: str = Env(str, 'groover')
+
+    def __init__(self, **values: Any):
+        '''
+        The constructor.
+
+        Args:
+            **values (Any): The variables set explicitly,
+                instead of read from the environment.
+
+        Raises:
+            TypeError: If a variable is unknown.
+        '''
+
+        for name, value in values.items():
+            if name not in self.variables():
+                raise TypeError(f'Unknown configuration variable {name}.')
+
+            self.__dict__[name] = value
+
+    @classmethod
+    def variables(cls) -> list[str]:
+        '''
+        Get the names of the configuration variables.
+
+        Returns:
+            list[str]: The variables names.
+        '''
+
+        return [
+            name for name, value in vars(cls).items() if isinstance(value, Env)
+        ]
+
+    def replace(self, **changes: Any) -> 'Config':
+        '''
+        Copy the configuration, with some variables changed.
+
+        Args:
+            **changes (Any): The changed variables.
+
+        Returns:
+            Config: The new configuration.
+        '''
+
+        return Config(**{**self.__dict__, **changes})
+
+    def validate(self) -> list[str]:
+        '''
+        Read all the variables, e.g. to check a deployment
+        (see check_config). The PostgreSQL variables are only read
+        when the PostgreSQL backend is selected, whose local pool
+        must not be smaller than the worker threads.
+
+        Returns:
+            list[str]: The errors of the missing or invalid variables.
+        '''
+
+        errors: list[str] = []
+
+        for name in self.variables():
+            if (
+                name.startswith('POSTGRES_')
+                and self.DATABASE_ENGINE.lower() != 'postgresql'
+            ):
+                continue
+
+            try:
+                getattr(self, name)
+            except ImproperlyConfigured as error:
+                errors.append(str(error))
+
+        if errors or self.DATABASE_ENGINE.lower() != 'postgresql':
+            return errors
+
+        # The queries beyond the pool size would wait for a connection.
+        if 0 < self.DATABASE_POOL_MAX_SIZE < self.WORKER_THREADS:
+            errors.append(
+                f'DATABASE_POOL_MAX_SIZE ({self.DATABASE_POOL_MAX_SIZE}) '
+                f'must be 0 or at least WORKER_THREADS '
+                f'({self.WORKER_THREADS}).'
+            )
+
+        return errors
+
+
+def check_config(app_configs: Any = None, **kwargs: Any) -> list[Any]:
+    '''
+    The deployment check of the configuration (manage.py check --deploy),
+    reporting the missing or invalid variables before the first request
+    needing them.
+
+    Args:
+        app_configs (Any): The checked applications.
+            Default to None (all).
+        **kwargs (Any): The other check arguments.
+
+    Returns:
+        list[Any]: The check errors.
+    '''
+
+    from django.conf import settings
+
+    return [
+        checks.Error(error, id='core.E001')
+        for error in settings.APP_CONFIG.validate()
+    ]
@@ -0,0 +1,138 @@
+from pathlib import Path
+from typing import Any
+from django.core.exceptions import ImproperlyConfigured
+from core.config import Config
+
+REPLICA_PREFIX: str = 'replica_'
+SQLITE: str = 'sqlite'
+POSTGRESQL: str = 'postgresql'
+ENGINES: dict[str, str] = {
+    SQLITE: 'django.db.backends.sqlite3',
+    POSTGRESQL: 'core.backends.postgresql',
+}
+
+
+def get_databases(config: Config, base_dir: Path) -> dict[str, Any]:
+    '''
+    Build the DATABASES setting from the configuration.
+    Fail fast with an ImproperlyConfigured error if the configuration
+    is not consistent, rather than on the first request.
+
+    Args:
+        config (Config): The application configuration.
+        base_dir (Path): The project base directory
+            (used to locate the SQLite file).
+
+    Raises:
+        ImproperlyConfigured: If the configuration is invalid.
+
+    Returns:
+        dict[str, Any]: The DATABASES setting.
+    '''
+
+    engine: str = config.DATABASE_ENGINE.lower()
+
+    if engine not in ENGINES:
+        raise ImproperlyConfigured(
+            f'DATABASE_ENGINE must be one of {", ".join(ENGINES)}. '
+            f'"{config.DATABASE_ENGINE}" given.'
+        )
+
+    if config.DATABASE_CONN_MAX_AGE < 0:
+        raise ImproperlyConfigured(
+            'DATABASE_CONN_MAX_AGE must be greater or equal to 0.'
+        )
+
+    if config.DATABASE_REPLICA_LAG < 0:
+        raise ImproperlyConfigured(
+            'DATABASE_REPLICA_LAG must be greater or equal to 0.'
+        )
+
+    if config.DATABASE_POOL_MAX_SIZE < 0:
+        raise ImproperlyConfigured(
+            'DATABASE_POOL_MAX_SIZE must be greater or equal to 0.'
+        )
+
+    if config.DATABASE_POOL_TIMEOUT <= 0:
+        raise ImproperlyConfigured(
+            'DATABASE_POOL_TIMEOUT must be greater than 0.'
+        )
+
+    if engine == SQLITE:
+        default: dict[str, Any] = {
+            'ENGINE': ENGINES[SQLITE],
+            'NAME': base_dir / 'db.sqlite3',
+            'CONN_MAX_AGE': config.DATABASE_CONN_MAX_AGE,
+        }
+
+        return {
+            'default': default,
+            **_get_replicas(
+                default,
+                'NAME',
+                [base_dir / replica for replica in config.DATABASE_REPLICAS],
+            ),
+        }
+
+    for key in ('POSTGRES_HOST', 'POSTGRES_USER', 'POSTGRES_DB'):
+        value: str = getattr(config, key)
+
+        if not value or value == '...':
+            raise ImproperlyConfigured(
+                f'{key} is required when DATABASE_ENGINE is "{POSTGRESQL}".'
+            )
+
+    default = {
+        'ENGINE': ENGINES[POSTGRESQL],
+        'NAME': config.POSTGRES_DB,
+        'USER': config.POSTGRES_USER,
+        'PASSWORD': config.POSTGRES_PASS,
+        'HOST': config.POSTGRES_HOST,
+        'PORT': config.POSTGRES_PORT,
+        # With a local pool, the pool owns the connections lifetime:
+        # Django hands the connection back at the end of each request.
+        'CONN_MAX_AGE': (
+            0
+            if config.DATABASE_POOL_MAX_SIZE
+            else config.DATABASE_CONN_MAX_AGE
+        ),
+        'CONN_HEALTH_CHECKS': config.DATABASE_CONN_HEALTH_CHECKS,
+        'OPTIONS': {
+            'pool_max_size': config.DATABASE_POOL_MAX_SIZE,
+            'pool_timeout': config.DATABASE_POOL_TIMEOUT,
+        },
+    }
+
+    return {
+        'default': default,
+        **_get_replicas(default, 'HOST', config.DATABASE_REPLICAS),
+    }
+
+
+def _get_replicas(
+    default: dict[str, Any], key: str, replicas: list[Any]
+) -> dict[str, Any]:
+    '''
+    Build the read replicas settings from the primary settings.
+    Each replica is named "replica_<index>" and only differs
+    from the primary by the given key.
+    In tests, the replicas mirror the primary test database.
+
+    Args:
+        default (dict[str, Any]): The primary database settings.
+        key (str): The settings key which locates a replica
+            (NAME for SQLite, HOST for PostgreSQL).
+        replicas (list[Any]): The replicas locations.
+
+    Returns:
+        dict[str, Any]: The replicas settings by alias.
+    '''
+
+    return {
+        f'{REPLICA_PREFIX}{index}': {
+            **default,
+            key: location,
+            'TEST': {'MIRROR': 'default'},
+        }
+        for index, location in enumerate(replicas)
+    }
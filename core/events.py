@@ -0,0 +1,488 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+from weakref import WeakKeyDictionary
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from core.codec import dumps
+
+ASGIApp = Callable[[dict, Callable, Callable], Awaitable[None]]
+
+LOCAL: str = 'local'
+CACHE: str = 'cache'
+# The number of pending events kept per connection: the oldest
+# are dropped for the clients too slow to read them.
+QUEUE_SIZE: int = 16
+# The queue items of the heartbeats and of the disconnections.
+PING: object = object()
+CLOSE: object = object()
+_CACHE_KEY: str = 'core:events'
+_CACHE_TIMEOUT: int = 3600
+
+
+class Event:
+    '''
+    A server-sent event.
+
+    Attributes:
+        event_id (int): The event ID, increasing.
+        name (str): The event name.
+        data (dict[str, Any]): The JSON serializable payload.
+    '''
+
+    def __init__(self, event_id: int, name: str, data: dict[str, Any]):
+        '''
+        The constructor.
+
+        Args:
+            event_id (int): The event ID, increasing.
+            name (str): The event name.
+            data (dict[str, Any]): The JSON serializable payload.
+        '''
+
+        self.event_id: int = event_id
+        self.name: str = name
+        self.data: dict[str, Any] = data
+
+    def encode(self) -> bytes:
+        '''
+        Encode the event in the text/event-stream format.
+
+        Returns:
+            bytes: The encoded event.
+        '''
+
+        return (
+            f'id: {self.event_id}\n'
+            f'event: {self.name}\n'
+            f'data: {dumps(self.data).decode()}\n\n'
+        ).encode()
+
+
+class EventHub:
+    '''
+    The in-process fan-out of the events to the connected clients.
+    An idle client only costs a small queue: the events are pushed
+    to the queues, once per event loop, from any thread.
+
+    Attributes:
+        last_event (Optional[Event]): The last published event,
+            sent to the clients reconnecting after having missed it.
+    '''
+
+    def __init__(self):
+        '''
+        The constructor.
+        '''
+
+        self.last_event: Optional[Event] = None
+        self._queues: dict[asyncio.AbstractEventLoop, set[asyncio.Queue]] = (
+            defaultdict(set)
+        )
+        self._lock: threading.Lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        '''
+        Subscribe to the events from the running event loop.
+
+        Returns:
+            asyncio.Queue: The queue receiving the events.
+        '''
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+        with self._lock:
+            self._queues[asyncio.get_running_loop()].add(queue)
+
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        '''
+        Unsubscribe a queue from the events.
+
+        Args:
+            queue (asyncio.Queue): The subscribed queue.
+        '''
+
+        with self._lock:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            self._queues[loop].discard(queue)
+
+            if not self._queues[loop]:
+                del self._queues[loop]
+
+    @property
+    def subscriber_count(self) -> int:
+        '''
+        The number of subscribed queues.
+
+        Returns:
+            int: The number of subscribed queues.
+        '''
+
+        with self._lock:
+            return sum(len(queues) for queues in self._queues.values())
+
+    def publish(self, event: Event) -> None:
+        '''
+        Push an event to all the subscribed queues.
+        Thread safe: the queues are filled by their own event loop.
+
+        Args:
+            event (Event): The event.
+        '''
+
+        with self._lock:
+            self.last_event = event
+            loops: list[asyncio.AbstractEventLoop] = list(self._queues)
+
+        for loop in loops:
+            loop.call_soon_threadsafe(self._fan_out, loop, event)
+
+    def ping(self) -> None:
+        '''
+        Push a heartbeat to the idle queues of the running event loop.
+        '''
+
+        with self._lock:
+            queues: list[asyncio.Queue] = list(
+                self._queues.get(asyncio.get_running_loop(), ())
+            )
+
+        for queue in queues:
+            if queue.empty():
+                queue.put_nowait(PING)
+
+    @staticmethod
+    def put(queue: asyncio.Queue, item: Any) -> None:
+        '''
+        Push an item to a queue, dropping its oldest item when full.
+
+        Args:
+            queue (asyncio.Queue): The queue.
+            item (Any): The item.
+        '''
+
+        if queue.full():
+            queue.get_nowait()
+
+        queue.put_nowait(item)
+
+    def _fan_out(self, loop: asyncio.AbstractEventLoop, event: Event) -> None:
+        with self._lock:
+            queues: list[asyncio.Queue] = list(self._queues.get(loop, ()))
+
+        for queue in queues:
+            self.put(queue, event)
+
+
+class LocalBroker:
+    '''
+    The broker delivering the events to the clients of the publishing
+    process only (a single worker deployment).
+    '''
+
+    def __init__(self, hub: EventHub):
+        '''
+        The constructor.
+
+        Args:
+            hub (EventHub): The hub of the process.
+        '''
+
+        self.hub: EventHub = hub
+
+    def publish(self, event: Event) -> None:
+        '''
+        Publish an event.
+
+        Args:
+            event (Event): The event.
+        '''
+
+        self.hub.publish(event)
+
+    def start(self) -> None:
+        '''
+        Start delivering the events of the other processes
+        (there aren't any).
+        '''
+
+
+class CacheBroker(LocalBroker):
+    '''
+    The broker delivering the events to the clients of all
+    the workers sharing the cache, standing in for a pub/sub server.
+    The events are appended to the cache and each worker polls
+    the last event ID, once for all its clients.
+
+    Attributes:
+        poll_interval (float): The polling interval in seconds.
+    '''
+
+    def __init__(self, hub: EventHub, poll_interval: float):
+        '''
+        The constructor.
+
+        Args:
+            hub (EventHub): The hub of the process.
+            poll_interval (float): The polling interval in seconds.
+        '''
+
+        super().__init__(hub)
+        self.poll_interval: float = poll_interval
+        self._poller: Optional[asyncio.Task] = None
+
+    def publish(self, event: Event) -> None:
+        '''
+        Publish an event to all the workers.
+        The events are delivered by the pollers, the publishing
+        worker's included.
+
+        Args:
+            event (Event): The event.
+        '''
+
+        cache: Any = caches['default']
+        cache.add(_CACHE_KEY, 0, timeout=None)
+        sequence: int = cache.incr(_CACHE_KEY)
+        cache.set(
+            f'{_CACHE_KEY}:{sequence}',
+            (event.event_id, event.name, event.data),
+            timeout=_CACHE_TIMEOUT,
+        )
+
+    def start(self) -> None:
+        '''
+        Start the poller of the running event loop, if not started.
+        '''
+
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self) -> None:
+        # The cache client blocks: it is called from a worker thread,
+        # once per poll, not to stall the clients of the event loop.
+        read: Callable[..., Awaitable[Any]] = sync_to_async(
+            self._read, thread_sensitive=False
+        )
+        sequence: int = await sync_to_async(
+            caches['default'].get, thread_sensitive=False
+        )(_CACHE_KEY, 0)
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            events: list[tuple]
+            sequence, events = await read(sequence)
+
+            for event in events:
+                self.hub.publish(Event(*event))
+
+    @staticmethod
+    def _read(sequence: int) -> tuple[int, list[tuple]]:
+        '''
+        Read the events appended to the cache after a sequence number.
+
+        Args:
+            sequence (int): The sequence number of the last event read.
+
+        Returns:
+            tuple[int, list[tuple]]: The last sequence number
+                and the events appended since the given one.
+        '''
+
+        cache: Any = caches['default']
+        last: int = cache.get(_CACHE_KEY, 0)
+
+        if last <= sequence:
+            return last, []
+
+        events: dict[str, tuple] = cache.get_many(
+            [
+                f'{_CACHE_KEY}:{next_sequence}'
+                for next_sequence in range(sequence + 1, last + 1)
+            ]
+        )
+
+        return last, [
+            events[f'{_CACHE_KEY}:{next_sequence}']
+            for next_sequence in range(sequence + 1, last + 1)
+            if f'{_CACHE_KEY}:{next_sequence}' in events
+        ]
+
+
+hub: EventHub = EventHub()
+_broker: Optional[LocalBroker] = None
+
+
+def get_broker() -> LocalBroker:
+    '''
+    Get the broker of the process, as configured by EVENTS_BROKER.
+
+    Returns:
+        LocalBroker: The broker.
+    '''
+
+    global _broker
+
+    if _broker is None:
+        if settings.APP_CONFIG.EVENTS_BROKER == CACHE:
+            _broker = CacheBroker(
+                hub, settings.APP_CONFIG.EVENTS_POLL_INTERVAL
+            )
+        else:
+            _broker = LocalBroker(hub)
+
+    return _broker
+
+
+def publish(event_id: int, name: str, data: dict[str, Any]) -> None:
+    '''
+    Publish a server-sent event to the connected clients.
+
+    Args:
+        event_id (int): The event ID, increasing.
+        name (str): The event name.
+        data (dict[str, Any]): The JSON serializable payload.
+    '''
+
+    get_broker().publish(Event(event_id, name, data))
+
+
+class EventStreamApp:
+    '''
+    The ASGI application serving the server-sent events stream
+    on a path, and delegating the other requests to an application.
+    Django 3.2 can't stream a response asynchronously, so each client
+    would otherwise hold a worker thread.
+
+    Attributes:
+        app (ASGIApp): The application of the other requests.
+        path (str): The events stream path.
+        heartbeat (float): The interval in seconds of the comments
+            keeping the idle connections open.
+    '''
+
+    def __init__(self, app: ASGIApp, path: str, heartbeat: float):
+        '''
+        The constructor.
+
+        Args:
+            app (ASGIApp): The application of the other requests.
+            path (str): The events stream path.
+            heartbeat (float): The interval in seconds of the comments
+                keeping the idle connections open.
+        '''
+
+        self.app: ASGIApp = app
+        self.path: str = path
+        self.heartbeat: float = heartbeat
+        self._heartbeats: WeakKeyDictionary = WeakKeyDictionary()
+
+    async def __call__(
+        self, scope: dict, receive: Callable, send: Callable
+    ) -> None:
+        if scope['type'] == 'http' and scope['path'] == self.path:
+            await self.stream(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def stream(
+        self, scope: dict, receive: Callable, send: Callable
+    ) -> None:
+        '''
+        Stream the events until the client disconnects.
+
+        Args:
+            scope (dict): The connection scope.
+            receive (Callable): The ASGI receive callable.
+            send (Callable): The ASGI send callable.
+        '''
+
+        if scope['method'] != 'GET':
+            await send(
+                {'type': 'http.response.start', 'status': 405, 'headers': []}
+            )
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        get_broker().start()
+        queue: asyncio.Queue = hub.subscribe()
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            }
+        )
+        await send(
+            {
+                'type': 'http.response.body',
+                'body': b'retry: 5000\n\n',
+                'more_body': True,
+            }
+        )
+        last_event_id: bytes = dict(scope['headers']).get(
+            b'last-event-id', b''
+        )
+        last_event: Optional[Event] = hub.last_event
+
+        # The client missed the last event while reconnecting.
+        if (
+            last_event is not None
+            and last_event_id.isdigit()
+            and int(last_event_id) < last_event.event_id
+        ):
+            queue.put_nowait(last_event)
+
+        self._start_heartbeat()
+        watcher: asyncio.Task = asyncio.ensure_future(
+            self._watch_disconnect(receive, queue)
+        )
+
+        # A single wait per idle client: the heartbeats and the
+        # disconnection also go through the queue.
+        try:
+            while True:
+                item: Any = await queue.get()
+
+                if item is CLOSE:
+                    break
+
+                await send(
+                    {
+                        'type': 'http.response.body',
+                        'body': (
+                            b': ping\n\n' if item is PING else item.encode()
+                        ),
+                        'more_body': True,
+                    }
+                )
+        finally:
+            watcher.cancel()
+            hub.unsubscribe(queue)
+
+    def _start_heartbeat(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        if loop not in self._heartbeats or self._heartbeats[loop].done():
+            self._heartbeats[loop] = loop.create_task(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            hub.ping()
+
+    async def _watch_disconnect(
+        self, receive: Callable, queue: asyncio.Queue
+    ) -> None:
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+        hub.put(queue, CLOSE)
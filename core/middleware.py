@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Callable
+from asgiref.sync import markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+from core.routers import get_replicas, primary_recently_written, use_primary
+
+
+class PrimaryReplicaMiddleware:
+    '''
+    Scope the read replicas pinning to the request.
+    The reads of a request start on the replicas, unless a sync has
+    just written to the primary, and stick to the primary once
+    the request writes anything.
+    The middleware supports both WSGI and ASGI, so it never forces
+    the async views to run in a sync thread.
+    '''
+
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response: Callable[[HttpRequest], Any] = get_response
+
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not get_replicas():
+            return self.get_response(request)
+
+        with use_primary(primary_recently_written()):
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not get_replicas():
+            return await self.get_response(request)
+
+        with use_primary(primary_recently_written()):
+            return await self.get_response(request)
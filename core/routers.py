@@ -0,0 +1,111 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from core.database import REPLICA_PREFIX
+
+PRIMARY: str = 'default'
+REPLICATED_APPS: set[str] = {'api'}
+_RECENT_WRITE_CACHE_KEY: str = 'core:routers:recent_write'
+_primary_pinned: ContextVar[bool] = ContextVar('primary_pinned', default=False)
+
+
+def get_replicas() -> list[str]:
+    '''
+    Returns the aliases of the configured read replicas.
+
+    Returns:
+        list[str]: The replicas aliases.
+    '''
+
+    return [
+        alias
+        for alias in settings.DATABASES
+        if alias.startswith(REPLICA_PREFIX)
+    ]
+
+
+@contextmanager
+def use_primary(pinned: bool = True) -> Iterator[None]:
+    '''
+    Send all the reads of the current context to the primary database.
+
+    Args:
+        pinned (bool): False to let the reads go to the replicas
+            until the next write instead.
+            Default to True.
+    '''
+
+    token: Any = _primary_pinned.set(pinned)
+
+    try:
+        yield
+    finally:
+        _primary_pinned.reset(token)
+
+
+def mark_primary_written() -> None:
+    '''
+    Keep the reads on the primary database, for every request
+    and every worker sharing the cache, until the replicas
+    have caught up with the last writes (see DATABASE_REPLICA_LAG).
+    '''
+
+    lag: int = settings.APP_CONFIG.DATABASE_REPLICA_LAG
+
+    if lag and get_replicas():
+        cache.set(_RECENT_WRITE_CACHE_KEY, True, timeout=lag)
+
+
+def primary_recently_written() -> bool:
+    '''
+    Returns True if the replicas may not have caught up
+    with the last writes yet.
+
+    Returns:
+        bool: True if the reads must stay on the primary.
+    '''
+
+    return cache.get(_RECENT_WRITE_CACHE_KEY, False)
+
+
+class PrimaryReplicaRouter:
+    '''
+    The database router sending the reads of the replicated apps
+    to a random read replica and all the writes to the primary.
+
+    Once a write happened in a context (a request, a sync...),
+    the following reads of the same context are pinned to the primary
+    so they always see their own writes.
+    '''
+
+    def db_for_read(
+        self, model: type[models.Model], **hints: Any
+    ) -> Optional[str]:
+        if (
+            model._meta.app_label not in REPLICATED_APPS
+            or _primary_pinned.get()
+        ):
+            return PRIMARY
+
+        replicas: list[str] = get_replicas()
+
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model: type[models.Model], **hints: Any) -> str:
+        _primary_pinned.set(True)
+
+        return PRIMARY
+
+    def allow_relation(
+        self, obj1: models.Model, obj2: models.Model, **hints: Any
+    ) -> bool:
+        # The replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> bool:
+        # The replicas are migrated through the replication.
+        return db == PRIMARY
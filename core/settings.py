@@ -23,6 +23,8 @@ except ImportError:
     pass
 
 from core.config import Config
+from core.cache import get_caches
+from core.database import get_databases
 
 APP_CONFIG: Config = Config()
 
@@ -55,6 +57,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.PrimaryReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,16 +86,18 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
+ASGI_APPLICATION = 'core.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# The backend is selected by the DATABASE_ENGINE environment variable.
+# An invalid configuration raises an ImproperlyConfigured error at startup.
+DATABASES = get_databases(APP_CONFIG, BASE_DIR)
+
+# The api reads go to the replicas (if any), the writes to the primary.
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
 
 
 # Password validation
@@ -115,6 +120,25 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = 'user.User'
 
+# The session user is loaded from the cache instead of the database.
+AUTHENTICATION_BACKENDS = ['user.backends.CachedModelBackend']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = get_caches(APP_CONFIG)
+
+
+# Sessions
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/
+
+# The sessions are read from their own cache and written through
+# to the database. The expired sessions are purged in batches
+# by the purge_sessions command.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -0,0 +1,63 @@
+import datetime
+import decimal
+import json
+from typing import Any
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from django.utils.translation import gettext_lazy as _
+from core import codec
+from core.codec import JsonResponse, dumps, loads
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def backend(request: Any, monkeypatch: MonkeyPatch) -> str:
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(codec, 'orjson', None)
+
+    return request.param
+
+
+class TestCodec:
+    def test_dumps(self, backend: str) -> None:
+        value: dict[str, Any] = {
+            'name': 'Beyoncé',
+            'date': datetime.date(2021, 8, 1),
+            'checked': datetime.datetime(
+                2021, 8, 1, 12, 30, tzinfo=datetime.timezone.utc
+            ),
+            'price': decimal.Decimal('9.99'),
+            'label': _('Invalid date.'),
+            'genres': ['pop', None, True, 1.5],
+        }
+
+        assert (
+            dumps(value)
+            == (
+                '{"name":"Beyoncé","date":"2021-08-01",'
+                '"checked":"2021-08-01T12:30:00Z","price":"9.99",'
+                '"label":"Invalid date.","genres":["pop",null,true,1.5]}'
+            ).encode()
+        )
+
+    def test_dumps_unknown(self, backend: str) -> None:
+        with pytest.raises(TypeError):
+            dumps({'value': object()})
+
+    def test_loads(self, backend: str) -> None:
+        assert loads(b'{"a":[1,"\xc3\xa9"]}') == {'a': [1, 'é']}
+        assert loads('{"a": null}') == {'a': None}
+
+        with pytest.raises(ValueError):
+            loads(b'{')
+
+    def test_json_response(self, backend: str) -> None:
+        response: JsonResponse = JsonResponse({'a': 1})
+
+        assert response['Content-Type'] == 'application/json'
+        assert json.loads(response.content) == {'a': 1}
+        assert JsonResponse([1], safe=False).content == b'[1]'
+
+        with pytest.raises(TypeError):
+            JsonResponse([1])
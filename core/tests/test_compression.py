@@ -0,0 +1,62 @@
+import gzip
+import pytest
+from django.http import HttpResponse
+from core.compression import (
+    GZIP,
+    IDENTITY,
+    compress_variants,
+    get_precompressed_response,
+    negotiate_encoding,
+)
+
+
+class TestCompression:
+    def test_compress_variants(self) -> None:
+        body: bytes = b'{"artists": []}' * 100
+        variants: dict[str, bytes] = compress_variants(body)
+
+        assert variants[IDENTITY] == body
+        assert gzip.decompress(variants[GZIP]) == body
+        assert len(variants[GZIP]) < len(body)
+        # The variants are reproducible.
+        assert compress_variants(body)[GZIP] == variants[GZIP]
+        assert compress_variants(body, [IDENTITY]) == {IDENTITY: body}
+
+    @pytest.mark.parametrize(
+        'accept_encoding, expected',
+        [
+            ('', IDENTITY),
+            ('gzip', GZIP),
+            ('deflate, GZIP;q=0.5', GZIP),
+            ('gzip;q=0', IDENTITY),
+            ('*', GZIP),
+            ('*;q=0.5, gzip;q=0', IDENTITY),
+            ('identity, gzip;q=invalid', IDENTITY),
+        ],
+    )
+    def test_negotiate_encoding(
+        self, accept_encoding: str, expected: str
+    ) -> None:
+        assert negotiate_encoding(accept_encoding, [GZIP]) == expected
+
+    def test_negotiate_encoding_preference(self) -> None:
+        assert negotiate_encoding('gzip;q=0.5, br', ['br', GZIP]) == 'br'
+        assert negotiate_encoding('gzip, br;q=0.5', ['br', GZIP]) == GZIP
+        assert negotiate_encoding('gzip, br', ['br', GZIP]) == 'br'
+
+    def test_get_precompressed_response(self) -> None:
+        variants: dict[str, bytes] = compress_variants(b'{}', [GZIP])
+        response: HttpResponse = get_precompressed_response(
+            variants, 'gzip, deflate', 'application/json'
+        )
+
+        assert response.content == variants[GZIP]
+        assert response['Content-Encoding'] == GZIP
+        assert response['Content-Length'] == str(len(variants[GZIP]))
+        assert response['Vary'] == 'Accept-Encoding'
+
+        response = get_precompressed_response(variants, '', 'text/plain')
+
+        assert response.content == b'{}'
+        assert not response.has_header('Content-Encoding')
+        assert response['Vary'] == 'Accept-Encoding'
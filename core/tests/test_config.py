@@ -0,0 +1,104 @@
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from django.core.exceptions import ImproperlyConfigured
+from core.config import Config
+
+
+class TestConfig:
+    def test_lazy(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.delenv('SPOTIFY_API_CLIENT_ID', raising=False)
+        config: Config = Config()
+        monkeypatch.setenv('SPOTIFY_API_CLIENT_ID', 'CLIENT_ID')
+
+        assert config.SPOTIFY_API_CLIENT_ID == 'CLIENT_ID'
+
+        # Read once.
+        monkeypatch.setenv('SPOTIFY_API_CLIENT_ID', 'OTHER_ID')
+
+        assert config.SPOTIFY_API_CLIENT_ID == 'CLIENT_ID'
+
+    def test_parse(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setenv('SYNC_MARKETS', ' fr,, us ')
+        monkeypatch.setenv('ASYNC_VIEWS', 'Yes')
+        monkeypatch.setenv('USER_CACHE_TTL', '30')
+        monkeypatch.delenv('DATABASE_REPLICA_LAG', raising=False)
+        config: Config = Config()
+
+        assert config.SYNC_MARKETS == ['FR', 'US']
+        assert config.ASYNC_VIEWS is True
+        assert config.USER_CACHE_TTL == 30
+        assert config.DATABASE_REPLICA_LAG == 5
+
+    def test_invalid(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.delenv('SPOTIFY_API_CLIENT_ID', raising=False)
+        monkeypatch.setenv('USER_CACHE_TTL', 'one minute')
+        config: Config = Config()
+
+        with pytest.raises(ImproperlyConfigured, match='is required'):
+            config.SPOTIFY_API_CLIENT_ID
+
+        with pytest.raises(ImproperlyConfigured, match='Invalid'):
+            config.USER_CACHE_TTL
+
+        assert config.validate() == [
+            'The SPOTIFY_API_CLIENT_ID environment variable is required.',
+            'Invalid USER_CACHE_TTL environment variable: "one minute".',
+        ]
+
+    def test_validate_postgresql(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.delenv('POSTGRES_HOST', raising=False)
+
+        assert Config(DATABASE_ENGINE='sqlite').validate() == []
+        assert Config(DATABASE_ENGINE='postgresql').validate() == [
+            'The POSTGRES_HOST environment variable is required.'
+        ]
+
+    @pytest.mark.parametrize(
+        'pool_max_size, errors',
+        [
+            (0, []),
+            (64, []),
+            (
+                10,
+                [
+                    'DATABASE_POOL_MAX_SIZE (10) must be 0 or at least '
+                    'WORKER_THREADS (64).'
+                ],
+            ),
+        ],
+    )
+    def test_validate_pool_size(
+        self, monkeypatch: MonkeyPatch, pool_max_size: int, errors: list[str]
+    ) -> None:
+        for name in ('POSTGRES_HOST', 'POSTGRES_PORT', 'POSTGRES_USER'):
+            monkeypatch.setenv(name, '1')
+
+        monkeypatch.setenv('POSTGRES_PASS', 'secret')
+
+        assert (
+            Config(
+                DATABASE_ENGINE='postgresql',
+                DATABASE_POOL_MAX_SIZE=pool_max_size,
+                WORKER_THREADS=64,
+            ).validate()
+            == errors
+        )
+        # The SQLite backend has no pool.
+        assert (
+            Config(
+                DATABASE_ENGINE='sqlite',
+                DATABASE_POOL_MAX_SIZE=pool_max_size,
+                WORKER_THREADS=64,
+            ).validate()
+            == []
+        )
+
+    def test_replace(self) -> None:
+        config: Config = Config(USER_CACHE_TTL=10, CACHE_LOCATION='a')
+
+        assert config.replace(CACHE_LOCATION='b').USER_CACHE_TTL == 10
+        assert config.replace(CACHE_LOCATION='b').CACHE_LOCATION == 'b'
+        assert config.CACHE_LOCATION == 'a'
+
+        with pytest.raises(TypeError):
+            Config(UNKNOWN=1)
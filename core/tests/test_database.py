@@ -0,0 +1,89 @@
+from pathlib import Path
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from core.config import Config
+from core.database import get_databases
+
+
+@pytest.fixture
+def config() -> Config:
+    return Config(
+        DATABASE_ENGINE='sqlite',
+        DATABASE_CONN_MAX_AGE=60,
+        DATABASE_CONN_HEALTH_CHECKS=True,
+        DATABASE_POOL_MAX_SIZE=0,
+        DATABASE_POOL_TIMEOUT=10.0,
+        POSTGRES_HOST='localhost',
+        POSTGRES_PORT=5432,
+        POSTGRES_USER='groover',
+        POSTGRES_PASS='secret',
+        POSTGRES_DB='groover',
+    )
+
+
+class TestGetDatabases:
+    def test_sqlite(self, config: Config) -> None:
+        databases: dict = get_databases(config, Path('/base'))
+
+        assert databases['default']['ENGINE'] == 'django.db.backends.sqlite3'
+        assert databases['default']['NAME'] == Path('/base/db.sqlite3')
+        assert databases['default']['CONN_MAX_AGE'] == 60
+
+    @pytest.mark.parametrize(
+        'pool_max_size, expected_max_age',
+        [(0, 60), (10, 0)],
+    )
+    def test_postgresql(
+        self, config: Config, pool_max_size: int, expected_max_age: int
+    ) -> None:
+        config = config.replace(
+            DATABASE_ENGINE='PostgreSQL',
+            DATABASE_POOL_MAX_SIZE=pool_max_size,
+        )
+        default: dict = get_databases(config, Path('/base'))['default']
+
+        assert default['ENGINE'] == 'core.backends.postgresql'
+        assert default['NAME'] == 'groover'
+        assert default['HOST'] == 'localhost'
+        assert default['PORT'] == 5432
+        assert default['CONN_MAX_AGE'] == expected_max_age
+        assert default['CONN_HEALTH_CHECKS'] is True
+        assert default['OPTIONS'] == {
+            'pool_max_size': pool_max_size,
+            'pool_timeout': 10.0,
+        }
+
+    @pytest.mark.parametrize(
+        'changes',
+        [
+            {'DATABASE_ENGINE': 'mysql'},
+            {'DATABASE_CONN_MAX_AGE': -1},
+            {'DATABASE_POOL_MAX_SIZE': -1},
+            {'DATABASE_POOL_TIMEOUT': 0},
+            {'DATABASE_ENGINE': 'postgresql', 'POSTGRES_HOST': '...'},
+            {'DATABASE_ENGINE': 'postgresql', 'POSTGRES_USER': ''},
+        ],
+    )
+    def test_invalid_config(self, config: Config, changes: dict) -> None:
+        with pytest.raises(ImproperlyConfigured):
+            get_databases(config.replace(**changes), Path('/base'))
+
+    @pytest.mark.parametrize(
+        'engine, key, expected',
+        [
+            ('sqlite', 'NAME', Path('/base/replica')),
+            ('postgresql', 'HOST', 'replica'),
+        ],
+    )
+    def test_replicas(
+        self, config: Config, engine: str, key: str, expected: str
+    ) -> None:
+        config = config.replace(
+            DATABASE_ENGINE=engine,
+            DATABASE_REPLICAS=['replica'],
+        )
+        databases: dict = get_databases(config, Path('/base'))
+
+        assert list(databases) == ['default', 'replica_0']
+        assert databases['replica_0'][key] == expected
+        assert databases['replica_0']['TEST'] == {'MIRROR': 'default'}
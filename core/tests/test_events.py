@@ -0,0 +1,206 @@
+import asyncio
+import threading
+from typing import Any
+from core import events
+from core.events import CacheBroker, Event, EventHub, EventStreamApp
+
+
+class FakeClient:
+    '''
+    The ASGI receive and send callables of a client.
+    '''
+
+    def __init__(self):
+        self.messages: list[dict] = []
+        self.disconnected: asyncio.Event = asyncio.Event()
+        self._requested: bool = False
+
+    async def receive(self) -> dict[str, Any]:
+        if not self._requested:
+            self._requested = True
+            return {'type': 'http.request', 'body': b''}
+
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message: dict) -> None:
+        self.messages.append(message)
+
+    @property
+    def body(self) -> bytes:
+        return b''.join(message.get('body', b'') for message in self.messages)
+
+
+def get_scope(path: str = '/api/events/', **headers: str) -> dict:
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'headers': [
+            (name.replace('_', '-').encode(), value.encode())
+            for name, value in headers.items()
+        ],
+    }
+
+
+async def fallback_app(scope: dict, receive: Any, send: Any) -> None:
+    await send({'type': 'http.response.start', 'status': 204, 'headers': []})
+
+
+class TestEvents:
+    def test_event_encode(self):
+        event: Event = Event(3, 'releases', {'albums': 2})
+        assert event.encode() == (
+            b'id: 3\nevent: releases\ndata: {"albums":2}\n\n'
+        )
+
+    def test_hub_publish_from_thread(self):
+        hub: EventHub = EventHub()
+
+        async def listen() -> Event:
+            queue: asyncio.Queue = hub.subscribe()
+            thread: threading.Thread = threading.Thread(
+                target=hub.publish, args=(Event(1, 'releases', {}),)
+            )
+            thread.start()
+            event: Event = await asyncio.wait_for(queue.get(), 1)
+            hub.unsubscribe(queue)
+            thread.join()
+
+            return event
+
+        assert asyncio.run(listen()).event_id == 1
+        assert hub.subscriber_count == 0
+
+    def test_hub_drops_oldest_events(self):
+        hub: EventHub = EventHub()
+
+        async def listen() -> list[int]:
+            queue: asyncio.Queue = hub.subscribe()
+
+            for event_id in range(events.QUEUE_SIZE + 2):
+                hub.publish(Event(event_id, 'releases', {}))
+
+            await asyncio.sleep(0)
+
+            return [queue.get_nowait().event_id for _ in range(queue.qsize())]
+
+        assert asyncio.run(listen()) == list(range(2, events.QUEUE_SIZE + 2))
+
+    def test_stream(self, monkeypatch):
+        hub: EventHub = EventHub()
+        monkeypatch.setattr(events, 'hub', hub)
+        monkeypatch.setattr(events, '_broker', events.LocalBroker(hub))
+        app: EventStreamApp = EventStreamApp(
+            fallback_app, '/api/events/', heartbeat=0.05
+        )
+
+        async def stream() -> FakeClient:
+            client: FakeClient = FakeClient()
+            task: asyncio.Task = asyncio.ensure_future(
+                app(get_scope(), client.receive, client.send)
+            )
+
+            while not hub.subscriber_count:
+                await asyncio.sleep(0.01)
+
+            events.publish(7, 'releases', {'albums': 1})
+            await asyncio.sleep(0.1)
+            client.disconnected.set()
+            await asyncio.wait_for(task, 1)
+
+            return client
+
+        client: FakeClient = asyncio.run(stream())
+
+        assert client.messages[0]['status'] == 200
+        assert (b'content-type', b'text/event-stream') in client.messages[0][
+            'headers'
+        ]
+        assert (
+            b'id: 7\nevent: releases\ndata: {"albums":1}\n\n' in client.body
+        )
+        assert b': ping\n\n' in client.body
+        assert hub.subscriber_count == 0
+
+    def test_stream_replays_missed_event(self, monkeypatch):
+        hub: EventHub = EventHub()
+        hub.last_event = Event(7, 'releases', {})
+        monkeypatch.setattr(events, 'hub', hub)
+        monkeypatch.setattr(events, '_broker', events.LocalBroker(hub))
+        app: EventStreamApp = EventStreamApp(
+            fallback_app, '/api/events/', heartbeat=10
+        )
+
+        async def stream(last_event_id: str) -> FakeClient:
+            client: FakeClient = FakeClient()
+            task: asyncio.Task = asyncio.ensure_future(
+                app(
+                    get_scope(last_event_id=last_event_id),
+                    client.receive,
+                    client.send,
+                )
+            )
+            await asyncio.sleep(0.05)
+            client.disconnected.set()
+            await asyncio.wait_for(task, 1)
+
+            return client
+
+        assert b'id: 7\n' in asyncio.run(stream('6')).body
+        assert b'id: 7\n' not in asyncio.run(stream('7')).body
+
+    def test_other_paths(self):
+        client: FakeClient = FakeClient()
+        app: EventStreamApp = EventStreamApp(
+            fallback_app, '/api/events/', heartbeat=10
+        )
+        asyncio.run(
+            app(get_scope('/api/albums/'), client.receive, client.send)
+        )
+
+        assert client.messages[0]['status'] == 204
+
+    def test_cache_broker(self):
+        hub: EventHub = EventHub()
+        broker: CacheBroker = CacheBroker(hub, poll_interval=0.01)
+
+        async def listen() -> Event:
+            broker.start()
+            queue: asyncio.Queue = hub.subscribe()
+            await asyncio.sleep(0.02)
+            broker.publish(Event(5, 'releases', {'albums': 3}))
+            event: Event = await asyncio.wait_for(queue.get(), 1)
+            broker._poller.cancel()
+
+            return event
+
+        event: Event = asyncio.run(listen())
+
+        assert (event.event_id, event.data) == (5, {'albums': 3})
+
+    def test_cache_broker_reads_off_loop(self, monkeypatch):
+        hub: EventHub = EventHub()
+        broker: CacheBroker = CacheBroker(hub, poll_interval=0.01)
+        threads: set[int] = set()
+        read = CacheBroker._read
+
+        def spy_read(sequence: int) -> tuple[int, list[tuple]]:
+            threads.add(threading.get_ident())
+            return read(sequence)
+
+        monkeypatch.setattr(CacheBroker, '_read', staticmethod(spy_read))
+
+        async def listen() -> int:
+            broker.start()
+            queue: asyncio.Queue = hub.subscribe()
+            await asyncio.sleep(0.02)
+            broker.publish(Event(6, 'releases', {'albums': 1}))
+            await asyncio.wait_for(queue.get(), 1)
+            broker._poller.cancel()
+
+            return threading.get_ident()
+
+        loop_thread: int = asyncio.run(listen())
+
+        assert threads and loop_thread not in threads
@@ -0,0 +1,45 @@
+import threading
+from types import ModuleType
+from unittest.mock import MagicMock
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+
+@pytest.fixture
+def base(monkeypatch: MonkeyPatch) -> ModuleType:
+    pytest.importorskip('psycopg2')
+    base: ModuleType = pytest.importorskip('core.backends.postgresql.base')
+    monkeypatch.setattr(
+        base.pool.psycopg2,
+        'connect',
+        lambda *args, **kwargs: MagicMock(closed=0),
+    )
+
+    return base
+
+
+class TestBlockingConnectionPool:
+    def test_getconn_exhausted(self, base: ModuleType) -> None:
+        connection_pool = base.BlockingConnectionPool(0, 1, 0.01)
+        connection: MagicMock = connection_pool.getconn()
+
+        with pytest.raises(base.pool.PoolError, match='exhausted'):
+            connection_pool.getconn()
+
+        # The connection given back is served again.
+        connection_pool.putconn(connection)
+
+        assert connection_pool.getconn() is connection
+
+    def test_getconn_waits(self, base: ModuleType) -> None:
+        connection_pool = base.BlockingConnectionPool(0, 1, 5)
+        connection: MagicMock = connection_pool.getconn()
+        timer: threading.Timer = threading.Timer(
+            0.05, connection_pool.putconn, [connection]
+        )
+        timer.start()
+
+        # The exhausted pool waits for the connection to be given back.
+        assert connection_pool.getconn() is connection
+
+        timer.join()
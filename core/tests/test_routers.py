@@ -0,0 +1,73 @@
+from pathlib import Path
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from django.conf import settings
+from django.core.cache import cache
+from api.models import Album
+from core.routers import (
+    PrimaryReplicaRouter,
+    mark_primary_written,
+    primary_recently_written,
+    use_primary,
+)
+from user.models import User
+
+DATABASES: dict[str, dict] = {
+    'default': {'NAME': 'primary.sqlite3'},
+    'replica_0': {'NAME': 'replica_0.sqlite3'},
+    'replica_1': {'NAME': 'replica_1.sqlite3'},
+}
+
+
+@pytest.fixture
+def router() -> PrimaryReplicaRouter:
+    cache.clear()
+
+    return PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replicas(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'DATABASES', DATABASES)
+
+
+@pytest.fixture
+def no_replicas(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        settings, 'DATABASES', {'default': DATABASES['default']}
+    )
+
+
+class TestPrimaryReplicaRouter:
+    @pytest.mark.usefixtures('replicas')
+    def test_db_for_read(self, router: PrimaryReplicaRouter) -> None:
+        with use_primary(False):
+            assert router.db_for_read(Album) in ('replica_0', 'replica_1')
+            assert router.db_for_read(User) == 'default'
+
+    @pytest.mark.usefixtures('no_replicas')
+    def test_db_for_read_without_replicas(
+        self, router: PrimaryReplicaRouter
+    ) -> None:
+        with use_primary(False):
+            assert router.db_for_read(Album) == 'default'
+
+    @pytest.mark.usefixtures('replicas')
+    def test_db_for_read_pinned(self, router: PrimaryReplicaRouter) -> None:
+        with use_primary():
+            assert router.db_for_read(Album) == 'default'
+
+        with use_primary(False):
+            assert router.db_for_write(Album) == 'default'
+            # Read your own writes.
+            assert router.db_for_read(Album) == 'default'
+
+    def test_allow_migrate(self, router: PrimaryReplicaRouter) -> None:
+        assert router.allow_migrate('default', 'api')
+        assert not router.allow_migrate('replica_0', 'api')
+
+    @pytest.mark.usefixtures('replicas')
+    def test_mark_primary_written(self, router: PrimaryReplicaRouter) -> None:
+        assert not primary_recently_written()
+        mark_primary_written()
+        assert primary_recently_written()
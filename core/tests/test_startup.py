@@ -0,0 +1,22 @@
+import pytest
+from benchmarks.startup import PROCESSES, import_times, total_time
+
+# The import time budget of a worker or command startup, generous
+# enough for slow CI machines (about 250ms on a laptop).
+BUDGET_MS: int = 1000
+# The modules slow to import, imported by their first use only.
+DEFERRED_MODULES: tuple[str, ...] = (
+    'numpy',
+    'scipy',
+    'pyarrow',
+    'requests',
+)
+
+
+@pytest.mark.parametrize('process', PROCESSES)
+def test_startup_import_time(process: str) -> None:
+    times: list[tuple[str, int, int]] = import_times(PROCESSES[process])
+    modules: set[str] = {module.strip() for module, _, _ in times}
+
+    assert modules.isdisjoint(DEFERRED_MODULES)
+    assert total_time(times) / 1000 < BUDGET_MS
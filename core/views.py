@@ -0,0 +1,16 @@
+from typing import Any, Callable
+from asgiref.sync import markcoroutinefunction
+from django.views.generic import View
+
+
+class AsyncView(View):
+    '''
+    The base class of the views whose handlers are all coroutines.
+    Django 3.2 only looks at the view function itself to decide
+    whether to await it, so the function returned by as_view
+    must be marked as a coroutine function.
+    '''
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Callable[..., Any]:
+        return markcoroutinefunction(super().as_view(**initkwargs))
@@ -0,0 +1,34 @@
+from typing import Any, Optional
+from django.contrib.auth.backends import ModelBackend
+from user.cache import cache_user, get_cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    '''
+    The authentication backend loading the session user from the cache.
+    The user row is read from the database at most once
+    per USER_CACHE_TTL seconds, instead of once per request.
+    The cached user is invalidated on each token update.
+    '''
+
+    def get_user(self, user_id: Any) -> Optional[Any]:
+        '''
+        Get the user of the session.
+
+        Args:
+            user_id (Any): The user primary key.
+
+        Returns:
+            Optional[User]: The user, None if it doesn't exists
+                or is inactive.
+        '''
+
+        user: Optional[Any] = get_cached_user(user_id)
+
+        if user is None:
+            user = super().get_user(user_id)
+
+            if user is not None:
+                cache_user(user)
+
+        return user
@@ -0,0 +1,45 @@
+from typing import Any, Optional
+from django.conf import settings
+from django.core.cache import cache
+
+_USER_CACHE_KEY: str = 'user:user:{}'
+
+
+def get_cached_user(user_id: Any) -> Optional[Any]:
+    '''
+    Get a user from the cache.
+
+    Args:
+        user_id (Any): The user primary key.
+
+    Returns:
+        Optional[User]: The user, None if not cached.
+    '''
+
+    return cache.get(_USER_CACHE_KEY.format(user_id))
+
+
+def cache_user(user: Any) -> None:
+    '''
+    Put a user in the cache for USER_CACHE_TTL seconds.
+
+    Args:
+        user (User): The user.
+    '''
+
+    cache.set(
+        _USER_CACHE_KEY.format(user.pk),
+        user,
+        timeout=settings.APP_CONFIG.USER_CACHE_TTL,
+    )
+
+
+def invalidate_cached_user(user_id: Any) -> None:
+    '''
+    Remove a user from the cache.
+
+    Args:
+        user_id (Any): The user primary key.
+    '''
+
+    cache.delete(_USER_CACHE_KEY.format(user_id))
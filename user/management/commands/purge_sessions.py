@@ -0,0 +1,54 @@
+import time
+from typing import Any
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    '''
+    The purge_sessions command.
+    Delete the expired sessions by small batches, so the session table
+    is never locked for long while the API keeps serving requests.
+    '''
+
+    help: str = 'Delete the expired sessions by batches.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of sessions deleted per batch.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.1,
+            help='The pause in seconds between two batches.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batch_size: int = options['batch_size']
+        now: Any = timezone.now()
+        deleted: int = 0
+
+        while True:
+            session_keys: list[str] = list(
+                Session.objects.filter(expire_date__lt=now).values_list(
+                    'session_key', flat=True
+                )[:batch_size]
+            )
+
+            if not session_keys:
+                break
+
+            Session.objects.filter(session_key__in=session_keys).delete()
+            deleted += len(session_keys)
+
+            if len(session_keys) < batch_size:
+                break
+
+            time.sleep(options['sleep'])
+
+        self.stdout.write(f'{deleted} expired sessions deleted.')
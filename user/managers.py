@@ -1,11 +1,26 @@
+from typing import Any
 from django.contrib.auth.models import BaseUserManager
+from django.db import connections, router
+from user.cache import invalidate_cached_user
 
 
 class CustomUserManager(BaseUserManager):
     '''
     The custom User manager class.
+
+    Attributes:
+        _TOKEN_FIELDS (list[str]): The fields updated when
+            an existing user logs in again.
     '''
 
+    _TOKEN_FIELDS: list[str] = [
+        'access_token',
+        'token_type',
+        'scope',
+        'expires_in',
+        'refreshed_date',
+    ]
+
     def create_or_update_user(
         self,
         email: str,
@@ -18,6 +33,8 @@ class CustomUserManager(BaseUserManager):
         '''
         Creates and saves a User with the given email, access_token,
         token_type, scope, refresh_token, and expires_in.
+        The user is inserted or updated in a single atomic statement,
+        so concurrent logins of the same user can't race.
 
         Args:
             email (str): The email of the user.
@@ -35,33 +52,89 @@ class CustomUserManager(BaseUserManager):
             User: The user model.
         '''
 
-        ignored_params: list[str] = ['refresh_token']
+        required_params: dict[str, Any] = {
+            'email': email,
+            'access_token': access_token,
+            'token_type': token_type,
+            'scope': scope,
+            'expires_in': expires_in,
+        }
 
-        for attr, val in locals().items():
-            if not attr in ignored_params and not val:
+        for attr, val in required_params.items():
+            if not val:
                 raise ValueError(f'Missing {attr} parameter.')
 
-        try:
-            user: self.model = self.model.objects.get(
-                email=self.normalize_email(email)
-            )
-            user.access_token = access_token
-            user.token_type = token_type
-            user.scope = scope
-            user.expires_in = expires_in
-
-            if refresh_token:
-                user.refresh_token = refresh_token
-        except self.model.DoesNotExist:
-            user = self.model(
-                email=self.normalize_email(email),
-                access_token=access_token,
-                token_type=token_type,
-                scope=scope,
-                refresh_token=refresh_token,
-                expires_in=expires_in,
-            )
+        user: self.model = self.model(
+            email=self.normalize_email(email),
+            access_token=access_token,
+            token_type=token_type,
+            scope=scope,
+            refresh_token=refresh_token or '',
+            expires_in=expires_in,
+        )
 
-        user.save(using=self._db)
+        user = self._upsert(user)
+        invalidate_cached_user(user.pk)
 
         return user
+
+    def _upsert(self, user: Any) -> Any:
+        '''
+        Insert the user, or update the token fields of the user
+        having the same email.
+        An empty refresh token keeps the stored one.
+
+        Args:
+            user (User): The unsaved user.
+
+        Returns:
+            User: The saved user, as stored in the database.
+        '''
+
+        db: str = self._db or router.db_for_write(self.model)
+        connection: Any = connections[db]
+        qn: Any = connection.ops.quote_name
+        meta: Any = self.model._meta
+        table: str = qn(meta.db_table)
+        fields: list[Any] = [
+            field for field in meta.concrete_fields if not field.primary_key
+        ]
+        columns: list[str] = [qn(field.column) for field in fields]
+        params: list[Any] = [
+            field.get_db_prep_save(
+                field.pre_save(user, add=True), connection=connection
+            )
+            for field in fields
+        ]
+        assignments: list[str] = [
+            f'{qn(meta.get_field(name).column)} = '
+            f'EXCLUDED.{qn(meta.get_field(name).column)}'
+            for name in self._TOKEN_FIELDS
+        ]
+        refresh_token: str = qn(meta.get_field('refresh_token').column)
+        assignments.append(
+            f'{refresh_token} = CASE WHEN EXCLUDED.{refresh_token} = \'\' '
+            f'THEN {table}.{refresh_token} '
+            f'ELSE EXCLUDED.{refresh_token} END'
+        )
+        sql: str = (
+            f'INSERT INTO {table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'ON CONFLICT ({qn(meta.get_field("email").column)}) '
+            f'DO UPDATE SET {", ".join(assignments)}'
+        )
+
+        if not connection.features.can_return_columns_from_insert:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+            return self.using(db).get(email=user.email)
+
+        returning: str = ', '.join(
+            qn(field.column) for field in meta.concrete_fields
+        )
+
+        # The raw queryset applies the fields converters to the returned row.
+        return list(
+            self.raw(f'{sql} RETURNING {returning}', params, using=db)
+        )[0]
@@ -0,0 +1,31 @@
+import pytest
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from user.backends import CachedModelBackend
+from user.models import User
+
+
+@pytest.mark.django_db
+class TestCachedModelBackend:
+    def test_get_user(self) -> None:
+        cache.clear()
+        user: User = User.objects.create_or_update_user(
+            email='user@test.com',
+            access_token='ACCESS_TOKEN',
+            token_type='Bearer',
+            scope='user-read-private',
+            expires_in=3600,
+            refresh_token='REFRESH_TOKEN',
+        )
+        backend: CachedModelBackend = CachedModelBackend()
+
+        assert backend.get_user(user.pk) == user
+
+        with CaptureQueriesContext(connection) as queries:
+            assert backend.get_user(user.pk) == user
+
+        assert len(queries) == 0
+
+    def test_get_user_does_not_exist(self) -> None:
+        assert CachedModelBackend().get_user(0) is None
@@ -0,0 +1,57 @@
+from typing import Any
+import pytest
+from user.cache import cache_user, get_cached_user
+from user.models import User
+
+USER_INFO: dict[str, Any] = {
+    'email': 'user@test.com',
+    'access_token': 'ACCESS_TOKEN',
+    'token_type': 'Bearer',
+    'scope': 'user-read-private user-read-email',
+    'expires_in': 3600,
+    'refresh_token': 'REFRESH_TOKEN',
+}
+
+
+@pytest.mark.django_db
+class TestCustomUserManager:
+    def test_create_or_update_user_create(self) -> None:
+        user: User = User.objects.create_or_update_user(**USER_INFO)
+        stored: User = User.objects.get(email=USER_INFO['email'])
+
+        assert user.pk == stored.pk
+        assert user.access_token == stored.access_token == 'ACCESS_TOKEN'
+        assert user.refreshed_date == stored.refreshed_date
+        assert user.is_active and not user.is_staff
+
+    @pytest.mark.parametrize(
+        'refresh_token, expected',
+        [(None, 'REFRESH_TOKEN'), ('NEW_REFRESH_TOKEN', 'NEW_REFRESH_TOKEN')],
+    )
+    def test_create_or_update_user_update(
+        self, refresh_token: str, expected: str
+    ) -> None:
+        created: User = User.objects.create_or_update_user(**USER_INFO)
+        User.objects.filter(pk=created.pk).update(is_staff=True)
+        cache_user(created)
+        updated: User = User.objects.create_or_update_user(
+            **{
+                **USER_INFO,
+                'access_token': 'NEW_ACCESS_TOKEN',
+                'refresh_token': refresh_token,
+            }
+        )
+
+        assert updated.pk == created.pk
+        assert updated.access_token == 'NEW_ACCESS_TOKEN'
+        assert updated.refresh_token == expected
+        assert updated.is_staff
+        assert User.objects.count() == 1
+        assert get_cached_user(created.pk) is None
+
+    @pytest.mark.parametrize(
+        'missing', ['email', 'access_token', 'token_type', 'scope']
+    )
+    def test_create_or_update_user_missing_param(self, missing: str) -> None:
+        with pytest.raises(ValueError, match=missing):
+            User.objects.create_or_update_user(**{**USER_INFO, missing: None})
@@ -0,0 +1,36 @@
+from datetime import timedelta
+from io import StringIO
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+class TestPurgeSessions:
+    def test_handle(self) -> None:
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [
+                Session(
+                    session_key=f'expired{i}',
+                    session_data='',
+                    expire_date=now - timedelta(days=1),
+                )
+                for i in range(5)
+            ]
+            + [
+                Session(
+                    session_key='active',
+                    session_data='',
+                    expire_date=now + timedelta(days=1),
+                )
+            ]
+        )
+        out: StringIO = StringIO()
+        call_command('purge_sessions', batch_size=2, sleep=0, stdout=out)
+
+        assert list(Session.objects.values_list('session_key', flat=True)) == [
+            'active'
+        ]
+        assert '5 expired sessions deleted.' in out.getvalue()
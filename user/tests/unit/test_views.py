@@ -0,0 +1,111 @@
+from typing import Any
+import pytest
+from asgiref.sync import async_to_sync
+from _pytest.monkeypatch import MonkeyPatch
+from django.contrib.auth import login
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from api.libs.spotify.auth import Auth, Token
+from api.libs.spotify.spotify_api import SpotifyAPI, SpotifyAPIError
+from user.models import User
+from user.views import AsyncAuthCallbackView, AsyncAuthRefreshTokenView
+
+
+async def get(request: HttpRequest) -> HttpResponse:
+    return await AsyncAuthCallbackView.as_view()(request)
+
+
+async def refresh(request: HttpRequest) -> HttpResponse:
+    return await AsyncAuthRefreshTokenView.as_view()(request)
+
+
+@pytest.fixture
+def callback_request() -> HttpRequest:
+    request: HttpRequest = RequestFactory().get(
+        '/auth/callback/', {'code': 'CODE'}
+    )
+    request.session = SessionStore()
+
+    return request
+
+
+@pytest.mark.django_db
+class TestAsyncAuthCallbackView:
+    def test_get(
+        self, callback_request: HttpRequest, monkeypatch: MonkeyPatch
+    ) -> None:
+        token: Token = Token(
+            access_token='ACCESS_TOKEN',
+            token_type='Bearer',
+            expires_in=3600,
+            refresh_token='REFRESH_TOKEN',
+            scope='user-read-private',
+        )
+        monkeypatch.setattr(Auth, 'get_token', lambda self, code: token)
+        monkeypatch.setattr(
+            SpotifyAPI, 'get_me', lambda self: {'email': 'user@test.com'}
+        )
+        response: HttpResponse = async_to_sync(get)(callback_request)
+        user: User = User.objects.get(email='user@test.com')
+
+        assert response.status_code == 302
+        assert response.url == '/api/artists/'
+        assert user.access_token == 'ACCESS_TOKEN'
+        assert callback_request.session['_auth_user_id'] == str(user.pk)
+
+    def test_get_spotify_error(
+        self, callback_request: HttpRequest, monkeypatch: MonkeyPatch
+    ) -> None:
+        def get_token(self: Auth, code: str) -> Any:
+            raise SpotifyAPIError('Spotify is down.')
+
+        monkeypatch.setattr(Auth, 'get_token', get_token)
+        response: HttpResponse = async_to_sync(get)(callback_request)
+
+        assert response.status_code == 500
+        assert not User.objects.exists()
+
+    def test_get_missing_code(self) -> None:
+        request: HttpRequest = RequestFactory().get('/auth/callback/')
+        response: HttpResponse = async_to_sync(get)(request)
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestAsyncAuthRefreshTokenView:
+    def test_get(self, monkeypatch: MonkeyPatch) -> None:
+        user: User = User.objects.create_or_update_user(
+            email='user@test.com',
+            access_token='ACCESS_TOKEN',
+            token_type='Bearer',
+            scope='user-read-private',
+            expires_in=3600,
+            refresh_token='REFRESH_TOKEN',
+        )
+
+        def update_token(self: Auth, refresh_token: str) -> Token:
+            assert refresh_token == 'REFRESH_TOKEN'
+            self.token.access_token = 'NEW_ACCESS_TOKEN'
+
+            return self.token
+
+        monkeypatch.setattr(Auth, 'update_token', update_token)
+        request: HttpRequest = RequestFactory().get('/auth/refresh-token/')
+        request.session = SessionStore()
+        login(request, user)
+        response: HttpResponse = async_to_sync(refresh)(request)
+        user.refresh_from_db()
+
+        assert response.status_code == 302
+        assert response.url == '/api/artists/'
+        assert user.access_token == 'NEW_ACCESS_TOKEN'
+
+    def test_get_anonymous(self) -> None:
+        request: HttpRequest = RequestFactory().get('/auth/refresh-token/')
+        request.session = SessionStore()
+        response: HttpResponse = async_to_sync(refresh)(request)
+
+        assert response.status_code == 302
+        assert response.url == '/auth/'
@@ -1,13 +1,32 @@
+from django.conf import settings
 from django.urls import path
-from .views import AuthView, AuthRefreshTokenView, AuthCallbackView
+from .views import (
+    AuthView,
+    AuthRefreshTokenView,
+    AuthCallbackView,
+    AsyncAuthCallbackView,
+    AsyncAuthRefreshTokenView,
+)
 
 app_name: str = 'user'
 urlpatterns = [
     path('', AuthView.as_view(), name='auth'),
     path(
         'refresh-token/',
-        AuthRefreshTokenView.as_view(),
+        (
+            AsyncAuthRefreshTokenView
+            if settings.APP_CONFIG.ASYNC_VIEWS
+            else AuthRefreshTokenView
+        ).as_view(),
         name='auth_refresh_token',
     ),
-    path('callback/', AuthCallbackView.as_view(), name='auth_callback'),
+    path(
+        'callback/',
+        (
+            AsyncAuthCallbackView
+            if settings.APP_CONFIG.ASYNC_VIEWS
+            else AuthCallbackView
+        ).as_view(),
+        name='auth_callback',
+    ),
 ]
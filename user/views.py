@@ -1,4 +1,4 @@
-from api.libs.spotify.spotify_api import SpotifyAPIError
+from asgiref.sync import sync_to_async
 from django.http.response import (
     HttpResponseBadRequest,
     HttpResponseServerError,
@@ -6,11 +6,10 @@ from django.http.response import (
 from django.utils.translation import gettext_lazy as _
 from django.shortcuts import redirect
 from django.views.generic import View
+from core.views import AsyncView
 from django.http import HttpRequest, HttpResponse
-from django.contrib.auth import login
+from django.contrib.auth import get_user, login
 from user.models import User
-from api.libs.spotify.spotify_manager import SpotifyManager
-from api.libs.spotify.auth import Token, TokenRequestError
 from django.conf import settings
 
 
@@ -34,6 +33,10 @@ class AuthView(View):
         '''
 
         if not request.user.is_authenticated:
+            # The Spotify stack (and requests) is imported on use,
+            # so loading the URLconf stays fast.
+            from api.libs.spotify.spotify_manager import SpotifyManager
+
             sp_man: SpotifyManager = SpotifyManager(
                 client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
                 client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
@@ -66,6 +69,9 @@ class AuthRefreshTokenView(View):
         if not request.user.is_authenticated:
             return redirect('user:auth')
 
+        from api.libs.spotify.auth import TokenRequestError
+        from api.libs.spotify.spotify_manager import SpotifyManager
+
         sp_man: SpotifyManager = SpotifyManager(
             client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
             client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
@@ -91,6 +97,60 @@ class AuthRefreshTokenView(View):
         return redirect('api:artists')
 
 
+class AsyncAuthRefreshTokenView(AsyncView):
+    '''
+    The /auth/refresh-token view class, served asynchronously under ASGI.
+    The Spotify call is awaited, so a slow Spotify Auth Server
+    never holds a worker.
+    '''
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            HttpResponse: An HTTP response.
+        '''
+
+        user: User = await sync_to_async(get_user)(request)
+
+        if not user.is_authenticated:
+            return redirect('user:auth')
+
+        from api.libs.spotify.async_client import AsyncSpotifyClient
+        from api.libs.spotify.auth import Token, TokenRequestError
+        from api.libs.spotify.spotify_manager import SpotifyManager
+
+        sp_man: SpotifyManager = SpotifyManager(
+            client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
+            client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
+            scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
+            redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
+        )
+        sp_man.recover_token(user)
+
+        try:
+            token_info: Token = await AsyncSpotifyClient(sp_man).update_token(
+                user.refresh_token
+            )
+        except TokenRequestError as e:
+            return HttpResponseBadRequest(e)
+
+        await sync_to_async(User.objects.create_or_update_user)(
+            email=user.email,
+            access_token=token_info.access_token,
+            token_type=token_info.token_type,
+            refresh_token=token_info.refresh_token,
+            scope=token_info.scope_as_str,
+            expires_in=token_info.expires_in,
+        )
+
+        return redirect('api:artists')
+
+
 class AuthCallbackView(View):
     '''
     The /auth/callback view class.
@@ -110,6 +170,10 @@ class AuthCallbackView(View):
             HttpResponse: An HTTP response.
         '''
 
+        from api.libs.spotify.auth import TokenRequestError
+        from api.libs.spotify.spotify_api import SpotifyAPIError
+        from api.libs.spotify.spotify_manager import SpotifyManager
+
         sp_man: SpotifyManager = SpotifyManager(
             client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
             client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
@@ -138,3 +202,61 @@ class AuthCallbackView(View):
         login(request, user)
 
         return redirect('api:artists')
+
+
+class AsyncAuthCallbackView(AsyncView):
+    '''
+    The /auth/callback view class, served asynchronously under ASGI.
+    The Spotify calls are awaited, so a slow Spotify Auth Server
+    never holds a worker.
+    '''
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        '''
+        The GET method implementation.
+        Request the Spotify Token and create a new user,
+        then authenticate it.
+        Redirect the client to the /api/artists route.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            HttpResponse: An HTTP response.
+        '''
+
+        from api.libs.spotify.async_client import AsyncSpotifyClient
+        from api.libs.spotify.auth import Token, TokenRequestError
+        from api.libs.spotify.spotify_api import SpotifyAPIError
+        from api.libs.spotify.spotify_manager import SpotifyManager
+
+        client: AsyncSpotifyClient = AsyncSpotifyClient(
+            SpotifyManager(
+                client_id=settings.APP_CONFIG.SPOTIFY_API_CLIENT_ID,
+                client_secret=settings.APP_CONFIG.SPOTIFY_API_CLIENT_SECRET,
+                scope=settings.APP_CONFIG.SPOTIFY_API_SCOPE,
+                redirect_uri=settings.APP_CONFIG.SPOTIFY_API_REDIRECT_URI,
+            )
+        )
+        code: str = request.GET.get('code')
+
+        if not code:
+            return HttpResponseBadRequest(_('Missing code.'))
+
+        try:
+            token_info: Token = await client.get_token(code)
+            me_info: dict[str, str] = await client.get_me()
+        except (TokenRequestError, SpotifyAPIError) as e:
+            return HttpResponseServerError(e)
+
+        user: User = await sync_to_async(User.objects.create_or_update_user)(
+            email=me_info['email'],
+            access_token=token_info.access_token,
+            token_type=token_info.token_type,
+            refresh_token=token_info.refresh_token,
+            expires_in=token_info.expires_in,
+            scope=token_info.scope_as_str,
+        )
+        await sync_to_async(login)(request, user)
+
+        return redirect('api:artists')